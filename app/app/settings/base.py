@@ -1,7 +1,7 @@
 import os
 
-from configuration import AcceptedFileTypes
-from decouple import Csv, config
+from configuration import AcceptedFileTypes, get_s3_origins
+from decouple import Choices, Csv, config
 from django.utils.csp import CSP
 from django.utils.translation import gettext_lazy as _
 
@@ -88,6 +88,8 @@ AUTHENTICATION_BACKENDS = [
 ]
 
 MIDDLEWARE = [
+    # Removed when REQUEST_PROFILER_ENABLED is False
+    "recordtransfer.middleware.RequestProfilerMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.middleware.csp.ContentSecurityPolicyMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -129,6 +131,7 @@ TEMPLATES = [
                 "recordtransfer.context_processors.signup_status",
                 "recordtransfer.context_processors.file_upload_status",
                 "recordtransfer.context_processors.constants_context",
+                "recordtransfer.context_processors.page_cache_csrf_token",
             ],
         },
     },
@@ -168,11 +171,6 @@ LOGIN_URL = "/account/login/"
 
 AUTH_USER_MODEL = "recordtransfer.User"
 
-FILE_UPLOAD_HANDLERS = [
-    "django.core.files.uploadhandler.MemoryFileUploadHandler",
-    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
-]
-
 # Internationalization
 # https://docs.djangoproject.com/en/3.0/topics/i18n/
 
@@ -229,8 +227,51 @@ STATICFILES_DIRS = [
 STORAGES = {
     "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
     "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    "temp_uploads": {"BACKEND": "upload.storage.TempFileStorage"},
+    "uploads": {"BACKEND": "upload.storage.UploadedFileStorage"},
+    "job_files": {"BACKEND": "recordtransfer.storage.OverwriteStorage"},
 }
 
+# Where uploaded files and job files are stored, either "filesystem" or "s3"
+FILE_STORAGE_BACKEND = config("FILE_STORAGE_BACKEND", default="filesystem")
+
+# Let clients upload files straight to the object store. Only used if FILE_STORAGE_BACKEND is s3
+DIRECT_UPLOAD_ENABLED = FILE_STORAGE_BACKEND == "s3" and config(
+    "DIRECT_UPLOAD_ENABLED", default=False, cast=bool
+)
+
+if FILE_STORAGE_BACKEND == "s3":
+    _S3_OPTIONS = {
+        "bucket_name": config("S3_BUCKET_NAME"),
+        "endpoint_url": config("S3_ENDPOINT_URL", default=None),
+        "access_key": config("S3_ACCESS_KEY_ID", default=None),
+        "secret_key": config("S3_SECRET_ACCESS_KEY", default=None),
+        "region_name": config("S3_REGION_NAME", default=None),
+        "querystring_expire": config("S3_PRESIGNED_URL_EXPIRE_SECONDS", default=300, cast=int),
+    }
+    STORAGES.update(
+        {
+            "temp_uploads": {
+                "BACKEND": "upload.s3.S3MediaStorage",
+                "OPTIONS": {**_S3_OPTIONS, "location": "temp", "file_overwrite": False},
+            },
+            "uploads": {
+                "BACKEND": "upload.s3.S3MediaStorage",
+                "OPTIONS": {**_S3_OPTIONS, "location": "uploaded_files", "file_overwrite": False},
+            },
+            "job_files": {
+                "BACKEND": "upload.s3.S3MediaStorage",
+                "OPTIONS": {**_S3_OPTIONS, "file_overwrite": True},
+            },
+        }
+    )
+
+    if DIRECT_UPLOAD_ENABLED:
+        # Browsers upload the parts of each file to pre-signed URLs on the object store
+        SECURE_CSP_POLICY["connect-src"] += get_s3_origins(
+            _S3_OPTIONS["bucket_name"], _S3_OPTIONS["endpoint_url"], _S3_OPTIONS["region_name"]
+        )
+
 # CAAIS dates
 
 CAAIS_UNKNOWN_DATE_TEXT = config("CAAIS_UNKNOWN_DATE_TEXT", cast=str, default="Unknown date")
@@ -277,6 +318,49 @@ UPLOAD_STORAGE_FOLDER = config(
 )
 TEMP_STORAGE_FOLDER = config("TEMP_STORAGE_FOLDER", default=os.path.join(MEDIA_ROOT, "temp"))
 
+# Let NGINX write upload request bodies to files, instead of streaming them through the app
+UPLOAD_OFFLOAD_ENABLED = config("UPLOAD_OFFLOAD_ENABLED", default=False, cast=bool)
+UPLOAD_OFFLOAD_FOLDER = config(
+    "UPLOAD_OFFLOAD_FOLDER", default=os.path.join(TEMP_STORAGE_FOLDER, ".offload")
+)
+# Sent by NGINX with each offloaded upload, so that only NGINX can tell the app which file to take
+UPLOAD_OFFLOAD_SECRET = config("UPLOAD_OFFLOAD_SECRET", default="")
+
+# Reserving disk space for uploads and bag jobs
+STORAGE_BUDGET_ENABLED = config("STORAGE_BUDGET_ENABLED", default=True, cast=bool)
+STORAGE_BUDGET_HIGH_WATERMARK_PERCENT = config(
+    "STORAGE_BUDGET_HIGH_WATERMARK_PERCENT", default=90, cast=int
+)
+STORAGE_BUDGET_LOW_WATERMARK_PERCENT = config(
+    "STORAGE_BUDGET_LOW_WATERMARK_PERCENT", default=80, cast=int
+)
+STORAGE_BUDGET_RESERVATION_TIMEOUT_SECONDS = config(
+    "STORAGE_BUDGET_RESERVATION_TIMEOUT_SECONDS", default=3600, cast=int
+)
+STORAGE_BUDGET_RETRY_SECONDS = config("STORAGE_BUDGET_RETRY_SECONDS", default=300, cast=int)
+
+# Removing files that no database row refers to
+STORAGE_GC_SCHEDULE = config("STORAGE_GC_SCHEDULE", default="", cast=str)
+STORAGE_GC_MIN_AGE_MINUTES = config("STORAGE_GC_MIN_AGE_MINUTES", default=1440, cast=int)
+STORAGE_GC_QUARANTINE_FOLDER = config("STORAGE_GC_QUARANTINE_FOLDER", default="", cast=str)
+
+# Number of seconds the total row count of a paginated table is cached for
+PAGINATION_COUNT_CACHE_SECONDS = config("PAGINATION_COUNT_CACHE_SECONDS", default=300, cast=int)
+
+# Number of seconds the parts of the submission form shared by every user are cached for
+SUBMISSION_FORM_CONTEXT_CACHE_SECONDS = config(
+    "SUBMISSION_FORM_CONTEXT_CACHE_SECONDS", default=3600, cast=int
+)
+
+# Where sessions are stored, either "db", "cached_db", or "cache"
+SESSION_STORE = config("SESSION_STORE", default="db", cast=Choices(["db", "cached_db", "cache"]))
+SESSION_ENGINE = f"django.contrib.sessions.backends.{SESSION_STORE}"
+
+# Where the submission form keeps its state between steps, either "session" or "redis"
+SUBMISSION_FORM_STORAGE = config(
+    "SUBMISSION_FORM_STORAGE", default="session", cast=Choices(["session", "redis"])
+)
+
 # Upload session settings
 UPLOAD_SESSION_MAX_CONCURRENT_OPEN = config(
     "UPLOAD_SESSION_MAX_CONCURRENT_OPEN", default=8, cast=int
@@ -302,6 +386,33 @@ IN_PROGRESS_SUBMISSION_EXPIRING_EMAIL_SCHEDULE = config(
     cast=str,
 )
 
+# Email outbox settings
+EMAIL_OUTBOX_DRAIN_SCHEDULE = config(
+    "EMAIL_OUTBOX_DRAIN_SCHEDULE",
+    default="* * * * *",
+    cast=str,
+)
+
+EMAIL_OUTBOX_BATCH_SIZE = config("EMAIL_OUTBOX_BATCH_SIZE", default=50, cast=int)
+
+EMAIL_OUTBOX_MAX_PER_MINUTE = config("EMAIL_OUTBOX_MAX_PER_MINUTE", default=60, cast=int)
+
+EMAIL_OUTBOX_MAX_ATTEMPTS = config("EMAIL_OUTBOX_MAX_ATTEMPTS", default=5, cast=int)
+
+EMAIL_OUTBOX_RETRY_BACKOFF_SECONDS = config(
+    "EMAIL_OUTBOX_RETRY_BACKOFF_SECONDS", default=60, cast=int
+)
+
+# Metrics for the upload, scan, bag, and email pipelines, exposed to staff users and to requests
+# made to the application directly from these networks
+METRICS_ENABLED = config("METRICS_ENABLED", default=False, cast=bool)
+METRICS_ALLOWED_NETWORKS = config(
+    "METRICS_ALLOWED_NETWORKS", default="127.0.0.1/32,::1/128", cast=Csv()
+)
+
+# Log the queries, cache lookups, and time taken by each request, for development
+REQUEST_PROFILER_ENABLED = config("REQUEST_PROFILER_ENABLED", default=False, cast=bool)
+
 FIXTURE_DIRS = [
     os.path.join(BASE_DIR, "fixtures"),
 ]
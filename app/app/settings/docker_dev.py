@@ -64,6 +64,13 @@ RQ_QUEUES = {
         "PASSWORD": config("REDIS_PASSWORD", ""),
         "DEFAULT_TIMEOUT": 500,
     },
+    "email": {
+        "HOST": config("REDIS_HOST", default="redis"),
+        "PORT": config("REDIS_PORT", cast=int, default=6379),
+        "DB": 0,  # Redis database index
+        "PASSWORD": config("REDIS_PASSWORD", ""),
+        "DEFAULT_TIMEOUT": 500,
+    },
 }
 
 RQ_SHOW_ADMIN_LINK = True
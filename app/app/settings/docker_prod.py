@@ -14,10 +14,17 @@ SECRET_KEY = config("SECRET_KEY", cast=str)
 # Enforce the shared Content Security Policy in production.
 SECURE_CSP = SECURE_CSP_POLICY
 
-# Extra Middleware for caching
+# Extra Middleware for caching whole pages. Must come after the session, locale, CSRF,
+# authentication, and message middleware
 
-MIDDLEWARE.insert(0, "django.middleware.cache.UpdateCacheMiddleware")
-MIDDLEWARE.append("django.middleware.cache.FetchFromCacheMiddleware")
+MIDDLEWARE.append("recordtransfer.middleware.PageCacheMiddleware")
+
+
+# Fingerprint and precompress static files when they are collected
+
+STORAGES["staticfiles"] = {
+    "BACKEND": "recordtransfer.storage.CompressedManifestStaticFilesStorage",
+}
 
 
 # Recaptcha
@@ -49,6 +56,13 @@ RQ_QUEUES = {
         "PASSWORD": config("REDIS_PASSWORD", default=""),
         "DEFAULT_TIMEOUT": 500,
     },
+    "email": {
+        "HOST": config("REDIS_HOST", default="redis"),
+        "PORT": config("REDIS_PORT", cast=int, default=6379),
+        "DB": 0,  # Redis database index
+        "PASSWORD": config("REDIS_PASSWORD", default=""),
+        "DEFAULT_TIMEOUT": 500,
+    },
 }
 
 RQ_SHOW_ADMIN_LINK = True
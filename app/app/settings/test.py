@@ -39,6 +39,13 @@ RQ_QUEUES = {
         "PASSWORD": "",
         "DEFAULT_TIMEOUT": 500,
     },
+    "email": {
+        "HOST": "0.0.0.0",
+        "PORT": 6379,
+        "DB": 0,  # Redis database index
+        "PASSWORD": "",
+        "DEFAULT_TIMEOUT": 500,
+    },
 }
 
 CACHES = {
@@ -76,6 +83,15 @@ STORAGES = {
     "staticfiles": {
         "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
     },
+    "temp_uploads": {
+        "BACKEND": "upload.storage.TempFileStorage",
+    },
+    "uploads": {
+        "BACKEND": "upload.storage.UploadedFileStorage",
+    },
+    "job_files": {
+        "BACKEND": "recordtransfer.storage.OverwriteStorage",
+    },
 }
 
 LOGGING = {
@@ -119,10 +135,16 @@ LOGGING = {
 # Disable ClamAV scanning in tests
 CLAMAV_ENABLED = False
 
+# There is no Redis server to keep storage reservations in during tests
+STORAGE_BUDGET_ENABLED = False
+
 BASE_DIR = tempfile.mkdtemp()
 MEDIA_ROOT = str(Path(BASE_DIR) / "media")
 TEMP_STORAGE_FOLDER = str(Path(MEDIA_ROOT) / "temp")
 Path(TEMP_STORAGE_FOLDER).mkdir(parents=True, exist_ok=True)
+UPLOAD_OFFLOAD_FOLDER = str(Path(TEMP_STORAGE_FOLDER) / ".offload")
+Path(UPLOAD_OFFLOAD_FOLDER).mkdir(parents=True, exist_ok=True)
+UPLOAD_OFFLOAD_SECRET = "test-upload-offload-secret"
 UPLOAD_STORAGE_FOLDER = str(Path(MEDIA_ROOT) / "uploads")
 Path(UPLOAD_STORAGE_FOLDER).mkdir(parents=True, exist_ok=True)
 
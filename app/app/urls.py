@@ -20,7 +20,6 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 from django.views.decorators.cache import cache_page
-from django.views.i18n import JavaScriptCatalog
 from nginx.errors import custom_404, custom_500
 from recordtransfer.views.account import (
     AsyncPasswordChangeView,
@@ -28,7 +27,8 @@ from recordtransfer.views.account import (
     AsyncPasswordResetView,
     Login,
 )
-from utility import get_js_translation_version
+from recordtransfer.views.i18n import CATALOG_MAX_AGE, VersionedJavaScriptCatalog
+from recordtransfer.views.metrics import metrics
 
 handler404 = custom_404
 handler500 = custom_500
@@ -62,12 +62,11 @@ urlpatterns = [
     # Django's built-in auth URLs (remaining views that aren't overridden)
     path("account/", include("django.contrib.auth.urls")),
     path(
-        "jsi18n/",
-        cache_page(86400, key_prefix="jsi18n-%s" % get_js_translation_version())(
-            JavaScriptCatalog.as_view()
-        ),
+        "jsi18n/<str:version>/<str:language>/",
+        cache_page(CATALOG_MAX_AGE)(VersionedJavaScriptCatalog.as_view()),
         name="javascript-catalog",
     ),
+    path("metrics/", metrics, name="metrics"),
 ]
 
 if settings.DEBUG:
@@ -1,6 +1,8 @@
 """Custom config parsers."""
 
 import re
+from typing import Optional
+from urllib.parse import urlsplit
 
 
 class AcceptedFileTypes(object):
@@ -93,3 +95,30 @@ class AcceptedFileTypes(object):
                 accepted_types[name].add(extension)
 
         return accepted_types
+
+
+def get_s3_origins(
+    bucket_name: str, endpoint_url: Optional[str] = None, region_name: Optional[str] = None
+) -> list[str]:
+    """Get the origins that pre-signed URLs for an S3 bucket can point to.
+
+    Browsers need to be allowed to connect to these origins to upload files directly to the
+    bucket.
+
+    Args:
+        bucket_name: The name of the bucket
+        endpoint_url: The URL of the S3-compatible object store, if it is not AWS
+        region_name: The AWS region the bucket is in
+
+    Returns:
+        The origin of the endpoint, which is used with path-style URLs. For AWS, the global and
+        regional origins of the bucket, which are used with virtual-hosted-style URLs
+    """
+    if endpoint_url:
+        url = urlsplit(endpoint_url)
+        return [f"{url.scheme}://{url.netloc}"]
+
+    origins = [f"https://{bucket_name}.s3.amazonaws.com"]
+    if region_name:
+        origins.append(f"https://{bucket_name}.s3.{region_name}.amazonaws.com")
+    return origins
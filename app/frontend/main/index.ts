@@ -10,9 +10,6 @@ import "./css/base/tooltip.css";
 import "./css/base/widget.css";
 import "./css/base/accounts.css";
 
-import "./css/submission_form/review_step.css";
-import "./css/submission_form/uppy.css";
-
 import "htmx-ext-head-support";
 import htmx from "htmx.org";
 
@@ -26,7 +23,6 @@ import {
     setupPasswordResetFormValidation,
 } from "./js/registration/form-validation.js";
 import { initializeSessionLimitPage } from "./js/session_limit/index.js";
-import { initializeSubmissionForm } from "./js/submission_form/index.js";
 import { initializeSubmissionGroup } from "./js/submission_group/index.js";
 import { initializeCustomModalEvents, setupBaseHtmxEventListeners } from "./js/utils/htmx.js";
 import { setupToastNotifications, displayStoredToast } from "./js/utils/toast.js";
@@ -50,7 +46,6 @@ document.addEventListener("DOMContentLoaded", () => {
     setupLoginFormValidation();
     setupPasswordResetFormValidation();
     initializeProfile();
-    initializeSubmissionForm();
     initializeSubmissionGroup();
     initializeSessionLimitPage();
 });
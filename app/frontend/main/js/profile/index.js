@@ -8,6 +8,7 @@ import {
     refreshSubmissionGroupTable,
     refreshSubmissionTable,
 } from "../utils/htmx.js";
+import { setupPhoneNumberMask } from "../utils/phoneNumberMask.js";
 import { closeModal, showModal } from "../utils/utils.js";
 import { setupUserContactInfoForm } from "./contactInfo.js";
 import { initTabListeners, restoreTab, redirectToCorrectFragment } from "./tab.js";
@@ -31,6 +32,7 @@ export const initializeProfile = function() {
 
     setupProfileForm(context);
     setupUserContactInfoForm(context);
+    setupPhoneNumberMask();
     initTabListeners();
     restoreTab();
     redirectToCorrectFragment();
@@ -0,0 +1,173 @@
+import { BasePlugin } from "@uppy/core";
+import { getCookie } from "./utils.js";
+
+// S3 requires every part but the last to be at least 5 MiB, and allows at most 10,000 parts
+const MIN_PART_SIZE = 5 * 1024 * 1024;
+const MAX_PARTS = 10000;
+
+/**
+ * Uploads files straight to the object store in parts, with pre-signed URLs. The application
+ * starts each upload, signs the URL for each part, and checks the file once all of its parts have
+ * been uploaded.
+ */
+class DirectUploadPlugin extends BasePlugin {
+    constructor(uppy, opts) {
+        super(uppy, { limit: 2, ...opts });
+        this.type = "uploader";
+        this.id = this.opts.id || "DirectUploadPlugin";
+        this.title = "Direct Upload Plugin";
+        this.baseUrl = `/upload-session/${this.opts.sessionToken}/direct-uploads/`;
+    }
+
+    install() {
+        this.uppy.addUploader(this.upload);
+    }
+
+    uninstall() {
+        this.uppy.removeUploader(this.upload);
+    }
+
+    /**
+     * Uploads the files, no more than `limit` at a time.
+     * @param {string[]} fileIDs - The IDs of the files to upload
+     */
+    upload = async (fileIDs) => {
+        const files = fileIDs.map((fileID) => this.uppy.getFile(fileID));
+        this.uppy.emit("upload-start", files);
+
+        const queue = [...files];
+        const uploadNext = async () => {
+            while (queue.length > 0) {
+                await this.uploadFile(queue.shift());
+            }
+        };
+        await Promise.all(Array.from({ length: this.opts.limit }, uploadNext));
+    };
+
+    /**
+     * Uploads one file in parts, and asks the application to check it once it is uploaded.
+     * @param {object} file - The Uppy file to upload
+     */
+    uploadFile = async (file) => {
+        let upload = null;
+        try {
+            upload = await this.request(this.baseUrl, {
+                method: "POST",
+                body: JSON.stringify({ name: file.name, type: file.type, size: file.size }),
+            });
+
+            const partSize = Math.max(MIN_PART_SIZE, Math.ceil(file.size / MAX_PARTS));
+            const parts = [];
+            let partNumber = 1;
+            let start = 0;
+            do {
+                const part = file.data.slice(start, start + partSize);
+                const { url } = await this.request(
+                    `${this.uploadUrl(upload)}parts/${partNumber}/${this.keyQuery(upload)}`
+                );
+                const etag = await this.putPart(url, part, (loaded) => {
+                    this.emitProgress(file, start + loaded);
+                });
+                if (!this.uppy.getFile(file.id)) {
+                    // The file was removed while it was being uploaded
+                    this.abort(upload);
+                    return;
+                }
+                parts.push({ PartNumber: partNumber, ETag: etag });
+                partNumber += 1;
+                start += part.size;
+            } while (start < file.size);
+
+            const body = await this.request(this.uploadUrl(upload), {
+                method: "POST",
+                body: JSON.stringify({ key: upload.key, parts }),
+            });
+            this.uppy.emit("upload-success", this.uppy.getFile(file.id), {
+                status: 200,
+                body,
+                uploadURL: body.url,
+            });
+        } catch (error) {
+            if (upload) {
+                this.abort(upload);
+            }
+            const currentFile = this.uppy.getFile(file.id);
+            if (currentFile) {
+                this.uppy.emit("upload-error", currentFile, error);
+            }
+        }
+    };
+
+    /**
+     * Uploads one part of a file to its pre-signed URL.
+     * @param {string} url - The pre-signed URL of the part
+     * @param {Blob} part - The bytes of the part
+     * @param {Function} onProgress - Called with the number of bytes of the part sent so far
+     * @returns {Promise<string>} The ETag of the uploaded part
+     */
+    putPart = (url, part, onProgress) => new Promise((resolve, reject) => {
+        const xhr = new XMLHttpRequest();
+        xhr.open("PUT", url);
+        xhr.upload.addEventListener("progress", (event) => onProgress(event.loaded));
+        xhr.addEventListener("load", () => {
+            const etag = xhr.getResponseHeader("ETag");
+            if (xhr.status >= 200 && xhr.status < 300 && etag) {
+                resolve(etag);
+            } else {
+                reject(new Error(xhr.statusText || window.django.gettext("Upload failed")));
+            }
+        });
+        xhr.addEventListener("error", () => {
+            reject(new Error(window.django.gettext("Upload failed")));
+        });
+        xhr.send(part);
+    });
+
+    /**
+     * Cancels a multipart upload, so that its parts are removed from the object store.
+     * @param {object} upload - The uploadId and key of the upload
+     */
+    abort = (upload) => {
+        this.request(`${this.uploadUrl(upload)}${this.keyQuery(upload)}`, { method: "DELETE" })
+            .catch((error) => console.error("Could not cancel upload:", error));
+    };
+
+    emitProgress = (file, bytesUploaded) => {
+        const currentFile = this.uppy.getFile(file.id);
+        if (!currentFile) {
+            return;
+        }
+        this.uppy.emit("upload-progress", currentFile, {
+            uploadStarted: currentFile.progress.uploadStarted ?? 0,
+            bytesUploaded,
+            bytesTotal: file.size,
+        });
+    };
+
+    uploadUrl = (upload) => `${this.baseUrl}${encodeURIComponent(upload.uploadId)}/`;
+
+    keyQuery = (upload) => `?key=${encodeURIComponent(upload.key)}`;
+
+    /**
+     * Sends a JSON request to the application.
+     * @param {string} url - The URL to send the request to
+     * @param {object} options - The options for fetch
+     * @returns {Promise<object>} The JSON response
+     */
+    request = async (url, options = {}) => {
+        const response = await fetch(url, {
+            ...options,
+            headers: {
+                "Content-Type": "application/json",
+                "X-CSRFToken": getCookie("csrftoken"),
+            },
+        });
+        const data = await response.json();
+        if (!response.ok || data.error) {
+            throw new Error(data.error ?? response.statusText);
+        }
+        return data;
+    };
+}
+
+export default DirectUploadPlugin;
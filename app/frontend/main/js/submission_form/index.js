@@ -1,17 +1,30 @@
 /* global singleCaptchaFn */
 import { setupHelpTooltips } from "../base/tooltip.js";
 import { setupContactInfoForm } from "./contactInfo.js";
-import { setupOtherIdentifiersForm } from "./otherIdentifiers.js";
-import { setupRightsForm } from "./rights.js";
 import { setupSourceInfoForm } from "./sourceInfo.js";
 import { setupSubmissionGroupForm } from "./submissionGroup.js";
 import { setupUnsavedChangesProtection } from "./unsavedChanges.js";
-import { setupUppy } from "./uppyForm.js";
 import {
     setupDatePickers,
     setupInputMasks,
 } from "./widgets.js";
 
+/**
+ * Steps that are set up by code that is only downloaded when the step is shown. Uppy is much
+ * larger than the rest of the submission form, and the formset logic is only used by two steps.
+ */
+const LAZY_STEP_SETUP = {
+    rights: () => import(
+        /* webpackChunkName: "submission_form_formset" */ "./rights.js"
+    ).then(({ setupRightsForm }) => setupRightsForm),
+    otheridentifiers: () => import(
+        /* webpackChunkName: "submission_form_formset" */ "./otherIdentifiers.js"
+    ).then(({ setupOtherIdentifiersForm }) => setupOtherIdentifiersForm),
+    uploadfiles: () => import(
+        /* webpackChunkName: "uppy" */ "./uppyForm.js"
+    ).then(({ setupUppy }) => setupUppy),
+};
+
 const _setupWithContext = () => {
     const contextElement = document.querySelector("[id^=\"js_context_\"]");
     if (!contextElement) {
@@ -27,18 +40,18 @@ const _setupWithContext = () => {
         case "sourceinfo":
             setupSourceInfoForm(context);
             break;
-        case "rights":
-            setupRightsForm(context);
-
-            break;
-        case "otheridentifiers":
-            setupOtherIdentifiersForm(context);
-            break;
         case "groupsubmission":
             setupSubmissionGroupForm(context);
             break;
+        case "rights":
+        case "otheridentifiers":
         case "uploadfiles":
-            setupUppy(context);
+            LAZY_STEP_SETUP[contextFor]().then((setupStep) => {
+                // Skip the setup if another page was swapped in while the code was downloading
+                if (contextElement.isConnected) {
+                    setupStep(context);
+                }
+            });
             break;
         default:
             break;
@@ -74,3 +87,15 @@ export const initializeSubmissionForm = () => {
 
     _setupWithContext();
 };
+
+/**
+ * Sets up the submission form again whenever HTMX swaps in another step.
+ * This should be called once in the submission form entry point.
+ */
+export function setupSubmissionFormHtmxEventListeners() {
+    document.addEventListener("htmx:afterSwap", (event) => {
+        if (event.detail.target.id === "main-container") {
+            initializeSubmissionForm();
+        }
+    });
+}
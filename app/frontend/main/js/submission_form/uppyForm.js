@@ -1,5 +1,6 @@
 import "@uppy/core/css/style.css";
 import "@uppy/dashboard/css/style.css";
+import "../../css/submission_form/uppy.css";
 
 import Uppy from "@uppy/core";
 import Dashboard from "@uppy/dashboard";
@@ -8,6 +9,7 @@ import French from "@uppy/locales/lib/fr_FR.js";
 import Hindi from "@uppy/locales/lib/hi_IN.js";
 import XHR from "@uppy/xhr-upload";
 import FileValidationPlugin from "./customUppyPlugin.js";
+import DirectUploadPlugin from "./directUploadPlugin.js";
 import {
     getCookie,
     fetchUploadedFiles,
@@ -24,6 +26,35 @@ const UPPY_LOCALE_MAP = {
     "hi": Hindi,
 };
 
+/**
+ * Gets the options for where and how the Uppy XHR plugin sends files. When upload offloading is
+ * enabled, the file is sent as the raw request body so that NGINX can write it straight to disk,
+ * and the file name is sent in a header.
+ * @param {object} context - The configuration context containing upload settings and session token
+ * @returns {object} The endpoint, formData, and headers options for the XHR plugin
+ */
+const getUploadEndpoint = (context) => {
+    const token = context["SESSION_TOKEN"];
+    const csrfToken = getCookie("csrftoken");
+
+    if (context["UPLOAD_OFFLOAD_ENABLED"]) {
+        return {
+            endpoint: `/upload-session/${token}/offloaded-files/`,
+            formData: false,
+            headers: (file) => ({
+                "X-CSRFToken": csrfToken,
+                "X-File-Name": encodeURIComponent(file.name),
+            }),
+        };
+    }
+
+    return {
+        endpoint: `/upload-session/${token}/files/`,
+        formData: true,
+        headers: { "X-CSRFToken": csrfToken },
+    };
+};
+
 /**
  * Sets up the Uppy widget for uploading files.
  * @param {object} context - The configuration context containing upload settings and session token
@@ -86,12 +117,14 @@ export async function setupUppy(context) {
             doneButtonHandler: null,
             showLinkToFileUploadResult: true,
             fileManagerSelectionType: "both",
-        })
-        .use(XHR, {
+        });
+
+    if (context["DIRECT_UPLOAD_ENABLED"]) {
+        uppy.use(DirectUploadPlugin, { sessionToken: token });
+    } else {
+        uppy.use(XHR, {
             method: "POST",
-            endpoint: `/upload-session/${token}/files/`,
-            formData: true,
-            headers: { "X-CSRFToken": getCookie("csrftoken") },
+            ...getUploadEndpoint(context),
             bundle: false,
             timeout: 180000,
             limit: 2,
@@ -122,8 +155,10 @@ export async function setupUppy(context) {
                     status === 429
                 );
             }
-        })
-        .use(FileValidationPlugin);
+        });
+    }
+
+    uppy.use(FileValidationPlugin);
 
     uppy.on("files-added" , () => {
         updateCapacity(uppy);
@@ -1,4 +1,3 @@
-import { initializeSubmissionForm } from "../submission_form/index.js";
 import { addQueryParam, getCurrentTablePage } from "./utils.js";
 
 /**
@@ -80,7 +79,6 @@ export function setupBaseHtmxEventListeners() {
     document.addEventListener("htmx:afterSwap", (event) => {
         if (event.detail.target.id === "main-container") {
             initializeCustomModalEvents();
-            initializeSubmissionForm();
         }
     });
 }
@@ -0,0 +1,15 @@
+import "./css/submission_form/review_step.css";
+
+import {
+    initializeSubmissionForm,
+    setupSubmissionFormHtmxEventListeners,
+} from "./js/submission_form/index.js";
+
+setupSubmissionFormHtmxEventListeners();
+
+// This bundle may be added to the head by HTMX after the document has already loaded
+if (document.readyState === "loading") {
+    document.addEventListener("DOMContentLoaded", initializeSubmissionForm);
+} else {
+    initializeSubmissionForm();
+}
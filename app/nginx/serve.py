@@ -1,11 +1,16 @@
 from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
 
 from django.conf import settings
 from django.http import (
+    HttpRequest,
     HttpResponse,
     HttpResponseRedirect,
 )
-from upload.mime import mime
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from upload.policy import get_file_policy
 
 MIME_RENDER_INLINE = {
     "text/plain",
@@ -29,16 +34,52 @@ MIME_RENDER_INLINE = {
     "application/pdf",
 }
 
+# Files with an ETag may be kept by the browser, but are revalidated each time they are used,
+# since a file can be removed and another uploaded with the same name
+PRIVATE_CACHE_CONTROL = "private, no-cache"
 
-def serve_media_file(file_url: str) -> HttpResponse:
+
+def _get_content_headers(file_path: Path, mime_type: Optional[str]) -> dict[str, str]:
+    """Get the Content-Type and Content-Disposition headers for a file. If the MIME type is not
+    known, it is determined from the file's extension.
+    """
+    if not mime_type:
+        extension = file_path.suffix.lower().lstrip(".")
+        # Sort MIME types to ensure deterministic behavior
+        mime_type = next(iter(sorted(get_file_policy().get_mime_types(extension))), None)
+    if not mime_type:
+        return {}
+    if mime_type in MIME_RENDER_INLINE:
+        return {"Content-Type": mime_type, "Content-Disposition": "inline"}
+    return {
+        "Content-Type": mime_type,
+        "Content-Disposition": f'attachment; filename="{file_path.name}"',
+    }
+
+
+def serve_media_file(
+    file_url: str,
+    file_name: Optional[str] = None,
+    request: Optional[HttpRequest] = None,
+    mime_type: Optional[str] = None,
+    etag: Optional[str] = None,
+) -> HttpResponse:
     """Create a response that allows a client to download a media file.
 
     In development, the development server serves media files directly, so a re-direct to the
     file's URL is returned.
 
+    If the file is kept in an object store (see :ref:`FILE_STORAGE_BACKEND`), its URL is a
+    short-lived pre-signed URL on the object store, and a re-direct to it is returned so that the
+    client downloads the file from the object store directly.
+
     In production, NGINX is used, and it serves media files. The media URL is locked down with an
     "internal" directive, and NGINX must receive an X-Accel-Redirect from the application to tell
-    it that it's OK to serve the file.
+    it that it's OK to serve the file. NGINX answers range requests for the file itself.
+
+    If an ``etag`` is given, the file may be cached privately by the browser. When the request's
+    ``If-None-Match`` header matches the ETag, a 304 is returned without asking NGINX to serve the
+    file.
 
     For more info, see:
     `NGINX docs <https://nginx.org/en/docs/http/ngx_http_core_module.html#internal>`_
@@ -50,41 +91,46 @@ def serve_media_file(file_url: str) -> HttpResponse:
 
     Args:
         file_url: The media URL to serve
+        file_name: The name to download the file as, if it is not the last part of the URL. The
+            MIME type of the file is also determined from this name if it is not given
+        request: The request for the file, used to answer conditional requests
+        mime_type: The MIME type of the file, if it is known
+        etag: An identifier for the contents of the file, e.g., its SHA-256 digest
 
     Returns:
-        HttpResponse: Direct redirect in development (DEBUG) mode, X-Accel-Redirect in production
+        HttpResponse: Direct redirect in development (DEBUG) mode or for files in an object store,
+        X-Accel-Redirect in production, or 304 if the client has the current file
     """
-    if settings.DEBUG:
+    url_parts = urlsplit(file_url)
+    if settings.DEBUG or url_parts.scheme or url_parts.netloc:
         return HttpResponseRedirect(file_url)
-    else:
-        headers = {"X-Accel-Redirect": file_url}
 
-        # Determine MIME type based on file extension and set headers deterministically
-        file_path = Path(file_url)
-        extension = file_path.suffix.lower().lstrip(".")
-        mime_types = mime.guess(extension)
-        if mime_types:
-            # Sort MIME types to ensure deterministic behavior
-            sorted_mime_types = sorted(mime_types)
-            mime_type = sorted_mime_types[0]
-            headers["Content-Type"] = mime_type
-            if mime_type in MIME_RENDER_INLINE:
-                headers["Content-Disposition"] = "inline"
-            else:
-                headers["Content-Disposition"] = f'attachment; filename="{file_path.name}"'
-
-        response = HttpResponse(headers=headers)
-
-        # Clear headers
-        for remove in [
-            "Content-Type",
-            "Content-Disposition",
-            "Accept-Ranges",
-            "Set-Cookie",
-            "Cache-Control",
-            "Expires",
-        ]:
-            if remove in response.headers and remove not in headers:
-                del response[remove]
-
-        return response
+    headers = {"X-Accel-Redirect": file_url, "Accept-Ranges": "bytes"}
+
+    if etag:
+        etag = quote_etag(etag)
+        if request is not None:
+            not_modified = get_conditional_response(request, etag=etag)
+            if not_modified is not None:
+                not_modified["ETag"] = etag
+                not_modified["Cache-Control"] = PRIVATE_CACHE_CONTROL
+                return not_modified
+        headers["ETag"] = etag
+        headers["Cache-Control"] = PRIVATE_CACHE_CONTROL
+
+    headers.update(_get_content_headers(Path(file_name or file_url), mime_type))
+
+    response = HttpResponse(headers=headers)
+
+    # Clear headers
+    for remove in [
+        "Content-Type",
+        "Content-Disposition",
+        "Set-Cookie",
+        "Cache-Control",
+        "Expires",
+    ]:
+        if remove in response.headers and remove not in headers:
+            del response[remove]
+
+    return response
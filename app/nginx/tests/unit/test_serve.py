@@ -1,4 +1,4 @@
-from django.test import TestCase, override_settings
+from django.test import RequestFactory, TestCase, override_settings
 from nginx.serve import serve_media_file
 
 
@@ -42,3 +42,62 @@ class ServeMediaFileTests(TestCase):
         self.assertEqual(response["Content-Type"], "image/svg+xml")
         self.assertEqual(response["Content-Disposition"], 'attachment; filename="xss.svg"')
         self.assertEqual(response["X-Accel-Redirect"], file_url)
+
+    @override_settings(DEBUG=False)
+    def test_object_store_url_redirects(self) -> None:
+        """Test that a re-direct is returned for a file kept in an object store."""
+        file_url = "https://bucket.s3.example.com/uploaded_files/file.pdf?X-Amz-Signature=abc"
+        response = serve_media_file(file_url)
+        self.assertEqual(response.url, file_url)
+        self.assertNotIn("X-Accel-Redirect", response)
+
+    @override_settings(DEBUG=False)
+    def test_file_name(self) -> None:
+        """Test that the file name is used for the headers when the URL has no file name."""
+        file_url = "/media/uploaded_files/blobs/ab/cd/abcd1234"
+        response = serve_media_file(file_url, "archive.zip")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="archive.zip"')
+        self.assertEqual(response["X-Accel-Redirect"], file_url)
+
+    @override_settings(DEBUG=False)
+    def test_stored_mime_type(self) -> None:
+        """Test that a known MIME type is used instead of guessing one from the file name."""
+        file_url = "/media/uploaded_files/blobs/ab/cd/abcd1234"
+        response = serve_media_file(file_url, "notes.dat", mime_type="text/plain")
+        self.assertEqual(response["Content-Type"], "text/plain")
+        self.assertEqual(response["Content-Disposition"], "inline")
+
+    @override_settings(DEBUG=False)
+    def test_cache_headers(self) -> None:
+        """Test that a file with an ETag can be cached privately by the browser."""
+        file_url = "/media/temp/aaa/file.pdf"
+        response = serve_media_file(file_url, etag="abcd1234")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["ETag"], '"abcd1234"')
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertNotIn("Expires", response)
+
+    @override_settings(DEBUG=False)
+    def test_no_etag_not_cached(self) -> None:
+        """Test that a file without an ETag has no cache headers."""
+        response = serve_media_file("/media/temp/aaa/file.pdf")
+        self.assertNotIn("ETag", response)
+        self.assertNotIn("Cache-Control", response)
+
+    @override_settings(DEBUG=False)
+    def test_not_modified(self) -> None:
+        """Test that a 304 is returned if the client already has the file."""
+        request = RequestFactory().get("/", headers={"If-None-Match": '"abcd1234"'})
+        response = serve_media_file("/media/temp/aaa/file.pdf", request=request, etag="abcd1234")
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], '"abcd1234"')
+        self.assertNotIn("X-Accel-Redirect", response)
+
+    @override_settings(DEBUG=False)
+    def test_modified(self) -> None:
+        """Test that the file is served if the client has a different version of it."""
+        request = RequestFactory().get("/", headers={"If-None-Match": '"old"'})
+        response = serve_media_file("/media/temp/aaa/file.pdf", request=request, etag="abcd1234")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Accel-Redirect"], "/media/temp/aaa/file.pdf")
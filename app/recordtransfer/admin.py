@@ -10,6 +10,7 @@ from django.contrib.admin import display
 from django.contrib.admin.options import InlineModelAdmin
 from django.contrib.admin.utils import unquote
 from django.contrib.auth.admin import UserAdmin
+from django.db import transaction
 from django.db.models import Model, QuerySet
 from django.db.models.signals import pre_delete
 from django.dispatch import receiver
@@ -23,6 +24,8 @@ from django.utils.safestring import SafeText, mark_safe
 from django.utils.translation import gettext_lazy as _
 from django.utils.translation import pgettext_lazy
 from django.views.decorators.debug import sensitive_post_parameters
+from upload.admin import format_file_count
+from upload.models import UploadSession
 
 from recordtransfer.constants import HtmlIds, OtherValues
 from recordtransfer.emails import send_user_account_updated
@@ -33,6 +36,7 @@ from recordtransfer.forms.admin_forms import SiteSettingModelForm, UserAdminForm
 from recordtransfer.jobs import create_downloadable_bag
 from recordtransfer.models import (
     Job,
+    OutgoingEmail,
     SiteSetting,
     Submission,
     SubmissionGroup,
@@ -346,16 +350,23 @@ class SubmissionAdmin(admin.ModelAdmin):
         "uuid",
     ]
 
+    list_select_related: bool | Sequence[str] = ["metadata", "user", "upload_session"]
+
+    def get_queryset(self, request: HttpRequest) -> QuerySet:
+        """Annotate the number of files in each submission's upload session, so that it is not
+        computed from the file system for each row.
+        """
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(**UploadSession.objects.file_stats(session_ref="upload_session"))
+        )
+
     def file_count(self, obj: Submission) -> str:
         """Display the number of files uploaded to the submission."""
         if not obj.upload_session:
             return "0"
-        file_count = None
-        try:
-            file_count = obj.upload_session.file_count
-        except ValueError:
-            file_count = "n/a"
-        return str(file_count)
+        return format_file_count(obj.upload_session, obj.stored_file_count)
 
     def has_add_permission(self, request: HttpRequest) -> bool:
         """Determine whether add permission is granted for this model admin."""
@@ -562,6 +573,64 @@ class JobAdmin(ReadOnlyAdmin):
         return bool(obj and request.user.is_superuser)
 
 
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(ReadOnlyAdmin):
+    """Admin for the OutgoingEmail model. Emails that failed to send can be re-queued.
+
+    Permissions:
+        - add: Not allowed
+        - change: Not allowed
+        - delete: Only superusers
+    """
+
+    fields: Sequence[str | Sequence[str]] = [
+        "subject",
+        "from_email",
+        "recipients",
+        "status",
+        "attempts",
+        "last_error",
+        "created_at",
+        "next_attempt_at",
+        "sent_at",
+    ]
+
+    list_display: Sequence[str | Callable] = [
+        "subject",
+        "recipients",
+        "status",
+        "attempts",
+        "created_at",
+        "sent_at",
+    ]
+
+    list_filter: Sequence[str] = ["status"]
+
+    search_fields: Sequence[str] = ["subject", "recipients"]
+
+    ordering: Sequence[str] | None = ["-created_at"]
+
+    actions: (
+        Sequence[Callable[[Any, HttpRequest, QuerySet[Any]], HttpResponse | None] | str] | None
+    ) = ["retry_failed"]
+
+    @admin.action(description=_("Retry sending selected failed emails"))
+    def retry_failed(self, request: HttpRequest, queryset: QuerySet) -> None:
+        """Put the selected failed emails back in the outbox."""
+        failed = queryset.filter(status=OutgoingEmail.EmailStatus.FAILED)
+        for email in failed:
+            email.retry()
+        self.message_user(
+            request,
+            _("%(count)d email(s) will be re-sent.") % {"count": len(failed)},
+            messages.SUCCESS,
+        )
+
+    def has_delete_permission(self, request: HttpRequest, obj: object = None) -> bool:
+        """Determine whether delete permission is granted for this model admin."""
+        return bool(obj and request.user.is_superuser)
+
+
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
     """Admin for the User model.
@@ -647,16 +716,17 @@ class CustomUserAdmin(UserAdmin):
         self, request: HttpRequest, id: str, form_url: str = ""
     ) -> HttpResponse:
         """Send a notification email when a user's password is changed."""
-        response = super().user_change_password(request, id, form_url)
-        user = self.get_object(request, unquote(id))
-        form = self.change_password_form(user, request.POST)
-        if form.is_valid() and request.method == "POST" and user is not None:
-            context = {
-                "subject": _("Password updated"),
-                "changed_item": _("password"),
-                "changed_status": _("updated"),
-            }
-            send_user_account_updated.delay(user, context)
+        with transaction.atomic():
+            response = super().user_change_password(request, id, form_url)
+            user = self.get_object(request, unquote(id))
+            form = self.change_password_form(user, request.POST)
+            if form.is_valid() and request.method == "POST" and user is not None:
+                context = {
+                    "subject": _("Password updated"),
+                    "changed_item": _("password"),
+                    "changed_status": _("updated"),
+                }
+                send_user_account_updated(user, context)
         return response
 
     def save_model(self, request: HttpRequest, obj: User, form: ModelForm, change: bool) -> None:
@@ -688,7 +758,7 @@ class CustomUserAdmin(UserAdmin):
                         "changed_list": self._get_changed_message(form.changed_data, obj),
                     }
 
-                send_user_account_updated.delay(obj, context)
+                send_user_account_updated(obj, context)
 
     def _get_changed_message(self, changed_data: list, user: User):
         """Generate a list of changed status message for certain account details."""
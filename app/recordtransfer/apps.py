@@ -9,3 +9,7 @@ class RecordTransferConfig(AppConfig):
     """Top-level application config for the recordtransfer app."""
 
     name = "recordtransfer"
+
+    def ready(self) -> None:
+        """Connect the signal receivers that keep the cached form contexts up to date."""
+        from recordtransfer import context_cache  # noqa: F401
@@ -45,6 +45,8 @@ class QueryParameters:
     """Class to hold query parameter names used in the application."""
 
     PAGINATE_QUERY_NAME: str = "p"
+    PAGINATE_AFTER_QUERY_NAME: str = "after"
+    PAGINATE_BEFORE_QUERY_NAME: str = "before"
     SUBMISSION_GROUP_QUERY_NAME: str = "group"
 
     def asdict(self) -> dict[str, str]:
@@ -0,0 +1,69 @@
+"""Caches for the parts of the submission form that are the same for every user.
+
+Every step of the submission form looks up the "Other" terms, builds the context passed to the
+JavaScript for the step, and renders parts of its template that only depend on the language and
+the settings. These are cached for each language under keys that include a version. The version
+is replaced whenever a CAAIS term or a site setting is saved or deleted, so that every cached
+context and template fragment is rebuilt the next time it is used. Pages cached by the
+:class:`~recordtransfer.middleware.PageCacheMiddleware` are keyed on the same version.
+"""
+
+import uuid
+from typing import Any, Callable, Optional
+
+from caais.models import AbstractTerm
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import get_language
+
+VERSION_KEY = "submission-form-context-version"
+
+
+def get_context_cache_version() -> str:
+    """Get the version of the cached contexts. A new version is made if there is none, e.g., if
+    it was evicted from the cache.
+    """
+    return cache.get_or_set(VERSION_KEY, lambda: uuid.uuid4().hex, timeout=None)
+
+
+def invalidate_context_caches() -> None:
+    """Replace the version of the cached contexts, so that they are all rebuilt."""
+    cache.set(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def get_context_cache_key(language: Optional[str] = None) -> str:
+    """Get the part of a cache key that varies with the language and the version of the cached
+    contexts. This is also used to vary the template fragments cached with ``{% cache %}``.
+
+    Args:
+        language: The language to get the key for. Defaults to the active language
+    """
+    return f"{language or get_language()}:{get_context_cache_version()}"
+
+
+def get_cached_context(name: str, build: Callable[[], Any]) -> Any:
+    """Get a context from the cache for the active language, or build and cache it.
+
+    Args:
+        name: The name of the context, unique within the language
+        build: Called to build the context if it is not cached
+    """
+    key = f"submission-form-context:{get_context_cache_key()}:{name}"
+    return cache.get_or_set(key, build, timeout=settings.SUBMISSION_FORM_CONTEXT_CACHE_SECONDS)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_on_term_change(sender: type, **kwargs) -> None:
+    """Rebuild the cached contexts when a CAAIS term is changed."""
+    if issubclass(sender, AbstractTerm):
+        invalidate_context_caches()
+
+
+@receiver(post_save, sender="recordtransfer.SiteSetting")
+@receiver(post_delete, sender="recordtransfer.SiteSetting")
+def invalidate_on_site_setting_change(**kwargs) -> None:
+    """Rebuild the cached contexts when a site setting is changed."""
+    invalidate_context_caches()
@@ -1,9 +1,11 @@
+import functools
 from typing import Any
 
 from django.conf import settings
 from django.http import HttpRequest
 
 from recordtransfer import constants
+from recordtransfer.middleware import CSRF_TOKEN_PLACEHOLDER
 
 
 def signup_status(request: HttpRequest) -> dict[str, Any]:
@@ -16,8 +18,23 @@ def file_upload_status(request: HttpRequest) -> dict[str, Any]:
     return {"FILE_UPLOAD_ENABLED": settings.FILE_UPLOAD_ENABLED}
 
 
+def page_cache_csrf_token(request: HttpRequest) -> dict[str, str]:
+    """Render a placeholder in place of the CSRF token in pages that may be cached by the
+    :class:`~recordtransfer.middleware.PageCacheMiddleware`.
+    """
+    if getattr(request, "page_cache_csrf_placeholder", False):
+        return {"csrf_token": CSRF_TOKEN_PLACEHOLDER}
+    return {}
+
+
 def constants_context(request: HttpRequest) -> dict[str, str]:
     """Make constants available globally in all templates."""
+    return _get_constants()
+
+
+@functools.cache
+def _get_constants() -> dict[str, str]:
+    # The constants never change, so they are only collected once
     return {
         **constants.HtmlIds().asdict(),
         **constants.QueryParameters().asdict(),
@@ -3,26 +3,41 @@
 import logging
 import re
 import smtplib
+import time
 from collections import defaultdict
 from typing import List, Optional
 
-import django_rq
 from django.conf import settings
 from django.contrib.sites.models import Site
-from django.core.mail import send_mail
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
 from django.template.loader import render_to_string
 from django.utils import timezone, translation
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
 from django.utils.translation import gettext_lazy as _
+from rq import get_current_job
 from utility import html_to_text
+from utility.metrics import Histogram
 
 from recordtransfer.enums import SiteSettingKey
-from recordtransfer.models import InProgressSubmission, SiteSetting, Submission, User
+from recordtransfer.models import (
+    InProgressSubmission,
+    OutgoingEmail,
+    SiteSetting,
+    Submission,
+    User,
+)
+from recordtransfer.payloads import job
 from recordtransfer.tokens import account_activation_token
 
 LOGGER = logging.getLogger(__name__)
 
+SEND_SECONDS = Histogram(
+    "email_send_seconds", "Time taken to send an email from the outbox, by result.", ("result",)
+)
+
 
 def _get_base_url_with_protocol() -> str:
     """Get the base URL with the appropriate protocol for the current environment.
@@ -41,6 +56,7 @@ def _get_base_url_with_protocol() -> str:
 
 __all__ = [
     "send_password_reset_email",
+    "send_queued_emails",
     "send_submission_creation_failure",
     "send_submission_creation_success",
     "send_thank_you_for_your_submission",
@@ -50,7 +66,6 @@ __all__ = [
 ]
 
 
-@django_rq.job
 def send_submission_creation_success(
     form_data: dict,
     submission: Submission,
@@ -110,7 +125,6 @@ def send_submission_creation_success(
     )
 
 
-@django_rq.job
 def send_submission_creation_failure(
     form_data: dict,
     user_submitted: User,
@@ -158,7 +172,6 @@ def send_submission_creation_failure(
     )
 
 
-@django_rq.job
 def send_thank_you_for_your_submission(form_data: dict, submission: Submission) -> None:
     """Send a submission success email to the user who made the submission.
 
@@ -187,7 +200,6 @@ def send_thank_you_for_your_submission(form_data: dict, submission: Submission)
         )
 
 
-@django_rq.job
 def send_your_submission_did_not_go_through(form_data: dict, user_submitted: User) -> None:
     """Send a submission failure email to the user who made the submission.
 
@@ -212,7 +224,6 @@ def send_your_submission_did_not_go_through(form_data: dict, user_submitted: Use
         )
 
 
-@django_rq.job
 def send_user_activation_email(new_user: User) -> None:
     """Send an activation email to the new user who is attempting to create an account. The user
     must visit the link to activate their account.
@@ -237,7 +248,6 @@ def send_user_activation_email(new_user: User) -> None:
     )
 
 
-@django_rq.job
 def send_user_account_updated(user_updated: User, context_vars: dict) -> None:
     """Send a notice that the user's account has been updated.
 
@@ -255,7 +265,6 @@ def send_user_account_updated(user_updated: User, context_vars: dict) -> None:
     )
 
 
-@django_rq.job
 def send_user_in_progress_submission_expiring(in_progress: InProgressSubmission) -> None:
     """Send an email to a user that their in-progress submission is expiring soon.
 
@@ -280,7 +289,6 @@ def send_user_in_progress_submission_expiring(in_progress: InProgressSubmission)
     )
 
 
-@django_rq.job
 def send_password_reset_email(
     context: dict,
 ) -> None:
@@ -360,7 +368,7 @@ def _send_mail(
     context: dict,
     user_language: Optional[str] = None,
 ) -> None:
-    """Send an HTML email and a Text email to a recipient.
+    """Render an HTML email and a Text email and queue them in the outbox for a recipient.
 
     Args:
         recipient: A recipient email address
@@ -370,33 +378,25 @@ def _send_mail(
         context: Any context that may need to be used to render the email
         user_language: The language to use for the email
     """
-    try:
-        LOGGER.info("Setting up new email:")
-        LOGGER.info("SUBJECT: %s", subject)
-        LOGGER.info("TO: %s", recipient)
-        LOGGER.info("FROM: %s", from_email)
-        context["base_url"] = _get_base_url_with_protocol()
-        context["site_domain"] = Site.objects.get_current().domain
-
-        with translation.override(user_language or translation.get_language()):
-            msg_html = render_to_string(template_name, context)
-            LOGGER.info("Stripping tags from rendered HTML to create a plaintext email")
-            msg_plain = html_to_text(msg_html)
-
-            LOGGER.info("Sending...")
-            send_mail(
-                subject=subject,
-                message=msg_plain,
-                from_email=from_email,
-                recipient_list=[recipient],
-                html_message=msg_html,
-                fail_silently=False,
-            )
-
-            LOGGER.info("Email sent")
-
-    except smtplib.SMTPException as exc:
-        LOGGER.error("Error when sending email to user, %s: %s", exc.__class__.__name__, str(exc))
+    LOGGER.info("Setting up new email:")
+    LOGGER.info("SUBJECT: %s", subject)
+    LOGGER.info("TO: %s", recipient)
+    LOGGER.info("FROM: %s", from_email)
+    context["base_url"] = _get_base_url_with_protocol()
+    context["site_domain"] = Site.objects.get_current().domain
+
+    with translation.override(user_language or translation.get_language()):
+        msg_html = render_to_string(template_name, context)
+        LOGGER.info("Stripping tags from rendered HTML to create a plaintext email")
+        msg_plain = html_to_text(msg_html)
+
+        _queue_mail(
+            subject=str(subject),
+            from_email=from_email,
+            recipients=[recipient],
+            body_text=msg_plain,
+            body_html=msg_html,
+        )
 
 
 def _send_mail_by_language_groups(
@@ -406,7 +406,8 @@ def _send_mail_by_language_groups(
     template_name: str,
     context: dict,
 ) -> None:
-    """Send an HTML email and a Text email to recipients grouped by language.
+    """Render an HTML email and a Text email and queue them in the outbox for recipients grouped
+    by language.
 
     Args:
         recipients: A dictionary mapping language codes to lists of recipients
@@ -415,41 +416,207 @@ def _send_mail_by_language_groups(
         template_name: The name of the email template
         context: Any context that may need to be used to render the email.
     """
+    LOGGER.info("Setting up new email:")
+    LOGGER.info("SUBJECT: %s", subject)
+    LOGGER.info("TO (by language): %s", recipients)
+    LOGGER.info("FROM: %s", from_email)
+    context["base_url"] = _get_base_url_with_protocol()
+
+    for lang, recipient_list in recipients.items():
+        if not recipient_list:
+            continue
+
+        current_language = lang or translation.get_language()
+        LOGGER.info("Rendering email for language: %s", current_language)
+        LOGGER.info("Recipients for language %s: %s", current_language, recipient_list)
+
+        with translation.override(current_language):
+            msg_html = render_to_string(template_name, context)
+            LOGGER.info("Stripping tags from rendered HTML to create a plaintext email")
+            msg_plain = html_to_text(msg_html)
+
+            _queue_mail(
+                subject=str(subject),
+                from_email=from_email,
+                recipients=recipient_list,
+                body_text=msg_plain,
+                body_html=msg_html,
+            )
+
+
+def _queue_mail(
+    subject: str,
+    from_email: str,
+    recipients: List[str],
+    body_text: str,
+    body_html: str,
+) -> OutgoingEmail:
+    """Add a rendered email to the outbox, and wake up the email worker once the current
+    transaction is committed.
+
+    Args:
+        subject: The translated subject of the email
+        from_email: A "From" address to send the email as
+        recipients: A list of recipient email addresses
+        body_text: The plain text version of the email
+        body_html: The HTML version of the email
+
+    Returns:
+        The email that was added to the outbox
+    """
+    email = OutgoingEmail.objects.create(
+        subject=subject,
+        from_email=from_email,
+        recipients=recipients,
+        body_text=body_text,
+        body_html=body_html,
+    )
+    LOGGER.info("Email queued in outbox with ID %s", email.pk)
+    transaction.on_commit(_enqueue_outbox_drain)
+    return email
+
+
+def _enqueue_outbox_drain() -> None:
+    """Enqueue a job to send the emails in the outbox.
+
+    If the job can't be enqueued, the emails stay in the outbox until the scheduled drain set by
+    :ref:`EMAIL_OUTBOX_DRAIN_SCHEDULE` picks them up.
+    """
+    try:
+        send_queued_emails.delay()
+    except Exception as exc:
+        LOGGER.warning(
+            "Could not enqueue outbox drain, emails will be sent on the next scheduled run: %s",
+            exc,
+        )
+
+
+# Errors that are caused by a specific message, and don't stop other messages from being sent
+_MESSAGE_ERRORS = (
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPSenderRefused,
+    smtplib.SMTPDataError,
+)
+
+
+# Time left for claimed emails to be sent in, on top of the time the rate limit takes to send them
+OUTBOX_LEASE_MARGIN_SECONDS = 600
+
+# The drain stops this long before the job would time out, so it is not killed part way through
+OUTBOX_DRAIN_TIMEOUT_MARGIN_SECONDS = 30
+
+
+@job("email")
+def send_queued_emails() -> None:
+    """Send the emails in the outbox that are due to be sent.
+
+    Emails are sent over a single connection to the email server, in batches of
+    :ref:`EMAIL_OUTBOX_BATCH_SIZE`, no faster than :ref:`EMAIL_OUTBOX_MAX_PER_MINUTE`. Each batch
+    is claimed in a short transaction, and each email is marked as sent or failed as soon as it
+    is attempted. No rows are locked while emails are sent, and an email that was delivered is
+    not sent again if the worker stops.
+
+    If a message is rejected by the server, the failure is recorded and the remaining emails are
+    still sent. If the connection to the server fails, the failure is recorded and the remaining
+    emails are left for the next run. If the job is about to time out, the remaining emails are
+    left for a new job.
+    """
+    max_per_minute = settings.EMAIL_OUTBOX_MAX_PER_MINUTE
+    min_interval = 60.0 / max_per_minute if max_per_minute > 0 else 0.0
+    lease = timezone.timedelta(
+        seconds=settings.EMAIL_OUTBOX_BATCH_SIZE * min_interval + OUTBOX_LEASE_MARGIN_SECONDS
+    )
+    deadline = _get_drain_deadline()
+    last_sent_at: Optional[float] = None
+    num_sent = 0
+    num_failed = 0
+
+    connection = get_connection(fail_silently=False)
+
+    try:
+        connection.open()
+    except (smtplib.SMTPException, OSError) as exc:
+        LOGGER.error("Could not connect to email server, %s: %s", exc.__class__.__name__, exc)
+        return
+
+    try:
+        stopped = False
+        while not stopped:
+            batch = OutgoingEmail.objects.claim_due(settings.EMAIL_OUTBOX_BATCH_SIZE, lease)
+            if not batch:
+                break
+
+            for index, email in enumerate(batch):
+                wait = _get_rate_limit_wait(last_sent_at, min_interval)
+                if deadline is not None and time.monotonic() + wait > deadline:
+                    LOGGER.info("Outbox drain is about to time out, continuing in a new job")
+                    _release_claimed_emails(batch[index:])
+                    _enqueue_outbox_drain()
+                    stopped = True
+                    break
+                if wait:
+                    time.sleep(wait)
+                last_sent_at = time.monotonic()
+
+                result = _send_outgoing_email(email, connection)
+                if result == "sent":
+                    num_sent += 1
+                    continue
+                num_failed += 1
+                if result == "error":
+                    _release_claimed_emails(batch[index + 1 :])
+                    stopped = True
+                    break
+
+    finally:
+        connection.close()
+
+    LOGGER.info("Outbox drained: %d email(s) sent, %d failed", num_sent, num_failed)
+
+
+def _get_rate_limit_wait(last_sent_at: Optional[float], min_interval: float) -> float:
+    """Get the number of seconds to wait before the next email can be sent."""
+    if not min_interval or last_sent_at is None:
+        return 0.0
+    return max(0.0, min_interval - (time.monotonic() - last_sent_at))
+
+
+def _send_outgoing_email(email: OutgoingEmail, connection: BaseEmailBackend) -> str:
+    """Send an email from the outbox, and record whether it was sent.
+
+    Returns:
+        "sent" if the email was sent, "rejected" if the server rejected the message, or "error"
+        if the connection to the server failed
+    """
+    send_started_at = time.perf_counter()
     try:
-        LOGGER.info("Setting up new email:")
-        LOGGER.info("SUBJECT: %s", subject)
-        LOGGER.info("TO (by language): %s", recipients)
-        LOGGER.info("FROM: %s", from_email)
-        context["base_url"] = _get_base_url_with_protocol()
-
-        for lang, recipient_list in recipients.items():
-            if not recipient_list:
-                continue
-
-            current_language = lang or translation.get_language()
-            LOGGER.info("Rendering email for language: %s", current_language)
-            LOGGER.info("Recipients for language %s: %s", current_language, recipient_list)
-
-            with translation.override(current_language):
-                msg_html = render_to_string(template_name, context)
-                LOGGER.info("Stripping tags from rendered HTML to create a plaintext email")
-                msg_plain = html_to_text(msg_html)
-
-                LOGGER.info("Sending...")
-                send_mail(
-                    subject=subject,
-                    message=msg_plain,
-                    from_email=from_email,
-                    recipient_list=recipient_list,
-                    html_message=msg_html,
-                    fail_silently=False,
-                )
-
-                num_recipients = len(recipient_list)
-                if num_recipients == 1:
-                    LOGGER.info("1 email sent for language %s", current_language)
-                else:
-                    LOGGER.info("%d emails sent for language %s", num_recipients, current_language)
-
-    except smtplib.SMTPException as exc:
-        LOGGER.error("Error when sending email to user, %s: %s", exc.__class__.__name__, str(exc))
+        email.to_message(connection).send()
+    except _MESSAGE_ERRORS as exc:
+        result = "rejected"
+        LOGGER.error("Email %s was rejected, %s: %s", email.pk, exc.__class__.__name__, exc)
+        email.mark_attempt_failed(f"{exc.__class__.__name__}: {exc}")
+    except (smtplib.SMTPException, OSError) as exc:
+        result = "error"
+        LOGGER.error("Error when sending email %s, %s: %s", email.pk, exc.__class__.__name__, exc)
+        email.mark_attempt_failed(f"{exc.__class__.__name__}: {exc}")
+    else:
+        result = "sent"
+        email.mark_sent()
+    SEND_SECONDS.observe(time.perf_counter() - send_started_at, result=result)
+    return result
+
+
+def _get_drain_deadline() -> Optional[float]:
+    """Get the monotonic time the drain must stop by to finish before its job times out, or None
+    if it is not running in a job with a timeout.
+    """
+    current_job = get_current_job()
+    if current_job is None or not current_job.timeout or current_job.timeout < 0:
+        return None
+    return time.monotonic() + current_job.timeout - OUTBOX_DRAIN_TIMEOUT_MARGIN_SECONDS
+
+
+def _release_claimed_emails(emails: list[OutgoingEmail]) -> None:
+    """Put claimed emails that were not attempted back in the outbox, in their original order."""
+    if emails:
+        OutgoingEmail.objects.bulk_update(emails, ["next_attempt_at"])
@@ -123,10 +123,8 @@ class AsyncPasswordResetForm(PasswordResetForm):
         to_email: str,
         html_email_template_name: Optional[str] = None,
     ) -> None:
-        """Override parent method to send password reset email asynchronously using django_rq."""
-        send_password_reset_email.delay(
-            context=context,
-        )
+        """Override parent method to add the password reset email to the outbox."""
+        send_password_reset_email(context=context)
 
 
 class UserContactInfoForm(ContactInfoFormMixin, forms.ModelForm):
@@ -0,0 +1,49 @@
+"""Versioned URLs for the JavaScript translation catalog.
+
+The catalog of each language is served under a URL that includes the version of the compiled
+JavaScript translations, so that browsers can keep it forever and only fetch it again when the
+translations change. The catalogs can also be rendered to static files with the
+``render_javascript_catalogs`` command, in which case they are served by NGINX instead.
+"""
+
+import functools
+import os
+from typing import Optional
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils.translation import get_language
+from utility import get_js_translation_version
+
+
+@functools.cache
+def get_catalog_version() -> str:
+    """Get the version of the compiled JavaScript translations. Compiled translations are only
+    loaded when the application starts, so the version is only looked up once.
+    """
+    return get_js_translation_version()
+
+
+def get_static_catalog_name(language: str) -> str:
+    """Get the name of the static file the catalog of a language is rendered to."""
+    return f"jsi18n/{get_catalog_version()}/{language}.js"
+
+
+@functools.cache
+def is_catalog_prerendered(language: str) -> bool:
+    """Check whether the catalog of a language has been rendered to a static file."""
+    return os.path.isfile(os.path.join(settings.STATIC_ROOT, get_static_catalog_name(language)))
+
+
+def get_catalog_url(language: Optional[str] = None) -> str:
+    """Get the URL of the JavaScript translation catalog of a language.
+
+    Args:
+        language: The language to get the catalog URL for. Defaults to the active language
+    """
+    language = language or get_language() or settings.LANGUAGE_CODE
+    if is_catalog_prerendered(language):
+        return settings.STATIC_URL + get_static_catalog_name(language)
+    return reverse(
+        "javascript-catalog", kwargs={"version": get_catalog_version(), "language": language}
+    )
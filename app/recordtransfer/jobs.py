@@ -1,15 +1,20 @@
 import logging
 import tempfile
 import zipfile
+from datetime import timedelta
 from pathlib import Path
+from typing import Optional
 
 import django_rq
 from django.conf import settings
 from django.core.files.base import File
+from django.db import transaction
 from django.db.models.query import QuerySet
 from django.utils import timezone
+from upload.budget import get_temp_storage_budget
 from upload.models import UploadSession
 from utility import zip_directory
+from utility.metrics import CallbackGauge, Histogram
 
 from recordtransfer.emails import (
     send_submission_creation_failure,
@@ -21,41 +26,108 @@ from recordtransfer.emails import (
 from recordtransfer.handlers import JobLogHandler
 from recordtransfer.models import LOGGER as RECORDTRANSFER_MODELS_LOGGER
 from recordtransfer.models import InProgressSubmission, Job, Submission, User
+from recordtransfer.orphans import collect_orphaned_files
+from recordtransfer.payloads import dump_value, job
 
 LOGGER = logging.getLogger(__name__)
 
 MAX_COPY_RETRIES = 2
+MAX_STORAGE_BUDGET_RETRIES = 12
 
+ZIP_BAG_SECONDS = Histogram("bag_zip_seconds", "Time taken to zip a BagIt bag for download.")
 
-@django_rq.job
-def create_downloadable_bag(submission: Submission, user_triggered: User) -> None:
+
+def get_queue_lengths() -> dict[tuple[str, ...], float]:
+    """Get the number of jobs waiting in each RQ queue."""
+    return {(name,): django_rq.get_queue(name).count for name in settings.RQ_QUEUES}
+
+
+QUEUE_LENGTH = CallbackGauge(
+    "rq_queue_length", "Number of jobs waiting in each RQ queue.", get_queue_lengths, ("queue",)
+)
+
+
+@job
+def create_downloadable_bag(
+    submission: Submission,
+    user_triggered: User,
+    job: Optional[Job] = None,
+    attempt: int = 0,
+) -> None:
     """Create a zipped BagIt bag that a user can download through a Job.
 
+    Space for the bag and its zip file is reserved in the temp storage's
+    :class:`~upload.budget.StorageBudget` first. If there is not enough space, the job is run
+    again after :ref:`STORAGE_BUDGET_RETRY_SECONDS`, up to ``MAX_STORAGE_BUDGET_RETRIES`` times.
+    The job fails right away if the bag could never fit on the volume.
+
     Args:
         submission (Submission): The submission to create a BagIt bag for
         user_triggered (User): The user who triggered this new Job creation
+        job (Optional[Job]): The Job to report to, if this is a retry of an earlier attempt
+        attempt (int): The number of times the job has already waited for space
     """
     description = (
         f"{user_triggered!s} triggered this job to generate a download link for a submission"
     )
 
-    new_job = Job(
+    new_job = job or Job(
         name=f"Generate Downloadable Bag for {submission!s}",
         description=description,
         start_time=timezone.now(),
         user_triggered=user_triggered,
         job_status=Job.JobStatus.IN_PROGRESS,
     )
+    new_job.job_status = Job.JobStatus.IN_PROGRESS
     new_job.save()
 
     # Set up job logging handler
     job_handler = JobLogHandler(new_job)
     job_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
 
+    reservation = None
     try:
         LOGGER.addHandler(job_handler)
         RECORDTRANSFER_MODELS_LOGGER.addHandler(job_handler)
 
+        # The files are copied into the bag, and the bag is zipped, so the job needs about twice
+        # the size of the uploaded files
+        upload_size = submission.upload_session.upload_size if submission.upload_session else 0
+        budget = get_temp_storage_budget()
+        reservation = budget.reserve(2 * upload_size)
+        if reservation is None:
+            capacity = budget.get_usage().capacity
+            if 2 * upload_size > capacity:
+                new_job.job_status = Job.JobStatus.FAILED
+                new_job.save()
+                LOGGER.error(
+                    "The bag needs %d bytes, but only %d bytes can ever be used on the volume",
+                    2 * upload_size,
+                    capacity,
+                )
+                return
+            if attempt >= MAX_STORAGE_BUDGET_RETRIES:
+                new_job.job_status = Job.JobStatus.FAILED
+                new_job.save()
+                LOGGER.error(
+                    "There was still not enough free space to create the bag after %d tries",
+                    attempt + 1,
+                )
+                return
+
+            new_job.job_status = Job.JobStatus.NOT_STARTED
+            new_job.save()
+            LOGGER.warning(
+                "There is not enough free space to create the bag, trying again in %d seconds",
+                settings.STORAGE_BUDGET_RETRY_SECONDS,
+            )
+            django_rq.get_scheduler().enqueue_in(
+                timedelta(seconds=settings.STORAGE_BUDGET_RETRY_SECONDS),
+                create_downloadable_bag,
+                *dump_value((submission, user_triggered, new_job, attempt + 1)),
+            )
+            return
+
         with (
             tempfile.TemporaryFile(
                 suffix=".zip", dir=settings.TEMP_STORAGE_FOLDER
@@ -72,10 +144,11 @@ def create_downloadable_bag(submission: Submission, user_triggered: User) -> Non
                 "Zipping Bag to temp file on disk at %s ...",
                 f"{settings.TEMP_STORAGE_FOLDER}/{temp_zip_file.name}.zip",
             )
-            zip_directory(
-                temp_dir,
-                zipfile.ZipFile(temp_zip_file, "w", zipfile.ZIP_DEFLATED, False),
-            )
+            with ZIP_BAG_SECONDS.time():
+                zip_directory(
+                    temp_dir,
+                    zipfile.ZipFile(temp_zip_file, "w", zipfile.ZIP_DEFLATED, False),
+                )
             LOGGER.info("Zipped directory successfully")
 
             file_name = f"{submission.bag_name}.zip"
@@ -95,6 +168,8 @@ def create_downloadable_bag(submission: Submission, user_triggered: User) -> Non
         LOGGER.error("Creating zipped bag failed due to exception!", exc_info=exc)
 
     finally:
+        if reservation:
+            reservation.release()
         LOGGER.removeHandler(job_handler)
         RECORDTRANSFER_MODELS_LOGGER.removeHandler(job_handler)
         job_handler.close()
@@ -110,7 +185,7 @@ def get_deletable_upload_sessions() -> QuerySet[UploadSession]:
     return UploadSession.objects.get_deletable().filter(in_progress_submission__isnull=True).all()
 
 
-@django_rq.job
+@job
 def move_uploads_and_send_emails(submission: Submission, form_data: dict) -> None:
     """Move the temp files in the given session to the permanent storage space and send emails.
 
@@ -171,7 +246,7 @@ def move_uploads_and_send_emails(submission: Submission, form_data: dict) -> Non
             send_submission_creation_failure(form_data, submission.user)
 
 
-@django_rq.job
+@job
 def cleanup_expired_sessions() -> None:
     """Clean up UploadSession objects that are expirable. Upload sessions that are not associated
     with any InProgressSubmission objects are deleted, while those that are associated with
@@ -205,7 +280,29 @@ def cleanup_expired_sessions() -> None:
         raise e
 
 
-@django_rq.job
+@job
+def collect_orphaned_storage_files() -> None:
+    """Remove files in the storage folders that no database row refers to, e.g., because the
+    application stopped between deleting a row and deleting its file.
+    """
+    LOGGER.info("Collecting orphaned files ...")
+    try:
+        quarantine = settings.STORAGE_GC_QUARANTINE_FOLDER
+        results = collect_orphaned_files(
+            settings.STORAGE_GC_MIN_AGE_MINUTES,
+            quarantine=Path(quarantine) if quarantine else None,
+        )
+        LOGGER.info(
+            "Removed %d orphaned files",
+            sum(stats.orphaned - stats.errors for stats in results.values()),
+        )
+
+    except Exception as e:
+        LOGGER.exception("Error collecting orphaned files: %s", str(e))
+        raise e
+
+
+@job
 def check_expiring_in_progress_submissions() -> None:
     """Check for in-progress submissions that are about to expire for which reminder emails have
     not been sent yet, and send email reminders.
@@ -223,9 +320,10 @@ def check_expiring_in_progress_submissions() -> None:
             return
 
         for in_progress in expiring:
-            send_user_in_progress_submission_expiring.delay(in_progress)
-            in_progress.reminder_email_sent = True
-            in_progress.save(update_fields=["reminder_email_sent"])
+            with transaction.atomic():
+                send_user_in_progress_submission_expiring(in_progress)
+                in_progress.reminder_email_sent = True
+                in_progress.save(update_fields=["reminder_email_sent"])
 
         LOGGER.info(
             "Sent reminders for %d in-progress submissions that are about to expire",
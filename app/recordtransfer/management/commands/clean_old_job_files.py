@@ -35,30 +35,27 @@ class Command(BaseCommand):
         days = options["older_than_days"]
         cutoff = timezone.now() - timedelta(days=days)
 
-        jobs_with_old_files = [
-            job
-            for job in Job.objects.filter(end_time__lt=cutoff, attached_file__isnull=False)
-            if job.has_file()
-        ]
+        jobs_with_old_files = (
+            Job.objects.filter(end_time__lt=cutoff)
+            .exclude(attached_file__isnull=True)
+            .exclude(attached_file="")
+        )
+        count = jobs_with_old_files.count()
 
-        if not jobs_with_old_files:
+        if count == 0:
             self.stdout.write("Did not find any old job attachment files to delete.")
             return
 
         if not options.get("no_confirm", False):
-            self.stdout.write(
-                f"About to delete {len(jobs_with_old_files)} old job attachment file(s)."
-            )
+            self.stdout.write(f"About to delete {count} old job attachment file(s).")
             confirm = input("Are you sure you want to continue? [y/n]: ").strip().lower()
             if confirm != "y":
                 self.stdout.write("Aborted deletion.")
                 return
 
-        for job in jobs_with_old_files:
-            file_path = job.attached_file.path
+        for job in jobs_with_old_files.iterator():
+            file_name = job.attached_file.name
             job.attached_file.delete(save=True)
-            self.stdout.write(f"Deleted: {file_path}")
+            self.stdout.write(f"Deleted: {file_name}")
 
-        self.stdout.write(
-            self.style.SUCCESS(f"Deleted {len(jobs_with_old_files)} old job attachment file(s).")
-        )
+        self.stdout.write(self.style.SUCCESS(f"Deleted {count} old job attachment file(s)."))
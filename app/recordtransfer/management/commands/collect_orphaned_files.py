@@ -0,0 +1,75 @@
+import argparse
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recordtransfer.orphans import STORAGE_AREAS, collect_orphaned_files
+
+
+class Command(BaseCommand):
+    """Remove files in the temp, upload, and job storage folders that no database row refers
+    to.
+    """
+
+    help = "Remove files in storage that are not referred to by the database"
+
+    def add_arguments(self, parser: argparse.ArgumentParser) -> None:
+        """Add command-line arguments for the management command.
+
+        Args:
+            parser: The parser to which arguments should be added.
+        """
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report orphaned files without removing them.",
+        )
+        parser.add_argument(
+            "--quarantine",
+            type=Path,
+            default=settings.STORAGE_GC_QUARANTINE_FOLDER or None,
+            help="Move orphaned files to this folder instead of deleting them.",
+        )
+        parser.add_argument(
+            "--min-age-minutes",
+            type=int,
+            default=settings.STORAGE_GC_MIN_AGE_MINUTES,
+            help="Leave files modified more recently than this many minutes alone.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of file names to look up in the database at a time.",
+        )
+        parser.add_argument(
+            "--area",
+            action="append",
+            choices=[area.name for area in STORAGE_AREAS],
+            help="Only collect files in this storage area. May be given more than once.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Walk the storage folders and remove orphaned files."""
+        quarantine = options["quarantine"]
+        results = collect_orphaned_files(
+            options["min_age_minutes"],
+            batch_size=options["batch_size"],
+            dry_run=options["dry_run"],
+            quarantine=quarantine.resolve() if quarantine else None,
+            area_names=options["area"],
+        )
+
+        for name, stats in results.items():
+            self.stdout.write(f"{name}: {stats}")
+
+        orphaned = sum(stats.orphaned for stats in results.values())
+        if options["dry_run"]:
+            self.stdout.write(f"Found {orphaned} orphaned file(s). Nothing was removed.")
+        elif quarantine:
+            self.stdout.write(
+                self.style.SUCCESS(f"Quarantined {orphaned} orphaned file(s) in {quarantine}.")
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Deleted {orphaned} orphaned file(s)."))
@@ -0,0 +1,35 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand
+from django.utils import translation
+from django.views.i18n import JavaScriptCatalog
+
+from recordtransfer.javascript_catalog import get_static_catalog_name
+from recordtransfer.storage import CompressedManifestStaticFilesStorage
+
+
+class Command(BaseCommand):
+    """Render the JavaScript translation catalog of each language to a static file, so that the
+    catalogs are served by NGINX instead of the application.
+
+    This must be run after ``collectstatic``, since ``collectstatic --clear`` removes the files.
+    """
+
+    help = "Render the JavaScript translation catalog of each language to STATIC_ROOT"
+
+    def handle(self, *args, **options) -> None:
+        """Render and save the catalog of each language."""
+        for language, _ in settings.LANGUAGES:
+            with translation.override(language):
+                response = JavaScriptCatalog().get(request=None)
+
+            name = get_static_catalog_name(language)
+            path = Path(settings.STATIC_ROOT, name)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(response.content)
+            if isinstance(staticfiles_storage, CompressedManifestStaticFilesStorage):
+                staticfiles_storage.compress(name)
+
+            self.stdout.write(f"Rendered the {language} catalog to {path}")
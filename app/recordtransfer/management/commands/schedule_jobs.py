@@ -4,7 +4,12 @@ import django_rq
 from django.conf import settings
 from django_rq.management.commands import rqscheduler
 
-from recordtransfer.jobs import check_expiring_in_progress_submissions, cleanup_expired_sessions
+from recordtransfer.emails import send_queued_emails
+from recordtransfer.jobs import (
+    check_expiring_in_progress_submissions,
+    cleanup_expired_sessions,
+    collect_orphaned_storage_files,
+)
 
 scheduler = django_rq.get_scheduler()
 LOGGER = logging.getLogger(__name__)
@@ -19,6 +24,25 @@ def clear_scheduled_jobs() -> None:
 
 def register_scheduled_jobs() -> None:
     """Register jobs to be run on a schedule."""
+    outbox_schedule = settings.EMAIL_OUTBOX_DRAIN_SCHEDULE
+    if outbox_schedule:
+        LOGGER.info("Scheduling email outbox drain job (schedule: %s)", outbox_schedule)
+        scheduler.cron(outbox_schedule, func=send_queued_emails, queue_name="email")
+    else:
+        LOGGER.info(
+            "EMAIL_OUTBOX_DRAIN_SCHEDULE is not set; emails that could not be sent right away "
+            "will not be retried"
+        )
+
+    storage_gc_schedule = settings.STORAGE_GC_SCHEDULE
+    if storage_gc_schedule:
+        LOGGER.info("Scheduling orphaned file collection job (schedule: %s)", storage_gc_schedule)
+        scheduler.cron(
+            storage_gc_schedule, func=collect_orphaned_storage_files, queue_name="default"
+        )
+    else:
+        LOGGER.info("STORAGE_GC_SCHEDULE is not set; orphaned files will not be removed")
+
     if (
         not settings.FILE_UPLOAD_ENABLED
         or settings.UPLOAD_SESSION_EXPIRE_AFTER_INACTIVE_MINUTES == -1
@@ -80,10 +80,10 @@ class Command(BaseCommand):
             self.send_email(email_id, user, form_data, submission, in_progress, language)
             if language:
                 logger.info(
-                    "✓ Sent '%s' email to %s in language '%s'", email_id, to_email, language
+                    "✓ Queued '%s' email to %s in language '%s'", email_id, to_email, language
                 )
             else:
-                logger.info("✓ Sent '%s' email to %s", email_id, to_email)
+                logger.info("✓ Queued '%s' email to %s", email_id, to_email)
         except Exception as e:
             logger.exception("Error sending email '%s' to %s: %s", email_id, to_email, e)
             raise CommandError(f"Error sending email: {e}") from e
@@ -1,3 +1,4 @@
+import ipaddress
 import logging
 import os
 import re
@@ -30,6 +31,8 @@ class Command(BaseCommand):
             verify_max_upload_size()
             verify_accepted_file_formats()
             verify_upload_session_settings()
+            verify_upload_offload_settings()
+            verify_metrics_settings()
             verify_site_id()
             if is_deployed_environment():
                 verify_security_settings()
@@ -460,6 +463,37 @@ def verify_upload_session_settings() -> None:
         )
 
 
+def verify_upload_offload_settings() -> None:
+    """Verify the upload offloading settings.
+
+    - UPLOAD_OFFLOAD_SECRET
+
+    Raises:
+        ImproperlyConfigured: If offloading is enabled without a secret.
+    """
+    if settings.UPLOAD_OFFLOAD_ENABLED and not settings.UPLOAD_OFFLOAD_SECRET:
+        raise ImproperlyConfigured(
+            "UPLOAD_OFFLOAD_SECRET must be set when UPLOAD_OFFLOAD_ENABLED is True"
+        )
+
+
+def verify_metrics_settings() -> None:
+    """Verify the metrics settings.
+
+    - METRICS_ALLOWED_NETWORKS
+
+    Raises:
+        ImproperlyConfigured: If a network is not a valid IP address or network.
+    """
+    for network in settings.METRICS_ALLOWED_NETWORKS:
+        try:
+            ipaddress.ip_network(network, strict=False)
+        except ValueError as exc:
+            raise ImproperlyConfigured(
+                f"METRICS_ALLOWED_NETWORKS contains an invalid network: {network}"
+            ) from exc
+
+
 def verify_site_id() -> None:
     """Verify that the SITE_ID setting is valid."""
     site_id = settings.SITE_ID
@@ -1,6 +1,6 @@
 from django.apps import apps
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.db.models import Q, query
 from django.utils import timezone
 
@@ -116,3 +116,43 @@ class InProgressSubmissionManager(models.Manager):
                 UploadSession.SessionStatus.UPLOADING,
             ],
         )
+
+
+class OutgoingEmailManager(models.Manager):
+    """Custom manager for OutgoingEmail model."""
+
+    def get_due(self) -> query.QuerySet:
+        """Return all pending emails that are ready to be sent, oldest first.
+
+        An email is ready to be sent if it has never been attempted, or if its retry backoff has
+        elapsed.
+        """
+        # Avoiding circular import
+        OutgoingEmail = apps.get_model(
+            app_label="recordtransfer",
+            model_name="OutgoingEmail",
+        )
+
+        return self.filter(
+            status=OutgoingEmail.EmailStatus.PENDING,
+            next_attempt_at__lte=timezone.now(),
+        ).order_by("next_attempt_at", "pk")
+
+    def claim_due(self, limit: int, lease: timezone.timedelta) -> list:
+        """Claim up to ``limit`` due emails for the caller to send.
+
+        The claimed emails are moved out of the outbox until the lease is up, so that other
+        workers don't send them too. The rows are only locked while they are claimed, not while
+        they are sent. If the caller stops before sending a claimed email, the email is due again
+        once the lease is up.
+
+        Returns:
+            The claimed emails, with the ``next_attempt_at`` they had before they were claimed
+        """
+        with transaction.atomic():
+            emails = list(self.get_due().select_for_update(skip_locked=True)[:limit])
+            if emails:
+                self.filter(pk__in=[email.pk for email in emails]).update(
+                    next_attempt_at=timezone.now() + lease
+                )
+        return emails
@@ -1,12 +1,32 @@
 """Custom middleware for the recordtransfer app."""
 
+import hashlib
+import logging
 from typing import Callable, cast
 
 from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
 from django.http import HttpRequest, HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import get_max_age, has_vary_header
+from django.utils.translation import get_language
+from utility import get_translation_version
+from utility.profiling import profile
 
+from recordtransfer.context_cache import get_context_cache_version
 from recordtransfer.models import User
 
+LOGGER = logging.getLogger("recordtransfer")
+
+# Rendered in place of the CSRF token in pages that may be cached, and replaced with the token of
+# the request each time the page is served
+CSRF_TOKEN_PLACEHOLDER = "page-cache-csrf-token-placeholder"
+
+# Headers that are not stored with cached pages, since they are set again when a page is served
+UNCACHED_HEADERS = ("Content-Length", "Set-Cookie")
+
 
 class SaveUserLanguageMiddleware:
     """Middleware to save language preference changes to the User model."""
@@ -38,3 +58,131 @@ class SaveUserLanguageMiddleware:
                 user.save(update_fields=["language"])
 
         return response
+
+
+class PageCacheMiddleware:
+    """Middleware to cache whole pages, in place of Django's site-wide cache middleware.
+
+    Django's cache middleware varies cached pages on the Cookie header, so a page is cached
+    separately for every visitor with a session or CSRF cookie, which is almost every visitor.
+    This middleware instead caches a page for each URL, language, and user, where every anonymous
+    user shares the same pages. The key also includes the version of the cached contexts, which
+    changes when a site setting or term is changed, and the version of the compiled translations.
+
+    The CSRF token in cached pages is replaced with a placeholder by the
+    :func:`~recordtransfer.context_processors.page_cache_csrf_token` context processor, and the
+    placeholder is replaced with the token of the request each time the page is served.
+
+    Requests that are not GET or HEAD requests, HTMX requests, and requests with messages waiting
+    to be shown are never served from the cache. Pages that set cookies, change the session, or
+    are marked private, uncacheable (e.g., with ``never_cache``), or immutable are not cached.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        """Initialize the middleware."""
+        self.get_response = get_response
+        # Compiled translations are only loaded when the application starts
+        self.translation_version = get_translation_version()
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        """Serve the page from the cache, or render and cache it."""
+        if not self._is_cacheable_request(request):
+            return self.get_response(request)
+
+        key = self.get_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            content, status, headers = cached
+            response = HttpResponse(content, status=status, headers=headers)
+            return self._insert_csrf_token(request, response)
+
+        request.page_cache_csrf_placeholder = True
+        response = self.get_response(request)
+        if self._is_cacheable_response(request, response):
+            headers = {
+                name: value
+                for name, value in response.headers.items()
+                if name not in UNCACHED_HEADERS
+            }
+            timeout = get_max_age(response) or settings.CACHE_MIDDLEWARE_SECONDS
+            cache.set(key, (response.content, response.status_code, headers), timeout)
+        return self._insert_csrf_token(request, response)
+
+    def get_cache_key(self, request: HttpRequest) -> str:
+        """Get the key a page is cached under for a request."""
+        url = hashlib.md5(request.build_absolute_uri().encode(), usedforsecurity=False)
+        user = "user-%s" % request.user.pk if request.user.is_authenticated else "anonymous"
+        return "%s:page:%s:%s:%s:%s:%s" % (
+            settings.CACHE_MIDDLEWARE_KEY_PREFIX,
+            url.hexdigest(),
+            get_language(),
+            user,
+            get_context_cache_version(),
+            self.translation_version,
+        )
+
+    def _is_cacheable_request(self, request: HttpRequest) -> bool:
+        if request.method not in ("GET", "HEAD") or "HX-Request" in request.headers:
+            return False
+        # Pages show the messages waiting for the user, so they must be rendered again
+        return len(messages.get_messages(request)) == 0
+
+    def _is_cacheable_response(self, request: HttpRequest, response: HttpResponse) -> bool:
+        if response.status_code != 200 or response.streaming or response.cookies:
+            return False
+        cache_control = response.get("Cache-Control", "").lower()
+        if any(directive in cache_control for directive in ("private", "no-cache", "no-store")):
+            return False
+        # Immutable responses are only fetched once by each browser, so caching them per user
+        # would only fill the cache
+        if "immutable" in cache_control:
+            return False
+        session = getattr(request, "session", None)
+        return not has_vary_header(response, "*") and not (session and session.modified)
+
+    def _insert_csrf_token(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        if response.streaming:
+            return response
+        placeholder = CSRF_TOKEN_PLACEHOLDER.encode()
+        if placeholder in response.content:
+            response.content = response.content.replace(placeholder, get_token(request).encode())
+            if response.has_header("Content-Length"):
+                response.headers["Content-Length"] = str(len(response.content))
+        return response
+
+
+class RequestProfilerMiddleware:
+    """Middleware to profile each request in development, when
+    :ref:`REQUEST_PROFILER_ENABLED` is True.
+
+    The number of database queries, the time spent in the database, the cache hits and misses,
+    and the total time taken by the rest of the middleware and the view are logged, and added to
+    the response in a ``Server-Timing`` header. The work done while a streaming response is sent
+    is not included.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        """Initialize the middleware, or remove it if profiling is not enabled."""
+        if not settings.REQUEST_PROFILER_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        """Profile the request."""
+        with profile() as result:
+            response = self.get_response(request)
+
+        response.headers["Server-Timing"] = result.server_timing()
+        resolver_match = getattr(request, "resolver_match", None)
+        LOGGER.info(
+            "%s %s (%s): %d queries in %.1f ms, %d cache hits, %d cache misses, %.1f ms total",
+            request.method,
+            request.path,
+            resolver_match.view_name if resolver_match else "unresolved",
+            result.queries,
+            result.db_seconds * 1000,
+            result.cache_hits,
+            result.cache_misses,
+            result.seconds * 1000,
+        )
+        return response
@@ -0,0 +1,36 @@
+# Generated by Django 6.0.9 on 2026-10-18 21:09
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recordtransfer', '0062_alter_submission_raw_form'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutgoingEmail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=256)),
+                ('from_email', models.CharField(max_length=256)),
+                ('recipients', models.JSONField(default=list)),
+                ('body_text', models.TextField(blank=True, default='')),
+                ('body_html', models.TextField(blank=True, default='')),
+                ('status', models.CharField(choices=[('PD', 'Pending'), ('ST', 'Sent'), ('FD', 'Failed')], default='PD', max_length=2)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Outgoing email',
+                'verbose_name_plural': 'Outgoing emails',
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='outgoing_email_due_idx')],
+            },
+        ),
+    ]
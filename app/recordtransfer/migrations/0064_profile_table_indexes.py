@@ -0,0 +1,25 @@
+# Generated by Django 6.0.9 on 2026-10-18 21:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recordtransfer', '0063_outgoingemail'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inprogresssubmission',
+            index=models.Index(fields=['user', 'last_updated'], name='in_progress_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['user', 'submission_date'], name='submission_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submissiongroup',
+            index=models.Index(fields=['created_by', 'name'], name='submission_group_user_name_idx'),
+        ),
+    ]
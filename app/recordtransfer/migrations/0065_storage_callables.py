@@ -0,0 +1,19 @@
+# Generated by Django 6.0.9 on 2026-10-18 21:32
+
+import recordtransfer.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recordtransfer', '0064_profile_table_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='job',
+            name='attached_file',
+            field=models.FileField(blank=True, null=True, storage=recordtransfer.storage.get_job_file_storage, upload_to='jobs/attachments'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 6.0.9 on 2026-10-18 22:07
+
+import hashlib
+import json
+
+import django.db.models.deletion
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import migrations, models
+
+
+def split_step_data(apps, schema_editor):
+    """Move the data of the completed steps of each in-progress submission into its own rows."""
+    InProgressSubmission = apps.get_model("recordtransfer", "InProgressSubmission")
+    InProgressSubmissionStep = apps.get_model("recordtransfer", "InProgressSubmissionStep")
+
+    for in_progress in InProgressSubmission.objects.iterator():
+        past = (in_progress.step_data or {}).get("past") or {}
+        steps = past.pop("step_data", None) or {}
+        InProgressSubmissionStep.objects.bulk_create(
+            InProgressSubmissionStep(
+                in_progress_submission=in_progress,
+                step=step,
+                data=data,
+                digest=hashlib.sha256(
+                    json.dumps(
+                        data, sort_keys=True, separators=(",", ":"), cls=DjangoJSONEncoder
+                    ).encode("utf-8")
+                ).hexdigest(),
+            )
+            for step, data in steps.items()
+        )
+        if steps:
+            in_progress.step_data["past"] = past
+            in_progress.save(update_fields=["step_data"])
+
+
+def join_step_data(apps, schema_editor):
+    """Move the data of the completed steps back into each in-progress submission."""
+    InProgressSubmission = apps.get_model("recordtransfer", "InProgressSubmission")
+
+    for in_progress in InProgressSubmission.objects.prefetch_related("steps").iterator(
+        chunk_size=100
+    ):
+        steps = {step.step: step.data for step in in_progress.steps.all()}
+        if steps:
+            in_progress.step_data.setdefault("past", {})["step_data"] = steps
+            in_progress.save(update_fields=["step_data"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recordtransfer', '0065_storage_callables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InProgressSubmissionStep',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('step', models.CharField(choices=[('acceptlegal', 'ACCEPT_LEGAL'), ('contactinfo', 'CONTACT_INFO'), ('sourceinfo', 'SOURCE_INFO'), ('recorddescription', 'RECORD_DESCRIPTION'), ('rights', 'RIGHTS'), ('otheridentifiers', 'OTHER_IDENTIFIERS'), ('groupsubmission', 'GROUP_SUBMISSION'), ('uploadfiles', 'UPLOAD_FILES'), ('finalnotes', 'FINAL_NOTES'), ('review', 'REVIEW')], max_length=20)),
+                ('data', models.JSONField(default=dict)),
+                ('digest', models.CharField(max_length=64)),
+                ('in_progress_submission', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='steps', to='recordtransfer.inprogresssubmission')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('in_progress_submission', 'step'), name='in_progress_step_unique')],
+            },
+        ),
+        migrations.RunPython(split_step_data, reverse_code=join_step_data),
+    ]
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
 import shutil
 import uuid
@@ -12,7 +14,10 @@ from caais.models import Metadata
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.core.cache import cache
-from django.db import models
+from django.core.mail import EmailMultiAlternatives
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, models
 from django.db.models.signals import post_save, pre_delete, pre_save
 from django.dispatch import receiver
 from django.forms import ValidationError
@@ -21,13 +26,18 @@ from django.utils import timezone
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 from upload.models import UploadSession
+from utility.metrics import Histogram
 
 from recordtransfer.enums import SiteSettingKey, SiteSettingType, SubmissionStep
-from recordtransfer.managers import InProgressSubmissionManager
-from recordtransfer.storage import OverwriteStorage
+from recordtransfer.managers import InProgressSubmissionManager, OutgoingEmailManager
+from recordtransfer.storage import get_job_file_storage
 
 LOGGER = logging.getLogger(__name__)
 
+MAKE_BAG_SECONDS = Histogram(
+    "submission_make_bag_seconds", "Time taken to create or update the BagIt bag of a submission."
+)
+
 # Sentinel object to distinguish between cache miss and cached None values
 NOT_CACHED = object()
 
@@ -502,6 +512,13 @@ class SubmissionGroup(models.Model):
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, null=False)
     uuid = models.UUIDField(default=uuid.uuid4)
 
+    class Meta:
+        """Meta information for the SubmissionGroup model."""
+
+        indexes: ClassVar = [
+            models.Index(fields=["created_by", "name"], name="submission_group_user_name_idx"),
+        ]
+
     @property
     def number_of_submissions_in_group(self) -> int:
         """Get the number of submissions in this group."""
@@ -556,6 +573,13 @@ class Submission(models.Model):
     upload_session = models.ForeignKey(UploadSession, null=True, on_delete=models.SET_NULL)
     uuid = models.UUIDField(default=uuid.uuid4)
 
+    class Meta:
+        """Meta information for the Submission model."""
+
+        indexes: ClassVar = [
+            models.Index(fields=["user", "submission_date"], name="submission_user_date_idx"),
+        ]
+
     @property
     def bag_name(self) -> str:
         """Get a name suitable for a submission bag.
@@ -618,6 +642,7 @@ class Submission(models.Model):
         view_name = f"admin:{self._meta.app_label}_{self._meta.model_name}_zip"
         return reverse(view_name, args=(self.pk,))
 
+    @MAKE_BAG_SECONDS.time()
     def make_bag(
         self,
         location: Path,
@@ -814,7 +839,7 @@ class Job(models.Model):
         max_length=2, choices=JobStatus.choices, default=JobStatus.NOT_STARTED
     )
     attached_file = models.FileField(
-        upload_to="jobs/attachments", storage=OverwriteStorage, blank=True, null=True
+        upload_to="jobs/attachments", storage=get_job_file_storage, blank=True, null=True
     )
     message_log = models.TextField(null=True)
 
@@ -837,6 +862,135 @@ class Job(models.Model):
         return f"{self.name} (Created by {self.user_triggered})"
 
 
+class OutgoingEmail(models.Model):
+    """An email that has been rendered and is waiting in the outbox to be sent.
+
+    Emails are written to the outbox by the functions in :py:mod:`recordtransfer.emails` as part
+    of the transaction that triggered them, and are sent in batches by the
+    :py:func:`~recordtransfer.emails.send_queued_emails` job running on the ``email`` queue. Emails
+    that fail to send are retried with exponential backoff until
+    :ref:`EMAIL_OUTBOX_MAX_ATTEMPTS` is reached.
+
+    Attributes:
+        subject:
+            The subject of the email, already translated
+        from_email:
+            The "From" address to send the email as
+        recipients:
+            A list of recipient email addresses
+        body_text:
+            The plain text version of the email. Cleared once the email is sent
+        body_html:
+            The HTML version of the email. Cleared once the email is sent
+        status:
+            Whether the email is pending, sent, or has permanently failed
+        attempts:
+            The number of times sending the email has been attempted
+        last_error:
+            The error encountered during the most recent failed attempt
+        created_at:
+            The time the email was added to the outbox
+        next_attempt_at:
+            The earliest time the email may be sent (or re-tried)
+        sent_at:
+            The time the email was sent
+    """
+
+    class EmailStatus(models.TextChoices):
+        """The delivery status of the email."""
+
+        PENDING = "PD", _("Pending")
+        SENT = "ST", _("Sent")
+        FAILED = "FD", _("Failed")
+
+    subject = models.CharField(max_length=256)
+    from_email = models.CharField(max_length=256)
+    recipients = models.JSONField(default=list)
+    body_text = models.TextField(blank=True, default="")
+    body_html = models.TextField(blank=True, default="")
+    status = models.CharField(
+        max_length=2, choices=EmailStatus.choices, default=EmailStatus.PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    objects = OutgoingEmailManager()
+
+    class Meta:
+        """Meta information for the OutgoingEmail model."""
+
+        verbose_name = _("Outgoing email")
+        verbose_name_plural = _("Outgoing emails")
+        indexes: ClassVar = [
+            models.Index(fields=["status", "next_attempt_at"], name="outgoing_email_due_idx"),
+        ]
+
+    def to_message(self, connection: Optional[BaseEmailBackend] = None) -> EmailMultiAlternatives:
+        """Build a message from this email that can be sent with the given connection.
+
+        Args:
+            connection: The email backend connection to send the message with
+        """
+        message = EmailMultiAlternatives(
+            subject=self.subject,
+            body=self.body_text,
+            from_email=self.from_email,
+            to=self.recipients,
+            connection=connection,
+        )
+        if self.body_html:
+            message.attach_alternative(self.body_html, "text/html")
+        return message
+
+    def mark_sent(self) -> None:
+        """Mark this email as sent.
+
+        The body of the email is cleared, since it may contain single-use links (e.g., account
+        activation or password reset links) that should not be kept around after sending.
+        """
+        self.status = self.EmailStatus.SENT
+        self.attempts += 1
+        self.sent_at = timezone.now()
+        self.body_text = ""
+        self.body_html = ""
+        self.save(update_fields=["status", "attempts", "sent_at", "body_text", "body_html"])
+
+    def mark_attempt_failed(self, error: str) -> None:
+        """Record a failed attempt to send this email.
+
+        The next attempt is delayed by :ref:`EMAIL_OUTBOX_RETRY_BACKOFF_SECONDS`, doubled for each
+        failed attempt. Once :ref:`EMAIL_OUTBOX_MAX_ATTEMPTS` attempts have failed, the email is
+        marked as FAILED and is not retried again.
+
+        Args:
+            error: A description of the error that occurred
+        """
+        self.attempts += 1
+        self.last_error = error
+
+        if self.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            self.status = self.EmailStatus.FAILED
+        else:
+            backoff = settings.EMAIL_OUTBOX_RETRY_BACKOFF_SECONDS * 2 ** (self.attempts - 1)
+            self.next_attempt_at = timezone.now() + timezone.timedelta(seconds=backoff)
+
+        self.save(update_fields=["status", "attempts", "last_error", "next_attempt_at"])
+
+    def retry(self) -> None:
+        """Put a failed email back in the outbox to be sent as soon as possible."""
+        self.status = self.EmailStatus.PENDING
+        self.attempts = 0
+        self.next_attempt_at = timezone.now()
+        self.save(update_fields=["status", "attempts", "next_attempt_at"])
+
+    def __str__(self) -> str:
+        """Return a string representation of this object."""
+        return f"{self.subject} (To: {', '.join(self.recipients)})"
+
+
 class InProgressSubmission(models.Model):
     """A submission that is in progress, created when a user saves a submission form.
 
@@ -850,7 +1004,8 @@ class InProgressSubmission(models.Model):
         current_step:
             The current step the user is on
         step_data:
-            The data contained in the form
+            The state of the form, and the data of the step the user is on. The data of the
+            steps the user has completed is kept in :class:`InProgressSubmissionStep` rows
         title:
             The accession title of the submission
     """
@@ -875,6 +1030,13 @@ class InProgressSubmission(models.Model):
 
     objects = InProgressSubmissionManager()
 
+    class Meta:
+        """Meta information for the InProgressSubmission model."""
+
+        indexes: ClassVar = [
+            models.Index(fields=["user", "last_updated"], name="in_progress_user_updated_idx"),
+        ]
+
     def clean(self) -> None:
         """Validate the current step value. This gets called when the model instance is
         modified through a form.
@@ -911,6 +1073,52 @@ class InProgressSubmission(models.Model):
             "recordtransfer:delete_in_progress_submission_modal", kwargs={"uuid": self.uuid}
         )
 
+    def get_step_data(self) -> dict[str, dict]:
+        """Get the saved data of each completed step, by step name."""
+        return dict(self.steps.values_list("step", "data"))
+
+    def save_step_data(self, step_data: dict[str, dict]) -> int:
+        """Save the data of each completed step. Only the steps whose data changed since they were
+        last saved are written.
+
+        Args:
+            step_data: The data of each completed step, by step name
+
+        Returns:
+            The number of steps that were written
+        """
+        saved_digests = dict(self.steps.values_list("step", "digest"))
+
+        changed = []
+        for step, data in step_data.items():
+            digest = InProgressSubmissionStep.get_digest(data)
+            if saved_digests.get(step) != digest:
+                changed.append(
+                    InProgressSubmissionStep(
+                        in_progress_submission=self, step=step, data=data, digest=digest
+                    )
+                )
+
+        if changed:
+            # MySQL can't be told which unique constraint to upsert on, and uses the one that
+            # conflicts, which is the constraint on the submission and step
+            unique_fields = (
+                ["in_progress_submission", "step"]
+                if connection.features.supports_update_conflicts_with_target
+                else None
+            )
+            InProgressSubmissionStep.objects.bulk_create(
+                changed,
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=["data", "digest"],
+            )
+
+        if removed := set(saved_digests) - set(step_data):
+            self.steps.filter(step__in=removed).delete()
+
+        return len(changed)
+
     def reset_reminder_email_sent(self) -> None:
         """Reset the reminder email flag to False, if it isn't already False."""
         if self.reminder_email_sent:
@@ -924,6 +1132,47 @@ class InProgressSubmission(models.Model):
         return f"In-Progress Submission by {self.user} (Title: {title} | Session: {session})"
 
 
+class InProgressSubmissionStep(models.Model):
+    """The saved data of one completed step of an in-progress submission.
+
+    Attributes:
+        in_progress_submission:
+            The in-progress submission the step belongs to
+        step:
+            The name of the step
+        data:
+            The data of the step's form, as kept by the form wizard
+        digest:
+            A SHA-256 digest of the data, used to skip writing steps that have not changed
+    """
+
+    in_progress_submission = models.ForeignKey(
+        InProgressSubmission, on_delete=models.CASCADE, related_name="steps"
+    )
+    step = models.CharField(max_length=20, choices=InProgressSubmission.STEP_CHOICES)
+    data = models.JSONField(default=dict)
+    digest = models.CharField(max_length=64)
+
+    class Meta:
+        """Meta information for the InProgressSubmissionStep model."""
+
+        constraints: ClassVar = [
+            models.UniqueConstraint(
+                fields=["in_progress_submission", "step"], name="in_progress_step_unique"
+            ),
+        ]
+
+    @staticmethod
+    def get_digest(data: Union[dict, list]) -> str:
+        """Get the digest of a step's data."""
+        encoded = json.dumps(data, sort_keys=True, separators=(",", ":"), cls=DjangoJSONEncoder)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def __str__(self):
+        """Return a string representation of this object."""
+        return f"{self.step} step of {self.in_progress_submission}"
+
+
 @receiver(pre_delete, sender=InProgressSubmission)
 def delete_upload_session_on_delete(
     sender: InProgressSubmission, instance: InProgressSubmission, **kwargs
@@ -0,0 +1,247 @@
+"""Find and remove files in storage that no database row refers to.
+
+Files are normally removed by signal handlers when the rows that refer to them are deleted, but a
+crash between deleting a row and unlinking its file, or a move that fails half way, leaves files
+behind that nothing will ever clean up. The collector walks each storage folder on the local file
+system, looks up the names it finds in the database in batches, and deletes or quarantines the
+files that are not referred to.
+
+Files kept in an object store are not collected. Use the object store's lifecycle rules instead.
+"""
+
+import dataclasses
+import logging
+import os
+import shutil
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+from django.core.files.storage import Storage
+from django.db import models
+from upload.models import FileBlob, PermUploadedFile, TempUploadedFile
+from upload.storage import get_temp_file_storage, get_uploaded_file_storage
+
+from recordtransfer.models import Job
+from recordtransfer.storage import get_job_file_storage
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class StorageArea:
+    """A storage folder, and the model fields that refer to files in it."""
+
+    name: str
+    get_storage: Callable[[], Storage]
+    references: tuple[tuple[type[models.Model], str], ...]
+    # Only files under this sub-directory of the storage are collected
+    subdirectory: str = ""
+
+    def get_root(self) -> Optional[Path]:
+        """Get the folder on the local file system to walk, or None if the storage is not on the
+        local file system.
+        """
+        try:
+            return Path(self.get_storage().path(self.subdirectory))
+        except NotImplementedError:
+            return None
+
+    def find_referenced(self, names: list[str]) -> set[str]:
+        """Find which of the names are referred to by a row in the database."""
+        referenced = set()
+        for model, field in self.references:
+            referenced.update(
+                model.objects.filter(**{f"{field}__in": names}).values_list(field, flat=True)
+            )
+        return referenced
+
+
+STORAGE_AREAS = (
+    StorageArea("temp", get_temp_file_storage, ((TempUploadedFile, "file_upload"),)),
+    StorageArea(
+        "uploads",
+        get_uploaded_file_storage,
+        ((PermUploadedFile, "file_upload"), (FileBlob, "file_upload")),
+    ),
+    StorageArea(
+        "jobs",
+        get_job_file_storage,
+        ((Job, "attached_file"),),
+        subdirectory=Job._meta.get_field("attached_file").upload_to,
+    ),
+)
+
+
+@dataclasses.dataclass
+class CollectionStats:
+    """Counts of the files the collector looked at and removed."""
+
+    scanned: int = 0
+    orphaned: int = 0
+    orphaned_bytes: int = 0
+    errors: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        """The number of files scanned per second."""
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.scanned / self.elapsed_seconds
+
+    def __str__(self) -> str:
+        """Summarize the counts for a log message."""
+        return (
+            f"scanned {self.scanned} files, found {self.orphaned} orphans "
+            f"({self.orphaned_bytes} bytes), {self.errors} errors, in "
+            f"{self.elapsed_seconds:.2f}s ({self.files_per_second:.0f} files/s)"
+        )
+
+
+def _walk_files(root: Path, skip: set[Path], max_mtime: float) -> Iterator[os.DirEntry]:
+    """Yield the files under root last modified before max_mtime. Directories in skip are not
+    entered.
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if Path(entry.path) not in skip:
+                            stack.append(Path(entry.path))
+                    elif (
+                        entry.is_file(follow_symlinks=False)
+                        and entry.stat(follow_symlinks=False).st_mtime < max_mtime
+                    ):
+                        yield entry
+        except FileNotFoundError:
+            continue
+
+
+def _remove_orphan(
+    area: StorageArea,
+    entry: os.DirEntry,
+    name: str,
+    stats: CollectionStats,
+    dry_run: bool,
+    quarantine: Optional[Path],
+) -> None:
+    """Delete or quarantine an orphaned file, and count it in the stats."""
+    stats.orphaned += 1
+    try:
+        stats.orphaned_bytes += entry.stat(follow_symlinks=False).st_size
+        if dry_run:
+            LOGGER.info("Found orphaned %s file %s", area.name, name)
+        elif quarantine:
+            destination = quarantine / area.name / name
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(entry.path, destination)
+            LOGGER.info("Quarantined orphaned %s file %s", area.name, name)
+        else:
+            os.unlink(entry.path)
+            LOGGER.info("Deleted orphaned %s file %s", area.name, name)
+    except OSError as exc:
+        stats.errors += 1
+        LOGGER.warning("Could not remove orphaned %s file %s: %s", area.name, name, exc)
+
+
+def collect_area(
+    area: StorageArea,
+    min_age_minutes: int,
+    batch_size: int = 1000,
+    dry_run: bool = False,
+    quarantine: Optional[Path] = None,
+    skip: Optional[set[Path]] = None,
+) -> CollectionStats:
+    """Remove the files in a storage area that no database row refers to.
+
+    Args:
+        area: The storage area to collect
+        min_age_minutes: Files modified more recently than this are left alone, since they may
+            belong to a row that is still being created
+        batch_size: The number of file names to look up in the database at a time
+        dry_run: Only report orphaned files, without removing them
+        quarantine: Move orphaned files under this folder instead of deleting them
+        skip: Folders that are not walked
+
+    Returns:
+        Counts of the files that were scanned and removed
+    """
+    stats = CollectionStats()
+    root = area.get_root()
+    if root is None:
+        LOGGER.info("Not collecting %s files, they are not on the local file system", area.name)
+        return stats
+
+    storage_root = Path(area.get_storage().path(""))
+    skip = {Path(p) for p in skip or ()}
+    if quarantine:
+        skip.add(quarantine)
+
+    def collect_batch(batch: list[tuple[os.DirEntry, str]]) -> None:
+        referenced = area.find_referenced([name for _, name in batch])
+        for entry, name in batch:
+            if name not in referenced:
+                _remove_orphan(area, entry, name, stats, dry_run, quarantine)
+
+    start = time.monotonic()
+    max_mtime = time.time() - min_age_minutes * 60
+    batch = []
+    for entry in _walk_files(root, skip, max_mtime):
+        batch.append((entry, Path(entry.path).relative_to(storage_root).as_posix()))
+        stats.scanned += 1
+        if len(batch) >= batch_size:
+            collect_batch(batch)
+            batch = []
+    if batch:
+        collect_batch(batch)
+
+    stats.elapsed_seconds = time.monotonic() - start
+    LOGGER.info("Collected %s files: %s", area.name, stats)
+    return stats
+
+
+def collect_orphaned_files(
+    min_age_minutes: int,
+    batch_size: int = 1000,
+    dry_run: bool = False,
+    quarantine: Optional[Path] = None,
+    area_names: Optional[list[str]] = None,
+) -> dict[str, CollectionStats]:
+    """Remove the files in each storage area that no database row refers to.
+
+    The folders of the other storage areas, and the :ref:`UPLOAD_OFFLOAD_FOLDER`, are not walked
+    when they are inside the folder of an area.
+
+    Args:
+        min_age_minutes: Files modified more recently than this are left alone
+        batch_size: The number of file names to look up in the database at a time
+        dry_run: Only report orphaned files, without removing them
+        quarantine: Move orphaned files under this folder instead of deleting them
+        area_names: The names of the areas to collect. All areas are collected if not given
+
+    Returns:
+        Counts of the files that were scanned and removed, by area name
+    """
+    roots = {area.name: area.get_root() for area in STORAGE_AREAS}
+    skip = {Path(settings.UPLOAD_OFFLOAD_FOLDER)}
+    skip.update(root for root in roots.values() if root is not None)
+
+    results = {}
+    for area in STORAGE_AREAS:
+        if area_names and area.name not in area_names:
+            continue
+        results[area.name] = collect_area(
+            area,
+            min_age_minutes,
+            batch_size=batch_size,
+            dry_run=dry_run,
+            quarantine=quarantine,
+            skip=skip - {roots[area.name]},
+        )
+    return results
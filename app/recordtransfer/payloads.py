@@ -0,0 +1,142 @@
+"""Arguments for background jobs that refer to database rows by primary key.
+
+RQ pickles the arguments of a job into Redis. Pickling a model instance stores every field of it,
+and of every related object that was loaded with it, and the worker gets a copy of the row as it
+was when the job was enqueued instead of as it is when the job runs. Jobs made with :func:`job`
+replace model instances in their arguments with a :class:`ModelRef` when they are enqueued, and
+load the rows again in the worker, with one query for each model.
+"""
+
+import dataclasses
+import functools
+from collections import defaultdict
+from collections.abc import Callable
+from typing import Any, Union
+
+import django_rq
+from django.apps import apps
+from django.db import models
+from utility.metrics import Histogram
+
+JOB_SECONDS = Histogram("job_seconds", "Time taken to run a background job, by job.", ("job",))
+
+# Related objects loaded with the rows that are passed to jobs, by model label
+SELECT_RELATED = {
+    "recordtransfer.InProgressSubmission": ("user", "upload_session"),
+    "recordtransfer.Job": ("user_triggered",),
+    "recordtransfer.Submission": ("user", "upload_session"),
+}
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class ModelRef:
+    """A reference to a database row."""
+
+    label: str
+    pk: Any
+
+    @classmethod
+    def of(cls, instance: models.Model) -> "ModelRef":
+        """Make a reference to a saved model instance."""
+        return cls(instance._meta.label, instance.pk)
+
+
+def dump_value(value: Any) -> Any:
+    """Replace the saved model instances in a value with references to them. Dictionaries, lists,
+    and tuples are searched for model instances, and querysets are replaced with lists of
+    references.
+    """
+    if isinstance(value, models.Model) and value.pk is not None:
+        return ModelRef.of(value)
+    if isinstance(value, models.QuerySet):
+        return [ModelRef.of(instance) for instance in value]
+    if isinstance(value, dict):
+        return {key: dump_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [dump_value(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(dump_value(item) for item in value)
+    return value
+
+
+def _find_refs(value: Any, refs: dict[str, set]) -> None:
+    if isinstance(value, ModelRef):
+        refs[value.label].add(value.pk)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _find_refs(item, refs)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _find_refs(item, refs)
+
+
+def _replace_refs(value: Any, rows: dict[str, dict]) -> Any:
+    if isinstance(value, ModelRef):
+        try:
+            return rows[value.label][value.pk]
+        except KeyError:
+            model = apps.get_model(value.label)
+            raise model.DoesNotExist(
+                f"{value.label} with pk {value.pk!r} no longer exists"
+            ) from None
+    if isinstance(value, dict):
+        return {key: _replace_refs(item, rows) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_replace_refs(item, rows) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_replace_refs(item, rows) for item in value)
+    return value
+
+
+def load_value(value: Any) -> Any:
+    """Replace the references in a value made with :func:`dump_value` with the rows they refer to.
+
+    Raises:
+        ObjectDoesNotExist: If a row has been deleted since the value was dumped
+    """
+    refs = defaultdict(set)
+    _find_refs(value, refs)
+    if not refs:
+        return value
+
+    rows = {}
+    for label, pks in refs.items():
+        model = apps.get_model(label)
+        queryset = model.objects.select_related(*SELECT_RELATED.get(label, ()))
+        rows[label] = queryset.in_bulk(pks)
+    return _replace_refs(value, rows)
+
+
+def job(func_or_queue: Union[Callable, str] = "default", **options) -> Callable:
+    """Make a function into a job that is run by an RQ worker, like :func:`django_rq.job`.
+
+    Model instances passed to the job's ``delay`` method are enqueued as references, and are
+    loaded again before the function is called. The function can also be called directly with
+    model instances.
+
+    Args:
+        func_or_queue: The function, or the name of the queue to run the function on
+        **options: Passed to :func:`django_rq.job`
+    """
+    if callable(func_or_queue):
+        return job()(func_or_queue)
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def load_and_call(*args, **kwargs) -> Any:
+            with JOB_SECONDS.time(job=func.__name__):
+                args, kwargs = load_value((args, kwargs))
+                return func(*args, **kwargs)
+
+        queued = django_rq.job(func_or_queue, **options)(load_and_call)
+        enqueue = queued.delay
+
+        @functools.wraps(enqueue)
+        def delay(*args, **kwargs) -> Any:
+            return enqueue(*dump_value(args), **dump_value(kwargs))
+
+        queued.delay = delay
+        queued.enqueue = delay
+        return queued
+
+    return decorator
@@ -1,7 +1,19 @@
-from typing import Optional
+import gzip
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, Optional
 
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
 from django.core.files.base import File
-from django.core.files.storage import FileSystemStorage
+from django.core.files.storage import FileSystemStorage, Storage, storages
+
+try:
+    import brotli
+
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+    brotli = None
 
 
 class OverwriteStorage(FileSystemStorage):
@@ -21,3 +33,55 @@ class OverwriteStorage(FileSystemStorage):
         allowing overwriting of existing files.
         """
         return name
+
+
+def get_job_file_storage() -> Storage:
+    """Get the storage for files attached to jobs, configured by the ``job_files`` key of the
+    ``STORAGES`` setting.
+    """
+    return storages["job_files"]
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Static file storage that fingerprints file names and writes compressed copies of them.
+
+    When ``collectstatic`` is run, each static file is copied to a name that includes a hash of its
+    contents, e.g., ``css/main.55e7cbb9ba48.css``, and ``{% static %}`` refers to the hashed name,
+    so that the files can be cached by browsers forever. A gzip copy of each text file is written
+    next to it with a ``.gz`` suffix, so that NGINX can serve it without compressing it for every
+    request. A Brotli copy with a ``.br`` suffix is also written if the ``brotli`` package is
+    installed.
+    """
+
+    compressed_extensions = (".css", ".js", ".json", ".map", ".svg", ".txt", ".xml", ".ico")
+
+    # Files smaller than this are not worth compressing
+    min_compress_size = 256
+
+    def post_process(
+        self, paths: dict[str, Any], dry_run: bool = False, **options
+    ) -> Iterator[tuple[str, str, bool]]:
+        """Hash the names of the collected files, then compress the original and hashed files."""
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        names = {*paths, *self.hashed_files.values()}
+        for name in sorted(names):
+            if name.endswith(self.compressed_extensions):
+                self.compress(name)
+
+    def compress(self, name: str) -> None:
+        """Write compressed copies of a stored file, if they are smaller than the file."""
+        path = Path(self.path(name))
+        data = path.read_bytes()
+        if len(data) < self.min_compress_size:
+            return
+
+        compressed = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+        if BROTLI_AVAILABLE:
+            compressed[".br"] = brotli.compress(data)
+
+        for suffix, content in compressed.items():
+            if len(content) < len(data):
+                path.with_name(path.name + suffix).write_bytes(content)
@@ -0,0 +1,11 @@
+from django import template
+
+from recordtransfer.javascript_catalog import get_catalog_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def javascript_catalog_url() -> str:
+    """Get the versioned URL of the JavaScript translation catalog of the active language."""
+    return get_catalog_url()
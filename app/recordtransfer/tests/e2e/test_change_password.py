@@ -22,7 +22,7 @@ from recordtransfer.tests.e2e.selenium_setup import SeleniumLiveServerTestCase
         },
     }
 )
-@patch("recordtransfer.emails.send_user_account_updated.delay")
+@patch("recordtransfer.views.account.send_user_account_updated")
 class ChangePasswordTest(SeleniumLiveServerTestCase):
     """End-to-end tests for the Change Password page."""
 
@@ -0,0 +1,67 @@
+"""Tests for the recordtransfer admin site."""
+
+from caais.models import Metadata
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from upload.models import TempUploadedFile, UploadSession
+
+from recordtransfer.models import Submission, User
+
+
+class TestSubmissionAdminChangelist(TestCase):
+    """Test that the submission changelist does not depend on the number of submissions."""
+
+    def setUp(self) -> None:
+        """Create an admin user."""
+        self.admin_user = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="password"
+        )
+        self.client.force_login(self.admin_user)
+        self.url = reverse("admin:recordtransfer_submission_changelist")
+
+    def _create_submission(self, file_count: int) -> Submission:
+        session = UploadSession.new_session(user=self.admin_user, enforce_limit=False)
+        for i in range(file_count):
+            TempUploadedFile.objects.create(
+                name=f"file_{i}.pdf",
+                session=session,
+                file_upload=SimpleUploadedFile(f"file_{i}.pdf", b"content"),
+            )
+        return Submission.objects.create(
+            user=self.admin_user,
+            metadata=Metadata.objects.create(accession_title="Title"),
+            upload_session=session,
+        )
+
+    def _count_queries(self) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_constant_queries(self) -> None:
+        """Test that the number of queries is the same for one submission or many."""
+        self._create_submission(1)
+        one_submission = self._count_queries()
+
+        for i in range(5):
+            self._create_submission(i)
+        many_submissions = self._count_queries()
+
+        self.assertEqual(one_submission, many_submissions)
+
+    def test_file_count(self) -> None:
+        """Test that the file count of each submission is displayed."""
+        self._create_submission(3)
+        Submission.objects.create(user=self.admin_user)
+
+        response = self.client.get(self.url)
+
+        file_counts = sorted(
+            response.context["cl"].model_admin.file_count(submission)
+            for submission in response.context["cl"].result_list
+        )
+        self.assertEqual(file_counts, ["0", "3"])
@@ -1,6 +1,23 @@
+import os
+import tempfile
+import time
+from io import StringIO
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
 from django.contrib.sites.models import Site
+from django.core.files.storage import FileSystemStorage
 from django.core.management import call_command
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from recordtransfer.javascript_catalog import (
+    get_catalog_url,
+    get_static_catalog_name,
+    is_catalog_prerendered,
+)
+from recordtransfer.models import Job
+from recordtransfer.orphans import StorageArea, collect_area
 
 
 class TestSetDomain(TestCase):
@@ -59,3 +76,132 @@ class TestSetDomain(TestCase):
                 updated_site = Site.objects.get_current()
                 self.assertEqual(updated_site.domain, self.original_domain)
                 self.assertEqual(updated_site.name, self.original_name)
+
+
+class TestCollectOrphanedFiles(TestCase):
+    """Test removing files that no database row refers to with the collect_orphaned_files
+    command.
+    """
+
+    def setUp(self) -> None:
+        """Create a job storage folder with a referenced file, an orphaned file, and a new
+        orphaned file.
+        """
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.root = Path(temp_dir.name)
+        self.storage = FileSystemStorage(location=self.root / "media")
+        self.area = StorageArea(
+            "jobs",
+            lambda: self.storage,
+            ((Job, "attached_file"),),
+            subdirectory="jobs/attachments",
+        )
+        patcher = patch("recordtransfer.orphans.STORAGE_AREAS", (self.area,))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        attachments = self.root / "media" / "jobs" / "attachments"
+        attachments.mkdir(parents=True)
+        self.referenced = attachments / "referenced.zip"
+        self.orphaned = attachments / "nested" / "orphaned.zip"
+        self.new = attachments / "new.zip"
+        self.outside = self.root / "media" / "other.zip"
+        self.orphaned.parent.mkdir()
+        day_ago = time.time() - 60 * 60 * 25
+        for path in (self.referenced, self.orphaned, self.new, self.outside):
+            path.write_bytes(b"data")
+            if path != self.new:
+                os.utime(path, (day_ago, day_ago))
+
+        Job.objects.create(
+            name="Job", start_time=timezone.now(), attached_file="jobs/attachments/referenced.zip"
+        )
+
+    def test_orphaned_file_deleted(self) -> None:
+        """Test that only old files that no row refers to are deleted."""
+        out = StringIO()
+        call_command("collect_orphaned_files", min_age_minutes=60, stdout=out)
+
+        self.assertTrue(self.referenced.exists())
+        self.assertFalse(self.orphaned.exists())
+        self.assertTrue(self.new.exists())
+        self.assertTrue(self.outside.exists())
+        self.assertIn("scanned 2 files, found 1 orphans (4 bytes)", out.getvalue())
+        self.assertIn("Deleted 1 orphaned file(s).", out.getvalue())
+
+    def test_dry_run(self) -> None:
+        """Test that nothing is removed in a dry run."""
+        out = StringIO()
+        call_command("collect_orphaned_files", min_age_minutes=60, dry_run=True, stdout=out)
+
+        self.assertTrue(self.orphaned.exists())
+        self.assertIn("Found 1 orphaned file(s). Nothing was removed.", out.getvalue())
+
+    def test_quarantine(self) -> None:
+        """Test that orphaned files are moved to the quarantine folder, keeping their path."""
+        quarantine = self.root / "quarantine"
+        call_command(
+            "collect_orphaned_files", min_age_minutes=60, quarantine=quarantine, stdout=StringIO()
+        )
+
+        self.assertFalse(self.orphaned.exists())
+        self.assertEqual(
+            (
+                quarantine / "jobs" / "jobs" / "attachments" / "nested" / "orphaned.zip"
+            ).read_bytes(),
+            b"data",
+        )
+
+    def test_batches(self) -> None:
+        """Test that the database is queried once per batch of file names."""
+        for i in range(4):
+            Job.objects.create(
+                name="Job", start_time=timezone.now(), attached_file=f"jobs/attachments/{i}.zip"
+            )
+            path = self.referenced.parent / f"{i}.zip"
+            path.write_bytes(b"data")
+            os.utime(path, (0, 0))
+
+        with self.assertNumQueries(2):
+            stats = collect_area(self.area, 60, batch_size=3, dry_run=True)
+
+        self.assertEqual(stats.scanned, 6)
+        self.assertEqual(stats.orphaned, 1)
+
+    def test_object_storage_skipped(self) -> None:
+        """Test that storages that are not on the local file system are not collected."""
+        storage = MagicMock()
+        storage.path.side_effect = NotImplementedError
+        area = StorageArea("uploads", lambda: storage, ())
+
+        self.assertEqual(collect_area(area, 60).scanned, 0)
+
+
+class TestRenderJavascriptCatalogs(TestCase):
+    """Test rendering the JavaScript translation catalogs to static files with the
+    render_javascript_catalogs command.
+    """
+
+    def setUp(self) -> None:
+        """Render the catalogs into an empty static folder."""
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.static_root = Path(temp_dir.name)
+        settings = override_settings(STATIC_ROOT=str(self.static_root), STATIC_URL="/static/")
+        settings.enable()
+        self.addCleanup(settings.disable)
+        is_catalog_prerendered.cache_clear()
+        self.addCleanup(is_catalog_prerendered.cache_clear)
+
+    def test_catalogs_rendered(self) -> None:
+        """Test that a catalog is rendered for each language, and pages refer to it."""
+        self.assertNotIn("/static/", get_catalog_url("fr"))
+
+        call_command("render_javascript_catalogs", stdout=StringIO())
+        is_catalog_prerendered.cache_clear()
+
+        for language in ("en", "fr", "hi"):
+            path = self.static_root / get_static_catalog_name(language)
+            self.assertIn(b"django.catalog", path.read_bytes())
+        self.assertEqual(get_catalog_url("fr"), "/static/" + get_static_catalog_name("fr"))
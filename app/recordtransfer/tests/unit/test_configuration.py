@@ -1,5 +1,11 @@
-from configuration import AcceptedFileTypes
+import os
+import runpy
+from importlib.util import find_spec
+from unittest.mock import patch
+
+from configuration import AcceptedFileTypes, get_s3_origins
 from django.test import TestCase
+from django.utils.csp import CSP
 
 from recordtransfer.management.commands.verify_settings import _validate_cron
 
@@ -116,3 +122,51 @@ class TestCronValidation(TestCase):
         for cron in invalid_crons:
             with self.subTest(cron=cron), self.assertRaises(ValueError):
                 _validate_cron(cron)
+
+
+class TestGetS3Origins(TestCase):
+    """Tests for the origins pre-signed S3 URLs can point to."""
+
+    def test_endpoint_url(self) -> None:
+        """Test that only the origin of a custom endpoint is used."""
+        self.assertEqual(
+            get_s3_origins("bucket", "http://minio:9000/some/path", "us-east-1"),
+            ["http://minio:9000"],
+        )
+
+    def test_aws(self) -> None:
+        """Test that the bucket's AWS origins are used when there is no endpoint."""
+        self.assertEqual(get_s3_origins("bucket"), ["https://bucket.s3.amazonaws.com"])
+        self.assertEqual(
+            get_s3_origins("bucket", region_name="ca-central-1"),
+            ["https://bucket.s3.amazonaws.com", "https://bucket.s3.ca-central-1.amazonaws.com"],
+        )
+
+
+class TestContentSecurityPolicy(TestCase):
+    """Tests for the content security policy built from the settings."""
+
+    def _get_connect_src(self, **environ: str) -> list:
+        with patch.dict(os.environ, environ):
+            base_settings = runpy.run_path(find_spec("app.settings.base").origin)
+        return base_settings["SECURE_CSP_POLICY"]["connect-src"]
+
+    def test_direct_uploads_allowed_to_object_store(self) -> None:
+        """Test that browsers may connect to the object store when direct uploads are enabled."""
+        connect_src = self._get_connect_src(
+            FILE_STORAGE_BACKEND="s3",
+            S3_BUCKET_NAME="bucket",
+            S3_ENDPOINT_URL="https://minio.example.com",
+            DIRECT_UPLOAD_ENABLED="True",
+        )
+        self.assertEqual(connect_src, [CSP.SELF, "https://minio.example.com"])
+
+    def test_object_store_not_allowed_without_direct_uploads(self) -> None:
+        """Test that browsers may only connect to the application when uploads go through it."""
+        connect_src = self._get_connect_src(
+            FILE_STORAGE_BACKEND="s3",
+            S3_BUCKET_NAME="bucket",
+            S3_ENDPOINT_URL="https://minio.example.com",
+            DIRECT_UPLOAD_ENABLED="False",
+        )
+        self.assertEqual(connect_src, [CSP.SELF])
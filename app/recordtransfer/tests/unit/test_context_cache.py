@@ -0,0 +1,93 @@
+from unittest.mock import MagicMock, patch
+
+from caais.models import RightsType
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import translation
+
+from recordtransfer.context_cache import (
+    get_cached_context,
+    get_context_cache_key,
+    get_context_cache_version,
+)
+from recordtransfer.enums import SiteSettingKey
+from recordtransfer.models import SiteSetting, User
+from recordtransfer.views.pre_submission import SubmissionFormWizard
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "test-context-cache",
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES, SUBMISSION_FORM_CONTEXT_CACHE_SECONDS=60)
+class TestContextCache(TestCase):
+    """Tests for the cached contexts of the submission form."""
+
+    def tearDown(self) -> None:
+        """Clear the cache between tests."""
+        cache.clear()
+
+    def test_context_built_once(self) -> None:
+        """Test that a context is only built the first time it is used."""
+        build = MagicMock(return_value={"value": 1})
+        self.assertEqual(get_cached_context("test", build), {"value": 1})
+        self.assertEqual(get_cached_context("test", build), {"value": 1})
+        build.assert_called_once()
+
+    def test_context_cached_per_language(self) -> None:
+        """Test that each language has its own cached context."""
+        with translation.override("en"):
+            english = get_cached_context("test", lambda: translation.get_language())
+            self.assertTrue(get_context_cache_key().startswith("en:"))
+        with translation.override("fr"):
+            french = get_cached_context("test", lambda: translation.get_language())
+        self.assertEqual(english, "en")
+        self.assertEqual(french, "fr")
+
+    def test_term_change_invalidates(self) -> None:
+        """Test that saving or deleting a term rebuilds the cached contexts."""
+        build = MagicMock(return_value={})
+        get_cached_context("test", build)
+
+        version = get_context_cache_version()
+        term = RightsType.objects.create(name="Test Term")
+        self.assertNotEqual(get_context_cache_version(), version)
+
+        version = get_context_cache_version()
+        term.delete()
+        self.assertNotEqual(get_context_cache_version(), version)
+
+        get_cached_context("test", build)
+        self.assertEqual(build.call_count, 2)
+
+    def test_site_setting_change_invalidates(self) -> None:
+        """Test that saving a site setting rebuilds the cached contexts."""
+        version = get_context_cache_version()
+        setting = SiteSetting.objects.get(key=SiteSettingKey.PAGINATE_BY.name)
+        setting.value = "20"
+        setting.save()
+        self.assertNotEqual(get_context_cache_version(), version)
+
+    def test_wizard_javascript_context_cached(self) -> None:
+        """Test that the part of the JavaScript context shared by every user is only built once."""
+        user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpassword"
+        )
+        self.client.force_login(user)
+        url = reverse("recordtransfer:submit")
+
+        with patch.object(
+            SubmissionFormWizard,
+            "_get_static_javascript_context",
+            wraps=SubmissionFormWizard._get_static_javascript_context,
+        ) as mock_build:
+            first = self.client.get(url)
+            second = self.client.get(url)
+
+        mock_build.assert_called_once()
+        self.assertEqual(first.context["js_context"], second.context["js_context"])
+        self.assertContains(second, "Terms of Submission")
@@ -0,0 +1,338 @@
+import smtplib
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.core import mail
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from freezegun import freeze_time
+
+from recordtransfer.emails import (
+    _send_mail,
+    _send_mail_by_language_groups,
+    send_queued_emails,
+    send_user_activation_email,
+)
+from recordtransfer.models import OutgoingEmail, User
+
+
+def _create_email(**kwargs) -> OutgoingEmail:
+    """Create a pending email in the outbox."""
+    defaults = {
+        "subject": "Subject",
+        "from_email": "do-not-reply@example.com",
+        "recipients": ["user@example.com"],
+        "body_text": "Hello",
+        "body_html": "<p>Hello</p>",
+    }
+    defaults.update(kwargs)
+    return OutgoingEmail.objects.create(**defaults)
+
+
+class TestQueueMail(TestCase):
+    """Tests that emails are rendered into the outbox instead of being sent right away."""
+
+    @patch("recordtransfer.emails.send_queued_emails.delay")
+    @patch("recordtransfer.emails.render_to_string", return_value="<p>Hello there</p>")
+    def test_send_mail_queues_email(self, mock_render: MagicMock, mock_delay: MagicMock) -> None:
+        """Test that an email is added to the outbox, and the worker is woken up on commit."""
+        with self.captureOnCommitCallbacks(execute=True):
+            _send_mail(
+                recipient="user@example.com",
+                from_email="do-not-reply@example.com",
+                subject="Subject",
+                template_name="recordtransfer/email/activate_account.html",
+                context={},
+            )
+
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.status, OutgoingEmail.EmailStatus.PENDING)
+        self.assertEqual(email.recipients, ["user@example.com"])
+        self.assertEqual(email.body_html, "<p>Hello there</p>")
+        self.assertEqual(email.body_text, "Hello there")
+        mock_delay.assert_called_once_with()
+
+    @patch("recordtransfer.emails.send_queued_emails.delay")
+    @patch("recordtransfer.emails.render_to_string", return_value="<p>Hello</p>")
+    def test_send_mail_by_language_groups_queues_one_email_per_language(
+        self, mock_render: MagicMock, mock_delay: MagicMock
+    ) -> None:
+        """Test that one email is queued for each non-empty language group."""
+        _send_mail_by_language_groups(
+            recipients={
+                "en": ["a@example.com", "b@example.com"],
+                "fr": ["c@example.com"],
+                "hr": [],
+            },
+            from_email="do-not-reply@example.com",
+            subject="Subject",
+            template_name="recordtransfer/email/submission_success.html",
+            context={},
+        )
+
+        recipients = sorted(OutgoingEmail.objects.values_list("recipients", flat=True))
+        self.assertEqual(recipients, [["a@example.com", "b@example.com"], ["c@example.com"]])
+
+    @patch("recordtransfer.emails.send_queued_emails.delay", side_effect=ConnectionError)
+    @patch("recordtransfer.emails.render_to_string", return_value="<p>Hello</p>")
+    def test_email_stays_queued_when_worker_unavailable(
+        self, mock_render: MagicMock, mock_delay: MagicMock
+    ) -> None:
+        """Test that the email is kept in the outbox if the send job can't be enqueued."""
+        with self.captureOnCommitCallbacks(execute=True):
+            _send_mail(
+                recipient="user@example.com",
+                from_email="do-not-reply@example.com",
+                subject="Subject",
+                template_name="recordtransfer/email/activate_account.html",
+                context={},
+            )
+
+        self.assertEqual(OutgoingEmail.objects.get().status, OutgoingEmail.EmailStatus.PENDING)
+
+    @patch("recordtransfer.emails.send_queued_emails.delay")
+    @patch("recordtransfer.emails.render_to_string", return_value="<p>Hello</p>")
+    def test_email_discarded_when_transaction_rolls_back(
+        self, mock_render: MagicMock, mock_delay: MagicMock
+    ) -> None:
+        """Test that an email is written in the triggering transaction, so it is not sent if the
+        transaction is rolled back.
+        """
+        user = User.objects.create_user(username="testuser", email="user@example.com")
+
+        with (
+            self.captureOnCommitCallbacks(execute=True),
+            self.assertRaises(RuntimeError),
+            transaction.atomic(),
+        ):
+            send_user_activation_email(user)
+            self.assertEqual(OutgoingEmail.objects.count(), 1)
+            raise RuntimeError
+
+        self.assertFalse(OutgoingEmail.objects.exists())
+        mock_delay.assert_not_called()
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    EMAIL_OUTBOX_MAX_PER_MINUTE=-1,
+    EMAIL_OUTBOX_MAX_ATTEMPTS=3,
+    EMAIL_OUTBOX_RETRY_BACKOFF_SECONDS=60,
+)
+class TestSendQueuedEmails(TestCase):
+    """Tests for the send_queued_emails job."""
+
+    def test_sends_due_emails(self) -> None:
+        """Test that all due emails are sent and marked as sent."""
+        email_1 = _create_email(subject="First")
+        email_2 = _create_email(subject="Second")
+
+        send_queued_emails()
+
+        self.assertEqual([m.subject for m in mail.outbox], ["First", "Second"])
+        self.assertEqual(mail.outbox[0].alternatives[0][0], "<p>Hello</p>")
+        for email in (email_1, email_2):
+            email.refresh_from_db()
+            self.assertEqual(email.status, OutgoingEmail.EmailStatus.SENT)
+            self.assertIsNotNone(email.sent_at)
+            self.assertEqual(email.body_text, "")
+            self.assertEqual(email.body_html, "")
+
+    def test_skips_emails_not_yet_due(self) -> None:
+        """Test that emails waiting on a retry backoff are not sent."""
+        _create_email(next_attempt_at=timezone.now() + timedelta(minutes=5))
+
+        send_queued_emails()
+
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_does_not_resend_sent_emails(self) -> None:
+        """Test that emails that were already sent are not sent again."""
+        _create_email()
+
+        send_queued_emails()
+        send_queued_emails()
+
+        self.assertEqual(len(mail.outbox), 1)
+
+    @freeze_time(datetime(2025, 1, 1, 9, 0, 0, tzinfo=ZoneInfo(settings.TIME_ZONE)))
+    @patch("recordtransfer.emails.get_connection")
+    def test_rejected_email_is_retried_with_backoff(self, mock_get_connection: MagicMock) -> None:
+        """Test that a rejected email is scheduled to be retried later, and that other emails
+        are still sent.
+        """
+        connection = mock_get_connection.return_value
+        connection.send_messages.side_effect = [
+            smtplib.SMTPRecipientsRefused({"bad@example.com": (550, b"No such user")}),
+            1,
+        ]
+        rejected = _create_email(recipients=["bad@example.com"])
+        accepted = _create_email()
+
+        send_queued_emails()
+
+        rejected.refresh_from_db()
+        accepted.refresh_from_db()
+        self.assertEqual(rejected.status, OutgoingEmail.EmailStatus.PENDING)
+        self.assertEqual(rejected.attempts, 1)
+        self.assertIn("SMTPRecipientsRefused", rejected.last_error)
+        self.assertEqual(rejected.next_attempt_at, timezone.now() + timedelta(seconds=60))
+        self.assertEqual(accepted.status, OutgoingEmail.EmailStatus.SENT)
+        connection.close.assert_called_once()
+
+    @patch("recordtransfer.emails.get_connection")
+    def test_connection_error_stops_drain(self, mock_get_connection: MagicMock) -> None:
+        """Test that the remaining emails are left in the outbox when the server goes away."""
+        connection = mock_get_connection.return_value
+        connection.send_messages.side_effect = smtplib.SMTPServerDisconnected("Gone")
+        first = _create_email()
+        second = _create_email()
+
+        send_queued_emails()
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.attempts, 1)
+        self.assertEqual(second.attempts, 0)
+        self.assertEqual(connection.send_messages.call_count, 1)
+        self.assertIn(second, OutgoingEmail.objects.get_due())
+
+    @override_settings(EMAIL_OUTBOX_MAX_PER_MINUTE=30)
+    @patch("recordtransfer.emails._enqueue_outbox_drain")
+    @patch("recordtransfer.emails.time.sleep")
+    @patch("recordtransfer.emails.get_current_job")
+    def test_stops_before_job_timeout(
+        self, mock_get_current_job: MagicMock, mock_sleep: MagicMock, mock_enqueue: MagicMock
+    ) -> None:
+        """Test that the drain hands the remaining emails to a new job before it times out."""
+        mock_get_current_job.return_value.timeout = 31
+        first = _create_email()
+        second = _create_email()
+
+        send_queued_emails()
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(first.status, OutgoingEmail.EmailStatus.SENT)
+        self.assertEqual(second.attempts, 0)
+        self.assertIn(second, OutgoingEmail.objects.get_due())
+        mock_sleep.assert_not_called()
+        mock_enqueue.assert_called_once_with()
+
+    @patch("recordtransfer.emails.get_connection")
+    def test_sent_email_marked_before_next_send(self, mock_get_connection: MagicMock) -> None:
+        """Test that an email is recorded as sent before the next email in the batch is sent."""
+        _create_email()
+        _create_email()
+        statuses = []
+
+        def send_messages(messages: list) -> int:
+            statuses.append(
+                list(OutgoingEmail.objects.order_by("pk").values_list("status", flat=True))
+            )
+            return 1
+
+        mock_get_connection.return_value.send_messages.side_effect = send_messages
+
+        send_queued_emails()
+
+        self.assertEqual(
+            statuses,
+            [
+                [OutgoingEmail.EmailStatus.PENDING, OutgoingEmail.EmailStatus.PENDING],
+                [OutgoingEmail.EmailStatus.SENT, OutgoingEmail.EmailStatus.PENDING],
+            ],
+        )
+
+    @patch("recordtransfer.emails.get_connection")
+    def test_email_fails_after_max_attempts(self, mock_get_connection: MagicMock) -> None:
+        """Test that an email is marked as failed once it has run out of attempts."""
+        connection = mock_get_connection.return_value
+        connection.send_messages.side_effect = smtplib.SMTPDataError(554, b"Rejected")
+        email = _create_email(attempts=2)
+
+        send_queued_emails()
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutgoingEmail.EmailStatus.FAILED)
+        self.assertEqual(email.attempts, 3)
+
+    @patch("recordtransfer.emails.get_connection")
+    def test_unreachable_server_leaves_emails_untouched(
+        self, mock_get_connection: MagicMock
+    ) -> None:
+        """Test that no attempt is recorded when the email server can't be reached."""
+        mock_get_connection.return_value.open.side_effect = ConnectionRefusedError
+        email = _create_email()
+
+        send_queued_emails()
+
+        email.refresh_from_db()
+        self.assertEqual(email.attempts, 0)
+        self.assertEqual(email.status, OutgoingEmail.EmailStatus.PENDING)
+
+    @override_settings(EMAIL_OUTBOX_MAX_PER_MINUTE=30)
+    @patch("recordtransfer.emails.time.sleep")
+    def test_rate_limit(self, mock_sleep: MagicMock) -> None:
+        """Test that sending is paced to stay within the per-minute limit."""
+        for _ in range(3):
+            _create_email()
+
+        send_queued_emails()
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+        for sleep_call in mock_sleep.call_args_list:
+            self.assertLessEqual(sleep_call.args[0], 2.0)
+            self.assertGreater(sleep_call.args[0], 1.5)
+
+    @override_settings(EMAIL_OUTBOX_BATCH_SIZE=2)
+    def test_sends_all_batches(self) -> None:
+        """Test that every batch is drained in a single run."""
+        for _ in range(5):
+            _create_email()
+
+        send_queued_emails()
+
+        self.assertEqual(len(mail.outbox), 5)
+
+
+class TestClaimDue(TestCase):
+    """Tests for claiming due emails from the outbox."""
+
+    def test_claimed_emails_not_due(self) -> None:
+        """Test that claimed emails are not claimed again until their lease runs out."""
+        email = _create_email()
+
+        claimed = OutgoingEmail.objects.claim_due(10, timedelta(minutes=5))
+
+        self.assertEqual(claimed, [email])
+        self.assertEqual(OutgoingEmail.objects.claim_due(10, timedelta(minutes=5)), [])
+        with freeze_time(timezone.now() + timedelta(minutes=6)):
+            self.assertEqual(OutgoingEmail.objects.claim_due(10, timedelta(minutes=5)), [email])
+
+    def test_limit(self) -> None:
+        """Test that no more than the limit are claimed at once."""
+        for _ in range(3):
+            _create_email()
+
+        self.assertEqual(len(OutgoingEmail.objects.claim_due(2, timedelta(minutes=5))), 2)
+        self.assertEqual(len(OutgoingEmail.objects.claim_due(2, timedelta(minutes=5))), 1)
+
+
+class TestOutgoingEmailRetry(TestCase):
+    """Tests for re-queueing failed emails."""
+
+    def test_retry(self) -> None:
+        """Test that a failed email is put back in the outbox."""
+        email = _create_email(status=OutgoingEmail.EmailStatus.FAILED, attempts=5)
+
+        email.retry()
+
+        self.assertEqual(list(OutgoingEmail.objects.get_due()), [email])
+        self.assertEqual(OutgoingEmail.objects.get().attempts, 0)
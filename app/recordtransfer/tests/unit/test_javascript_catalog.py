@@ -0,0 +1,50 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import translation
+
+from recordtransfer.javascript_catalog import get_catalog_version
+
+
+class TestVersionedJavaScriptCatalog(TestCase):
+    """Tests for the versioned JavaScript translation catalog."""
+
+    def _url(self, language: str, version: str = "") -> str:
+        return reverse(
+            "javascript-catalog",
+            kwargs={"version": version or get_catalog_version(), "language": language},
+        )
+
+    def test_catalog_cached_forever(self) -> None:
+        """Test that the catalog can be kept by browsers forever."""
+        response = self.client.get(self._url("en"))
+        self.assertEqual(response.status_code, 200)
+        cache_control = response["Cache-Control"]
+        self.assertIn("public", cache_control)
+        self.assertIn("max-age=31536000", cache_control)
+        self.assertIn("immutable", cache_control)
+
+    def test_catalog_in_url_language(self) -> None:
+        """Test that the catalog is in the language of the URL, not the active language."""
+        french = self.client.get(self._url("fr"), headers={"accept-language": "en"})
+        with translation.override("fr"):
+            expected = self.client.get(self._url("fr"))
+        english = self.client.get(self._url("en"), headers={"accept-language": "fr"})
+        self.assertEqual(french.content, expected.content)
+        self.assertNotEqual(french.content, english.content)
+
+    def test_old_version_redirected(self) -> None:
+        """Test that a catalog for an old version is redirected to the current version."""
+        response = self.client.get(self._url("fr", version="1.0"))
+        self.assertRedirects(response, self._url("fr"), fetch_redirect_response=False)
+
+    def test_unsupported_language(self) -> None:
+        """Test that there is no catalog for languages that are not supported."""
+        response = self.client.get(self._url("xx"))
+        self.assertEqual(response.status_code, 404)
+
+    def test_pages_use_versioned_url(self) -> None:
+        """Test that pages load the catalog of their language from the versioned URL."""
+        response = self.client.get(
+            reverse("recordtransfer:index"), headers={"accept-language": "fr"}
+        )
+        self.assertContains(response, f'<script src="{self._url("fr")}"></script>', html=True)
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 from unittest.mock import MagicMock, call, patch
 from zoneinfo import ZoneInfo
@@ -9,12 +9,14 @@ from django.test import TestCase, override_settings
 from freezegun import freeze_time
 
 from recordtransfer.jobs import (
+    MAX_STORAGE_BUDGET_RETRIES,
     check_expiring_in_progress_submissions,
     cleanup_expired_sessions,
     create_downloadable_bag,
     move_uploads_and_send_emails,
 )
 from recordtransfer.models import InProgressSubmission, Job, Submission, UploadSession, User
+from recordtransfer.payloads import ModelRef
 
 
 class TestCreateDownloadableBag(TestCase):
@@ -263,6 +265,103 @@ class TestCreateDownloadableBag(TestCase):
         # Verify job failure
         self.assertEqual(self.mock_job.job_status, Job.JobStatus.FAILED)
 
+    @override_settings(STORAGE_BUDGET_RETRY_SECONDS=120)
+    @patch("recordtransfer.jobs.django_rq.get_scheduler")
+    @patch("recordtransfer.jobs.get_temp_storage_budget")
+    @patch("recordtransfer.jobs.Job")
+    def test_bag_creation_deferred_when_storage_full(
+        self,
+        mock_job_class: MagicMock,
+        mock_get_budget: MagicMock,
+        mock_get_scheduler: MagicMock,
+    ) -> None:
+        """Test that the job is run again later when there is no space for the bag."""
+        mock_job_class.JobStatus = Job.JobStatus
+        mock_job_class.return_value = self.mock_job
+        mock_get_budget.return_value.reserve.return_value = None
+        mock_get_budget.return_value.get_usage.return_value.capacity = 10000
+        self.mock_submission.upload_session.upload_size = 1000
+
+        with (
+            patch("recordtransfer.jobs.JobLogHandler"),
+            patch("recordtransfer.jobs.LOGGER"),
+            patch("recordtransfer.jobs.zip_directory") as mock_zip_directory,
+        ):
+            create_downloadable_bag(self.mock_submission, self.mock_user)
+
+        mock_get_budget.return_value.reserve.assert_called_once_with(2000)
+        self.mock_submission.make_bag.assert_not_called()
+        mock_zip_directory.assert_not_called()
+        self.assertEqual(self.mock_job.job_status, Job.JobStatus.NOT_STARTED)
+        # The retry is enqueued with references to the rows instead of the rows themselves
+        mock_get_scheduler.return_value.enqueue_in.assert_called_once_with(
+            timedelta(seconds=120),
+            create_downloadable_bag,
+            ModelRef.of(self.mock_submission),
+            ModelRef.of(self.mock_user),
+            ModelRef.of(self.mock_job),
+            1,
+        )
+
+    @patch("recordtransfer.jobs.django_rq.get_scheduler")
+    @patch("recordtransfer.jobs.get_temp_storage_budget")
+    @patch("recordtransfer.jobs.Job")
+    def test_bag_creation_fails_when_bag_can_never_fit(
+        self,
+        mock_job_class: MagicMock,
+        mock_get_budget: MagicMock,
+        mock_get_scheduler: MagicMock,
+    ) -> None:
+        """Test that the job fails right away when the bag is bigger than the volume allows."""
+        mock_job_class.JobStatus = Job.JobStatus
+        mock_job_class.return_value = self.mock_job
+        mock_get_budget.return_value.reserve.return_value = None
+        mock_get_budget.return_value.get_usage.return_value.capacity = 1500
+        self.mock_submission.upload_session.upload_size = 1000
+
+        with (
+            patch("recordtransfer.jobs.JobLogHandler"),
+            patch("recordtransfer.jobs.LOGGER") as mock_logger,
+        ):
+            create_downloadable_bag(self.mock_submission, self.mock_user)
+
+        self.mock_submission.make_bag.assert_not_called()
+        self.assertEqual(self.mock_job.job_status, Job.JobStatus.FAILED)
+        mock_logger.error.assert_called_once()
+        mock_get_scheduler.return_value.enqueue_in.assert_not_called()
+
+    @patch("recordtransfer.jobs.django_rq.get_scheduler")
+    @patch("recordtransfer.jobs.get_temp_storage_budget")
+    @patch("recordtransfer.jobs.Job")
+    def test_bag_creation_fails_after_max_retries(
+        self,
+        mock_job_class: MagicMock,
+        mock_get_budget: MagicMock,
+        mock_get_scheduler: MagicMock,
+    ) -> None:
+        """Test that the job fails once it has waited for space too many times."""
+        mock_job_class.JobStatus = Job.JobStatus
+        mock_job_class.return_value = self.mock_job
+        mock_get_budget.return_value.reserve.return_value = None
+        mock_get_budget.return_value.get_usage.return_value.capacity = 10000
+        self.mock_submission.upload_session.upload_size = 1000
+
+        with (
+            patch("recordtransfer.jobs.JobLogHandler"),
+            patch("recordtransfer.jobs.LOGGER") as mock_logger,
+        ):
+            create_downloadable_bag(
+                self.mock_submission,
+                self.mock_user,
+                self.mock_job,
+                MAX_STORAGE_BUDGET_RETRIES,
+            )
+
+        self.mock_submission.make_bag.assert_not_called()
+        self.assertEqual(self.mock_job.job_status, Job.JobStatus.FAILED)
+        mock_logger.error.assert_called_once()
+        mock_get_scheduler.return_value.enqueue_in.assert_not_called()
+
 
 class TestMoveUploadsAndSendEmailsJob(TestCase):
     """Tests for the move_uploads_and_send_emails job."""
@@ -292,7 +391,6 @@ class TestMoveUploadsAndSendEmailsJob(TestCase):
         self.upload_session.add_temp_file(SimpleUploadedFile("image.jpg", bytearray([1] * 1024)))
 
         temp_dir = Path(settings.TEMP_STORAGE_FOLDER) / self.upload_session.token
-        perm_dir = Path(settings.UPLOAD_STORAGE_FOLDER) / self.upload_session.token
 
         # Temp dir should have one file
         self.assertEqual(1, sum(1 if item.is_file() else 0 for item in temp_dir.iterdir()))
@@ -300,8 +398,9 @@ class TestMoveUploadsAndSendEmailsJob(TestCase):
         move_uploads_and_send_emails(self.submission, {})
 
         self.assertFalse(temp_dir.exists())
-        self.assertTrue(perm_dir.exists())
-        self.assertEqual(1, sum(1 if item.is_file() else 0 for item in perm_dir.iterdir()))
+        perm_file = self.upload_session.permuploadedfile_set.get()
+        self.assertTrue(perm_file.exists)
+        self.assertEqual(perm_file.blob.reference_count, 1)
         self.assertEqual(UploadSession.SessionStatus.STORED, self.upload_session.status)
         mock_creation_success.assert_called_once()
         mock_submit_success.assert_called_once()
@@ -324,7 +423,6 @@ class TestMoveUploadsAndSendEmailsJob(TestCase):
             )
 
         temp_dir = Path(settings.TEMP_STORAGE_FOLDER) / self.upload_session.token
-        perm_dir = Path(settings.UPLOAD_STORAGE_FOLDER) / self.upload_session.token
 
         # Temp dir should have ten files
         self.assertEqual(10, sum(1 if item.is_file() else 0 for item in temp_dir.iterdir()))
@@ -332,8 +430,12 @@ class TestMoveUploadsAndSendEmailsJob(TestCase):
         move_uploads_and_send_emails(self.submission, {})
 
         self.assertFalse(temp_dir.exists())
-        self.assertTrue(perm_dir.exists())
-        self.assertEqual(10, sum(1 if item.is_file() else 0 for item in perm_dir.iterdir()))
+        perm_files = self.upload_session.permuploadedfile_set.all()
+        self.assertEqual(10, len(perm_files))
+        self.assertTrue(all(f.exists for f in perm_files))
+        # The files all have the same contents, so they are stored once
+        self.assertEqual({f.blob_id for f in perm_files}, {perm_files[0].blob_id})
+        self.assertEqual(perm_files[0].blob.reference_count, 10)
         self.assertEqual(UploadSession.SessionStatus.STORED, self.upload_session.status)
         mock_creation_success.assert_called_once()
         mock_submit_success.assert_called_once()
@@ -450,7 +552,7 @@ class TestCheckExpiringInProgressSubmissions(TestCase):
 
         check_expiring_in_progress_submissions()
 
-        mock_send_email.delay.assert_not_called()
+        mock_send_email.assert_not_called()
 
     @patch("recordtransfer.jobs.send_user_in_progress_submission_expiring")
     @patch("recordtransfer.models.InProgressSubmission.objects.get_expiring_without_reminder")
@@ -466,7 +568,7 @@ class TestCheckExpiringInProgressSubmissions(TestCase):
 
         check_expiring_in_progress_submissions()
 
-        mock_send_email.delay.assert_called_once_with(mock_in_progress)
+        mock_send_email.assert_called_once_with(mock_in_progress)
         mock_in_progress.save.assert_called_once()
         self.assertTrue(mock_in_progress.reminder_email_sent)
 
@@ -498,7 +600,7 @@ class TestCheckExpiringInProgressSubmissions(TestCase):
         self.assertTrue(in_progress.reminder_email_sent)
         # Verify the expiry time was NOT changed
         self.assertEqual(original_expiry, upload_session.expires_at)
-        mock_send_email.delay.assert_called_once_with(in_progress)
+        mock_send_email.assert_called_once_with(in_progress)
 
 
 class TestCleanupExpiredSessions(TestCase):
@@ -0,0 +1,130 @@
+from unittest.mock import MagicMock, patch
+
+from caais.models import RightsType
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.views.generic import TemplateView
+
+from recordtransfer.middleware import CSRF_TOKEN_PLACEHOLDER
+from recordtransfer.models import User
+from recordtransfer.views.home import Index
+
+PAGE_CACHE_SETTINGS = {
+    "CACHES": {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "test-page-cache",
+        }
+    },
+    "MIDDLEWARE": [*settings.MIDDLEWARE, "recordtransfer.middleware.PageCacheMiddleware"],
+    "CACHE_MIDDLEWARE_SECONDS": 60,
+}
+
+
+@override_settings(**PAGE_CACHE_SETTINGS)
+class TestPageCacheMiddleware(TestCase):
+    """Tests for the PageCacheMiddleware."""
+
+    def setUp(self) -> None:
+        """Count how many times the home page is rendered."""
+        self.url = reverse("recordtransfer:index")
+        patcher = patch.object(
+            Index, "get_context_data", autospec=True, side_effect=TemplateView.get_context_data
+        )
+        self.render = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(cache.clear)
+
+    def test_anonymous_page_cached(self) -> None:
+        """Test that anonymous visitors share the same cached page, even with cookies."""
+        first = self.client.get(self.url)
+        self.client.cookies["csrftoken"] = "a" * 32
+        second = self.client.get(self.url)
+
+        self.assertEqual(self.render.call_count, 1)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 200)
+        self.assertNotContains(second, CSRF_TOKEN_PLACEHOLDER)
+
+    def test_csrf_token_per_request(self) -> None:
+        """Test that a cached page has a CSRF token that works for the request it is served to."""
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+
+        self.assertNotContains(response, CSRF_TOKEN_PLACEHOLDER)
+        self.assertIn("csrftoken", response.cookies)
+
+    def test_cached_per_language(self) -> None:
+        """Test that each language has its own cached page."""
+        self.client.get(self.url, headers={"accept-language": "en"})
+        self.client.get(self.url, headers={"accept-language": "fr"})
+        self.client.get(self.url, headers={"accept-language": "fr"})
+        self.assertEqual(self.render.call_count, 2)
+
+    def test_cached_per_user(self) -> None:
+        """Test that signed in users do not share pages with anonymous users or each other."""
+        self.client.get(self.url)
+        for username in ("first", "second"):
+            user = User.objects.create_user(username=username, password="zCNAD5&@Uy")
+            self.client.force_login(user)
+            self.client.get(self.url)
+            self.client.get(self.url)
+        self.assertEqual(self.render.call_count, 3)
+
+    def test_messages_bypass_cache(self) -> None:
+        """Test that a page is rendered again when there are messages waiting to be shown."""
+        self.client.get(self.url)
+        with patch("recordtransfer.middleware.messages.get_messages") as mock_get_messages:
+            mock_get_messages.return_value = ["Saved"]
+            self.client.get(self.url)
+        self.assertEqual(self.render.call_count, 2)
+
+    def test_htmx_requests_bypass_cache(self) -> None:
+        """Test that HTMX requests are never served from the cache."""
+        self.client.get(self.url)
+        self.client.get(self.url, headers={"hx-request": "true"})
+        self.assertEqual(self.render.call_count, 2)
+
+    def test_term_change_invalidates(self) -> None:
+        """Test that changing a term replaces the cached pages."""
+        self.client.get(self.url)
+        RightsType.objects.create(name="New Rights Type")
+        self.client.get(self.url)
+        self.assertEqual(self.render.call_count, 2)
+
+    @patch("recordtransfer.middleware.cache")
+    def test_never_cache_pages_not_cached(self, mock_cache: MagicMock) -> None:
+        """Test that pages marked with never_cache are not cached."""
+        mock_cache.get.return_value = None
+        user = User.objects.create_user(username="user", password="zCNAD5&@Uy")
+        self.client.force_login(user)
+
+        response = self.client.get(reverse("recordtransfer:user_profile"))
+
+        self.assertEqual(response.status_code, 200)
+        mock_cache.set.assert_not_called()
+
+
+class TestRequestProfilerMiddleware(TestCase):
+    """Tests for the RequestProfilerMiddleware."""
+
+    @override_settings(REQUEST_PROFILER_ENABLED=True)
+    def test_profile_added(self) -> None:
+        """Test that the profile of a request is logged and added to the response."""
+        with patch("recordtransfer.middleware.LOGGER") as mock_logger:
+            response = self.client.get(reverse("recordtransfer:index"))
+
+        self.assertRegex(
+            response["Server-Timing"],
+            r'^db;desc="\d+ queries";dur=[\d.]+, cache;desc="\d+ hits, \d+ misses", '
+            r"total;dur=[\d.]+$",
+        )
+        args = mock_logger.info.call_args.args
+        self.assertEqual(args[1:4], ("GET", "/", "recordtransfer:index"))
+
+    def test_disabled(self) -> None:
+        """Test that requests are not profiled by default."""
+        response = self.client.get(reverse("recordtransfer:index"))
+        self.assertNotIn("Server-Timing", response)
@@ -9,6 +9,7 @@ from caais.models import Metadata
 from django.conf import settings
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.forms import ValidationError
 from django.test import TestCase, override_settings
 from django.urls import reverse
@@ -18,9 +19,11 @@ from upload.models import PermUploadedFile, TempUploadedFile, UploadSession
 from recordtransfer.enums import SiteSettingType, SubmissionStep
 from recordtransfer.models import (
     InProgressSubmission,
+    InProgressSubmissionStep,
     Job,
     SiteSetting,
     Submission,
+    SubmissionGroup,
     User,
 )
 
@@ -447,6 +450,62 @@ class TestInProgressSubmission(TestCase):
         )
         self.assertEqual(self.in_progress.get_delete_url(), expected_url)
 
+    def test_save_step_data(self) -> None:
+        """Test that the data of each completed step is saved in its own row."""
+        step_data = {
+            SubmissionStep.ACCEPT_LEGAL.value: {"acceptlegal-agreement_accepted": ["on"]},
+            SubmissionStep.CONTACT_INFO.value: {"contactinfo-contact_name": ["Jane"]},
+        }
+        self.assertEqual(self.in_progress.save_step_data(step_data), 2)
+        self.assertEqual(self.in_progress.get_step_data(), step_data)
+
+    def test_save_step_data_writes_changed_steps(self) -> None:
+        """Test that only the steps that changed are written."""
+        step_data = {
+            step.value: {f"{step.value}-field": ["value"] * 100}
+            for step in list(SubmissionStep)[:6]
+        }
+        self.in_progress.save_step_data(step_data)
+
+        step_data[SubmissionStep.RIGHTS.value] = {"rights-field": ["changed"]}
+        # One query to read the saved digests, and one to write the changed step
+        with self.assertNumQueries(2):
+            self.assertEqual(self.in_progress.save_step_data(step_data), 1)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.in_progress.save_step_data(step_data), 0)
+
+        self.assertEqual(self.in_progress.get_step_data(), step_data)
+
+    def test_save_step_data_without_upsert_target(self) -> None:
+        """Test that the unique fields are not given to backends like MySQL that can't upsert on
+        a given constraint, since Django refuses to upsert on them if they are.
+        """
+        step_data = {SubmissionStep.ACCEPT_LEGAL.value: {"a": ["1"]}}
+        with (
+            patch.object(connection.features, "supports_update_conflicts_with_target", False),
+            patch.object(InProgressSubmissionStep.objects, "bulk_create") as mock_bulk_create,
+        ):
+            self.in_progress.save_step_data(step_data)
+
+        kwargs = mock_bulk_create.call_args.kwargs
+        self.assertTrue(kwargs["update_conflicts"])
+        self.assertIsNone(kwargs["unique_fields"])
+        self.assertEqual(kwargs["update_fields"], ["data", "digest"])
+
+    def test_save_step_data_removes_steps(self) -> None:
+        """Test that steps that are no longer completed are removed."""
+        self.in_progress.save_step_data(
+            {
+                SubmissionStep.ACCEPT_LEGAL.value: {"a": ["1"]},
+                SubmissionStep.CONTACT_INFO.value: {"b": ["2"]},
+            }
+        )
+        self.in_progress.save_step_data({SubmissionStep.ACCEPT_LEGAL.value: {"a": ["1"]}})
+        self.assertEqual(
+            self.in_progress.get_step_data(), {SubmissionStep.ACCEPT_LEGAL.value: {"a": ["1"]}}
+        )
+
     def test_reset_reminder_email_sent_flag_true(self) -> None:
         """Test reset_reminder_email_sent method when the flag is True."""
         self.in_progress.reminder_email_sent = True
@@ -898,3 +957,49 @@ class TestJob(TestCase):
         """Test the string representation of the Job model."""
         expected_str = f"{self.job.name} (Created by {self.job.user_triggered})"
         self.assertEqual(str(self.job), expected_str)
+
+
+class TestQueryPlans(TestCase):
+    """Test that the profile tables and expiry reminders are served by an index."""
+
+    def setUp(self) -> None:
+        """Skip on databases whose query plans are not checked."""
+        if connection.vendor not in ("sqlite", "mysql"):
+            self.skipTest(f"Query plans are not checked on {connection.vendor}")
+        self.user = User.objects.create_user(username="testuser", password="password")
+
+    def assertSortedByIndex(self, plan: str, index_name: str) -> None:
+        """Assert that the rows are found and sorted with the given index."""
+        self.assertIn(index_name, plan)
+        if connection.vendor == "sqlite":
+            self.assertNotIn("TEMP B-TREE", plan)
+        else:
+            self.assertNotIn("filesort", plan)
+
+    def test_in_progress_submission_table(self) -> None:
+        """Test that the in-progress submission table is sorted by the user and update index."""
+        queryset = InProgressSubmission.objects.filter(user=self.user).order_by("-last_updated")
+
+        self.assertSortedByIndex(queryset.explain(), "in_progress_user_updated_idx")
+
+    def test_submission_table(self) -> None:
+        """Test that the submission table is sorted by the user and submission date index."""
+        queryset = Submission.objects.filter(user=self.user).order_by("-submission_date")
+
+        self.assertSortedByIndex(queryset.explain(), "submission_user_date_idx")
+
+    def test_submission_group_table(self) -> None:
+        """Test that the submission group table is sorted by the user and name index."""
+        queryset = SubmissionGroup.objects.filter(created_by=self.user).order_by("name")
+
+        self.assertSortedByIndex(queryset.explain(), "submission_group_user_name_idx")
+
+    @override_settings(
+        UPLOAD_SESSION_EXPIRE_AFTER_INACTIVE_MINUTES=60,
+        UPLOAD_SESSION_EXPIRING_REMINDER_MINUTES=30,
+    )
+    def test_expiring_without_reminder(self) -> None:
+        """Test that finding submissions to remind starts from the upload session expiry index."""
+        plan = InProgressSubmission.objects.get_expiring_without_reminder().explain()
+
+        self.assertIn("upload_session_expiry_idx", plan)
@@ -0,0 +1,105 @@
+import pickle
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+from rq import Queue
+
+from recordtransfer.jobs import move_uploads_and_send_emails
+from recordtransfer.models import Submission, SubmissionGroup, UploadSession, User
+from recordtransfer.payloads import ModelRef, dump_value, load_value
+
+
+class TestJobPayloads(TestCase):
+    """Tests for the arguments passed to background jobs."""
+
+    def setUp(self) -> None:
+        """Create test data."""
+        self.user = User.objects.create(
+            username="testuser", email="testuser@example.com", password="svaE95EQW^"
+        )
+        self.upload_session = UploadSession.new_session(user=self.user)
+        self.submission = Submission.objects.create(
+            user=self.user, upload_session=self.upload_session
+        )
+        self.group = SubmissionGroup.objects.create(name="Group", created_by=self.user)
+        self.form_data = {
+            "submission_group": self.group,
+            "accession_title": "A" * 200,
+            "date_of_materials": date(2020, 1, 1),
+            "rights": [{"rights_type": self.group, "rights_value": "Public"}],
+        }
+
+    def test_dump_value(self) -> None:
+        """Test that model instances are replaced with references."""
+        args = dump_value((self.submission, self.form_data))
+        self.assertEqual(args[0], ModelRef("recordtransfer.Submission", self.submission.pk))
+        self.assertEqual(
+            args[1]["submission_group"], ModelRef("recordtransfer.SubmissionGroup", self.group.pk)
+        )
+        self.assertEqual(args[1]["date_of_materials"], date(2020, 1, 1))
+        self.assertEqual(
+            args[1]["rights"][0]["rights_type"],
+            ModelRef("recordtransfer.SubmissionGroup", self.group.pk),
+        )
+
+    def test_dump_queryset(self) -> None:
+        """Test that a queryset is replaced with a list of references."""
+        refs = dump_value(User.objects.filter(pk=self.user.pk))
+        self.assertEqual(refs, [ModelRef("recordtransfer.User", self.user.pk)])
+
+    def test_load_value(self) -> None:
+        """Test that references are loaded with one query per model, with related rows."""
+        args = dump_value((self.submission, self.form_data))
+
+        with self.assertNumQueries(2):
+            submission, form_data = load_value(args)
+            # The user and upload session are loaded with the submission
+            self.assertEqual(submission.user.email, "testuser@example.com")
+            self.assertEqual(submission.upload_session.token, self.upload_session.token)
+
+        self.assertEqual(submission, self.submission)
+        self.assertEqual(form_data["submission_group"], self.group)
+        self.assertEqual(form_data["rights"][0]["rights_type"], self.group)
+
+    def test_load_value_reflects_changes(self) -> None:
+        """Test that the worker sees the row as it is when the job runs."""
+        ref = dump_value(self.user)
+        User.objects.filter(pk=self.user.pk).update(first_name="Changed")
+        self.assertEqual(load_value(ref).first_name, "Changed")
+
+    def test_load_deleted_row(self) -> None:
+        """Test that loading a deleted row raises an error."""
+        ref = dump_value(self.group)
+        self.group.delete()
+        with self.assertRaises(SubmissionGroup.DoesNotExist):
+            load_value(ref)
+
+    @patch.object(Queue, "enqueue_call")
+    def test_enqueued_payload_size(self, mock_enqueue_call: MagicMock) -> None:
+        """Test that the payload of a job stays small no matter how much the rows hold."""
+        move_uploads_and_send_emails.delay(self.submission, self.form_data)
+
+        kwargs = mock_enqueue_call.call_args.kwargs
+        payload = pickle.dumps((kwargs["args"], kwargs["kwargs"]))
+        full_payload = pickle.dumps(((self.submission, self.form_data), {}))
+
+        self.assertLess(len(payload), 1024)
+        self.assertLess(len(payload), len(full_payload) // 2)
+        self.assertNotIn(b"testuser@example.com", payload)
+
+    @patch("recordtransfer.jobs.send_thank_you_for_your_submission")
+    @patch("recordtransfer.jobs.send_submission_creation_success")
+    def test_job_called_with_references(
+        self, mock_creation_success: MagicMock, mock_submit_success: MagicMock
+    ) -> None:
+        """Test that a job called with references gets the rows they refer to."""
+        self.submission.upload_session = None
+        self.submission.save()
+
+        move_uploads_and_send_emails(*dump_value((self.submission, self.form_data)))
+
+        mock_submit_success.assert_called_once()
+        submission = mock_submit_success.call_args.args[1]
+        self.assertIsInstance(submission, Submission)
+        self.assertEqual(submission.pk, self.submission.pk)
@@ -0,0 +1,65 @@
+import gzip
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.templatetags.static import static
+from django.test import SimpleTestCase, override_settings
+
+
+class TestCompressedManifestStaticFilesStorage(SimpleTestCase):
+    """Tests for the CompressedManifestStaticFilesStorage."""
+
+    def setUp(self) -> None:
+        """Make a folder of static files to collect, and a folder to collect them into."""
+        source_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(source_dir.cleanup)
+        static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(static_root.cleanup)
+
+        self.source = Path(source_dir.name)
+        self.static_root = Path(static_root.name)
+        (self.source / "css").mkdir()
+        (self.source / "css" / "site.css").write_text(
+            "body { background: url('../img/logo.svg'); }\n" * 50
+        )
+        (self.source / "img").mkdir()
+        (self.source / "img" / "logo.svg").write_text("<svg></svg>")
+        (self.source / "img" / "photo.webp").write_bytes(b"RIFF" + bytes(1024))
+
+        settings = override_settings(
+            STATIC_ROOT=str(self.static_root),
+            STATICFILES_DIRS=[str(self.source)],
+            STATICFILES_FINDERS=["django.contrib.staticfiles.finders.FileSystemFinder"],
+            STORAGES={
+                "staticfiles": {
+                    "BACKEND": "recordtransfer.storage.CompressedManifestStaticFilesStorage",
+                },
+            },
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        call_command("collectstatic", interactive=False, verbosity=0, stdout=StringIO())
+
+    def test_names_fingerprinted(self) -> None:
+        """Test that static files are referred to by hashed names."""
+        url = static("css/site.css")
+        self.assertRegex(url, r"^/static/css/site\.[0-9a-f]{12}\.css$")
+        hashed_css = self.static_root / staticfiles_storage.stored_name("css/site.css")
+        self.assertRegex(hashed_css.read_text(), r"logo\.[0-9a-f]{12}\.svg")
+
+    def test_compressed_copies_written(self) -> None:
+        """Test that gzip copies are written next to the original and hashed text files."""
+        hashed_name = staticfiles_storage.stored_name("css/site.css")
+        for name in ("css/site.css", hashed_name):
+            path = self.static_root / name
+            compressed = Path(f"{path}.gz")
+            self.assertTrue(compressed.exists(), name)
+            self.assertEqual(gzip.decompress(compressed.read_bytes()), path.read_bytes())
+
+    def test_small_and_binary_files_not_compressed(self) -> None:
+        """Test that files too small to benefit, and already compressed formats, are skipped."""
+        self.assertFalse((self.static_root / "img" / "logo.svg.gz").exists())
+        self.assertFalse((self.static_root / "img" / "photo.webp.gz").exists())
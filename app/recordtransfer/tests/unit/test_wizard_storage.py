@@ -0,0 +1,111 @@
+from unittest.mock import patch
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from utility.tests.fake_redis import FakeRedis
+
+from recordtransfer.wizard_storage import RedisStorage, get_storage_timeout
+
+
+@override_settings(UPLOAD_SESSION_EXPIRE_AFTER_INACTIVE_MINUTES=60)
+class TestRedisStorage(TestCase):
+    """Tests for the RedisStorage wizard storage."""
+
+    def setUp(self) -> None:
+        """Use a fake Redis connection and a saved session."""
+        self.redis = FakeRedis()
+        patcher = patch(
+            "recordtransfer.wizard_storage.django_rq.get_connection", return_value=self.redis
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.request = RequestFactory().get("/")
+        self.request.session = SessionStore()
+        self.request.session.save()
+
+    def _storage(self) -> RedisStorage:
+        return RedisStorage("submission_form_wizard", self.request)
+
+    def _submit_step(self, step: str, data: dict) -> RedisStorage:
+        storage = self._storage()
+        storage.set_step_data(step, data)
+        storage.current_step = step
+        storage.update_response(HttpResponse())
+        return storage
+
+    def test_new_state(self) -> None:
+        """Test that the state starts empty when there is no hash."""
+        storage = self._storage()
+        self.assertIsNone(storage.current_step)
+        self.assertEqual(storage.extra_data, {})
+        self.assertIsNone(storage.get_step_data("contactinfo"))
+
+    def test_state_saved_per_step(self) -> None:
+        """Test that each step is saved to its own field and read back."""
+        self._submit_step("acceptlegal", {"agreement_accepted": ["on"]})
+        self._submit_step("contactinfo", {"contact_name": ["John Doe"]})
+
+        fields = self.redis.data[self._storage().key]
+        self.assertIn("step_data:acceptlegal", fields)
+        self.assertIn("step_data:contactinfo", fields)
+
+        storage = self._storage()
+        self.assertEqual(storage.current_step, "contactinfo")
+        self.assertEqual(storage.get_step_data("contactinfo")["contact_name"], "John Doe")
+        self.assertEqual(storage.get_step_data("acceptlegal")["agreement_accepted"], "on")
+
+    def test_step_costs_two_round_trips(self) -> None:
+        """Test that a step reads the hash once and writes only the changed fields."""
+        self._submit_step("acceptlegal", {"agreement_accepted": ["on"]})
+        self.redis.round_trips = 0
+        self.redis.commands = []
+
+        self._submit_step("contactinfo", {"contact_name": ["John Doe"]})
+
+        self.assertEqual(self.redis.round_trips, 2)
+        self.assertEqual(self.redis.commands, ["hgetall", "hset", "expire"])
+        fields = self.redis.data[self._storage().key]
+        self.assertEqual(fields["step"], '"contactinfo"')
+
+    def test_unchanged_state_renews_expiry(self) -> None:
+        """Test that the hash is not written if nothing changed, but its expiry is renewed."""
+        self._submit_step("acceptlegal", {"agreement_accepted": ["on"]})
+        self.redis.commands = []
+
+        storage = self._storage()
+        self.assertEqual(storage.current_step, "acceptlegal")
+        storage.update_response(HttpResponse())
+
+        self.assertEqual(self.redis.commands, ["hgetall", "expire"])
+        self.assertEqual(self.redis.ttls[storage.key], 3600)
+
+    def test_reset_removes_hash(self) -> None:
+        """Test that resetting the wizard removes its hash."""
+        self._submit_step("acceptlegal", {"agreement_accepted": ["on"]})
+
+        storage = self._storage()
+        storage.reset()
+        storage.update_response(HttpResponse())
+
+        self.assertNotIn(storage.key, self.redis.data)
+
+    def test_unused_storage_not_saved(self) -> None:
+        """Test that Redis is not used if the state was never read."""
+        self._storage().update_response(HttpResponse())
+        self.assertEqual(self.redis.round_trips, 0)
+
+    def test_session_saved_for_key(self) -> None:
+        """Test that a session without a key is saved so that the hash has a key."""
+        self.request.session = SessionStore()
+        key = self._storage().key
+        self.assertIsNotNone(self.request.session.session_key)
+        self.assertIn(self.request.session.session_key, key)
+
+    def test_storage_timeout(self) -> None:
+        """Test that the state expires with the upload sessions, or the session cookie."""
+        self.assertEqual(get_storage_timeout(), 3600)
+        with override_settings(
+            UPLOAD_SESSION_EXPIRE_AFTER_INACTIVE_MINUTES=-1, SESSION_COOKIE_AGE=1209600
+        ):
+            self.assertEqual(get_storage_timeout(), 1209600)
@@ -2,7 +2,7 @@
 
 import datetime
 import logging
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
@@ -15,6 +15,7 @@ from django.utils.http import urlsafe_base64_encode
 from freezegun import freeze_time
 
 from recordtransfer.forms import SignUpForm
+from recordtransfer.models import OutgoingEmail
 from recordtransfer.tokens import account_activation_token
 
 User = get_user_model()
@@ -32,7 +33,7 @@ class TestCreateAccount(TestCase):
     def setUp(self) -> None:
         """Set up test data."""
         # Mock the send_user_activation_email task
-        self.mock_email_patcher = patch("recordtransfer.emails.send_user_activation_email.delay")
+        self.mock_email_patcher = patch("recordtransfer.views.account.send_user_activation_email")
         self.mock_send_email = self.mock_email_patcher.start()
 
         self.addCleanup(self.mock_email_patcher.stop)
@@ -100,6 +101,18 @@ class TestCreateAccount(TestCase):
         # Check activation email was sent
         self.mock_send_email.assert_called_once_with(new_user)
 
+    @patch("recordtransfer.emails.send_queued_emails.delay")
+    def test_post_valid_form_adds_activation_email_to_outbox(self, mock_delay: MagicMock) -> None:
+        """Test that the activation email is added to the outbox by the request itself."""
+        self.mock_email_patcher.stop()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.create_account_url, data=self.valid_form_data)
+
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.recipients, ["testuser@example.com"])
+        mock_delay.assert_called_once_with()
+
     def test_post_invalid_form_displays_errors(self) -> None:
         """Test form submission with invalid data shows errors."""
         invalid_data = self.valid_form_data.copy()
@@ -0,0 +1,65 @@
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from recordtransfer.models import User
+
+
+@override_settings(METRICS_ENABLED=True, METRICS_ALLOWED_NETWORKS=["10.0.0.0/8"])
+@patch("recordtransfer.views.metrics.render_metrics", return_value="metric_total 1.0\n")
+class TestMetricsView(TestCase):
+    """Tests for the metrics view."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        """Create user accounts."""
+        cls.staff_user = User.objects.create_user(
+            username="staff", password="1X<ISRUkw+tuK", is_staff=True
+        )
+        cls.regular_user = User.objects.create_user(
+            username="regular", password="1X<ISRUkw+tuK", is_staff=False
+        )
+
+    def setUp(self) -> None:
+        """Set up test environment."""
+        self.url = reverse("metrics")
+
+    def test_staff_user(self, render_metrics: MagicMock) -> None:
+        """Test that staff users can view the metrics."""
+        self.client.force_login(self.staff_user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"metric_total 1.0\n")
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+
+    def test_regular_user(self, render_metrics: MagicMock) -> None:
+        """Test that users who aren't staff can't view the metrics."""
+        self.client.force_login(self.regular_user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+        render_metrics.assert_not_called()
+
+    def test_allowed_network(self, render_metrics: MagicMock) -> None:
+        """Test that a scraper in an allowed network can get the metrics without logging in."""
+        response = self.client.get(self.url, REMOTE_ADDR="10.1.2.3")
+        self.assertEqual(response.status_code, 200)
+
+    def test_other_network(self, render_metrics: MagicMock) -> None:
+        """Test that anonymous requests from other networks are denied."""
+        response = self.client.get(self.url, REMOTE_ADDR="192.168.1.5")
+        self.assertEqual(response.status_code, 403)
+
+    def test_forwarded_request(self, render_metrics: MagicMock) -> None:
+        """Test that the network of a request forwarded by a proxy is not trusted."""
+        response = self.client.get(
+            self.url, REMOTE_ADDR="10.1.2.3", HTTP_X_FORWARDED_FOR="10.1.2.3"
+        )
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled(self, render_metrics: MagicMock) -> None:
+        """Test that the metrics are not found when they are disabled."""
+        self.client.force_login(self.staff_user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
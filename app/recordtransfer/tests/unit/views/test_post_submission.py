@@ -1,5 +1,7 @@
 from unittest.mock import MagicMock, patch
 
+import pytest
+from caais.models import Metadata
 from django.http import HttpResponse
 from django.test import TestCase
 from django.urls import reverse
@@ -202,6 +204,15 @@ class TestSubmissionCsvExport(TestCase):
         self.assertIn("filename_prefix", call_args.kwargs)
         self.assertTrue(call_args.kwargs["filename_prefix"].startswith("testuser_export-"))
 
+    @pytest.mark.query_budget(25)
+    def test_csv_export(self) -> None:
+        """Test that the CSV for a submission is exported."""
+        self.submission.metadata = Metadata.objects.create(accession_title="Test Title")
+        self.submission.save()
+        response = self.client.get(self.submission_csv_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Test Title", response.content.decode())
+
     def test_nonexistent_submission(self) -> None:
         """Test that accessing a nonexistent submission returns 404."""
         invalid_csv_url = reverse(
@@ -253,6 +264,22 @@ class TestSubmissionGroupBulkCsvExport(TestCase):
         self.assertEqual(response.status_code, 200)
         mock_export.assert_called_once()
 
+    @pytest.mark.query_budget(63)
+    def test_csv_export(self) -> None:
+        """Test that the CSV for every submission in the group is exported."""
+        self.submission.metadata = Metadata.objects.create(accession_title="Test Title 0")
+        self.submission.save()
+        for i in range(1, 3):
+            Submission.objects.create(
+                user=self.user,
+                part_of_group=self.submission_group,
+                metadata=Metadata.objects.create(accession_title=f"Test Title {i}"),
+            )
+        response = self.client.get(self.submission_group_csv_url)
+        self.assertEqual(response.status_code, 200)
+        for i in range(3):
+            self.assertIn(f"Test Title {i}", response.content.decode())
+
     @patch("caais.managers.MetadataQuerySet.export_csv")
     def test_invalid_group_uuid(self, mock_export: MagicMock) -> None:
         """Test that accessing a nonexistent submission group returns 404."""
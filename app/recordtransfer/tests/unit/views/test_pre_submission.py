@@ -1,13 +1,17 @@
 from typing import cast
 from unittest.mock import MagicMock, PropertyMock, patch
 
+import pytest
 from caais.models import RightsType, SourceRole, SourceType
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.http import HttpResponse
 from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from upload.models import UploadSession
+from utility.tests.fake_redis import FakeRedis
 
 from recordtransfer.constants import QueryParameters
 from recordtransfer.enums import SubmissionStep
@@ -133,6 +137,35 @@ class OpenSessionTableTests(TestCase):
         )
         self.assertEqual(response.status_code, 200)
 
+    @patch("recordtransfer.views.table.SiteSetting.get_value_int", return_value=10)
+    def test_open_session_table_query_count(self, mock_get_value_int: MagicMock) -> None:
+        """Test that the open session table renders in a constant number of queries, no matter
+        how many sessions are on the page.
+        """
+
+        def count_queries() -> int:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.open_session_table_url, headers=self.htmx_headers)
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+
+        def add_session(i: int) -> None:
+            InProgressSubmission.objects.create(
+                user=self.user,
+                upload_session=UploadSession.new_session(user=self.user),
+                title=f"In-Progress {i}",
+            )
+
+        add_session(0)
+        one_session = count_queries()
+        for i in range(1, 6):
+            add_session(i)
+        many_sessions = count_queries()
+
+        self.assertEqual(one_session, many_sessions)
+        # Session, user, total count, page count, page, and the two prefetched file tables
+        self.assertLessEqual(many_sessions, 8)
+
     @patch("recordtransfer.views.table.SiteSetting.get_value_int", return_value=3)
     def test_open_session_table_sorting_functionality(self, mock_get_value_int: MagicMock) -> None:
         """Test that the open session table includes sorting functionality."""
@@ -372,6 +405,7 @@ class SubmissionFormWizardTests(TestCase):
 
         return submit_data
 
+    @pytest.mark.query_budget(90)
     @override_settings(FILE_UPLOAD_ENABLED=True)
     @patch("recordtransfer.views.pre_submission.move_uploads_and_send_emails.delay")
     @patch("recordtransfer.views.pre_submission.UploadSession.new_session")
@@ -412,6 +446,22 @@ class SubmissionFormWizardTests(TestCase):
 
         mock_move_files.assert_called_once()
 
+    @pytest.mark.query_budget(13)
+    def test_wizard_steps(self) -> None:
+        """Test that the steps before the files are uploaded stay within their query budget,
+        which is much smaller than the budget of the step that creates the submission.
+        """
+        self.assertEqual(200, self.client.get(self.url).status_code)
+
+        for step, step_data in self.test_data:
+            if step == SubmissionStep.UPLOAD_FILES.value:
+                break
+            submit_data = self._process_test_data(step, step_data)
+            response = self.client.post(self.url, submit_data, follow=True)
+            self.assertEqual(200, response.status_code)
+            if response.context and "form" in response.context:
+                self.assertFalse(response.context["form"].errors)
+
     @override_settings(FILE_UPLOAD_ENABLED=True, UPLOAD_SESSION_EXPIRE_AFTER_INACTIVE_MINUTES=60)
     def test_saving_expirable_in_progress_submission(self) -> None:
         """Test that saving an expirable in-progress submission. Saves the form on the
@@ -477,6 +527,52 @@ class SubmissionFormWizardTests(TestCase):
                 response = self.client.post(self.url, submit_data, follow=True)
                 self.assertEqual(200, response.status_code)
 
+    @override_settings(UPLOAD_SESSION_EXPIRE_AFTER_INACTIVE_MINUTES=60)
+    def test_saved_steps_restored_on_resume(self) -> None:
+        """Test that the completed steps are saved separately, and restored when the submission
+        is resumed.
+        """
+        self.assertEqual(200, self.client.get(self.url).status_code)
+
+        for step, step_data in self.test_data:
+            submit_data = self._process_test_data(step, step_data)
+            if step == SubmissionStep.RIGHTS.value:
+                submit_data["save_form_step"] = step
+                self.client.post(self.url, submit_data)
+                break
+            self.client.post(self.url, submit_data)
+
+        in_progress = self.user.inprogresssubmission_set.get()
+        saved_steps = in_progress.get_step_data()
+        self.assertIn(SubmissionStep.RECORD_DESCRIPTION.value, saved_steps)
+        self.assertNotIn("step_data", in_progress.step_data["past"])
+
+        response = self.client.get(self.url, {"resume": in_progress.uuid})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(response.context["wizard"]["steps"].current, SubmissionStep.RIGHTS.value)
+        self.assertEqual(response.context["view"].storage.data["step_data"], saved_steps)
+
+    @override_settings(SUBMISSION_FORM_STORAGE="redis")
+    def test_wizard_state_kept_in_redis(self) -> None:
+        """Test that the state of the wizard is kept in Redis instead of the session when the
+        Redis storage is used.
+        """
+        redis = FakeRedis()
+        with patch("recordtransfer.wizard_storage.django_rq.get_connection", return_value=redis):
+            self.assertEqual(200, self.client.get(self.url).status_code)
+            for step, step_data in self.test_data[:3]:
+                redis.round_trips = 0
+                response = self.client.post(self.url, self._process_test_data(step, step_data))
+                self.assertEqual(200, response.status_code)
+                self.assertEqual(redis.round_trips, 2)
+
+        self.assertEqual(
+            response.context["wizard"]["steps"].current, SubmissionStep.RECORD_DESCRIPTION.value
+        )
+        (fields,) = redis.data.values()
+        self.assertIn(f"step_data:{SubmissionStep.CONTACT_INFO.value}", fields)
+        self.assertNotIn("wizard_submission_form_wizard", self.client.session)
+
     @patch(
         "recordtransfer.models.InProgressSubmission.upload_session_expired",
         new_callable=PropertyMock,
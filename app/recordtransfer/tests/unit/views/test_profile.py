@@ -3,13 +3,16 @@ import re
 import uuid
 from datetime import datetime, timedelta
 from gettext import gettext
-from typing import Optional, cast
+from typing import Callable, Optional, cast
 from unittest.mock import MagicMock, patch
 from zoneinfo import ZoneInfo
 
-from caais.models import Metadata
+import pytest
+from caais.models import ExtentStatement, Metadata
 from django.conf import settings
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils.translation import gettext as _
 from freezegun import freeze_time
@@ -71,7 +74,7 @@ class TestUserProfileView(TestCase):
         self.assertEqual(response.status_code, 405)
 
 
-@patch("recordtransfer.emails.send_user_account_updated.delay", lambda a, b: None)
+@patch("recordtransfer.views.account.send_user_account_updated", lambda a, b: None)
 @freeze_time(datetime(2025, 1, 1, 9, 0, 0, tzinfo=ZoneInfo(settings.TIME_ZONE)))
 class TestAccountInfoUpdateView(TestCase):
     """Tests for the AccountInfoUpdateView (HTMX account info updates)."""
@@ -402,6 +405,7 @@ class TestInProgressSubmissionTableView(TestCase):
         self.assertNotIn("fa-exclamation-circle text-warning", content)
         self.assertNotIn("Submission is expiring soon", content)
 
+    @pytest.mark.query_budget(4)
     @patch("recordtransfer.views.table.SiteSetting.get_value_int", return_value=3)
     def test_in_progress_submission_table_display(self, mock_get_value_int: MagicMock) -> None:
         """Test that the in-progress submission table displays in-progress submissions
@@ -569,6 +573,7 @@ class TestSubmissionGroupTableView(TestCase):
         content = response.content.decode()
         self.assertIn(_("You have not made any submission groups."), content)
 
+    @pytest.mark.query_budget(4)
     @patch("recordtransfer.views.table.SiteSetting.get_value_int", return_value=3)
     def test_submission_group_table_display(self, mock_get_value_int: MagicMock) -> None:
         """Test that the submission group table displays submission groups correctly."""
@@ -752,6 +757,22 @@ class TestSubmissionTableView(TestCase):
         self.assertIn("sort_options", context)
         self.assertIn("submission_date", context["sort_options"])
 
+    @pytest.mark.query_budget(5)
+    def test_submission_table_display(self) -> None:
+        """Test that the submission table displays submissions correctly."""
+        group = SubmissionGroup.objects.create(created_by=self.user, name="Test Group")
+        for i in range(3):
+            Submission.objects.create(
+                user=self.user,
+                part_of_group=group,
+                metadata=Metadata.objects.create(accession_title=f"Test Submission {i}"),
+            )
+
+        response = self.client.get(self.submission_table_url, headers=self.htmx_headers)
+        self.assertEqual(response.status_code, 200)
+        for i in range(3):
+            self.assertIn(f"Test Submission {i}", response.content.decode())
+
     def test_submission_table_custom_sorting(self) -> None:
         """Test that custom sorting parameters work correctly."""
         # Test sorting by title in ascending order
@@ -1714,3 +1735,94 @@ class TestAssignSubmissionGroupView(TestCase):
             self.assertEqual(response.status_code, 500)
             self.assertIn("HX-Trigger", response.headers)
             self.assertIn("showError", response.headers["HX-Trigger"])
+
+
+@patch("recordtransfer.views.table.SiteSetting.get_value_int", return_value=10)
+class TestProfileTableQueryCounts(TestCase):
+    """Tests that the profile tables render a page in a constant number of queries, no matter
+    how many rows are on the page.
+    """
+
+    # Session, user, count, and page queries, with some headroom
+    QUERY_BUDGET = 6
+
+    def setUp(self) -> None:
+        """Set up the test case with a user."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpassword"
+        )
+        self.client.force_login(self.user)
+        self.htmx_headers = {"HX-Request": "true"}
+
+    def _count_queries(self, url: str) -> int:
+        """Count the number of queries made to render a table."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, headers=self.htmx_headers)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def _assert_constant_queries(self, url: str, add_row: Callable[[int], None]) -> None:
+        """Assert that adding rows to a table does not add queries, and that the number of
+        queries is within budget.
+        """
+        add_row(0)
+        one_row = self._count_queries(url)
+
+        for i in range(1, 6):
+            add_row(i)
+        many_rows = self._count_queries(url)
+
+        self.assertEqual(one_row, many_rows)
+        self.assertLessEqual(many_rows, self.QUERY_BUDGET)
+
+    def test_submission_table(self, mock_get_value_int: MagicMock) -> None:
+        """Test the query count of the submission table."""
+        group = SubmissionGroup.objects.create(created_by=self.user, name="Group")
+
+        def add_row(i: int) -> None:
+            metadata = Metadata.objects.create(accession_title=f"Submission {i}")
+            ExtentStatement.objects.create(
+                metadata=metadata, quantity_and_unit_of_measure=f"{i} files"
+            )
+            Submission.objects.create(user=self.user, metadata=metadata, part_of_group=group)
+
+        self._assert_constant_queries(reverse("recordtransfer:submission_table"), add_row)
+
+    def test_submission_table_shows_first_extent_statement(
+        self, mock_get_value_int: MagicMock
+    ) -> None:
+        """Test that the first extent statement of each submission is shown."""
+        metadata = Metadata.objects.create(accession_title="Submission")
+        ExtentStatement.objects.create(metadata=metadata, quantity_and_unit_of_measure="5 files")
+        ExtentStatement.objects.create(metadata=metadata, quantity_and_unit_of_measure="9 files")
+        Submission.objects.create(user=self.user, metadata=metadata)
+
+        response = self.client.get(
+            reverse("recordtransfer:submission_table"), headers=self.htmx_headers
+        )
+
+        self.assertContains(response, "5 files")
+        self.assertNotContains(response, "9 files")
+
+    def test_submission_group_table(self, mock_get_value_int: MagicMock) -> None:
+        """Test the query count of the submission group table."""
+
+        def add_row(i: int) -> None:
+            group = SubmissionGroup.objects.create(created_by=self.user, name=f"Group {i}")
+            Submission.objects.create(user=self.user, part_of_group=group)
+
+        self._assert_constant_queries(reverse("recordtransfer:submission_group_table"), add_row)
+
+    def test_in_progress_submission_table(self, mock_get_value_int: MagicMock) -> None:
+        """Test the query count of the in-progress submission table."""
+
+        def add_row(i: int) -> None:
+            InProgressSubmission.objects.create(
+                user=self.user,
+                upload_session=UploadSession.new_session(user=self.user),
+                title=f"In-Progress {i}",
+            )
+
+        self._assert_constant_queries(
+            reverse("recordtransfer:in_progress_submission_table"), add_row
+        )
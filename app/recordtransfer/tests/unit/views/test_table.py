@@ -0,0 +1,187 @@
+import uuid
+from unittest.mock import MagicMock, patch
+
+from caais.models import Metadata
+from django.db import connection
+from django.db.models import Count
+from django.http import QueryDict
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from recordtransfer.constants import QueryParameters
+from recordtransfer.models import Submission, SubmissionGroup, User
+from recordtransfer.views.table import KeysetPaginator, encode_cursor
+
+
+class TestKeysetPaginator(TestCase):
+    """Tests for the KeysetPaginator."""
+
+    def setUp(self) -> None:
+        """Create submissions with duplicate and missing sort values."""
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+        group = SubmissionGroup.objects.create(created_by=self.user, name="Group")
+        titles = ["B", None, "A", "B", None, "C", "A", "B"]
+        for i, title in enumerate(titles):
+            Submission.objects.create(
+                user=self.user,
+                metadata=Metadata.objects.create(accession_title=title) if title else None,
+                part_of_group=group if i % 2 else None,
+            )
+        self.queryset = Submission.objects.filter(user=self.user)
+
+    def _walk_forward(self, paginator: KeysetPaginator) -> list[int]:
+        """Follow the next page links from the first page to the last."""
+        page = paginator.page(1, QueryDict(mutable=True))
+        pks = [row.pk for row in page]
+        while page.has_next():
+            query = QueryDict(page.next_page_query)
+            page = paginator.page(
+                int(query[QueryParameters.PAGINATE_QUERY_NAME]),
+                QueryDict(mutable=True),
+                after=query[QueryParameters.PAGINATE_AFTER_QUERY_NAME],
+            )
+            pks.extend(row.pk for row in page)
+        return pks
+
+    def test_pages_match_offset_ordering(self) -> None:
+        """Test that walking through the pages visits every row once, in the same order as
+        sorting the whole table, for every sort and direction.
+        """
+        for order_field in [
+            "metadata__accession_title",
+            "-metadata__accession_title",
+            "part_of_group",
+            "-part_of_group",
+            "submission_date",
+            "-submission_date",
+        ]:
+            with self.subTest(order_field=order_field):
+                paginator = KeysetPaginator(self.queryset, order_field, per_page=3)
+                expected = [row.pk for row in paginator._ordered()]
+                self.assertEqual(self._walk_forward(paginator), expected)
+                self.assertEqual(len(expected), 8)
+
+    def test_previous_page(self) -> None:
+        """Test that going back a page returns the same rows as going forward."""
+        paginator = KeysetPaginator(self.queryset, "metadata__accession_title", per_page=3)
+        first = paginator.page(1, QueryDict(mutable=True))
+        second = paginator.page(
+            2, QueryDict(mutable=True), after=QueryDict(first.next_page_query)["after"]
+        )
+        third = paginator.page(
+            3, QueryDict(mutable=True), after=QueryDict(second.next_page_query)["after"]
+        )
+        back = paginator.page(
+            2, QueryDict(mutable=True), before=QueryDict(third.previous_page_query)["before"]
+        )
+
+        self.assertEqual(list(back), list(second))
+        self.assertTrue(back.has_previous())
+        self.assertTrue(back.has_next())
+        self.assertFalse(third.has_next())
+
+    def test_invalid_cursor_falls_back_to_page_number(self) -> None:
+        """Test that a tampered cursor is ignored."""
+        paginator = KeysetPaginator(self.queryset, "pk", per_page=3)
+        page = paginator.page(2, QueryDict(mutable=True), after="not-a-cursor")
+
+        self.assertEqual(list(page), list(paginator._ordered()[3:6]))
+
+    def test_cursor_page_does_not_count(self) -> None:
+        """Test that requesting a page with a cursor does not count the rows when the count is
+        cached.
+        """
+        paginator = KeysetPaginator(self.queryset, "pk", per_page=3)
+        after = encode_cursor(
+            self.queryset.order_by("pk")[2].pk, self.queryset.order_by("pk")[2].pk
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            page = paginator.page(2, QueryDict(mutable=True), after=after)
+            list(page)
+
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("COUNT(", queries[0]["sql"].upper())
+        self.assertNotIn("OFFSET", queries[0]["sql"].upper())
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_count_is_cached(self) -> None:
+        """Test that the total row count is only computed once."""
+        self.assertEqual(KeysetPaginator(self.queryset, "pk", per_page=3).count, 8)
+        with self.assertNumQueries(0):
+            self.assertEqual(KeysetPaginator(self.queryset, "pk", per_page=3).num_pages, 3)
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_stale_count_is_corrected(self) -> None:
+        """Test that the number of pages is corrected when the cached count is out of date."""
+        self.assertEqual(KeysetPaginator(self.queryset, "pk", per_page=3).count, 8)
+        Submission.objects.filter(pk__in=self.queryset.order_by("pk")[:5].values("pk")).delete()
+
+        page = KeysetPaginator(self.queryset, "pk", per_page=3).page(1, QueryDict(mutable=True))
+
+        self.assertEqual(len(page), 3)
+        self.assertEqual(page.num_pages, 1)
+
+
+@patch("recordtransfer.views.table.SiteSetting.get_value_int", return_value=2)
+class TestPaginatedTableView(TestCase):
+    """Tests for keyset pagination in the table views."""
+
+    def setUp(self) -> None:
+        """Create submission groups for the user."""
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+        self.client.force_login(self.user)
+        for i in range(5):
+            SubmissionGroup.objects.create(
+                created_by=self.user, name=f"Test Group {i}", uuid=uuid.uuid4()
+            )
+        self.url = reverse("recordtransfer:submission_group_table")
+        self.htmx_headers = {"HX-Request": "true"}
+
+    def test_next_link_keeps_sort(self, mock_get_value_int: MagicMock) -> None:
+        """Test that the link to the next page keeps the sort parameters and uses a cursor."""
+        response = self.client.get(
+            f"{self.url}?sort=name&direction=desc", headers=self.htmx_headers
+        )
+
+        query = QueryDict(response.context["page"].next_page_query)
+        self.assertEqual(query["sort"], "name")
+        self.assertEqual(query["direction"], "desc")
+        self.assertEqual(query[QueryParameters.PAGINATE_QUERY_NAME], "2")
+        self.assertIn(QueryParameters.PAGINATE_AFTER_QUERY_NAME, query)
+
+        response = self.client.get(
+            f"{self.url}?{response.context['page'].next_page_query}", headers=self.htmx_headers
+        )
+        names = [group.name for group in response.context["page"]]
+        self.assertEqual(names, ["Test Group 2", "Test Group 1"])
+        self.assertEqual(response.context["page_num"], 2)
+        self.assertIn("Page 2 of 3", response.content.decode())
+
+    def test_sort_by_aggregate(self, mock_get_value_int: MagicMock) -> None:
+        """Test that tables sorted by an aggregate can be paged through."""
+        groups = list(SubmissionGroup.objects.order_by("name"))
+        for count, group in zip([2, 0, 1, 2, 0], groups, strict=True):
+            for _ in range(count):
+                Submission.objects.create(user=self.user, part_of_group=group)
+
+        queryset = SubmissionGroup.objects.filter(created_by=self.user).annotate(
+            submission_count=Count("submission")
+        )
+        for order_field in ["submission_count", "-submission_count"]:
+            with self.subTest(order_field=order_field):
+                paginator = KeysetPaginator(queryset, order_field, per_page=2)
+                page = paginator.page(1, QueryDict(mutable=True))
+                pks = [group.pk for group in page]
+                while page.has_next():
+                    after = QueryDict(page.next_page_query)["after"]
+                    page = paginator.page(page.number + 1, QueryDict(mutable=True), after=after)
+                    pks.extend(group.pk for group in page)
+
+                self.assertEqual(pks, [group.pk for group in paginator._ordered()])
+                self.assertEqual(len(pks), 5)
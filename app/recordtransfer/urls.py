@@ -1,14 +1,12 @@
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.urls import path
-from django.views.decorators.cache import cache_page, never_cache
+from django.views.decorators.cache import never_cache
 
 from . import views
 
 # Pages are cached by default. If a URL should not be cached, use never_cache()
 
-ONE_HOUR = 60 * 60
-
 app_name = "recordtransfer"
 urlpatterns = [
     path("", views.home.Index.as_view(), name="index"),
@@ -46,8 +44,8 @@ urlpatterns = [
         name="delete_in_progress_submission_modal",
     ),
     path("about/", views.home.About.as_view(), name="about"),
-    # Cache for one hour only - admins may change terms shown on this page
-    path("help/", cache_page(ONE_HOUR)(views.home.Help.as_view()), name="help"),
+    # The cached page is replaced when admins change the terms shown on this page
+    path("help/", views.home.Help.as_view(), name="help"),
     path(
         "user/profile/",
         never_cache(login_required(views.profile.UserProfile.as_view())),
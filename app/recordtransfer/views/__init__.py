@@ -1,5 +1,14 @@
 """Contains views for the record transfer application."""
 
-from . import account, home, media, post_submission, pre_submission, profile
+from . import account, home, i18n, media, metrics, post_submission, pre_submission, profile
 
-__all__ = ["account", "home", "media", "post_submission", "pre_submission", "profile"]
+__all__ = [
+    "account",
+    "home",
+    "i18n",
+    "media",
+    "metrics",
+    "post_submission",
+    "pre_submission",
+    "profile",
+]
@@ -13,6 +13,7 @@ from django.contrib.auth.views import (
     PasswordResetConfirmView,
     PasswordResetView,
 )
+from django.db import transaction
 from django.dispatch import receiver
 from django.forms import BaseModelForm
 from django.http import HttpRequest, HttpResponse
@@ -68,7 +69,9 @@ class CreateAccount(FormView):
         new_user.is_active = False
         new_user.gets_submission_email_updates = False
         new_user.language = getattr(self.request, "LANGUAGE_CODE", get_language())
-        new_user.save()
+        with transaction.atomic():
+            new_user.save()
+            send_user_activation_email(new_user)
 
         LOGGER.info(
             "New user account created: username='%s', email='%s', user_id=%s, ip=%s",
@@ -78,8 +81,6 @@ class CreateAccount(FormView):
             get_client_ip_address(self.request),
         )
 
-        send_user_activation_email.delay(new_user)
-
         LOGGER.info(
             "Activation email sent to user: username='%s', email='%s', user_id=%s",
             new_user.username,
@@ -317,7 +318,6 @@ class AsyncPasswordChangeView(PasswordChangeView):
     def form_valid(self, form: PasswordChangeForm) -> HttpResponse:
         """Handle successful password change."""
         LOGGER.info("Password change successful for user: %s", form.user)
-        response = super().form_valid(form)
         user = cast(User, form.user)
 
         context = {
@@ -325,7 +325,9 @@ class AsyncPasswordChangeView(PasswordChangeView):
             "changed_item": gettext_lazy("password"),
             "changed_status": gettext_lazy("updated"),
         }
-        send_user_account_updated.delay(user, context)
+        with transaction.atomic():
+            response = super().form_valid(form)
+            send_user_account_updated(user, context)
         return response
 
 
@@ -358,7 +360,6 @@ class AsyncPasswordResetConfirmView(PasswordResetConfirmView):
     def form_valid(self, form: SetPasswordForm) -> HttpResponse:
         """Handle successful password reset confirmation."""
         LOGGER.info("Password reset successful for user: %s", form.user)
-        response = super().form_valid(form)
         user = cast(User, form.user)
 
         context = {
@@ -366,6 +367,8 @@ class AsyncPasswordResetConfirmView(PasswordResetConfirmView):
             "changed_item": gettext_lazy("password"),
             "changed_status": gettext_lazy("reset"),
         }
-        send_user_account_updated.delay(user, context)
+        with transaction.atomic():
+            response = super().form_valid(form)
+            send_user_account_updated(user, context)
         LOGGER.info("Password reset email queued for user: %s", user.username)
         return response
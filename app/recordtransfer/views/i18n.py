@@ -0,0 +1,34 @@
+"""Views for internationalization."""
+
+from django.conf import settings
+from django.http import Http404, HttpRequest, HttpResponse
+from django.shortcuts import redirect
+from django.utils import translation
+from django.utils.cache import patch_cache_control
+from django.views.i18n import JavaScriptCatalog
+
+from recordtransfer.javascript_catalog import get_catalog_url, get_catalog_version
+
+# The catalog URL changes when the translations change, so browsers can keep it for a year
+CATALOG_MAX_AGE = 60 * 60 * 24 * 365
+
+
+class VersionedJavaScriptCatalog(JavaScriptCatalog):
+    """Serve the JavaScript translation catalog of the language and version in the URL.
+
+    Requests for an old version are redirected to the current version.
+    """
+
+    def get(
+        self, request: HttpRequest, *args, version: str, language: str, **kwargs
+    ) -> HttpResponse:
+        """Render the catalog, with headers letting browsers cache it forever."""
+        if language not in dict(settings.LANGUAGES):
+            raise Http404("Unsupported language")
+        if version != get_catalog_version():
+            return redirect(get_catalog_url(language))
+
+        with translation.override(language):
+            response = super().get(request, *args, **kwargs)
+        patch_cache_control(response, public=True, max_age=CATALOG_MAX_AGE, immutable=True)
+        return response
@@ -0,0 +1,60 @@
+"""Views for the metrics of the application."""
+
+import ipaddress
+from importlib import import_module
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpRequest, HttpResponse
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET
+from utility.metrics import render_metrics
+
+# Modules that create metrics. They are imported before the metrics are rendered, so that every
+# metric is registered even if the process has not used the module yet
+METRIC_MODULES = (
+    "recordtransfer.emails",
+    "recordtransfer.jobs",
+    "recordtransfer.models",
+    "recordtransfer.payloads",
+    "upload.clam",
+    "upload.handlers",
+    "upload.mime",
+    "upload.models",
+    "upload.views",
+)
+
+# The content type of the Prometheus text format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@require_GET
+@never_cache
+def metrics(request: HttpRequest) -> HttpResponse:
+    """Render the metrics in the Prometheus text format.
+
+    The metrics can be viewed by staff users, or requested by a scraper in one of the
+    :ref:`METRICS_ALLOWED_NETWORKS`. Requests forwarded by a proxy like NGINX are only allowed for
+    staff users, since the address of the client can't be trusted.
+    """
+    if not settings.METRICS_ENABLED:
+        raise Http404("Metrics are not enabled")
+    if not (request.user.is_staff or _is_from_allowed_network(request)):
+        raise PermissionDenied
+
+    for module in METRIC_MODULES:
+        import_module(module)
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
+
+
+def _is_from_allowed_network(request: HttpRequest) -> bool:
+    if "x-forwarded-for" in request.headers:
+        return False
+    try:
+        address = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in settings.METRICS_ALLOWED_NETWORKS
+    )
@@ -10,6 +10,7 @@ from typing import Any, ClassVar, Optional, OrderedDict, Union, cast
 from caais.models import RightsType, SourceRole, SourceType
 from django.conf import settings
 from django.contrib import messages
+from django.db import transaction
 from django.db.models import Case, Count, Value, When
 from django.forms import (
     BaseForm,
@@ -40,6 +41,7 @@ from utility import is_deployed_environment
 from recordtransfer import forms
 from recordtransfer.caais import map_form_to_metadata
 from recordtransfer.constants import HtmlIds, OtherValues, QueryParameters
+from recordtransfer.context_cache import get_cached_context, get_context_cache_key
 from recordtransfer.emails import (
     send_submission_creation_failure,
     send_your_submission_did_not_go_through,
@@ -120,6 +122,8 @@ def open_session_table(request: HttpRequest) -> HttpResponse:
     user = cast(User, request.user)
     queryset = (
         user.open_upload_sessions()
+        .select_related("in_progress_submission")
+        .prefetch_related("tempuploadedfile_set", "permuploadedfile_set")
         .annotate(
             calculated_file_count=Case(
                 When(status=UploadSession.SessionStatus.EXPIRED, then=Value(0)),
@@ -129,7 +133,6 @@ def open_session_table(request: HttpRequest) -> HttpResponse:
                 ),
             ),
         )
-        .order_by(order_field)
     )
 
     return paginated_table_view(
@@ -146,6 +149,7 @@ def open_session_table(request: HttpRequest) -> HttpResponse:
             "total_open_sessions": queryset.count(),
             "max_open_sessions": settings.UPLOAD_SESSION_MAX_CONCURRENT_OPEN,
         },
+        order_field=order_field,
     )
 
 
@@ -165,6 +169,11 @@ class SubmissionFormWizard(SessionWizardView):
         form: type[Union[forms.SubmissionForm, BaseFormSet]]
         info_message: Optional[str] = None
 
+    _STORAGES: ClassVar[dict[str, str]] = {
+        "session": "formtools.wizard.storage.session.SessionStorage",
+        "redis": "recordtransfer.wizard_storage.RedisStorage",
+    }
+
     _TEMPLATES: ClassVar[dict[SubmissionStep, SubmissionStepMeta]] = {
         SubmissionStep.ACCEPT_LEGAL: SubmissionStepMeta(
             template="recordtransfer/submission_form_legal.html",
@@ -276,6 +285,12 @@ class SubmissionFormWizard(SessionWizardView):
         self.submission_group_uuid = None
         self.in_progress_submission = None
         self.in_progress_uuid = None
+        self._upload_session = None
+
+    @property
+    def storage_name(self) -> str:
+        """The wizard storage for the :ref:`SUBMISSION_FORM_STORAGE` setting."""
+        return self._STORAGES[settings.SUBMISSION_FORM_STORAGE]
 
     @property
     def current_step(self) -> SubmissionStep:
@@ -297,9 +312,11 @@ class SubmissionFormWizard(SessionWizardView):
             )
             return super().dispatch(request, *args, **kwargs)
 
-        self.in_progress_submission = InProgressSubmission.objects.filter(
-            user=request.user, uuid=self.in_progress_uuid
-        ).first()
+        self.in_progress_submission = (
+            InProgressSubmission.objects.filter(user=request.user, uuid=self.in_progress_uuid)
+            .select_related("upload_session")
+            .first()
+        )
 
         # Redirect user to a fresh submission form if the in-progress submission is not found
         if not self.in_progress_submission:
@@ -357,7 +374,11 @@ class SubmissionFormWizard(SessionWizardView):
 
         step_data = self.in_progress_submission.step_data
 
-        self.storage.data = step_data["past"]
+        past = dict(step_data["past"])
+        if saved_steps := self.in_progress_submission.get_step_data():
+            past["step_data"] = {**past.get("step_data", {}), **saved_steps}
+
+        self.storage.data = past
         self.storage.extra_data = step_data["extra"]
         self.storage.current_step = self.in_progress_submission.current_step
 
@@ -453,8 +474,13 @@ class SubmissionFormWizard(SessionWizardView):
 
         current_data = SubmissionFormWizard.format_step_data(self.current_step, request.POST)
 
+        # The data of the completed steps is saved separately, so that only the steps that changed
+        # are written
+        past_data = dict(self.storage.data)
+        completed_steps = past_data.pop("step_data", None) or {}
+
         form_data = {
-            "past": self.storage.data,
+            "past": past_data,
             "current": current_data,
             "extra": self.storage.extra_data or {},
         }
@@ -477,18 +503,37 @@ class SubmissionFormWizard(SessionWizardView):
 
         self.in_progress_submission.title = title
 
-        session = UploadSession.objects.filter(
-            token=self.storage.extra_data.get("session_token"), user=self.request.user
-        ).first()
-
-        if session:
+        if session := self.get_upload_session():
             self.in_progress_submission.upload_session = session
 
         self.in_progress_submission.current_step = self.current_step.value
         self.in_progress_submission.user = cast(User, self.request.user)
         self.in_progress_submission.step_data = form_data
 
-        self.in_progress_submission.save()
+        with transaction.atomic():
+            self.in_progress_submission.save()
+            self.in_progress_submission.save_step_data(completed_steps)
+
+    def get_upload_session(self) -> Optional[UploadSession]:
+        """Get the user's upload session for this submission, if one has been assigned. The
+        session is looked up once per token.
+        """
+        token = self.storage.extra_data.get("session_token")
+        if not token:
+            return None
+
+        cached = self._upload_session
+        if cached is None or cached.token != token:
+            in_progress_session = (
+                self.in_progress_submission.upload_session if self.in_progress_submission else None
+            )
+            if in_progress_session is not None and in_progress_session.token == token:
+                cached = in_progress_session
+            else:
+                cached = UploadSession.objects.filter(token=token, user=self.request.user).first()
+            self._upload_session = cached
+
+        return cached
 
     def save_current_step(
         self, form: Union[BaseInlineFormSet, BaseModelFormSet, ModelForm]
@@ -846,6 +891,11 @@ class SubmissionFormWizard(SessionWizardView):
         context.update(self._get_template_context())
         context["js_context"] = self._get_javascript_context()
         context["js_context_id"] = "js_context_" + self.steps.current
+        # Vary the template fragments that are the same for every user by language and version
+        context["context_cache_key"] = get_context_cache_key()
+        context["SUBMISSION_FORM_CONTEXT_CACHE_SECONDS"] = (
+            settings.SUBMISSION_FORM_CONTEXT_CACHE_SECONDS
+        )
 
         return context
 
@@ -886,12 +936,29 @@ class SubmissionFormWizard(SessionWizardView):
         Returns:
             A dictionary of context data to be used in the JavaScript files. Can be empty.
         """
+        step = self.current_step
         js_context: dict[str, Any] = {
+            **get_cached_context(
+                f"js_context:{step.value}", lambda: self._get_static_javascript_context(step)
+            ),
             "FORM_STARTED": self.form_started,
+        }
+
+        if step == SubmissionStep.GROUP_SUBMISSION:
+            js_context["default_group_uuid"] = self.submission_group_uuid
+        elif step == SubmissionStep.UPLOAD_FILES:
+            js_context["SESSION_TOKEN"] = self.storage.extra_data.get("session_token", "")
+        return js_context
+
+    @staticmethod
+    def _get_static_javascript_context(step: SubmissionStep) -> dict[str, Any]:
+        """Get the part of the context passed to the JavaScript files that is the same for every
+        user on a step, which is cached for each language.
+        """
+        js_context: dict[str, Any] = {
             "RECAPTCHA_ENABLED": is_deployed_environment(),
         }
 
-        step = self.current_step
         if step == SubmissionStep.CONTACT_INFO:
             js_context.update(
                 {
@@ -942,13 +1009,11 @@ class SubmissionFormWizard(SessionWizardView):
                     "fetch_group_descriptions_url": reverse(
                         "recordtransfer:get_user_submission_groups",
                     ),
-                    "default_group_uuid": self.submission_group_uuid,
                 },
             )
         elif step == SubmissionStep.UPLOAD_FILES:
             js_context.update(
                 {
-                    "SESSION_TOKEN": self.storage.extra_data.get("session_token", ""),
                     "MAX_TOTAL_UPLOAD_SIZE_MB": settings.MAX_TOTAL_UPLOAD_SIZE_MB,
                     "MAX_SINGLE_UPLOAD_SIZE_MB": settings.MAX_SINGLE_UPLOAD_SIZE_MB,
                     "MAX_TOTAL_UPLOAD_COUNT": settings.MAX_TOTAL_UPLOAD_COUNT,
@@ -957,6 +1022,8 @@ class SubmissionFormWizard(SessionWizardView):
                         for formats in settings.ACCEPTED_FILE_FORMATS.values()
                         for format in formats
                     ],
+                    "UPLOAD_OFFLOAD_ENABLED": settings.UPLOAD_OFFLOAD_ENABLED,
+                    "DIRECT_UPLOAD_ENABLED": settings.DIRECT_UPLOAD_ENABLED,
                 }
             )
         return js_context
@@ -984,11 +1051,7 @@ class SubmissionFormWizard(SessionWizardView):
             LOGGER.info("Mapping form data to CAAIS metadata")
             submission.metadata = map_form_to_metadata(form_data)
 
-            if settings.FILE_UPLOAD_ENABLED and (
-                upload_session := UploadSession.objects.filter(
-                    token=self.storage.extra_data.get("session_token"), user=self.request.user
-                ).first()
-            ):
+            if settings.FILE_UPLOAD_ENABLED and (upload_session := self.get_upload_session()):
                 submission.upload_session = upload_session
 
             if submission_group := form_data.get("submission_group"):
@@ -1008,8 +1071,8 @@ class SubmissionFormWizard(SessionWizardView):
         except Exception as exc:
             LOGGER.error("Encountered error creating Submission object", exc_info=exc)
 
-            send_your_submission_did_not_go_through.delay(form_data, cast(User, self.request.user))
-            send_submission_creation_failure.delay(form_data, cast(User, self.request.user))
+            send_your_submission_did_not_go_through(form_data, cast(User, self.request.user))
+            send_submission_creation_failure(form_data, cast(User, self.request.user))
 
             raise Exception(
                 gettext(
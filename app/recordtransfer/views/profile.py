@@ -3,8 +3,17 @@
 import logging
 from typing import Any, Optional, cast
 
+from caais.models import ExtentStatement
 from django.conf import settings
-from django.db.models import Count, DateTimeField, ExpressionWrapper, F, QuerySet
+from django.db.models import (
+    Count,
+    DateTimeField,
+    ExpressionWrapper,
+    F,
+    OuterRef,
+    QuerySet,
+    Subquery,
+)
 from django.forms import BaseModelForm
 from django.http import Http404, HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404, render
@@ -195,10 +204,8 @@ def submission_group_table(request: HttpRequest) -> HttpResponse:
     if direction == "desc":
         order_field = f"-{order_field}"
 
-    queryset = (
-        SubmissionGroup.objects.filter(created_by=request.user)
-        .annotate(submission_count=Count("submission"))
-        .order_by(order_field)
+    queryset = SubmissionGroup.objects.filter(created_by=request.user).annotate(
+        submission_count=Count("submission")
     )
     return paginated_table_view(
         request,
@@ -212,6 +219,7 @@ def submission_group_table(request: HttpRequest) -> HttpResponse:
             "sort_options": sort_options,
             "target_id": HtmlIds.ID_SUBMISSION_GROUP_TABLE,
         },
+        order_field=order_field,
     )
 
 
@@ -232,11 +240,15 @@ def in_progress_submission_table(request: HttpRequest) -> HttpResponse:
             "expires_at": "expires_at",
         }
 
-        queryset = InProgressSubmission.objects.filter(user=request.user).annotate(
-            expires_at=ExpressionWrapper(
-                F("upload_session__last_upload_interaction_time")
-                + timezone.timedelta(minutes=expire_minutes),
-                output_field=DateTimeField(),
+        queryset = (
+            InProgressSubmission.objects.filter(user=request.user)
+            .select_related("upload_session")
+            .annotate(
+                expires_at=ExpressionWrapper(
+                    F("upload_session__last_upload_interaction_time")
+                    + timezone.timedelta(minutes=expire_minutes),
+                    output_field=DateTimeField(),
+                )
             )
         )
     else:
@@ -250,7 +262,9 @@ def in_progress_submission_table(request: HttpRequest) -> HttpResponse:
             "submission_title": "title",
         }
 
-        queryset = InProgressSubmission.objects.filter(user=request.user)
+        queryset = InProgressSubmission.objects.filter(user=request.user).select_related(
+            "upload_session"
+        )
 
     default_sort = "last_updated"
     default_direction = "desc"
@@ -267,7 +281,6 @@ def in_progress_submission_table(request: HttpRequest) -> HttpResponse:
     if direction == "desc":
         order_field = f"-{order_field}"
 
-    queryset = queryset.order_by(order_field)
     return paginated_table_view(
         request,
         queryset,
@@ -280,6 +293,7 @@ def in_progress_submission_table(request: HttpRequest) -> HttpResponse:
             "sort_options": sort_options,
             "target_id": HtmlIds.ID_IN_PROGRESS_SUBMISSION_TABLE,
         },
+        order_field=order_field,
     )
 
 
@@ -325,7 +339,14 @@ def submission_table(request: HttpRequest) -> HttpResponse:
     else:
         queryset = Submission.objects.filter(user=request.user)
 
-    queryset = queryset.order_by(order_field)
+    first_extent_statement = ExtentStatement.objects.filter(
+        metadata=OuterRef("metadata")
+    ).order_by("pk")
+    queryset = queryset.select_related("metadata", "part_of_group").annotate(
+        first_extent_statement=Subquery(
+            first_extent_statement.values("quantity_and_unit_of_measure")[:1]
+        )
+    )
 
     return paginated_table_view(
         request,
@@ -334,6 +355,7 @@ def submission_table(request: HttpRequest) -> HttpResponse:
         HtmlIds.ID_SUBMISSION_TABLE,
         reverse("recordtransfer:submission_table"),
         context,
+        order_field=order_field,
     )
 
 
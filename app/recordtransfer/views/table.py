@@ -1,14 +1,282 @@
+import hashlib
+import json
+import math
+from collections.abc import Sequence
+from datetime import date
+from functools import cached_property
 from typing import Any, Optional
 
-from django.core.paginator import Paginator
-from django.db.models import QuerySet
-from django.http import HttpRequest, HttpResponse
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db.models import F, Model, Q, QuerySet
+from django.http import HttpRequest, HttpResponse, QueryDict
 from django.shortcuts import render
 
 from recordtransfer.constants import QueryParameters
 from recordtransfer.enums import SiteSettingKey
 from recordtransfer.models import SiteSetting
 
+# Name of the annotation holding the value of the column a table is sorted by
+SORT_KEY = "table_sort_key"
+
+CURSOR_SALT = "recordtransfer.views.table.cursor"
+
+# Query parameters that are replaced when building the link to another page
+_PAGE_PARAMETERS = (
+    QueryParameters.PAGINATE_QUERY_NAME,
+    QueryParameters.PAGINATE_AFTER_QUERY_NAME,
+    QueryParameters.PAGINATE_BEFORE_QUERY_NAME,
+)
+
+
+class _CursorSerializer:
+    """Serialize cursors as compact JSON, keeping full precision for datetimes."""
+
+    def dumps(self, obj: Any) -> bytes:
+        """Serialize a cursor to bytes."""
+        return json.dumps(obj, default=self._default, separators=(",", ":")).encode("latin-1")
+
+    def loads(self, data: bytes) -> Any:
+        """Deserialize a cursor from bytes."""
+        return json.loads(data.decode("latin-1"))
+
+    @staticmethod
+    def _default(obj: Any) -> str:
+        if isinstance(obj, date):
+            return obj.isoformat()
+        return str(obj)
+
+
+def encode_cursor(value: Any, pk: Any) -> str:
+    """Encode the sort value and primary key of a row into a signed cursor."""
+    return signing.dumps([value, pk], salt=CURSOR_SALT, serializer=_CursorSerializer)
+
+
+def decode_cursor(token: Optional[str]) -> Optional[tuple[Any, Any]]:
+    """Decode a cursor created by :func:`encode_cursor`.
+
+    Returns:
+        A (sort value, primary key) tuple, or None if the token is missing or invalid
+    """
+    if not token:
+        return None
+    try:
+        value, pk = signing.loads(token, salt=CURSOR_SALT, serializer=_CursorSerializer)
+    except (signing.BadSignature, ValueError, TypeError):
+        return None
+    return value, pk
+
+
+class KeysetPaginator:
+    """Paginate a queryset by seeking past the first or last row of the current page, instead of
+    using an OFFSET. Rows are ordered by a single sort column, with the primary key as a
+    tie-breaker. NULL sort values are always treated as the smallest values.
+
+    The total number of rows is only used to display the number of pages, so it is cached for
+    :ref:`PAGINATION_COUNT_CACHE_SECONDS` instead of being counted on every request.
+    """
+
+    def __init__(self, queryset: QuerySet, order_field: str, per_page: int) -> None:
+        """Create a paginator.
+
+        Args:
+            queryset: The rows to paginate
+            order_field: The field to sort by, prefixed with "-" to sort in descending order
+            per_page: The maximum number of rows on a page
+        """
+        self.descending = order_field.startswith("-")
+        self.sort_field = order_field.lstrip("-")
+        self.per_page = per_page
+        self.queryset = queryset
+        self._sortable = queryset.annotate(**{SORT_KEY: F(self.sort_field)})
+
+    @cached_property
+    def count(self) -> int:
+        """Get the (possibly cached) total number of rows."""
+        unordered = self.queryset.order_by()
+        try:
+            sql = str(unordered.query)
+        except EmptyResultSet:
+            return 0
+
+        cache_key = f"table_count:{hashlib.sha256(sql.encode('utf-8')).hexdigest()}"
+        count = cache.get(cache_key)
+        if count is None:
+            count = unordered.count()
+            cache.set(cache_key, count, settings.PAGINATION_COUNT_CACHE_SECONDS)
+        return count
+
+    @cached_property
+    def num_pages(self) -> int:
+        """Get the (possibly cached) total number of pages."""
+        return max(1, math.ceil(self.count / self.per_page))
+
+    def page(
+        self,
+        number: int,
+        base_query: QueryDict,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+    ) -> "KeysetPage":
+        """Get a page of rows.
+
+        If a cursor is given, the rows directly after or before it are returned. Otherwise, the
+        page is looked up by its number, which requires an OFFSET; this is only the case for the
+        first page, or when a table is refreshed in place.
+
+        Args:
+            number: The number of the page, used for display
+            base_query: The query parameters to keep in the links to other pages
+            after: A cursor for the last row of the previous page
+            before: A cursor for the first row of the next page
+        """
+        after_cursor = decode_cursor(after)
+        before_cursor = decode_cursor(before) if after_cursor is None else None
+
+        if before_cursor is not None:
+            rows = list(
+                self._ordered(reverse=True).filter(self._seek(before_cursor, reverse=True))[
+                    : self.per_page + 1
+                ]
+            )
+            has_previous = len(rows) > self.per_page
+            rows = rows[: self.per_page][::-1]
+            has_next = True
+            if not has_previous:
+                number = 1
+        elif after_cursor is not None:
+            rows = list(self._ordered().filter(self._seek(after_cursor))[: self.per_page + 1])
+            has_next = len(rows) > self.per_page
+            rows = rows[: self.per_page]
+            has_previous = True
+        else:
+            number = min(number, self.num_pages)
+            offset = (number - 1) * self.per_page
+            rows = list(self._ordered()[offset : offset + self.per_page + 1])
+            has_next = len(rows) > self.per_page
+            rows = rows[: self.per_page]
+            has_previous = number > 1
+
+        if not rows and (after_cursor or before_cursor):
+            # The rows around the cursor are gone, fall back to looking the page up by number
+            return self.page(number, base_query)
+
+        return KeysetPage(rows, number, self, base_query, has_next, has_previous)
+
+    def _ordered(self, reverse: bool = False) -> QuerySet:
+        """Order the rows by the sort column and primary key."""
+        if self.descending != reverse:
+            return self._sortable.order_by(F(SORT_KEY).desc(nulls_last=True), "-pk")
+        return self._sortable.order_by(F(SORT_KEY).asc(nulls_first=True), "pk")
+
+    def _seek(self, cursor: tuple[Any, Any], reverse: bool = False) -> Q:
+        """Filter for the rows that come after the cursor in the current ordering."""
+        value, pk = cursor
+        if self.descending != reverse:
+            if value is None:
+                return Q(**{f"{SORT_KEY}__isnull": True, "pk__lt": pk})
+            return (
+                Q(**{f"{SORT_KEY}__lt": value})
+                | Q(**{SORT_KEY: value, "pk__lt": pk})
+                | Q(**{f"{SORT_KEY}__isnull": True})
+            )
+        if value is None:
+            return Q(**{f"{SORT_KEY}__isnull": True, "pk__gt": pk}) | Q(
+                **{f"{SORT_KEY}__isnull": False}
+            )
+        return Q(**{f"{SORT_KEY}__gt": value}) | Q(**{SORT_KEY: value, "pk__gt": pk})
+
+
+class KeysetPage(Sequence):
+    """A page of rows from a :class:`KeysetPaginator`."""
+
+    def __init__(
+        self,
+        object_list: list[Model],
+        number: int,
+        paginator: KeysetPaginator,
+        base_query: QueryDict,
+        has_next: bool,
+        has_previous: bool,
+    ) -> None:
+        self.object_list = object_list
+        self.number = number
+        self.paginator = paginator
+        self.base_query = base_query
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __len__(self) -> int:
+        """Get the number of rows on this page."""
+        return len(self.object_list)
+
+    def __getitem__(self, index: Any) -> Any:
+        """Get a row on this page."""
+        return self.object_list[index]
+
+    def __repr__(self) -> str:
+        """Return a string representation of this page."""
+        return f"<Page {self.number} of {self.num_pages}>"
+
+    def has_next(self) -> bool:
+        """Determine whether there is a page after this one."""
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        """Determine whether there is a page before this one."""
+        return self._has_previous
+
+    def next_page_number(self) -> int:
+        """Get the number of the next page."""
+        return self.number + 1
+
+    def previous_page_number(self) -> int:
+        """Get the number of the previous page."""
+        return max(1, self.number - 1)
+
+    @property
+    def num_pages(self) -> int:
+        """Get the number of pages, corrected with what is known about the rows around this page
+        in case the cached count is out of date.
+        """
+        if not self._has_next:
+            return self.number
+        return max(self.paginator.num_pages, self.number + 1)
+
+    @property
+    def next_page_query(self) -> str:
+        """Get the query string to request the next page."""
+        last = self.object_list[-1]
+        return self._page_query(
+            self.next_page_number(),
+            QueryParameters.PAGINATE_AFTER_QUERY_NAME,
+            encode_cursor(getattr(last, SORT_KEY), last.pk),
+        )
+
+    @property
+    def previous_page_query(self) -> str:
+        """Get the query string to request the previous page."""
+        if self.previous_page_number() == 1:
+            # The first page is always the same, no need for a cursor
+            return self._page_query(1)
+        first = self.object_list[0]
+        return self._page_query(
+            self.previous_page_number(),
+            QueryParameters.PAGINATE_BEFORE_QUERY_NAME,
+            encode_cursor(getattr(first, SORT_KEY), first.pk),
+        )
+
+    def _page_query(
+        self, number: int, cursor_name: Optional[str] = None, cursor: Optional[str] = None
+    ) -> str:
+        query = self.base_query.copy()
+        query[QueryParameters.PAGINATE_QUERY_NAME] = str(number)
+        if cursor_name and cursor:
+            query[cursor_name] = cursor
+        return query.urlencode()
+
 
 def paginated_table_view(
     request: HttpRequest,
@@ -17,14 +285,21 @@ def paginated_table_view(
     target_id: str,
     paginate_url: str,
     extra_context: Optional[dict[str, Any]] = None,
+    *,
+    order_field: str = "pk",
 ) -> HttpResponse:
     """Define a generic function to render paginated tables. Request must be made by HTMX, or else
     a 400 Error is returned.
+
+    Tables are paginated with a :class:`KeysetPaginator`, so the queryset should not be ordered;
+    the field to order by is passed as ``order_field`` instead.
     """
     if not request.htmx:
         return HttpResponse(status=400)
 
-    paginator = Paginator(queryset, SiteSetting.get_value_int(SiteSettingKey.PAGINATE_BY))
+    paginator = KeysetPaginator(
+        queryset, order_field, SiteSetting.get_value_int(SiteSettingKey.PAGINATE_BY)
+    )
     page_num = request.GET.get(QueryParameters.PAGINATE_QUERY_NAME, 1)
 
     try:
@@ -34,12 +309,21 @@ def paginated_table_view(
 
     if page_num < 1:
         page_num = 1
-    elif page_num > paginator.num_pages:
-        page_num = paginator.num_pages
+
+    base_query = request.GET.copy()
+    for name in _PAGE_PARAMETERS:
+        base_query.pop(name, None)
+
+    page = paginator.page(
+        page_num,
+        base_query,
+        after=request.GET.get(QueryParameters.PAGINATE_AFTER_QUERY_NAME),
+        before=request.GET.get(QueryParameters.PAGINATE_BEFORE_QUERY_NAME),
+    )
 
     context = {
-        "page": paginator.get_page(page_num),
-        "page_num": page_num,
+        "page": page,
+        "page_num": page.number,
         "target_id": target_id,
         "paginate_url": paginate_url,
         **(extra_context or {}),
@@ -0,0 +1,131 @@
+"""Storage for the state of the submission form wizard, kept in Redis.
+
+With the default session storage, the whole state of the wizard is serialized into the user's
+session, and every step of the form reads and writes the full state to the ``django_session``
+table. :class:`RedisStorage` keeps the state in a Redis hash instead, with one field for the data
+of each step. A step costs one read of the hash when the state is first used, and one pipeline
+that writes only the fields that changed and renews the expiry of the hash.
+
+The storage is used when the :ref:`SUBMISSION_FORM_STORAGE` setting is ``redis``.
+"""
+
+import json
+from typing import Any, Optional
+
+import django_rq
+from django.conf import settings
+from django.http import HttpResponse
+from formtools.wizard.storage.base import BaseStorage
+
+KEY_PREFIX = "wizard"
+
+
+def get_storage_timeout() -> int:
+    """Get the number of seconds the state of a wizard is kept after the last step. The state is
+    kept as long as an upload session, or as long as the session cookie if upload sessions do not
+    expire.
+    """
+    minutes = settings.UPLOAD_SESSION_EXPIRE_AFTER_INACTIVE_MINUTES
+    if minutes == -1:
+        return settings.SESSION_COOKIE_AGE
+    return minutes * 60
+
+
+class RedisStorage(BaseStorage):
+    """Wizard storage that keeps the state of each user's wizard in a Redis hash."""
+
+    step_data_field_prefix = "step_data:"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._data: Optional[dict] = None
+        self._saved_fields: dict[str, str] = {}
+
+    @property
+    def key(self) -> str:
+        """The Redis key of the hash for the current session and wizard."""
+        session = self.request.session
+        if session.session_key is None:
+            session.save()
+        return f"{KEY_PREFIX}:{session.session_key}:{self.prefix}"
+
+    def _get_data(self) -> dict:
+        if self._data is None:
+            fields = {
+                _decode(field): _decode(value)
+                for field, value in django_rq.get_connection().hgetall(self.key).items()
+            }
+            self._saved_fields = fields
+            if fields:
+                self._data = self._load_fields(fields)
+            else:
+                self.init_data()
+        return self._data
+
+    def _set_data(self, value: dict) -> None:
+        self._data = value
+
+    data = property(_get_data, _set_data)
+
+    def _load_fields(self, fields: dict[str, str]) -> dict:
+        data = {
+            self.step_key: None,
+            self.step_data_key: {},
+            self.step_files_key: {},
+            self.extra_data_key: {},
+        }
+        for field, value in fields.items():
+            if field.startswith(self.step_data_field_prefix):
+                step = field.removeprefix(self.step_data_field_prefix)
+                data[self.step_data_key][step] = json.loads(value)
+            else:
+                data[field] = json.loads(value)
+        return data
+
+    def _dump_fields(self, data: dict) -> dict[str, str]:
+        fields = {
+            field: json.dumps(data.get(field), separators=(",", ":"))
+            for field in (self.step_key, self.step_files_key, self.extra_data_key)
+        }
+        for step, step_data in (data.get(self.step_data_key) or {}).items():
+            fields[self.step_data_field_prefix + step] = json.dumps(
+                step_data, separators=(",", ":")
+            )
+        return fields
+
+    def save(self) -> None:
+        """Write the fields of the state that changed since it was read, and renew the expiry of
+        the hash. The hash is removed if the wizard was reset to its initial state.
+        """
+        if self._data is None:
+            return
+
+        fields = self._dump_fields(self._data)
+        pipeline = django_rq.get_connection().pipeline(transaction=False)
+        if not any(self._data.values()):
+            pipeline.delete(self.key)
+            fields = {}
+        else:
+            changed = {
+                field: value
+                for field, value in fields.items()
+                if self._saved_fields.get(field) != value
+            }
+            removed = [field for field in self._saved_fields if field not in fields]
+            if changed:
+                pipeline.hset(self.key, mapping=changed)
+            if removed:
+                pipeline.hdel(self.key, *removed)
+            pipeline.expire(self.key, get_storage_timeout())
+        pipeline.execute()
+        self._saved_fields = fields
+
+    def update_response(self, response: HttpResponse) -> Any:
+        """Save the state of the wizard after the view has handled the request."""
+        result = super().update_response(response)
+        self.save()
+        return result
+
+
+def _decode(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else value
@@ -4,7 +4,8 @@ from typing import Callable, Sequence
 
 from django.contrib import admin
 from django.contrib.admin import display
-from django.http import HttpRequest
+from django.db.models import QuerySet
+from django.http import HttpRequest, HttpResponse
 from django.urls import reverse
 from django.utils.formats import date_format
 from django.utils.html import format_html
@@ -13,6 +14,7 @@ from django.utils.timezone import localtime
 from django.utils.translation import gettext_lazy as _
 from utility import get_human_readable_size
 
+from .budget import get_temp_storage_budget, get_upload_storage_budget
 from .models import BaseUploadedFile, PermUploadedFile, TempUploadedFile, UploadSession
 
 
@@ -41,6 +43,24 @@ def linkify(field_name: str) -> Callable:
     return admin.display(description=field_name.replace("_", " "))(_linkify)
 
 
+# Sessions in these states are moving files around, so their file stats are not meaningful
+UNSTABLE_SESSION_STATUSES = (
+    UploadSession.SessionStatus.COPYING_IN_PROGRESS,
+    UploadSession.SessionStatus.REMOVING_IN_PROGRESS,
+)
+
+
+def format_file_count(session: UploadSession, stored_file_count: int) -> str:
+    """Display the file count annotated by :meth:`UploadSessionManager.file_stats` for a session,
+    the same way as :attr:`UploadSession.file_count` would be displayed.
+    """
+    if session.status in UNSTABLE_SESSION_STATUSES:
+        return str(_("N/A"))
+    if session.status == UploadSession.SessionStatus.EXPIRED:
+        return "0"
+    return str(stored_file_count)
+
+
 class BaseUploadedFileAdminMixin:
     """Adds functions for rendering extra fields for uploaded files."""
 
@@ -49,6 +69,8 @@ class BaseUploadedFileAdminMixin:
         """Format file size of an BaseUploadedFile instance for display."""
         if not obj.file_upload or not obj.exists:
             return _("N/A")
+        if obj.file_size is not None:
+            return get_human_readable_size(obj.file_size, 1000, 2)
         return get_human_readable_size(int(obj.file_upload.size), 1000, 2)
 
     @display(description=_("File Link"))
@@ -222,6 +244,43 @@ class UploadSessionAdmin(admin.ModelAdmin):
         "-started_at",
     ]
 
+    list_select_related: bool | Sequence[str] = ["user"]
+
+    change_list_template = "admin/uploadsession_change_list.html"
+
+    def changelist_view(
+        self, request: HttpRequest, extra_context: dict | None = None
+    ) -> HttpResponse:
+        """Show the free space and headroom of the storage volumes above the list of sessions."""
+        extra_context = extra_context or {}
+        storage_usage = []
+        for label, budget in (
+            (_("Temporary storage"), get_temp_storage_budget()),
+            (_("Permanent storage"), get_upload_storage_budget()),
+        ):
+            try:
+                usage = budget.get_usage()
+            except OSError:
+                continue
+            storage_usage.append(
+                {
+                    "label": label,
+                    "free": get_human_readable_size(usage.free, 1000, 2),
+                    "total": get_human_readable_size(usage.total, 1000, 2),
+                    "reserved": get_human_readable_size(usage.reserved, 1000, 2),
+                    "headroom": get_human_readable_size(usage.headroom, 1000, 2),
+                    "full": usage.full,
+                }
+            )
+        extra_context["storage_usage"] = storage_usage
+        return super().changelist_view(request, extra_context)
+
+    def get_queryset(self, request: HttpRequest) -> QuerySet:
+        """Annotate the file count and upload size of each session, so that they are not computed
+        from the file system for each row.
+        """
+        return super().get_queryset(request).annotate(**UploadSession.objects.file_stats())
+
     def has_add_permission(self, request: HttpRequest) -> bool:
         """Determine whether add permission is granted for this model admin."""
         return False
@@ -251,22 +310,16 @@ class UploadSessionAdmin(admin.ModelAdmin):
 
     def file_count(self, obj: UploadSession) -> str:
         """Display the number of files uploaded to the session."""
-        file_count = None
-        try:
-            file_count = obj.file_count
-        except ValueError:
-            file_count = _("N/A")
-        return str(file_count)
+        return format_file_count(obj, obj.stored_file_count)
 
     @display(description=_("Upload Size"))
     def upload_size(self, obj: UploadSession) -> str | None:
         """Display the total upload size for the session."""
-        upload_size = None
-        try:
-            upload_size = get_human_readable_size(obj.upload_size, 1000, 2)
-        except ValueError:
-            upload_size = _("N/A")
-        return upload_size
+        if obj.status in UNSTABLE_SESSION_STATUSES:
+            return _("N/A")
+        if obj.status == UploadSession.SessionStatus.EXPIRED:
+            return get_human_readable_size(0, 1000, 2)
+        return get_human_readable_size(obj.stored_upload_size, 1000, 2)
 
     @display(description=_("Last upload at"))
     def last_upload_at(self, obj: UploadSession) -> str:
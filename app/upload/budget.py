@@ -0,0 +1,201 @@
+"""Admission control for the disk space of local storage folders.
+
+Uploads and bag jobs write to the :ref:`TEMP_STORAGE_FOLDER`, and a few large jobs could fill the
+volume and make every upload that is being written at the same time fail. Before writing, work
+reserves the number of bytes it expects to write. Reservations are kept in Redis, so that they are
+shared by every application process and worker, and expire on their own if a process dies without
+releasing them.
+
+A reservation is refused if the used space on the volume plus all reservations would go past the
+:ref:`STORAGE_BUDGET_HIGH_WATERMARK_PERCENT`. Once the used space and reservations go past the high
+watermark, every reservation is refused until they fall below the
+:ref:`STORAGE_BUDGET_LOW_WATERMARK_PERCENT`, so that work is not admitted and refused in turn while
+the volume is nearly full.
+"""
+
+import dataclasses
+import logging
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import django_rq
+from django.conf import settings
+from redis import Redis
+from redis.exceptions import RedisError
+
+LOGGER = logging.getLogger(__name__)
+
+KEY_PREFIX = "storage-budget"
+
+
+@dataclasses.dataclass(frozen=True)
+class DiskUsage:
+    """The space on a volume, and how much of it is reserved."""
+
+    total: int
+    free: int
+    reserved: int
+    full: bool
+
+    @property
+    def used(self) -> int:
+        """The number of bytes in use on the volume."""
+        return self.total - self.free
+
+    @property
+    def capacity(self) -> int:
+        """The number of bytes that can be used on the volume before the high watermark."""
+        return self.total * settings.STORAGE_BUDGET_HIGH_WATERMARK_PERCENT // 100
+
+    @property
+    def headroom(self) -> int:
+        """The number of bytes that can still be reserved."""
+        if self.full:
+            return 0
+        return max(0, self.capacity - self.used - self.reserved)
+
+
+@dataclasses.dataclass
+class Reservation:
+    """Space reserved in a :class:`StorageBudget`. The reservation has no ID if it is not tracked,
+    e.g., when the budget is disabled.
+    """
+
+    budget: "StorageBudget"
+    id: Optional[str]
+    num_bytes: int
+
+    def release(self) -> None:
+        """Release the reserved space."""
+        if self.id:
+            self.budget.release(self.id)
+            self.id = None
+
+
+class StorageBudget:
+    """Tracks the space reserved on the volume a folder is on.
+
+    Folders on the same volume share their reservations.
+
+    Args:
+        folder: A folder on the volume
+    """
+
+    def __init__(self, folder: str | Path) -> None:
+        self.folder = Path(folder)
+
+    @property
+    def key(self) -> str:
+        """The Redis key the reservations for the volume are stored in."""
+        return f"{KEY_PREFIX}:{os.stat(self.folder).st_dev}"
+
+    def _get_space(self) -> tuple[int, int]:
+        stats = os.statvfs(self.folder)
+        return stats.f_blocks * stats.f_frsize, stats.f_bavail * stats.f_frsize
+
+    def _get_reserved(self, connection: Redis) -> int:
+        """Sum the reservations on the volume, removing the ones that have expired."""
+        reserved = 0
+        expired = []
+        now = time.time()
+        for reservation_id, value in connection.hgetall(self.key).items():
+            num_bytes, expires_at = value.split(b":")
+            if float(expires_at) < now:
+                expired.append(reservation_id)
+            else:
+                reserved += int(num_bytes)
+        if expired:
+            connection.hdel(self.key, *expired)
+        return reserved
+
+    def get_usage(self) -> DiskUsage:
+        """Get the space on the volume, and how much of it is reserved."""
+        total, free = self._get_space()
+        if not settings.STORAGE_BUDGET_ENABLED:
+            return DiskUsage(total, free, 0, False)
+        try:
+            connection = django_rq.get_connection()
+            return DiskUsage(
+                total,
+                free,
+                self._get_reserved(connection),
+                bool(connection.exists(f"{self.key}:full")),
+            )
+        except RedisError as exc:
+            LOGGER.warning("Could not read storage reservations: %s", exc)
+            return DiskUsage(total, free, 0, False)
+
+    def reserve(self, num_bytes: int, timeout: Optional[int] = None) -> Optional[Reservation]:
+        """Reserve space on the volume.
+
+        If Redis can not be reached, the reservation is not tracked, and is only refused if the
+        volume itself does not have room for it.
+
+        Args:
+            num_bytes: The number of bytes to reserve
+            timeout: The number of seconds after which the reservation expires if it is not
+                released. Defaults to :ref:`STORAGE_BUDGET_RESERVATION_TIMEOUT_SECONDS`
+
+        Returns:
+            The reservation, or None if there is not enough space for it
+        """
+        if not settings.STORAGE_BUDGET_ENABLED:
+            return Reservation(self, None, num_bytes)
+
+        total, free = self._get_space()
+        used = total - free
+        high_watermark = total * settings.STORAGE_BUDGET_HIGH_WATERMARK_PERCENT // 100
+        low_watermark = total * settings.STORAGE_BUDGET_LOW_WATERMARK_PERCENT // 100
+        timeout = timeout or settings.STORAGE_BUDGET_RESERVATION_TIMEOUT_SECONDS
+
+        try:
+            connection = django_rq.get_connection()
+            reservation_id = uuid.uuid4().hex
+            # The reservation is added before the space is checked, so that two processes
+            # reserving at the same time never both fit into the last of the space
+            connection.hset(self.key, reservation_id, f"{num_bytes}:{time.time() + timeout}")
+            committed = used + self._get_reserved(connection)
+            full_key = f"{self.key}:full"
+            full = bool(connection.exists(full_key))
+
+            if full and committed - num_bytes < low_watermark:
+                connection.delete(full_key)
+                full = False
+            if committed - num_bytes >= high_watermark:
+                connection.set(full_key, 1)
+                full = True
+
+            if not full and committed <= high_watermark:
+                return Reservation(self, reservation_id, num_bytes)
+
+            connection.hdel(self.key, reservation_id)
+
+        except RedisError as exc:
+            LOGGER.warning("Could not reserve storage space: %s", exc)
+            if used + num_bytes <= high_watermark:
+                return Reservation(self, None, num_bytes)
+
+        LOGGER.warning(
+            "Refused to reserve %d bytes in %s, the volume is too full", num_bytes, self.folder
+        )
+        return None
+
+    def release(self, reservation_id: str) -> None:
+        """Release a reservation made with :meth:`reserve`."""
+        try:
+            django_rq.get_connection().hdel(self.key, reservation_id)
+        except RedisError as exc:
+            LOGGER.warning("Could not release storage reservation: %s", exc)
+
+
+def get_temp_storage_budget() -> StorageBudget:
+    """Get the budget for the volume the :ref:`TEMP_STORAGE_FOLDER` is on."""
+    return StorageBudget(settings.TEMP_STORAGE_FOLDER)
+
+
+def get_upload_storage_budget() -> StorageBudget:
+    """Get the budget for the volume the :ref:`UPLOAD_STORAGE_FOLDER` is on."""
+    return StorageBudget(settings.UPLOAD_STORAGE_FOLDER)
@@ -3,7 +3,7 @@
 import contextlib
 import urllib.parse
 from pathlib import Path
-from typing import TYPE_CHECKING, Union
+from typing import TYPE_CHECKING, Optional, Union
 
 from django.conf import settings
 from django.core.files.uploadedfile import UploadedFile
@@ -13,6 +13,7 @@ from utility import bytes_to_mb, mb_to_bytes
 
 from upload.constants import WindowsFileRestrictions
 from upload.mime import MAGIC_AVAILABLE, mime
+from upload.policy import get_file_policy
 
 # This is to avoid a circular import
 if TYPE_CHECKING:
@@ -41,17 +42,29 @@ def accept_file(filename: str, filesize: int, file: UploadedFile) -> dict:
         False if not. The dictionary also contains an 'error' and 'verboseError' key if 'accepted'
         is False.
     """
-    validators = [
-        _validate_file_size,
-        _validate_basic_filename,
-        _validate_filename_characters,
-        _validate_absolute_paths,
-        _validate_path_traversal,
-        _validate_windows_reserved_names,
-        _validate_file_extension,
-        _validate_mime_type,
-    ]
+    return _run_validators([*FILE_INFO_VALIDATORS, _validate_mime_type], filename, filesize, file)
 
+
+def accept_file_info(filename: str, filesize: int) -> dict:
+    """Determine if a new file should be accepted, before its contents are available.
+
+    This applies all the checks in :func:`accept_file` except for the MIME type check. It is used
+    to reject a file before a client uploads it directly to storage; the file is checked again
+    with :func:`accept_file` once it has been uploaded.
+
+    Args:
+        filename: The name of the file to check
+        filesize: The size of the file in bytes, as reported by the client
+
+    Returns:
+        The same dictionary returned by :func:`accept_file`
+    """
+    return _run_validators(FILE_INFO_VALIDATORS, filename, filesize, None)
+
+
+def _run_validators(
+    validators: list, filename: str, filesize: int, file: Optional[UploadedFile]
+) -> dict:
     for validator in validators:
         result = validator(filename, filesize, file)
         if not result["accepted"]:
@@ -198,39 +211,28 @@ def _validate_path_traversal(filename: str, filesize: int, file: UploadedFile) -
     with contextlib.suppress(Exception):
         decoded_filename = urllib.parse.unquote(filename)
 
-    traversal_patterns = [
-        "..",
-        "/",
-        "\\",
-        "%2e%2e",  # URL encoded ..
-        "%2f",  # URL encoded /
-        "%5c",  # URL encoded \\
-        "%252e%252e",  # Double URL encoded ..
-        "%252f",  # Double URL encoded /
-        "%255c",  # Double URL encoded \\
-    ]
-
-    # Create a set, since decoded filename might be the same as the filename
-    check_files = {decoded_filename.lower(), filename.lower()}
-
-    for pattern in traversal_patterns:
-        if any(pattern in file for file in check_files):
-            return {
-                "accepted": False,
-                "error": _("Filename contains invalid path characters"),
-                "verboseError": _(
-                    'Filename "%(filename)s" contains invalid character pattern: "%(pattern)s"'
-                )
-                % {"filename": filename, "pattern": pattern},
-            }
+    policy = get_file_policy()
+    pattern = policy.find_traversal_pattern(filename.lower())
+    if pattern is None and decoded_filename != filename:
+        pattern = policy.find_traversal_pattern(decoded_filename.lower())
+
+    if pattern is not None:
+        return {
+            "accepted": False,
+            "error": _("Filename contains invalid path characters"),
+            "verboseError": _(
+                'Filename "%(filename)s" contains invalid character pattern: "%(pattern)s"'
+            )
+            % {"filename": filename, "pattern": pattern},
+        }
 
     return {"accepted": True}
 
 
 def _validate_windows_reserved_names(filename: str, filesize: int, file: UploadedFile) -> dict:
     """Validate filename doesn't use Windows reserved names."""
-    base_name = filename.split(".")[0].upper()
-    if base_name in WindowsFileRestrictions.RESERVED_FILENAMES:
+    reserved = get_file_policy().find_reserved_name(filename)
+    if reserved is not None:
         return {
             "accepted": False,
             "error": _("Filename uses reserved system name"),
@@ -239,7 +241,7 @@ def _validate_windows_reserved_names(filename: str, filesize: int, file: Uploade
             )
             % {
                 "filename": filename,
-                "reserved": base_name,
+                "reserved": reserved,
             },
         }
 
@@ -249,8 +251,9 @@ def _validate_windows_reserved_names(filename: str, filesize: int, file: Uploade
 def _validate_file_extension(filename: str, filesize: int, file: UploadedFile) -> dict:
     """Validate that file extension exists, and is allowed."""
     # Check extension exists
-    name_split = filename.split(".")
-    if len(name_split) == 1:
+    policy = get_file_policy()
+    extension = policy.get_extension(filename)
+    if extension is None:
         return {
             "accepted": False,
             "error": gettext("File is missing an extension."),
@@ -259,12 +262,7 @@ def _validate_file_extension(filename: str, filesize: int, file: UploadedFile) -
         }
 
     # Check extension is allowed
-    extension = name_split[-1].lower()
-    if not any(
-        extension == accepted_extension.lower()
-        for accepted_extensions in settings.ACCEPTED_FILE_FORMATS.values()
-        for accepted_extension in accepted_extensions
-    ):
+    if not policy.is_accepted_extension(extension):
         return {
             "accepted": False,
             "error": gettext('Files with "%(extension)s" extension are not allowed.')
@@ -281,7 +279,8 @@ def _validate_file_extension(filename: str, filesize: int, file: UploadedFile) -
 def _validate_mime_type(filename: str, filesize: int, file: UploadedFile) -> dict:
     """Check if the file's MIME type matches the expected MIME type for its extension.
 
-    Only performs validation if magic library is available.
+    Only performs validation if magic library is available. The detected MIME type is set on the
+    file as ``detected_mime_type``.
     """
     # If magic library is not available, skip MIME type validation
     if not MAGIC_AVAILABLE:
@@ -290,7 +289,7 @@ def _validate_mime_type(filename: str, filesize: int, file: UploadedFile) -> dic
     extension = Path(filename).suffix.lower().lstrip(".")
 
     # Get expected MIME types for this extension
-    expected_mime_types = mime.guess(extension)
+    expected_mime_types = get_file_policy().get_mime_types(extension)
     if not expected_mime_types:
         return {
             "accepted": False,
@@ -314,6 +313,9 @@ def _validate_mime_type(filename: str, filesize: int, file: UploadedFile) -> dic
             % {"filename": filename},
         }
 
+    # Keep the detected MIME type, so that it can be stored with the file
+    file.detected_mime_type = detected_mime_type
+
     # Check if detected MIME type matches any expected MIME type
     if detected_mime_type not in expected_mime_types:
         return {
@@ -377,3 +379,15 @@ def _validate_file_size(filename: str, filesize: int, file: UploadedFile) -> dic
         }
 
     return {"accepted": True}
+
+
+# Checks that only need the name and size of a file
+FILE_INFO_VALIDATORS = [
+    _validate_file_size,
+    _validate_basic_filename,
+    _validate_filename_characters,
+    _validate_absolute_paths,
+    _validate_path_traversal,
+    _validate_windows_reserved_names,
+    _validate_file_extension,
+]
@@ -1,16 +1,24 @@
 """Malware and virus scanning with ClamAV."""
 
 import logging
+import time
 from typing import BinaryIO, Optional, cast
 
 from clamav_client import clamd
 from django.core.exceptions import ValidationError
 from django.core.files import File
+from utility.metrics import Histogram
 
 from . import settings
 
 LOGGER = logging.getLogger(__name__)
 
+SCAN_SECONDS = Histogram(
+    "clamav_scan_seconds",
+    "Time taken to scan a file for malware with ClamAV, by result.",
+    ("result",),
+)
+
 
 def get_clamd_socket() -> Optional[clamd.ClamdNetworkSocket]:
     """Return a socket that can be used to communicate with clamd over the network.
@@ -44,17 +52,22 @@ def check_for_malware(file: File) -> None:
 
     file.seek(0)
 
+    start = time.perf_counter()
+    result = "error"
     try:
         output = socket.instream(cast(BinaryIO, file))
         status, reason = output["stream"]
 
         if status != "OK":
+            result = "malware"
             LOGGER.warning(
                 "The given file contains Malware! Status: %s, Reason: %s", status, reason
             )
             raise ValidationError(f"File contained malware. Reason: {reason}")
+        result = "clean"
 
     except clamd.BufferTooLongError as exc:
+        result = "too_large"
         LOGGER.error(
             "File is too large to be read by ClamAV! %d bytes were read", file.tell(), exc_info=exc
         )
@@ -66,5 +79,8 @@ def check_for_malware(file: File) -> None:
             "Unable to scan file for malware due to scanner communication error"
         ) from exc
 
+    finally:
+        SCAN_SECONDS.observe(time.perf_counter() - start, result=result)
+
     # Return file pointer to beginning
     file.seek(0)
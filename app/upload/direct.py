@@ -0,0 +1,106 @@
+"""Uploads that clients send directly to the temp storage, instead of through the application.
+
+When :ref:`DIRECT_UPLOAD_ENABLED` is True and files are kept in an object store, the client asks
+the application to start a multipart upload for each file, and is given presigned URLs to upload
+the parts of the file to. Once all the parts are uploaded, the client asks the application to
+complete the upload, and the file is checked the same way as any other uploaded file before it is
+added to the upload session. The bytes of the file never pass through the application, so upload
+throughput is limited by the object store, not by the number of application workers.
+"""
+
+from typing import Any, Optional
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import Storage
+from django.core.files.uploadedfile import UploadedFile
+
+from .handlers import SNIFF_BUFFER_SIZE
+from .models import TempUploadedFile, UploadSession, session_upload_location
+from .storage import get_temp_file_storage
+
+DIRECT_UPLOAD_SALT = "upload.direct.upload"
+
+
+def get_direct_upload_storage() -> Optional[Storage]:
+    """Get the storage clients upload files to directly.
+
+    Returns:
+        The temp file storage, or None if direct uploads are disabled or the storage does not
+        support them
+    """
+    if not settings.DIRECT_UPLOAD_ENABLED:
+        return None
+    storage = get_temp_file_storage()
+    if not hasattr(storage, "create_multipart_upload"):
+        return None
+    return storage
+
+
+def start_direct_upload(
+    storage: Storage, session: UploadSession, file_name: str, content_type: str
+) -> dict[str, str]:
+    """Start a multipart upload of a file to a session.
+
+    Args:
+        storage: The storage from :func:`get_direct_upload_storage`
+        session: The session the file is being uploaded to
+        file_name: The name of the file
+        content_type: The content type of the file, as reported by the client
+
+    Returns:
+        The ``uploadId`` of the multipart upload, and an opaque ``key`` the client sends back
+        with every request about the upload
+    """
+    stored_name, upload_id = storage.create_multipart_upload(
+        session_upload_location(TempUploadedFile(session=session), file_name), content_type
+    )
+    key = signing.dumps(
+        {
+            "session": session.token,
+            "upload_id": upload_id,
+            "stored_name": stored_name,
+            "name": file_name,
+            "content_type": content_type,
+        },
+        salt=DIRECT_UPLOAD_SALT,
+    )
+    return {"uploadId": upload_id, "key": key}
+
+
+def read_direct_upload_key(
+    key: str, session: UploadSession, upload_id: str
+) -> Optional[dict[str, Any]]:
+    """Read a key created by :func:`start_direct_upload`.
+
+    Returns:
+        The ``stored_name``, ``name``, and ``content_type`` of the file being uploaded, or None if
+        the key is invalid or was not created for this session and upload
+    """
+    try:
+        upload = signing.loads(key, salt=DIRECT_UPLOAD_SALT)
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+    if upload.get("session") != session.token or upload.get("upload_id") != upload_id:
+        return None
+    return upload
+
+
+class DirectUploadedFile(UploadedFile):
+    """A file that a client uploaded directly to the temp storage.
+
+    Only the first bytes of the file are fetched to detect its MIME type. The rest of the file is
+    only downloaded if it needs to be read, e.g., to scan it for malware, and is streamed as it is
+    downloaded.
+
+    Attributes:
+        head (bytes): The first bytes of the file, used to detect its MIME type
+        stored_name (str): The name of the file in the temp storage
+    """
+
+    def __init__(self, storage: Storage, stored_name: str, name: str, content_type: str) -> None:
+        super().__init__(
+            storage.open_stream(stored_name), name, content_type, storage.size(stored_name)
+        )
+        self.stored_name = stored_name
+        self.head = storage.read_head(stored_name, SNIFF_BUFFER_SIZE)
@@ -0,0 +1,206 @@
+"""Upload handlers that stream uploaded files to their final storage location."""
+
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile, UploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.http import QueryDict
+from django.utils.datastructures import MultiValueDict
+from utility.metrics import Counter, Histogram
+
+from .budget import Reservation, get_temp_storage_budget
+
+LOGGER = logging.getLogger(__name__)
+
+# Number of bytes from the start of a file kept in memory for MIME type detection
+SNIFF_BUFFER_SIZE = 2048
+
+# Name of the directory under TEMP_STORAGE_FOLDER that files are streamed to while they are being
+# received
+PARTIAL_UPLOAD_DIRECTORY = ".partial"
+
+TEMP_WRITE_SECONDS = Histogram(
+    "upload_temp_write_seconds",
+    "Time taken to receive an uploaded file and write it to the temp storage.",
+)
+TEMP_WRITTEN_BYTES = Counter(
+    "upload_temp_written_bytes_total",
+    "Bytes of uploaded files written to the temp storage while they were received.",
+)
+
+
+def get_partial_upload_folder() -> Path:
+    """Get the folder that files are streamed to while they are being received, creating it if it
+    does not exist.
+    """
+    folder = Path(settings.TEMP_STORAGE_FOLDER) / PARTIAL_UPLOAD_DIRECTORY
+    folder.mkdir(parents=True, exist_ok=True)
+    return folder
+
+
+class SessionTemporaryUploadedFile(TemporaryUploadedFile):
+    """A file streamed to a provisional name in the :ref:`TEMP_STORAGE_FOLDER`.
+
+    Because the file is already on the same file system as the temp storage, saving it to a
+    :class:`~upload.storage.TempFileStorage` renames it into place instead of copying it.
+
+    Attributes:
+        head (bytes): The first bytes of the file, used to detect its MIME type
+        sha256 (str): The SHA-256 hex digest of the file, set once the file is complete
+    """
+
+    def __init__(
+        self,
+        name: str,
+        content_type: str,
+        size: int,
+        charset: Optional[str],
+        content_type_extra: Optional[dict] = None,
+    ) -> None:
+        _, ext = os.path.splitext(name)
+        file = tempfile.NamedTemporaryFile(  # noqa: SIM115 - closed by UploadedFile.close
+            suffix=".part" + ext, dir=get_partial_upload_folder()
+        )
+        # Skip TemporaryUploadedFile.__init__, which would create the file in FILE_UPLOAD_TEMP_DIR
+        super(TemporaryUploadedFile, self).__init__(
+            file, name, content_type, size, charset, content_type_extra
+        )
+        self.head = b""
+        self.sha256 = ""
+
+
+class SessionFileUploadHandler(TemporaryFileUploadHandler):
+    """Stream uploaded files directly into the :ref:`TEMP_STORAGE_FOLDER`.
+
+    Django's :class:`~django.core.files.uploadhandler.TemporaryFileUploadHandler` writes large
+    uploads to the system temp directory, which is usually on a different file system than the
+    media directory, so the file is copied a second time when it is added to an upload session.
+    This handler writes the file next to where it will be stored instead, so that it is moved with
+    a rename once it is accepted. The SHA-256 digest and the first bytes of the file are computed
+    while the file is received, so the file does not need to be read again for them.
+
+    Space for the whole request body is reserved in the temp storage's
+    :class:`~upload.budget.StorageBudget` before any of it is written. If there is not enough
+    space, the body is not read, no files are received, and ``upload_storage_full`` is set on the
+    request. The reservation is released once the body has been received or the upload is
+    interrupted. Since Django calls neither hook if parsing the body raises an error, views that
+    use this handler must also call :meth:`release_reservation` once they are done with the
+    request.
+
+    This handler is only used by the views that receive files for an upload session, see
+    :func:`~upload.views.upload_or_list_files`.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.reservation: Optional[Reservation] = None
+
+    def handle_raw_input(
+        self,
+        input_data: object,
+        META: dict,
+        content_length: int,
+        boundary: bytes,
+        encoding: Optional[str] = None,
+    ) -> Optional[tuple[QueryDict, MultiValueDict]]:
+        """Reserve space for the request body, or stop the upload if there is not enough space."""
+        self.reservation = get_temp_storage_budget().reserve(content_length)
+        if self.reservation is None:
+            if self.request is not None:
+                self.request.upload_storage_full = True
+            return QueryDict(encoding=encoding), MultiValueDict()
+        return None
+
+    def new_file(self, *args, **kwargs) -> None:
+        """Create the provisional file that incoming data is written to."""
+        super(TemporaryFileUploadHandler, self).new_file(*args, **kwargs)
+        self.file = SessionTemporaryUploadedFile(
+            self.file_name, self.content_type, 0, self.charset, self.content_type_extra
+        )
+        self.hasher = hashlib.sha256()
+        self.started_at = time.perf_counter()
+
+    def receive_data_chunk(self, raw_data: bytes, start: int) -> None:
+        """Write a chunk of data to the file, and feed it to the hasher and sniff buffer."""
+        self.file.write(raw_data)
+        self.hasher.update(raw_data)
+        if len(self.file.head) < SNIFF_BUFFER_SIZE:
+            self.file.head += raw_data[: SNIFF_BUFFER_SIZE - len(self.file.head)]
+
+    def file_complete(self, file_size: int) -> SessionTemporaryUploadedFile:
+        """Finish receiving the file."""
+        self.file.sha256 = self.hasher.hexdigest()
+        TEMP_WRITE_SECONDS.observe(time.perf_counter() - self.started_at)
+        TEMP_WRITTEN_BYTES.inc(file_size)
+        return super().file_complete(file_size)
+
+    def upload_complete(self) -> None:
+        """Release the reserved space, since the received files now take up the space."""
+        self.release_reservation()
+
+    def upload_interrupted(self) -> None:
+        """Remove the partial file and release the reserved space."""
+        super().upload_interrupted()
+        self.release_reservation()
+
+    def release_reservation(self) -> None:
+        """Release the space reserved for the request body, if it has not been released yet."""
+        if self.reservation:
+            self.reservation.release()
+            self.reservation = None
+
+
+class OffloadedUploadedFile(UploadedFile):
+    """A file whose upload request body was written to the :ref:`UPLOAD_OFFLOAD_FOLDER` by NGINX.
+
+    Like a :class:`SessionTemporaryUploadedFile`, saving this file to a
+    :class:`~upload.storage.TempFileStorage` renames it into place.
+
+    Attributes:
+        head (bytes): The first bytes of the file, used to detect its MIME type
+    """
+
+    def __init__(self, path: Path, name: str, content_type: str) -> None:
+        file = path.open("rb")
+        super().__init__(file, name, content_type, path.stat().st_size)
+        self.head = file.read(SNIFF_BUFFER_SIZE)
+        file.seek(0)
+
+    def temporary_file_path(self) -> str:
+        """Return the full path of this file."""
+        return self.file.name
+
+
+def get_offloaded_file(
+    request_body_file: str, name: str, content_type: str
+) -> Optional[OffloadedUploadedFile]:
+    """Open a request body that NGINX wrote to the :ref:`UPLOAD_OFFLOAD_FOLDER`.
+
+    NGINX and the application may mount the folder at different paths, so only the last part of
+    the path NGINX sends is used to find the file in the folder.
+
+    Args:
+        request_body_file: The path to the request body file, as sent by NGINX
+        name: The name of the uploaded file
+        content_type: The content type of the uploaded file
+
+    Returns:
+        The file, or None if no request body file exists with that name
+    """
+    file_name = Path(request_body_file).name
+    if not file_name or file_name in (".", ".."):
+        return None
+
+    path = Path(settings.UPLOAD_OFFLOAD_FOLDER) / file_name
+    if not path.is_file():
+        LOGGER.warning("The offloaded request body %s does not exist", request_body_file)
+        return None
+
+    return OffloadedUploadedFile(path, name, content_type)
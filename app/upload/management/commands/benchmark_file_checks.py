@@ -0,0 +1,62 @@
+import timeit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from upload.check import accept_file_info
+from upload.policy import FilePolicy, get_file_policy
+
+# A mix of accepted names and names rejected by each of the file name checks
+SAMPLE_FILE_NAMES = (
+    "Annual Report 2024.pdf",
+    "IMG_0001.JPG",
+    "interview-recording.mp3",
+    "budget.final.v2.xlsx",
+    "notes.txt",
+    "archive.tar.gz",
+    "no_extension",
+    "../../etc/passwd.txt",
+    "%2e%2e%2fsecret.pdf",
+    "COM1.txt",
+    "C:/Users/report.docx",
+)
+
+
+class Command(BaseCommand):
+    """Time the checks a file name goes through before it is accepted."""
+
+    help = "Measure how long it takes to check the name and size of one uploaded file"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add arguments to parser."""
+        parser.add_argument(
+            "--number",
+            type=int,
+            default=10000,
+            metavar="TIMES",
+            help="number of times to check each sample file name (default: 10000)",
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Run after arguments are parsed."""
+        number = options["number"]
+        policy = get_file_policy()
+        file_names = list(SAMPLE_FILE_NAMES) * 100
+
+        def check_files() -> None:
+            for file_name in SAMPLE_FILE_NAMES:
+                accept_file_info(file_name, 1024)
+
+        seconds = timeit.timeit(check_files, number=number)
+        self._report("accept_file_info", seconds, number * len(SAMPLE_FILE_NAMES), "file")
+
+        seconds = timeit.timeit(lambda: policy.count_file_types(file_names), number=number // 100)
+        self._report("count_file_types", seconds, number // 100 * len(file_names), "file")
+
+        seconds = timeit.timeit(
+            lambda: FilePolicy(settings.ACCEPTED_FILE_FORMATS), number=number // 100
+        )
+        self._report("FilePolicy", seconds, number // 100, "build")
+
+    def _report(self, name: str, seconds: float, count: int, unit: str) -> None:
+        self.stdout.write(f"{name}: {seconds / max(count, 1) * 1e6:.2f} µs per {unit}")
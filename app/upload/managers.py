@@ -1,13 +1,60 @@
+from typing import Any, Optional
+
 from django.apps import apps
 from django.conf import settings
-from django.db import models
-from django.db.models import Q, query
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, Expression, F, OuterRef, Q, Subquery, Sum, Value, query
+from django.db.models.fields.files import FieldFile
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 
 class UploadSessionManager(models.Manager):
     """Custom manager for UploadSession model."""
 
+    def file_stats(self, session_ref: str = "pk") -> dict[str, Expression]:
+        """Get annotations for the number of uploaded files in a session, and their total size.
+
+        The stats are computed from the file sizes recorded in the database, so the file system is
+        not accessed. Each stat is computed with a subquery so that it can be combined with other
+        annotations without the joins multiplying the results.
+
+        Args:
+            session_ref:
+                The path from the annotated model to the upload session's primary key, e.g.,
+                "upload_session" when annotating a Submission
+
+        Returns:
+            A dict of ``stored_file_count`` and ``stored_upload_size`` expressions, to be passed
+            to ``annotate()``
+        """
+        # Avoiding circular import
+        file_models = [
+            apps.get_model(app_label="upload", model_name="TempUploadedFile"),
+            apps.get_model(app_label="upload", model_name="PermUploadedFile"),
+        ]
+
+        def _aggregate(model: type[models.Model], aggregate: Expression) -> Expression:
+            return Coalesce(
+                Subquery(
+                    model.objects.filter(session=OuterRef(session_ref))
+                    .order_by()
+                    .values("session")
+                    .annotate(value=aggregate)
+                    .values("value"),
+                    output_field=models.BigIntegerField(),
+                ),
+                Value(0),
+            )
+
+        temp_files, perm_files = file_models
+        return {
+            "stored_file_count": _aggregate(temp_files, Count("pk"))
+            + _aggregate(perm_files, Count("pk")),
+            "stored_upload_size": _aggregate(temp_files, Sum("file_size"))
+            + _aggregate(perm_files, Sum("file_size")),
+        }
+
     def get_expirable(self) -> query.QuerySet:
         """Return all expired upload sessions that can be set to EXPIRED.
 
@@ -71,3 +118,54 @@ class UploadSessionManager(models.Manager):
             )
             | Q(status=UploadSession.SessionStatus.EXPIRED),  # type: ignore
         )
+
+
+class FileBlobManager(models.Manager):
+    """Custom manager for FileBlob model."""
+
+    def add_reference(self, sha256: str, source: FieldFile, file_size: Optional[int]) -> Any:
+        """Get the blob with the given contents, storing the contents if no blob has them yet.
+
+        If the blob already exists, its reference count is incremented, and the source file is not
+        copied.
+
+        Args:
+            sha256: The SHA-256 digest of the source file
+            source: The file to store if there is no blob with the same contents
+            file_size: The size of the source file in bytes
+
+        Returns:
+            The FileBlob, with one more reference
+        """
+        with transaction.atomic():
+            blob = self.select_for_update().filter(sha256=sha256).first()
+            if blob is not None:
+                if not blob.exists:
+                    blob.store(source)
+                blob.reference_count = F("reference_count") + 1
+                blob.save()
+                blob.refresh_from_db(fields=["reference_count"])
+                return blob
+
+        blob = self.model(sha256=sha256, file_size=file_size, reference_count=1)
+        blob.store(source)
+        try:
+            with transaction.atomic():
+                blob.save()
+        except IntegrityError:
+            # Another upload stored the same contents at the same time, use that blob instead
+            blob.file_upload.storage.delete(blob.file_upload.name)
+            return self.add_reference(sha256, source, file_size)
+        return blob
+
+    def release(self, blob_id: int) -> None:
+        """Remove a reference to a blob, and delete the blob if nothing refers to it anymore."""
+        with transaction.atomic():
+            blob = self.select_for_update().filter(pk=blob_id).first()
+            if blob is None:
+                return
+            if blob.reference_count > 1:
+                blob.reference_count = F("reference_count") - 1
+                blob.save(update_fields=["reference_count"])
+            else:
+                blob.delete()
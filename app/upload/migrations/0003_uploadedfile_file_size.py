@@ -0,0 +1,38 @@
+# Generated by Django 6.0.9 on 2026-10-18 21:18
+
+from django.db import migrations, models
+
+
+def record_file_sizes(apps, schema_editor) -> None:
+    """Record the size of files that were uploaded before file sizes were stored."""
+    for model_name in ("TempUploadedFile", "PermUploadedFile"):
+        model = apps.get_model("upload", model_name)
+        for uploaded_file in model.objects.filter(file_size__isnull=True).iterator():
+            if not uploaded_file.file_upload:
+                continue
+            try:
+                uploaded_file.file_size = uploaded_file.file_upload.size
+            except (OSError, ValueError):
+                continue
+            uploaded_file.save(update_fields=["file_size"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('upload', '0002_add_archivist_permissions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='permuploadedfile',
+            name='file_size',
+            field=models.PositiveBigIntegerField(blank=True, help_text='Size of the file in bytes, recorded when the file was saved', null=True),
+        ),
+        migrations.AddField(
+            model_name='tempuploadedfile',
+            name='file_size',
+            field=models.PositiveBigIntegerField(blank=True, help_text='Size of the file in bytes, recorded when the file was saved', null=True),
+        ),
+        migrations.RunPython(record_file_sizes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.9 on 2026-10-18 21:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('upload', '0003_uploadedfile_file_size'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='uploadsession',
+            name='token',
+            field=models.CharField(max_length=32, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='uploadsession',
+            index=models.Index(fields=['status', 'last_upload_interaction_time'], name='upload_session_expiry_idx'),
+        ),
+    ]
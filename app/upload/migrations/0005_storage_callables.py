@@ -0,0 +1,25 @@
+# Generated by Django 6.0.9 on 2026-10-18 21:32
+
+import upload.models
+import upload.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('upload', '0004_uploadsession_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='permuploadedfile',
+            name='file_upload',
+            field=models.FileField(null=True, storage=upload.storage.get_uploaded_file_storage, upload_to=''),
+        ),
+        migrations.AlterField(
+            model_name='tempuploadedfile',
+            name='file_upload',
+            field=models.FileField(null=True, storage=upload.storage.get_temp_file_storage, upload_to=upload.models.session_upload_location),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 6.0.9 on 2026-10-18 21:43
+
+import django.db.models.deletion
+import upload.models
+import upload.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('upload', '0005_storage_callables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('file_upload', models.FileField(storage=upload.storage.get_uploaded_file_storage, upload_to=upload.models.blob_location)),
+                ('file_size', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('reference_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'File blob',
+                'verbose_name_plural': 'File blobs',
+            },
+        ),
+        migrations.AddField(
+            model_name='permuploadedfile',
+            name='sha256',
+            field=models.CharField(blank=True, default='', help_text='SHA-256 digest of the file, recorded when the file was uploaded', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='tempuploadedfile',
+            name='sha256',
+            field=models.CharField(blank=True, default='', help_text='SHA-256 digest of the file, recorded when the file was uploaded', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='permuploadedfile',
+            name='blob',
+            field=models.ForeignKey(blank=True, help_text='The stored contents of the file, shared by all files with the same contents', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='uploaded_files', to='upload.fileblob'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0.9 on 2026-10-18 21:55
+
+import mimetypes
+
+from django.db import migrations, models
+
+
+def guess_mime_types(apps, schema_editor) -> None:
+    """Guess the MIME type of files that were uploaded before MIME types were stored."""
+    for model_name in ("TempUploadedFile", "PermUploadedFile"):
+        model = apps.get_model("upload", model_name)
+        for uploaded_file in model.objects.filter(mime_type="").iterator():
+            mime_type = mimetypes.guess_type(uploaded_file.name or "")[0]
+            if mime_type:
+                uploaded_file.mime_type = mime_type
+                uploaded_file.save(update_fields=["mime_type"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('upload', '0006_file_blobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='permuploadedfile',
+            name='mime_type',
+            field=models.CharField(blank=True, default='', help_text='MIME type of the file, detected when the file was uploaded', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='tempuploadedfile',
+            name='mime_type',
+            field=models.CharField(blank=True, default='', help_text='MIME type of the file, detected when the file was uploaded', max_length=255),
+        ),
+        migrations.RunPython(guess_mime_types, migrations.RunPython.noop),
+    ]
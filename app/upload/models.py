@@ -1,16 +1,19 @@
 from __future__ import annotations
 
+import hashlib
 import logging
+import mimetypes
+import os
 import shutil
 from itertools import chain
 from pathlib import Path
-from typing import Optional
+from typing import ClassVar, Optional
 
 from django.conf import settings
 from django.core.files import File
 from django.core.files.uploadedfile import UploadedFile
 from django.db import models, transaction
-from django.db.models.signals import pre_delete
+from django.db.models.signals import post_delete, pre_delete
 from django.dispatch import receiver
 from django.urls import reverse
 from django.utils import timezone
@@ -19,14 +22,22 @@ from django.utils.formats import date_format
 from django.utils.translation import gettext_lazy as _
 from django.utils.translation import ngettext
 from utility import get_human_readable_file_count, get_human_readable_size
+from utility.metrics import Histogram
 
-from .managers import UploadSessionManager
-from .storage import TempFileStorage, UploadedFileStorage
+from .managers import FileBlobManager, UploadSessionManager
+from .policy import get_file_policy
+from .storage import get_temp_file_storage, get_uploaded_file_storage
 
 LOGGER = logging.getLogger(__name__)
 
 User = settings.AUTH_USER_MODEL
 
+MAKE_PERMANENT_SECONDS = Histogram(
+    "upload_make_permanent_seconds",
+    "Time taken to move the files of an upload session from the temp storage to the upload "
+    "storage.",
+)
+
 
 class UploadSession(models.Model):
     """Represents a file upload session. This model is used to track the files that a
@@ -70,7 +81,7 @@ class UploadSession(models.Model):
             """Return the string representation of the session status."""
             return self.name
 
-    token = models.CharField(max_length=32)
+    token = models.CharField(max_length=32, unique=True)
     started_at = models.DateTimeField()
     status = models.CharField(
         max_length=2, choices=SessionStatus.choices, default=SessionStatus.CREATED
@@ -80,6 +91,17 @@ class UploadSession(models.Model):
 
     objects = UploadSessionManager()
 
+    class Meta:
+        """Meta information for the UploadSession model."""
+
+        indexes: ClassVar = [
+            # Used to find sessions to expire or delete
+            models.Index(
+                fields=["status", "last_upload_interaction_time"],
+                name="upload_session_expiry_idx",
+            ),
+        ]
+
     @classmethod
     def new_session(
         cls, user: Optional[User] = None, enforce_limit: bool = False
@@ -240,7 +262,11 @@ class UploadSession(models.Model):
             self.save()
 
     def add_temp_file(self, file: UploadedFile) -> TempUploadedFile:
-        """Add a temporary uploaded file to this session."""
+        """Add a temporary uploaded file to this session.
+
+        If the file has a ``stored_name``, it is already in the temp storage under that name, and
+        is added to the session without being saved again.
+        """
         if self.status not in (self.SessionStatus.CREATED, self.SessionStatus.UPLOADING):
             raise ValueError(
                 f"Cannot add temporary uploaded file to session {self.token} because the session "
@@ -248,7 +274,30 @@ class UploadSession(models.Model):
                 f"{self.SessionStatus.UPLOADING}"
             )
 
-        temp_file = TempUploadedFile(session=self, file_upload=file, name=file.name)
+        stored_name = getattr(file, "stored_name", None)
+        sha256 = getattr(file, "sha256", "")
+        if not sha256 and not stored_name:
+            # Files received in memory or from NGINX were not hashed while they were received
+            hasher = hashlib.sha256()
+            for chunk in file.chunks():
+                hasher.update(chunk)
+            file.seek(0)
+            sha256 = hasher.hexdigest()
+
+        temp_file = TempUploadedFile(
+            session=self,
+            name=file.name,
+            sha256=sha256,
+            mime_type=getattr(file, "detected_mime_type", "")
+            or mimetypes.guess_type(file.name)[0]
+            or "",
+        )
+        if stored_name:
+            # The file was uploaded directly to the temp storage, so it doesn't need to be saved
+            temp_file.file_upload.name = stored_name
+            temp_file.file_size = file.size
+        else:
+            temp_file.file_upload = file
         temp_file.save()
 
         self.touch(save=False)
@@ -372,6 +421,32 @@ class UploadSession(models.Model):
                 f"{self.SessionStatus.STORED}"
             )
 
+    def get_upload_metadata(self) -> list[dict]:
+        """Get the ``name``, ``file_size``, ``mime_type``, and ``sha256`` of each file in this
+        session, in the order they were uploaded.
+
+        The files are chosen the same way as :meth:`get_uploads`, but the metadata is read from the
+        database alone, so the file storage is not accessed to check that each file exists.
+        """
+        if self.status == self.SessionStatus.CREATED:
+            return []
+        elif self.status == self.SessionStatus.UPLOADING:
+            files = self.tempuploadedfile_set  # type: ignore
+        elif self.status == self.SessionStatus.STORED:
+            files = self.permuploadedfile_set  # type: ignore
+        else:
+            raise ValueError(
+                f"Cannot get uploaded files from session {self.token} because the session status "
+                f"is {self.status} and not {self.SessionStatus.UPLOADING} or "
+                f"{self.SessionStatus.STORED}"
+            )
+        return list(
+            files.exclude(file_upload__isnull=True)
+            .exclude(file_upload="")
+            .order_by("pk")
+            .values("name", "file_size", "mime_type", "sha256")
+        )
+
     def remove_temp_uploads(self, save: bool = True) -> None:
         """Remove all temp uploaded files associated with this session."""
         if self.status == self.SessionStatus.REMOVING_IN_PROGRESS:
@@ -408,6 +483,7 @@ class UploadSession(models.Model):
             if save:
                 self.save()
 
+    @MAKE_PERMANENT_SECONDS.time()
     def make_uploads_permanent(self) -> None:
         """Make all temporary uploaded files associated with this session permanent."""
         if self.status == self.SessionStatus.STORED:
@@ -438,9 +514,9 @@ class UploadSession(models.Model):
             temp_dir_path = None
 
             for uploaded_file in files:
-                # Get temp directory from first file
-                if temp_dir_path is None:
-                    temp_dir_path = Path(uploaded_file.file_upload.path).parent
+                # Get temp directory from first file. Object storages have no directories
+                if temp_dir_path is None and uploaded_file.local_path:
+                    temp_dir_path = uploaded_file.local_path.parent
 
                 LOGGER.info(
                     'Moving file "%s" (size: %d bytes) to permanent storage...',
@@ -499,18 +575,18 @@ class UploadSession(models.Model):
         copied, missing = [], []
         for f in files:
             if not f.exists:
-                LOGGER.error('File "%s" was moved or deleted', f.file_upload.path)
-                missing.append(f.file_upload.path)
+                LOGGER.error('File "%s" was moved or deleted', f.file_upload.name)
+                missing.append(f.file_upload.name)
                 continue
 
             if f.name is not None:
                 new_path = destination_path / f.name
-                LOGGER.info("Copying %s to %s", f.file_upload.path, new_path)
+                LOGGER.info("Copying %s to %s", f.file_upload.name, new_path)
                 f.copy(str(new_path))
                 copied.append(str(new_path))
             else:
-                LOGGER.error('File name is None for file "%s"', f.file_upload.path)
-                missing.append(f.file_upload.path)
+                LOGGER.error('File name is None for file "%s"', f.file_upload.name)
+                missing.append(f.file_upload.name)
 
         # No need to set status to COPYING_FAILED even if some files are missing
         self.status = self.SessionStatus.STORED
@@ -547,7 +623,8 @@ class UploadSession(models.Model):
         size = get_human_readable_size(self.upload_size, base=1000, precision=2)
 
         count = get_human_readable_file_count(
-            [f.name for f in self.get_uploads()], settings.ACCEPTED_FILE_FORMATS
+            [f.name for f in self.get_uploads()],
+            extension_groups=get_file_policy().extension_groups,
         )
 
         return _("%(file_count)s, totalling %(total_size)s") % {
@@ -593,12 +670,40 @@ class BaseUploadedFile(models.Model):
     name = models.CharField(max_length=256, null=True, default="-")
     session = models.ForeignKey(UploadSession, on_delete=models.CASCADE, null=False)
     file_upload = models.FileField(null=True)
+    file_size = models.PositiveBigIntegerField(
+        null=True,
+        blank=True,
+        help_text=_("Size of the file in bytes, recorded when the file was saved"),
+    )
+    sha256 = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        help_text=_("SHA-256 digest of the file, recorded when the file was uploaded"),
+    )
+    mime_type = models.CharField(
+        max_length=255,
+        blank=True,
+        default="",
+        help_text=_("MIME type of the file, detected when the file was uploaded"),
+    )
 
     class Meta:
         """Meta information for the BaseUploadedFile model."""
 
         abstract = True
 
+    def save(self, *args, **kwargs) -> None:
+        """Record the size of the file the first time it is saved, so that it does not need to be
+        read from the file system again.
+        """
+        if self.file_size is None and self.file_upload:
+            try:
+                self.file_size = self.file_upload.size
+            except (OSError, ValueError):
+                LOGGER.warning("Could not determine the size of file %s", self.file_upload.name)
+        super().save(*args, **kwargs)
+
     @property
     def exists(self) -> bool:
         """Determine if the file this object represents exists on the file system.
@@ -608,14 +713,42 @@ class BaseUploadedFile(models.Model):
         """
         return bool(self.file_upload) and self.file_upload.storage.exists(self.file_upload.name)
 
+    @property
+    def local_path(self) -> Optional[Path]:
+        """Get the path to this file on the local file system, or None if the file is not stored
+        on the local file system.
+        """
+        if not self.file_upload:
+            return None
+        try:
+            return Path(self.file_upload.path)
+        except NotImplementedError:
+            return None
+
     def copy(self, new_path: str) -> None:
         """Copy this file to a new path.
 
         Args:
             new_path: The new path to copy this file to
         """
-        if self.file_upload:
-            shutil.copy2(self.file_upload.path, new_path)
+        if not self.file_upload:
+            return
+        if self.local_path:
+            shutil.copy2(self.local_path, new_path)
+            return
+        destination_path = Path(new_path)
+        if destination_path.is_dir():
+            destination_path = destination_path / Path(self.file_upload.name).name
+        with self.file_upload.open("rb") as source, destination_path.open("wb") as destination:
+            shutil.copyfileobj(source, destination)
+
+    def compute_sha256(self) -> str:
+        """Compute the SHA-256 digest of this file by reading it."""
+        hasher = hashlib.sha256()
+        with self.file_upload.open("rb") as file:
+            for chunk in file.chunks():
+                hasher.update(chunk)
+        return hasher.hexdigest()
 
     def remove(self) -> None:
         """Remove this file from the file system."""
@@ -662,14 +795,27 @@ class TempUploadedFile(BaseUploadedFile):
         verbose_name_plural = "Files Currently Being Uploaded"
 
     file_upload = models.FileField(
-        null=True, storage=TempFileStorage, upload_to=session_upload_location
+        null=True, storage=get_temp_file_storage, upload_to=session_upload_location
     )
 
     def move_to_permanent_storage(self) -> None:
-        """Move the file from TempFileStorage to UploadedFileStorage."""
+        """Move the file from the temp storage to a :class:`FileBlob` in permanent storage.
+
+        If a blob with the same contents already exists, a reference to it is added instead of
+        storing the file again.
+        """
         if self.exists:
-            perm_file = PermUploadedFile(name=self.name, session=self.session)
-            perm_file.file_upload.save(self.file_upload.name, File(self.file_upload.file))
+            sha256 = self.sha256 or self.compute_sha256()
+            blob = FileBlob.objects.add_reference(sha256, self.file_upload, self.file_size)
+            perm_file = PermUploadedFile(
+                name=self.name,
+                session=self.session,
+                file_size=self.file_size,
+                sha256=sha256,
+                mime_type=self.mime_type,
+                blob=blob,
+            )
+            perm_file.file_upload.name = blob.file_upload.name
             perm_file.save()
             self.delete()
 
@@ -683,7 +829,105 @@ class PermUploadedFile(BaseUploadedFile):
         verbose_name = "Permanent uploaded file"
         verbose_name_plural = "Permanent uploaded files"
 
-    file_upload = models.FileField(null=True, storage=UploadedFileStorage)
+    file_upload = models.FileField(null=True, storage=get_uploaded_file_storage)
+    blob = models.ForeignKey(
+        "FileBlob",
+        null=True,
+        blank=True,
+        on_delete=models.PROTECT,
+        related_name="uploaded_files",
+        help_text=_("The stored contents of the file, shared by all files with the same contents"),
+    )
+
+    def copy(self, new_path: str) -> None:
+        """Copy this file to a new path.
+
+        Blobs are never changed once they are stored, so if the new path is on the same file
+        system, the blob is hard-linked to the new path instead of being copied.
+
+        Args:
+            new_path: The new path to copy this file to
+        """
+        if self.blob_id and self.local_path:
+            destination_path = Path(new_path)
+            if destination_path.is_dir():
+                destination_path = destination_path / self.name
+            try:
+                os.link(self.local_path, destination_path)
+                return
+            except OSError:
+                pass
+        super().copy(new_path)
+
+    def remove(self) -> None:
+        """Remove this file, and release its reference to the blob it is stored in."""
+        if not self.blob_id:
+            super().remove()
+            return
+        blob_id = self.blob_id
+        self.blob = None
+        self.file_upload = None
+        self.save()
+        FileBlob.objects.release(blob_id)
+
+
+def blob_location(instance: FileBlob, filename: str) -> str:
+    """Generate the location of a blob in permanent storage from its digest."""
+    return "blobs/{0}/{1}/{2}".format(instance.sha256[:2], instance.sha256[2:4], instance.sha256)
+
+
+class FileBlob(models.Model):
+    """The contents of one or more uploaded files in permanent storage, stored once and addressed
+    by their SHA-256 digest.
+
+    Donors often submit the same file more than once, so each :class:`PermUploadedFile` refers to
+    a blob instead of storing its own copy of the file. The number of files that refer to a blob
+    is kept in ``reference_count``, and the blob is deleted once nothing refers to it.
+    """
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    file_upload = models.FileField(storage=get_uploaded_file_storage, upload_to=blob_location)
+    file_size = models.PositiveBigIntegerField(null=True, blank=True)
+    reference_count = models.PositiveIntegerField(default=0)
+
+    objects = FileBlobManager()
+
+    class Meta:
+        """Meta information."""
+
+        verbose_name = "File blob"
+        verbose_name_plural = "File blobs"
+
+    @property
+    def exists(self) -> bool:
+        """Determine if the contents of this blob exist in storage."""
+        return bool(self.file_upload) and self.file_upload.storage.exists(self.file_upload.name)
+
+    def store(self, source: File) -> None:
+        """Store the contents of a file in this blob, without saving the model.
+
+        If the source is in storage that can copy files into the permanent storage without
+        downloading them, the file is copied there.
+
+        Args:
+            source: The file to store, e.g., the ``file_upload`` of a :class:`TempUploadedFile`
+        """
+        destination = self.file_upload.storage
+        source_storage = getattr(source, "storage", None)
+        if (
+            source_storage is not None
+            and hasattr(destination, "can_copy_from")
+            and destination.can_copy_from(source_storage)
+        ):
+            name = self.file_upload.field.generate_filename(self, self.sha256)
+            self.file_upload.name = destination.copy_from(source_storage, source.name, name)
+        else:
+            with source.open("rb"):
+                self.file_upload.save(self.sha256, File(source.file), save=False)
+
+    def __str__(self):
+        """Return a string representation of this object."""
+        return self.sha256
 
 
 @receiver(pre_delete, sender=TempUploadedFile)
@@ -700,7 +944,39 @@ def delete_file_on_model_delete(
         instance: The model uploaded file instance being deleted
         **kwargs: Additional keyword arguments passed to the signal handler
     """
+    if isinstance(instance, PermUploadedFile) and instance.blob_id:
+        # The blob is released once the file is deleted, in release_blob_on_model_delete
+        return
     if instance.exists:
         instance.file_upload.delete()
         if isinstance(instance, TempUploadedFile):
             instance.session.touch()
+
+
+@receiver(post_delete, sender=PermUploadedFile)
+def release_blob_on_model_delete(
+    sender: type[PermUploadedFile], instance: PermUploadedFile, **kwargs
+) -> None:
+    """Release the reference a deleted permanent file had to its blob.
+
+    Args:
+        sender: The model class that sent the signal
+        instance: The permanent uploaded file that was deleted
+        **kwargs: Additional keyword arguments passed to the signal handler
+    """
+    if instance.blob_id:
+        FileBlob.objects.release(instance.blob_id)
+
+
+@receiver(post_delete, sender=FileBlob)
+def delete_blob_file_on_model_delete(sender: type[FileBlob], instance: FileBlob, **kwargs) -> None:
+    """Delete the contents of a blob from storage once the blob is deleted.
+
+    Args:
+        sender: The model class that sent the signal
+        instance: The blob that was deleted
+        **kwargs: Additional keyword arguments passed to the signal handler
+    """
+    if instance.file_upload:
+        storage, name = instance.file_upload.storage, instance.file_upload.name
+        transaction.on_commit(lambda: storage.delete(name))
@@ -0,0 +1,99 @@
+"""The rules a file name must follow to be accepted, compiled once from the settings.
+
+Every uploaded file is checked against the :ref:`ACCEPTED_FILE_FORMATS`, a set of path traversal
+patterns, and the Windows reserved file names. Rather than scanning each of these per file, they
+are compiled into a :class:`FilePolicy` the first time it is needed, and the policy is rebuilt if
+the setting is replaced.
+"""
+
+import re
+from typing import Optional
+
+from django.conf import settings
+from utility import count_file_types, invert_file_groups
+
+from upload.constants import WindowsFileRestrictions
+from upload.mime import mime
+
+# Patterns that must not appear in a file name, or in the URL-decoded file name
+TRAVERSAL_PATTERNS = (
+    "..",
+    "/",
+    "\\",
+    "%2e%2e",  # URL encoded ..
+    "%2f",  # URL encoded /
+    "%5c",  # URL encoded \\
+    "%252e%252e",  # Double URL encoded ..
+    "%252f",  # Double URL encoded /
+    "%255c",  # Double URL encoded \\
+)
+
+
+class FilePolicy:
+    """Lookup tables and patterns for checking file names.
+
+    Args:
+        accepted_file_groups: A dictionary of file group names mapping to a list of file
+            extensions without periods, like the :ref:`ACCEPTED_FILE_FORMATS`
+    """
+
+    def __init__(self, accepted_file_groups: dict[str, list[str]]) -> None:
+        self.accepted_file_groups = accepted_file_groups
+        self.extension_groups = invert_file_groups(accepted_file_groups)
+        self.extension_mime_types = {
+            extension: frozenset(mime.guess(extension)) for extension in self.extension_groups
+        }
+        self.traversal_pattern = re.compile("|".join(map(re.escape, TRAVERSAL_PATTERNS)))
+        self.reserved_name_pattern = re.compile(
+            r"(?:{})(?:\.|\Z)".format("|".join(WindowsFileRestrictions.RESERVED_FILENAMES)),
+            re.IGNORECASE,
+        )
+
+    @staticmethod
+    def get_extension(file_name: str) -> Optional[str]:
+        """Get the lowercase extension of a file name without the period, or None if the file
+        has no extension.
+        """
+        _, dot, extension = file_name.rpartition(".")
+        return extension.lower() if dot else None
+
+    def is_accepted_extension(self, extension: str) -> bool:
+        """Determine whether files with the lowercase extension may be uploaded."""
+        return extension in self.extension_groups
+
+    def get_mime_types(self, extension: str) -> frozenset[str]:
+        """Get the MIME types expected for a lowercase file extension."""
+        mime_types = self.extension_mime_types.get(extension)
+        if mime_types is None:
+            mime_types = frozenset(mime.guess(extension))
+        return mime_types
+
+    def find_traversal_pattern(self, file_name: str) -> Optional[str]:
+        """Find a path traversal pattern in a lowercase file name, or None if it has none."""
+        match = self.traversal_pattern.search(file_name)
+        return match.group() if match else None
+
+    def find_reserved_name(self, file_name: str) -> Optional[str]:
+        """Find the Windows reserved name a file name starts with, or None if it does not use
+        one.
+        """
+        match = self.reserved_name_pattern.match(file_name)
+        return file_name.split(".", 1)[0].upper() if match else None
+
+    def count_file_types(self, file_names: list[str]) -> dict[str, int]:
+        """Count how many files fall into each accepted file group."""
+        return count_file_types(file_names, extension_groups=self.extension_groups)
+
+
+_policy: Optional[FilePolicy] = None
+
+
+def get_file_policy() -> FilePolicy:
+    """Get the policy for the :ref:`ACCEPTED_FILE_FORMATS` setting. The policy is rebuilt if the
+    setting is replaced.
+    """
+    global _policy
+    accepted_file_groups = settings.ACCEPTED_FILE_FORMATS
+    if _policy is None or _policy.accepted_file_groups is not accepted_file_groups:
+        _policy = FilePolicy(accepted_file_groups)
+    return _policy
@@ -0,0 +1,188 @@
+"""Storage for uploaded files in an S3-compatible object store.
+
+This module requires the ``django-storages[s3]`` package, and is only imported if the
+:ref:`FILE_STORAGE_BACKEND` is set to ``s3``.
+"""
+
+import io
+from typing import Any, Optional
+
+from django.core.files.storage import Storage
+from storages.backends.s3 import S3Storage
+from storages.utils import clean_name
+
+
+class S3MediaStorage(S3Storage):
+    """Stores files in an S3-compatible bucket, under the prefix set by the ``location`` option.
+
+    Files are served with presigned URLs that expire after ``querystring_expire`` seconds, so the
+    application does not need to proxy downloads. Clients can also upload files directly to the
+    bucket with presigned multipart uploads, see :mod:`upload.direct`.
+    """
+
+    def can_copy_from(self, source: Storage) -> bool:
+        """Determine whether files in the source storage can be copied into this storage without
+        downloading them.
+        """
+        return isinstance(source, S3Storage) and source.endpoint_url == self.endpoint_url
+
+    def copy_from(self, source: S3Storage, source_name: str, name: str) -> str:
+        """Copy a file from another S3 storage with a server-side copy.
+
+        Args:
+            source: The storage the file is in. Must be a storage that :meth:`can_copy_from`
+            source_name: The name of the file in the source storage
+            name: The name to copy the file to in this storage
+
+        Returns:
+            The name the file was saved as in this storage
+        """
+        name = self.get_available_name(name)
+        self.bucket.Object(self._key(name)).copy(
+            {
+                "Bucket": source.bucket_name,
+                "Key": source._normalize_name(clean_name(source_name)),
+            },
+            ExtraArgs=self._get_write_parameters(name),
+        )
+        return name
+
+    def create_multipart_upload(self, name: str, content_type: str) -> tuple[str, str]:
+        """Start a multipart upload that a client uploads the parts of directly.
+
+        Args:
+            name: The name to upload the file to
+            content_type: The content type of the file
+
+        Returns:
+            A tuple of the name the file will be saved as, and the ID of the multipart upload
+        """
+        name = self.get_available_name(name)
+        params = self._get_write_parameters(name)
+        params["ContentType"] = content_type or params.get("ContentType", "")
+        response = self.bucket.meta.client.create_multipart_upload(
+            Bucket=self.bucket_name, Key=self._key(name), **params
+        )
+        return name, response["UploadId"]
+
+    def presign_upload_part(self, name: str, upload_id: str, part_number: int) -> str:
+        """Create a presigned URL that a client can PUT one part of a multipart upload to."""
+        return self.bucket.meta.client.generate_presigned_url(
+            "upload_part",
+            Params={
+                "Bucket": self.bucket_name,
+                "Key": self._key(name),
+                "UploadId": upload_id,
+                "PartNumber": part_number,
+            },
+            ExpiresIn=self.querystring_expire,
+        )
+
+    def list_uploaded_parts(self, name: str, upload_id: str) -> list[dict[str, Any]]:
+        """List the parts of a multipart upload that have been uploaded so far."""
+        paginator = self.bucket.meta.client.get_paginator("list_parts")
+        return [
+            {"PartNumber": part["PartNumber"], "ETag": part["ETag"], "Size": part["Size"]}
+            for page in paginator.paginate(
+                Bucket=self.bucket_name, Key=self._key(name), UploadId=upload_id
+            )
+            for part in page.get("Parts", [])
+        ]
+
+    def complete_multipart_upload(
+        self, name: str, upload_id: str, parts: list[dict[str, Any]]
+    ) -> None:
+        """Assemble the uploaded parts of a multipart upload into a file.
+
+        Args:
+            name: The name of the file being uploaded
+            upload_id: The ID of the multipart upload
+            parts: The ``PartNumber`` and ``ETag`` of each uploaded part
+        """
+        self.bucket.meta.client.complete_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=self._key(name),
+            UploadId=upload_id,
+            MultipartUpload={
+                "Parts": [
+                    {"PartNumber": int(part["PartNumber"]), "ETag": part["ETag"]}
+                    for part in sorted(parts, key=lambda part: int(part["PartNumber"]))
+                ]
+            },
+        )
+
+    def abort_multipart_upload(self, name: str, upload_id: str) -> None:
+        """Cancel a multipart upload, and remove the parts uploaded so far."""
+        self.bucket.meta.client.abort_multipart_upload(
+            Bucket=self.bucket_name, Key=self._key(name), UploadId=upload_id
+        )
+
+    def read_head(self, name: str, length: int) -> bytes:
+        """Read the first bytes of a file with a ranged request, without downloading the rest."""
+        if length <= 0 or self.size(name) == 0:
+            return b""
+        response = self.bucket.Object(self._key(name)).get(Range=f"bytes=0-{length - 1}")
+        return response["Body"].read()
+
+    def open_stream(self, name: str) -> "S3ObjectStream":
+        """Open a file to be read from start to end as it is downloaded."""
+        return S3ObjectStream(self.bucket.Object(self._key(name)))
+
+    def _key(self, name: str) -> str:
+        return self._normalize_name(clean_name(name))
+
+
+class S3ObjectStream(io.RawIOBase):
+    """Read an object in the bucket as it is downloaded.
+
+    Unlike the files returned by :meth:`S3Storage.open`, the object is not downloaded to a
+    temporary file before it can be read. Seeking is only supported back to the start of the
+    object, which starts a new download.
+    """
+
+    def __init__(self, s3_object: Any) -> None:
+        super().__init__()
+        self._object = s3_object
+        self._body: Optional[Any] = None
+        self._position = 0
+
+    def readable(self) -> bool:
+        """Return True, since the stream can be read."""
+        return True
+
+    def seekable(self) -> bool:
+        """Return True, since the stream can be rewound to the start."""
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        """Read the next bytes of the object into the buffer."""
+        if self._body is None:
+            self._body = self._object.get()["Body"]
+        data = self._body.read(len(buffer))
+        buffer[: len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Rewind the stream to the start of the object."""
+        if whence == io.SEEK_SET and offset == self._position:
+            return self._position
+        if whence != io.SEEK_SET or offset != 0:
+            raise io.UnsupportedOperation("Can only seek to the start of the object")
+        self._close_body()
+        self._position = 0
+        return 0
+
+    def tell(self) -> int:
+        """Get the number of bytes read so far."""
+        return self._position
+
+    def close(self) -> None:
+        """Stop downloading the object."""
+        self._close_body()
+        super().close()
+
+    def _close_body(self) -> None:
+        if self._body is not None:
+            self._body.close()
+            self._body = None
@@ -1,7 +1,7 @@
 from pathlib import Path
 
 from django.conf import settings
-from django.core.files.storage import FileSystemStorage
+from django.core.files.storage import FileSystemStorage, Storage, storages
 
 
 class MediaFileStorage(FileSystemStorage):
@@ -40,3 +40,17 @@ class TempFileStorage(MediaFileStorage):
 
     def __init__(self, **kwargs):
         super().__init__(settings.TEMP_STORAGE_FOLDER, **kwargs)
+
+
+def get_temp_file_storage() -> Storage:
+    """Get the storage for files that are being uploaded, configured by the ``temp_uploads`` key
+    of the ``STORAGES`` setting.
+    """
+    return storages["temp_uploads"]
+
+
+def get_uploaded_file_storage() -> Storage:
+    """Get the storage for files that have been submitted, configured by the ``uploads`` key of
+    the ``STORAGES`` setting.
+    """
+    return storages["uploads"]
@@ -1,10 +1,18 @@
 """Tests for the admin site."""
 
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
+from django.contrib.auth import get_user_model
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 from upload.admin import PermUploadedFileInline, TempUploadedFileInline, UploadSessionAdmin
-from upload.models import UploadSession
+from upload.models import TempUploadedFile, UploadSession
+
+User = get_user_model()
 
 
 class TestUploadSessionAdmin(TestCase):
@@ -65,3 +73,92 @@ class TestUploadSessionAdmin(TestCase):
         result = self.admin.get_inlines(self.request, None)
 
         self.assertEqual(result, [])
+
+
+class TestUploadSessionAdminChangelist(TestCase):
+    """Test that the upload session changelist does not depend on the number of sessions."""
+
+    def setUp(self) -> None:
+        """Create an admin user."""
+        self.admin_user = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="password"
+        )
+        self.client.force_login(self.admin_user)
+        self.url = reverse("admin:upload_uploadsession_changelist")
+
+    def _create_session(self, size: int) -> UploadSession:
+        session = UploadSession.new_session(user=self.admin_user, enforce_limit=False)
+        session.status = UploadSession.SessionStatus.UPLOADING
+        session.save()
+        TempUploadedFile.objects.create(
+            name="file.pdf",
+            session=session,
+            file_upload=SimpleUploadedFile("file.pdf", b"x" * size),
+        )
+        return session
+
+    def _count_queries(self) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_constant_queries(self) -> None:
+        """Test that the number of queries is the same for one session or many."""
+        self._create_session(10)
+        one_session = self._count_queries()
+
+        for _ in range(5):
+            self._create_session(10)
+        many_sessions = self._count_queries()
+
+        self.assertEqual(one_session, many_sessions)
+
+    def test_stats_do_not_access_storage(self) -> None:
+        """Test that the file count and size are read from the database."""
+        session = self._create_session(2000)
+        admin_site = UploadSessionAdmin(UploadSession, Mock())
+        obj = admin_site.get_queryset(RequestFactory().get("/")).get(pk=session.pk)
+
+        with (
+            patch.object(FileSystemStorage, "exists") as mock_exists,
+            patch.object(FileSystemStorage, "size") as mock_size,
+        ):
+            self.assertEqual(admin_site.file_count(obj), "1")
+            self.assertEqual(admin_site.upload_size(obj), "2.00 KB")
+
+        mock_exists.assert_not_called()
+        mock_size.assert_not_called()
+
+    def test_queryset_keeps_admin_ordering(self) -> None:
+        """Test that the annotated queryset is still built and ordered by the admin."""
+        first = self._create_session(10)
+        second = self._create_session(20)
+        admin_site = UploadSessionAdmin(UploadSession, Mock())
+
+        queryset = admin_site.get_queryset(RequestFactory().get("/"))
+
+        self.assertEqual(list(queryset.query.order_by), ["-started_at"])
+        self.assertEqual(
+            {session.pk: session.stored_upload_size for session in queryset},
+            {first.pk: 10, second.pk: 20},
+        )
+
+    def test_stats_not_available_while_copying(self) -> None:
+        """Test that the stats are not shown while files are being moved."""
+        session = self._create_session(10)
+        session.status = UploadSession.SessionStatus.COPYING_IN_PROGRESS
+        session.save()
+        admin_site = UploadSessionAdmin(UploadSession, Mock())
+        obj = admin_site.get_queryset(RequestFactory().get("/")).get(pk=session.pk)
+
+        self.assertEqual(admin_site.file_count(obj), "N/A")
+        self.assertEqual(admin_site.upload_size(obj), "N/A")
+
+    def test_storage_headroom_shown(self) -> None:
+        """Test that the free space and headroom of the storage volumes are shown."""
+        response = self.client.get(self.url)
+
+        self.assertEqual(len(response.context["storage_usage"]), 2)
+        self.assertContains(response, 'id="storage-usage"')
+        self.assertContains(response, "Headroom")
@@ -0,0 +1,94 @@
+"""Tests for the storage budget."""
+
+import time
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from redis.exceptions import ConnectionError as RedisConnectionError
+from upload.budget import StorageBudget
+from utility.tests.fake_redis import FakeRedis
+
+GIB = 1024**3
+
+
+@override_settings(
+    STORAGE_BUDGET_ENABLED=True,
+    STORAGE_BUDGET_HIGH_WATERMARK_PERCENT=90,
+    STORAGE_BUDGET_LOW_WATERMARK_PERCENT=80,
+    STORAGE_BUDGET_RESERVATION_TIMEOUT_SECONDS=60,
+)
+class TestStorageBudget(TestCase):
+    """Tests for the StorageBudget."""
+
+    def setUp(self) -> None:
+        """Use a fake Redis connection, and a 100 GiB volume with 50 GiB free."""
+        self.redis = FakeRedis()
+        patcher = patch("upload.budget.django_rq.get_connection", return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.space = patch.object(StorageBudget, "_get_space", return_value=(100 * GIB, 50 * GIB))
+        self.space.start()
+        self.addCleanup(self.space.stop)
+        self.budget = StorageBudget("/")
+
+    def test_reservations_are_counted(self) -> None:
+        """Test that reservations are counted against the headroom until released."""
+        first = self.budget.reserve(30 * GIB)
+        second = self.budget.reserve(10 * GIB)
+
+        self.assertIsNotNone(first)
+        self.assertIsNotNone(second)
+        self.assertEqual(self.budget.get_usage().reserved, 40 * GIB)
+        self.assertEqual(self.budget.get_usage().headroom, 0)
+
+        first.release()
+        self.assertEqual(self.budget.get_usage().reserved, 10 * GIB)
+
+    def test_reservation_past_high_watermark_refused(self) -> None:
+        """Test that a reservation that would go past the high watermark is refused, without
+        stopping smaller reservations.
+        """
+        self.assertIsNone(self.budget.reserve(41 * GIB))
+        self.assertEqual(self.budget.get_usage().reserved, 0)
+        self.assertIsNotNone(self.budget.reserve(1 * GIB))
+
+    def test_full_until_low_watermark(self) -> None:
+        """Test that once the high watermark is reached, reservations are refused until the used
+        space falls below the low watermark.
+        """
+        with patch.object(StorageBudget, "_get_space", return_value=(100 * GIB, 9 * GIB)):
+            self.assertIsNone(self.budget.reserve(1))
+        self.assertTrue(self.budget.get_usage().full)
+
+        with patch.object(StorageBudget, "_get_space", return_value=(100 * GIB, 15 * GIB)):
+            self.assertIsNone(self.budget.reserve(1))
+
+        with patch.object(StorageBudget, "_get_space", return_value=(100 * GIB, 25 * GIB)):
+            self.assertIsNotNone(self.budget.reserve(1))
+        self.assertFalse(self.budget.get_usage().full)
+
+    def test_expired_reservations_are_dropped(self) -> None:
+        """Test that a reservation that was never released stops counting once it expires."""
+        self.budget.reserve(30 * GIB)
+
+        with patch("upload.budget.time.time", return_value=time.time() + 61):
+            self.assertEqual(self.budget.get_usage().reserved, 0)
+
+    def test_redis_unavailable(self) -> None:
+        """Test that only the free space on the volume is checked if Redis can not be reached."""
+        with patch(
+            "upload.budget.django_rq.get_connection", side_effect=RedisConnectionError("down")
+        ):
+            reservation = self.budget.reserve(30 * GIB)
+            self.assertIsNotNone(reservation)
+            self.assertIsNone(reservation.id)
+            self.assertIsNone(self.budget.reserve(41 * GIB))
+
+    @override_settings(STORAGE_BUDGET_ENABLED=False)
+    def test_disabled(self) -> None:
+        """Test that nothing is reserved when the budget is disabled."""
+        reservation = self.budget.reserve(1000 * GIB)
+
+        self.assertIsNotNone(reservation)
+        self.assertIsNone(reservation.id)
+        self.assertEqual(self.redis.data, {})
@@ -7,6 +7,7 @@ from django.utils import timezone
 from upload.check import (
     MAGIC_AVAILABLE,
     accept_file,
+    accept_file_info,
     accept_session,
 )
 from upload.models import TempUploadedFile, UploadSession
@@ -132,6 +133,13 @@ class TestAcceptFile(TestCase):
         self.assertFalse(result["accepted"])
         self.assertIn("extension", result["error"])
 
+    def test_accept_file_info(self) -> None:
+        """Test that a file's name and size are checked without its contents."""
+        self.assertTrue(accept_file_info("My File.pdf", 9012)["accepted"])
+        for file_name, size in [("My File.mp3", 9012), ("../My File.pdf", 9012), ("a.pdf", 0)]:
+            with self.subTest(file_name=file_name, size=size):
+                self.assertFalse(accept_file_info(file_name, size)["accepted"])
+
     def test_malicious_file_names(self) -> None:
         """Test that malicious filenames are not accepted."""
         param_list = [
@@ -0,0 +1,105 @@
+"""Tests for the upload handlers."""
+
+import hashlib
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+from django.conf import settings
+from django.test import RequestFactory, TestCase
+from upload.handlers import (
+    SNIFF_BUFFER_SIZE,
+    SessionFileUploadHandler,
+    SessionTemporaryUploadedFile,
+    get_partial_upload_folder,
+)
+from upload.models import UploadSession
+
+
+class TestSessionFileUploadHandler(TestCase):
+    """Tests for the SessionFileUploadHandler."""
+
+    def setUp(self) -> None:
+        """Set up the handler."""
+        self.handler = SessionFileUploadHandler(RequestFactory().post("/"))
+        self.content = os.urandom(SNIFF_BUFFER_SIZE * 3)
+
+    def _receive(self, chunk_size: int = 1000) -> SessionTemporaryUploadedFile:
+        self.handler.new_file("file", "test.pdf", "application/pdf", len(self.content))
+        for start in range(0, len(self.content), chunk_size):
+            self.handler.receive_data_chunk(self.content[start : start + chunk_size], start)
+        uploaded_file = self.handler.file_complete(len(self.content))
+        self.addCleanup(uploaded_file.close)
+        return uploaded_file
+
+    def test_file_is_written_to_temp_storage(self) -> None:
+        """Test that the file is streamed into the temp storage folder."""
+        uploaded_file = self._receive()
+
+        path = Path(uploaded_file.temporary_file_path())
+        self.assertEqual(path.parent, get_partial_upload_folder())
+        self.assertTrue(path.is_relative_to(settings.TEMP_STORAGE_FOLDER))
+        self.assertEqual(path.read_bytes(), self.content)
+        self.assertEqual(uploaded_file.size, len(self.content))
+
+    def test_digest_and_head(self) -> None:
+        """Test that the digest and first bytes of the file are computed while it's received."""
+        uploaded_file = self._receive()
+
+        self.assertEqual(uploaded_file.sha256, hashlib.sha256(self.content).hexdigest())
+        self.assertEqual(uploaded_file.head, self.content[:SNIFF_BUFFER_SIZE])
+
+    def test_interrupted_upload_is_removed(self) -> None:
+        """Test that a partial file is removed when the upload is interrupted."""
+        self.handler.new_file("file", "test.pdf", "application/pdf", len(self.content))
+        self.handler.receive_data_chunk(self.content[:100], 0)
+        path = Path(self.handler.file.temporary_file_path())
+
+        self.handler.upload_interrupted()
+
+        self.assertFalse(path.exists())
+
+    def test_upload_refused_when_storage_full(self) -> None:
+        """Test that the request body is not read when there is no space reserved for it."""
+        with patch("upload.handlers.get_temp_storage_budget") as get_budget:
+            get_budget.return_value.reserve.return_value = None
+            result = self.handler.handle_raw_input(None, {}, 1000, b"boundary")
+
+        self.assertIsNotNone(result)
+        self.assertEqual(len(result[1]), 0)
+        self.assertTrue(self.handler.request.upload_storage_full)
+
+    def test_reservation_released_when_complete(self) -> None:
+        """Test that the space reserved for the request body is released once it's received."""
+        with patch("upload.handlers.get_temp_storage_budget") as get_budget:
+            self.assertIsNone(self.handler.handle_raw_input(None, {}, 1000, b"boundary"))
+        self._receive()
+
+        self.handler.upload_complete()
+
+        get_budget.return_value.reserve.return_value.release.assert_called_once()
+
+    def test_reservation_released_when_interrupted(self) -> None:
+        """Test that the space reserved for the request body is released if the upload is
+        interrupted, and only once.
+        """
+        with patch("upload.handlers.get_temp_storage_budget") as get_budget:
+            self.handler.handle_raw_input(None, {}, 1000, b"boundary")
+        self.handler.new_file("file", "test.pdf", "application/pdf", len(self.content))
+
+        self.handler.upload_interrupted()
+        self.handler.upload_complete()
+
+        get_budget.return_value.reserve.return_value.release.assert_called_once()
+
+    def test_file_is_moved_into_session(self) -> None:
+        """Test that adding the file to a session renames it instead of copying it."""
+        uploaded_file = self._receive()
+        inode = os.stat(uploaded_file.temporary_file_path()).st_ino
+        session = UploadSession.new_session()
+
+        temp_file = session.add_temp_file(uploaded_file)
+        self.addCleanup(temp_file.remove)
+
+        self.assertEqual(os.stat(temp_file.file_upload.path).st_ino, inode)
+        self.assertEqual(temp_file.file_size, len(self.content))
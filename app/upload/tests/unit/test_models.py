@@ -1,3 +1,4 @@
+import hashlib
 import logging
 import shutil
 import tempfile
@@ -9,11 +10,15 @@ from unittest.mock import MagicMock, Mock, patch
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.db.models.manager import BaseManager
 from django.test import TestCase, override_settings
 from django.utils import timezone
-from upload.models import PermUploadedFile, TempUploadedFile, UploadSession
+from upload.models import FileBlob, PermUploadedFile, TempUploadedFile, UploadSession
 
 
 def get_mock_temp_uploaded_file(
@@ -39,6 +44,7 @@ def get_mock_temp_uploaded_file(
     file_upload_mock.name = name
 
     file_mock.file_upload = file_upload_mock
+    file_mock.local_path = Path(file_upload_mock.path)
 
     return file_mock
 
@@ -66,6 +72,7 @@ def get_mock_perm_uploaded_file(
     file_upload_mock.name = name
 
     file_mock.file_upload = file_upload_mock
+    file_mock.local_path = Path(file_upload_mock.path)
 
     return file_mock
 
@@ -1034,6 +1041,11 @@ class TestPermUploadedFile(TestCase):
         """Test that the file exists."""
         self.assertTrue(self.uploaded_file.exists)
 
+    def test_file_size_recorded(self) -> None:
+        """Test that the size of the file is stored when the file is saved."""
+        self.uploaded_file.refresh_from_db()
+        self.assertEqual(self.uploaded_file.file_size, len(b"Test file content"))
+
     def test_file_does_not_exist(self) -> None:
         """Test that the file does not exist."""
         # Delete the uploaded file from the file system
@@ -1112,10 +1124,237 @@ class TestTempUploadedFile(TestPermUploadedFile):
     model_class = TempUploadedFile
 
     def test_move_to_permanent_storage(self) -> None:
-        """Test that the file is moved to permanent storage."""
-        relative_path = self.uploaded_file.file_upload.name
+        """Test that the file is moved to a blob in permanent storage."""
         self.uploaded_file.move_to_permanent_storage()
-        self.assertTrue(Path(settings.UPLOAD_STORAGE_FOLDER, relative_path).exists())
         self.assertFalse(self.uploaded_file.exists)
         perm_uploaded_file = PermUploadedFile.objects.get(session=self.session, name="test.pdf")
         self.assertTrue(perm_uploaded_file.exists)
+        self.assertEqual(
+            perm_uploaded_file.sha256, hashlib.sha256(b"Test file content").hexdigest()
+        )
+        self.assertEqual(
+            perm_uploaded_file.file_upload.name, perm_uploaded_file.blob.file_upload.name
+        )
+        self.assertTrue(
+            Path(settings.UPLOAD_STORAGE_FOLDER, perm_uploaded_file.file_upload.name).exists()
+        )
+
+
+class TestFileBlob(TestCase):
+    """Tests for storing permanent files once per unique contents."""
+
+    def setUp(self) -> None:
+        """Create two sessions with files that have the same contents."""
+        self.sessions = [UploadSession.new_session(), UploadSession.new_session()]
+        for session in self.sessions:
+            session.add_temp_file(SimpleUploadedFile("test.pdf", b"Same content"))
+            session.add_temp_file(SimpleUploadedFile("other.pdf", b"Other content"))
+
+    def tearDown(self) -> None:
+        """Clear the permanent storage folder."""
+        shutil.rmtree(Path(settings.UPLOAD_STORAGE_FOLDER))
+        Path(settings.UPLOAD_STORAGE_FOLDER).mkdir(parents=True, exist_ok=True)
+
+    def _make_permanent(self) -> list[PermUploadedFile]:
+        for session in self.sessions:
+            session.make_uploads_permanent()
+        return list(PermUploadedFile.objects.filter(name="test.pdf"))
+
+    def test_same_contents_stored_once(self) -> None:
+        """Test that files with the same contents share one blob."""
+        first, second = self._make_permanent()
+
+        self.assertEqual(FileBlob.objects.count(), 2)
+        self.assertEqual(first.blob_id, second.blob_id)
+        self.assertEqual(first.blob.reference_count, 2)
+        self.assertEqual(first.file_upload.name, second.file_upload.name)
+        blob_files = [p for p in Path(settings.UPLOAD_STORAGE_FOLDER).rglob("*") if p.is_file()]
+        self.assertEqual(len(blob_files), 2)
+
+    def test_sha256_recorded_at_ingest(self) -> None:
+        """Test that a digest computed while the file was received is used for the blob."""
+        file = SimpleUploadedFile("ingested.pdf", b"Ingested content")
+        file.sha256 = hashlib.sha256(b"Ingested content").hexdigest()
+
+        temp_file = self.sessions[0].add_temp_file(file)
+
+        self.assertEqual(temp_file.sha256, file.sha256)
+        with patch.object(TempUploadedFile, "compute_sha256") as compute_sha256:
+            temp_file.move_to_permanent_storage()
+        compute_sha256.assert_not_called()
+        self.assertTrue(FileBlob.objects.filter(sha256=file.sha256).exists())
+
+    def test_metadata_recorded_at_ingest(self) -> None:
+        """Test that the digest and MIME type are recorded for a file received in memory, and are
+        kept when the file is made permanent.
+        """
+        file = SimpleUploadedFile("ingested.pdf", b"Ingested content")
+        file.detected_mime_type = "application/pdf"
+
+        temp_file = self.sessions[0].add_temp_file(file)
+        temp_file.move_to_permanent_storage()
+
+        perm_file = PermUploadedFile.objects.get(name="ingested.pdf")
+        self.assertEqual(perm_file.sha256, hashlib.sha256(b"Ingested content").hexdigest())
+        self.assertEqual(perm_file.mime_type, "application/pdf")
+
+    def test_delete_releases_blob(self) -> None:
+        """Test that the blob is only deleted once no file refers to it."""
+        first, second = self._make_permanent()
+        blob_path = Path(settings.UPLOAD_STORAGE_FOLDER, first.file_upload.name)
+
+        first.delete()
+
+        blob = FileBlob.objects.get(pk=second.blob_id)
+        self.assertEqual(blob.reference_count, 1)
+        self.assertTrue(second.exists)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+
+        self.assertFalse(FileBlob.objects.filter(pk=blob.pk).exists())
+        self.assertFalse(blob_path.exists())
+
+    def test_remove_releases_blob(self) -> None:
+        """Test that removing a file does not remove the blob another file refers to."""
+        first, second = self._make_permanent()
+
+        first.remove()
+
+        self.assertIsNone(first.blob)
+        self.assertFalse(first.exists)
+        self.assertTrue(second.exists)
+        self.assertEqual(FileBlob.objects.get(pk=second.blob_id).reference_count, 1)
+
+    def test_session_delete_releases_blobs(self) -> None:
+        """Test that deleting a session releases the blobs of all its files."""
+        self._make_permanent()
+
+        self.sessions[0].delete()
+        self.sessions[1].delete()
+
+        self.assertEqual(FileBlob.objects.count(), 0)
+
+    def test_copy_hard_links_blob(self) -> None:
+        """Test that a blob is hard-linked when it is copied on the same file system."""
+        first, _ = self._make_permanent()
+        destination = Path(settings.UPLOAD_STORAGE_FOLDER, "bag")
+        destination.mkdir()
+
+        first.copy(str(destination))
+
+        copied = destination / "test.pdf"
+        self.assertEqual(copied.read_bytes(), b"Same content")
+        self.assertEqual(copied.stat().st_ino, first.local_path.stat().st_ino)
+
+
+class ObjectStorage(Storage):
+    """An in-memory storage that, like an object storage, has no local paths."""
+
+    def __init__(self) -> None:
+        self.files = {}
+
+    def _open(self, name: str, mode: str = "rb") -> ContentFile:
+        return ContentFile(self.files[name], name=name)
+
+    def _save(self, name: str, content: File) -> str:
+        self.files[name] = content.read()
+        return name
+
+    def exists(self, name: str) -> bool:
+        """Determine whether a file exists."""
+        return name in self.files
+
+    def delete(self, name: str) -> None:
+        """Delete a file."""
+        self.files.pop(name, None)
+
+    def size(self, name: str) -> int:
+        """Get the size of a file."""
+        return len(self.files[name])
+
+
+class TestUploadedFileInObjectStorage(TestCase):
+    """Tests for uploaded files kept in a storage that is not on the local file system."""
+
+    def setUp(self) -> None:
+        """Store the temp and permanent files in memory."""
+        self.temp_storage = ObjectStorage()
+        self.perm_storage = ObjectStorage()
+        for model, storage in [
+            (TempUploadedFile, self.temp_storage),
+            (PermUploadedFile, self.perm_storage),
+            (FileBlob, self.perm_storage),
+        ]:
+            patcher = patch.object(model._meta.get_field("file_upload"), "storage", storage)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.session = UploadSession.new_session()
+        self.uploaded_file = TempUploadedFile(name="test.pdf", session=self.session)
+        self.uploaded_file.file_upload.save("test.pdf", ContentFile(b"Test file content"))
+
+    def test_local_path_is_none(self) -> None:
+        """Test that a file that is not on the local file system has no local path."""
+        self.assertIsNone(self.uploaded_file.local_path)
+
+    def test_copy(self) -> None:
+        """Test that the file is streamed out of the storage when it is copied."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+
+        self.uploaded_file.copy(str(Path(temp_dir, "copy.pdf")))
+
+        self.assertEqual(Path(temp_dir, "copy.pdf").read_bytes(), b"Test file content")
+
+    def test_move_to_permanent_storage_falls_back_to_save(self) -> None:
+        """Test that the file is re-uploaded when the storages can't copy between each other."""
+        name = self.uploaded_file.file_upload.name
+        digest = hashlib.sha256(b"Test file content").hexdigest()
+
+        self.uploaded_file.move_to_permanent_storage()
+
+        self.assertFalse(self.temp_storage.exists(name))
+        perm_file = PermUploadedFile.objects.get(session=self.session)
+        self.assertEqual(perm_file.file_upload.name, f"blobs/{digest[:2]}/{digest[2:4]}/{digest}")
+        self.assertTrue(self.perm_storage.exists(perm_file.file_upload.name))
+
+    def test_move_to_permanent_storage_copies_in_storage(self) -> None:
+        """Test that the file is copied within the storage when the storage supports it."""
+        name = self.uploaded_file.file_upload.name
+        digest = hashlib.sha256(b"Test file content").hexdigest()
+        blob_name = f"blobs/{digest[:2]}/{digest[2:4]}/{digest}"
+        self.perm_storage.can_copy_from = MagicMock(return_value=True)
+        self.perm_storage.copy_from = MagicMock(return_value=blob_name)
+
+        self.uploaded_file.move_to_permanent_storage()
+
+        self.perm_storage.copy_from.assert_called_once_with(self.temp_storage, name, blob_name)
+        self.assertEqual(
+            PermUploadedFile.objects.get(session=self.session).file_upload.name, blob_name
+        )
+
+
+class TestUploadSessionQueryPlans(TestCase):
+    """Test that the upload session lookups are served by an index."""
+
+    def setUp(self) -> None:
+        """Skip on databases whose query plans are not checked."""
+        if connection.vendor not in ("sqlite", "mysql"):
+            self.skipTest(f"Query plans are not checked on {connection.vendor}")
+
+    def test_token_lookup_uses_unique_index(self) -> None:
+        """Test that sessions are looked up by token with the token's unique index."""
+        plan = UploadSession.objects.filter(token="a" * 32).explain()
+
+        if connection.vendor == "sqlite":
+            self.assertRegex(plan, r"SEARCH upload_uploadsession USING .*INDEX .*\(token=\?\)")
+        else:
+            self.assertIn("token", plan)
+
+    def test_expirable_uses_expiry_index(self) -> None:
+        """Test that finding sessions to expire uses the status and interaction time index."""
+        with override_settings(UPLOAD_SESSION_EXPIRE_AFTER_INACTIVE_MINUTES=30):
+            plan = UploadSession.objects.get_expirable().explain()
+
+        self.assertIn("upload_session_expiry_idx", plan)
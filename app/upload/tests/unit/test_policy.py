@@ -0,0 +1,63 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from upload.policy import FilePolicy, get_file_policy
+
+
+class TestFilePolicy(SimpleTestCase):
+    """Tests for the compiled file policy."""
+
+    def setUp(self) -> None:
+        """Set up test data."""
+        self.policy = FilePolicy({"Document": ["pdf", "TXT"], "Image": ["jpg", "png"]})
+
+    def test_get_extension(self) -> None:
+        """Test that the last extension is found and lowercased."""
+        self.assertEqual(self.policy.get_extension("report.final.PDF"), "pdf")
+        self.assertEqual(self.policy.get_extension("file."), "")
+        self.assertIsNone(self.policy.get_extension("no_extension"))
+
+    def test_is_accepted_extension(self) -> None:
+        """Test that accepted extensions are matched regardless of the case in the settings."""
+        self.assertTrue(self.policy.is_accepted_extension("pdf"))
+        self.assertTrue(self.policy.is_accepted_extension("txt"))
+        self.assertFalse(self.policy.is_accepted_extension("exe"))
+
+    def test_get_mime_types(self) -> None:
+        """Test that MIME types are looked up for accepted and other extensions."""
+        self.assertIn("image/jpeg", self.policy.get_mime_types("jpg"))
+        self.assertIn("application/zip", self.policy.get_mime_types("zip"))
+        self.assertEqual(self.policy.get_mime_types("notarealextension"), frozenset())
+
+    def test_find_traversal_pattern(self) -> None:
+        """Test that path traversal patterns are found."""
+        self.assertEqual(self.policy.find_traversal_pattern("..secret.txt"), "..")
+        self.assertEqual(self.policy.find_traversal_pattern("a\\b.txt"), "\\")
+        self.assertEqual(self.policy.find_traversal_pattern("%252fetc.txt"), "%252f")
+        self.assertIsNone(self.policy.find_traversal_pattern("my report.pdf"))
+
+    def test_find_reserved_name(self) -> None:
+        """Test that Windows reserved names are found only as the whole base name."""
+        self.assertEqual(self.policy.find_reserved_name("com5.pdf"), "COM5")
+        self.assertEqual(self.policy.find_reserved_name("NUL"), "NUL")
+        self.assertIsNone(self.policy.find_reserved_name("COM10.pdf"))
+        self.assertIsNone(self.policy.find_reserved_name("CONTRACT.pdf"))
+
+    def test_count_file_types(self) -> None:
+        """Test that files are counted by group."""
+        counts = self.policy.count_file_types(["a.pdf", "b.TXT", "c.png", "d.exe", "e"])
+        self.assertEqual(counts, {"Document": 2, "Image": 1})
+
+    def test_policy_rebuilt_when_setting_changes(self) -> None:
+        """Test that the shared policy follows the ACCEPTED_FILE_FORMATS setting."""
+        with override_settings(ACCEPTED_FILE_FORMATS={"Archive": ["zip"]}):
+            self.assertTrue(get_file_policy().is_accepted_extension("zip"))
+        self.assertFalse(get_file_policy().is_accepted_extension("zip"))
+
+    def test_benchmark_command(self) -> None:
+        """Test that the benchmark reports the cost of each check."""
+        out = StringIO()
+        call_command("benchmark_file_checks", number=100, stdout=out)
+        self.assertIn("accept_file_info", out.getvalue())
+        self.assertIn("µs per file", out.getvalue())
@@ -0,0 +1,108 @@
+import io
+
+import boto3
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase
+from moto import mock_aws
+from upload.s3 import S3MediaStorage
+
+
+class TestS3MediaStorage(SimpleTestCase):
+    """Tests for the S3 media storage, against a mocked S3 service."""
+
+    def setUp(self) -> None:
+        """Create a bucket, and a temp and permanent storage in it."""
+        mock = mock_aws()
+        mock.start()
+        self.addCleanup(mock.stop)
+
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="test-bucket")
+        options = {"bucket_name": "test-bucket", "region_name": "us-east-1"}
+        self.temp_storage = S3MediaStorage(location="temp", file_overwrite=False, **options)
+        self.perm_storage = S3MediaStorage(
+            location="uploaded_files", file_overwrite=False, **options
+        )
+
+    def test_can_copy_from_same_endpoint(self) -> None:
+        """Test that files can be copied between storages on the same object store."""
+        self.assertTrue(self.perm_storage.can_copy_from(self.temp_storage))
+
+    def test_cannot_copy_from_other_endpoint(self) -> None:
+        """Test that files can't be copied from a different object store."""
+        other = S3MediaStorage(bucket_name="test-bucket", endpoint_url="https://minio.example.com")
+        self.assertFalse(self.perm_storage.can_copy_from(other))
+
+    def test_copy_from(self) -> None:
+        """Test that a file is copied from one storage to another."""
+        name = self.temp_storage.save("session/test.pdf", ContentFile(b"Test file content"))
+
+        copied_name = self.perm_storage.copy_from(self.temp_storage, name, name)
+
+        self.assertEqual(copied_name, name)
+        with self.perm_storage.open(copied_name) as copied:
+            self.assertEqual(copied.read(), b"Test file content")
+        self.assertTrue(self.temp_storage.exists(name))
+
+    def test_copy_from_does_not_overwrite(self) -> None:
+        """Test that copying a file to a name that is taken uses a different name."""
+        name = self.temp_storage.save("session/test.pdf", ContentFile(b"New content"))
+        self.perm_storage.save(name, ContentFile(b"Existing content"))
+
+        copied_name = self.perm_storage.copy_from(self.temp_storage, name, name)
+
+        self.assertNotEqual(copied_name, name)
+        with self.perm_storage.open(name) as existing:
+            self.assertEqual(existing.read(), b"Existing content")
+
+    def test_url_is_presigned(self) -> None:
+        """Test that file URLs are pre-signed URLs on the object store."""
+        name = self.perm_storage.save("session/test.pdf", ContentFile(b"Test file content"))
+
+        url = self.perm_storage.url(name)
+
+        self.assertTrue(url.startswith("https://"))
+        self.assertIn("Signature", url)
+
+    def test_multipart_upload(self) -> None:
+        """Test that a file uploaded in parts is assembled when the upload is completed."""
+        name, upload_id = self.temp_storage.create_multipart_upload(
+            "session/test.pdf", "application/pdf"
+        )
+        client = self.temp_storage.bucket.meta.client
+        key = f"temp/{name}"
+        first_part = b"a" * 5 * 1024 * 1024
+        parts = [
+            {
+                "PartNumber": number,
+                "ETag": client.upload_part(
+                    Bucket="test-bucket", Key=key, UploadId=upload_id, PartNumber=number, Body=data
+                )["ETag"],
+            }
+            for number, data in [(1, first_part), (2, b"end")]
+        ]
+
+        self.assertEqual(len(self.temp_storage.list_uploaded_parts(name, upload_id)), 2)
+        self.temp_storage.complete_multipart_upload(name, upload_id, parts)
+
+        self.assertEqual(self.temp_storage.size(name), len(first_part) + 3)
+        self.assertEqual(self.temp_storage.read_head(name, 4), b"aaaa")
+
+    def test_presign_upload_part(self) -> None:
+        """Test that a presigned URL is created for each part of an upload."""
+        name, upload_id = self.temp_storage.create_multipart_upload("session/test.pdf", "")
+
+        url = self.temp_storage.presign_upload_part(name, upload_id, 3)
+
+        self.assertIn("partNumber=3", url)
+        self.assertIn(f"uploadId={upload_id}", url)
+
+    def test_open_stream(self) -> None:
+        """Test that a file can be streamed, and rewound to the start."""
+        name = self.temp_storage.save("session/test.pdf", ContentFile(b"Test file content"))
+
+        with self.temp_storage.open_stream(name) as stream:
+            self.assertEqual(stream.read(4), b"Test")
+            stream.seek(0)
+            self.assertEqual(stream.read(), b"Test file content")
+            with self.assertRaises(io.UnsupportedOperation):
+                stream.seek(2)
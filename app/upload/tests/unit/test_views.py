@@ -1,10 +1,18 @@
+import io
 import logging
+from pathlib import Path
 from unittest.mock import patch
 
+import pytest
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, Storage
 from django.core.files.uploadedfile import SimpleUploadedFile, UploadedFile
 from django.forms import ValidationError
-from django.test import TestCase, override_settings
+from django.http import HttpResponse
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from django.utils.translation import gettext
 from upload.models import TempUploadedFile, UploadSession
@@ -89,6 +97,7 @@ class TestUploadFilesView(TestCase):
         response_json = response.json()
         self.assertEqual(response_json.get("files"), [])
 
+    @pytest.mark.query_budget(4)
     def test_list_uploaded_files_with_files(self) -> None:
         """Session has one file."""
         file_to_upload = SimpleUploadedFile("testfile.txt", self.one_kib)
@@ -101,6 +110,44 @@ class TestUploadFilesView(TestCase):
         self.assertEqual(response_files[0]["name"], "testfile.txt")
         self.assertEqual(response_files[0]["size"], file_to_upload.size)
         self.assertEqual(response_files[0]["url"], temp_file.get_file_access_url())
+        self.assertEqual(response_files[0]["type"], "text/plain")
+
+    def test_list_uploaded_files_from_database(self) -> None:
+        """Test that listing the files does not access the file storage."""
+        temp_files = [
+            self.session.add_temp_file(SimpleUploadedFile(name, self.one_kib))
+            for name in ("a file.txt", "ünïcödé.txt", "50%;x.txt")
+        ]
+
+        with (
+            patch.object(FileSystemStorage, "exists") as mock_exists,
+            patch.object(FileSystemStorage, "size") as mock_size,
+            self.assertNumQueries(4),
+        ):
+            response = self.client.get(self.url)
+
+        mock_exists.assert_not_called()
+        mock_size.assert_not_called()
+        self.assertEqual(
+            [f["url"] for f in response.json()["files"]],
+            [f.get_file_access_url() for f in temp_files],
+        )
+
+    def test_list_uploaded_files_not_modified(self) -> None:
+        """Test that an unchanged list is answered with a 304, and a changed list is not."""
+        self.session.add_temp_file(SimpleUploadedFile("first.txt", self.one_kib))
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        self.session.add_temp_file(SimpleUploadedFile("second.txt", self.one_kib))
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["files"]), 2)
+        self.assertNotEqual(response["ETag"], etag)
 
     ## --- POST Request Tests --- ##
 
@@ -124,6 +171,7 @@ class TestUploadFilesView(TestCase):
         response = self.client.post(self.url, {})
         self.assertEqual(response.status_code, 400)
 
+    @pytest.mark.query_budget(5)
     def test_same_session_used(self) -> None:
         """Test that the same session is used if the token is provided."""
         response = self.client.post(
@@ -138,6 +186,57 @@ class TestUploadFilesView(TestCase):
         # Check that no error is raised if the uploaded file is looked up within the session
         self.session.get_file_by_name("File.pdf")
 
+    def test_storage_full(self) -> None:
+        """Test that a 507 is returned if there is no space to receive the file."""
+        with patch("upload.handlers.get_temp_storage_budget") as get_budget:
+            get_budget.return_value.reserve.return_value = None
+            response = self.client.post(
+                self.url,
+                {"file": SimpleUploadedFile("File.pdf", self.one_kib)},
+            )
+
+        self.assertEqual(response.status_code, 507)
+        self.assertIn("error", response.json())
+        self.assertEqual(self.session.file_count, 0)
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=0)
+    def test_reservation_released_on_error(self) -> None:
+        """Test that the space reserved for the request body is released if it can't be read."""
+        with (
+            patch("upload.handlers.get_temp_storage_budget") as get_budget,
+            patch(
+                "upload.handlers.SessionFileUploadHandler.receive_data_chunk",
+                side_effect=OSError("Disk error"),
+            ),
+        ):
+            response = self.client.post(
+                self.url,
+                {"file": SimpleUploadedFile("File.pdf", self.one_kib)},
+            )
+
+        self.assertEqual(response.status_code, 500)
+        get_budget.return_value.reserve.return_value.release.assert_called_once()
+
+    def test_csrf_token_checked(self) -> None:
+        """Test that an upload without a CSRF token is refused."""
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.test_user_1)
+        response = client.post(self.url, {"file": SimpleUploadedFile("File.pdf", self.one_kib)})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.session.file_count, 0)
+
+    def test_other_views_do_not_reserve_space(self) -> None:
+        """Test that files posted to other views are not received by the session upload
+        handler.
+        """
+        with patch("upload.handlers.get_temp_storage_budget") as get_budget:
+            self.client.post(
+                reverse("login"),
+                {"file": SimpleUploadedFile("File.pdf", self.one_kib)},
+            )
+
+        get_budget.assert_not_called()
+
     def test_html_file_is_sanitized_after_malware_scan(self) -> None:
         """Test that HTML files are sanitized after malware scanning and before saving."""
         html_content = b'<html><body><script>alert("xss")</script><p>Safe</p></body></html>'
@@ -477,6 +576,19 @@ class TestUploadedFileView(TestCase):
         self.assertIn("X-Accel-Redirect", response.headers)
         self.assertEqual(response.headers["X-Accel-Redirect"], self.temp_file.get_file_media_url())
 
+    @override_settings(DEBUG=False)
+    def test_get_uploaded_file_cache_headers(self) -> None:
+        """Test that the file is served with its digest as the ETag, and the stored MIME type."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.headers["ETag"], f'"{self.temp_file.sha256}"')
+        self.assertEqual(response.headers["Content-Type"], self.temp_file.mime_type)
+        self.assertIn("private", response.headers["Cache-Control"])
+        self.assertNotIn("no-store", response.headers["Cache-Control"])
+
+        response = self.client.get(self.url, headers={"If-None-Match": response.headers["ETag"]})
+        self.assertEqual(response.status_code, 304)
+        self.assertNotIn("X-Accel-Redirect", response.headers)
+
     def test_admin_can_get_any_uploaded_file(self) -> None:
         """Test that admin users can get uploaded files from any session."""
         # Login as admin
@@ -502,3 +614,348 @@ class TestUploadedFileView(TestCase):
         """Tear down test environment."""
         TempUploadedFile.objects.all().delete()
         UploadSession.objects.all().delete()
+
+
+@override_settings(UPLOAD_OFFLOAD_ENABLED=True)
+class TestUploadOffloadedFileView(TestCase):
+    """Tests for upload:upload_offloaded_file view."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        """Set up test data."""
+        cls.test_user_1 = get_user_model().objects.create_user(
+            username="testuser1", password="1X<ISRUkw+tuK"
+        )
+
+    def setUp(self) -> None:
+        """Set up test environment."""
+        self.client.force_login(self.test_user_1)
+        self.patch__accept_file = patch("upload.views.accept_file").start()
+        self.patch__accept_session = patch("upload.views.accept_session").start()
+        patch("upload.views.check_for_malware").start()
+        self.addCleanup(patch.stopall)
+        self.patch__accept_file.return_value = {"accepted": True}
+        self.patch__accept_session.return_value = {"accepted": True}
+
+        self.session = UploadSession.new_session(user=self.test_user_1)
+        self.url = reverse("upload:upload_offloaded_file", args=[self.session.token])
+
+        # Simulate NGINX writing the request body to a file
+        Path(settings.UPLOAD_OFFLOAD_FOLDER).mkdir(parents=True, exist_ok=True)
+        self.body_file = Path(settings.UPLOAD_OFFLOAD_FOLDER) / "0000000001"
+        self.body_file.write_bytes(b"%PDF-1.4 file content")
+        self.addCleanup(self.body_file.unlink, missing_ok=True)
+
+    def _post(
+        self,
+        body_file: str,
+        name: str = "My%20File.pdf",
+        secret: str = "test-upload-offload-secret",
+    ) -> HttpResponse:
+        return self.client.post(
+            self.url,
+            content_type="application/pdf",
+            headers={
+                # NGINX may mount the folder somewhere else
+                "X-Upload-File-Path": f"/nginx/media/temp/.offload/{body_file}",
+                "X-Upload-Offload-Secret": secret,
+                "X-File-Name": name,
+            },
+        )
+
+    def test_file_is_moved_into_session(self) -> None:
+        """Test that an accepted file is renamed into the upload session."""
+        inode = self.body_file.stat().st_ino
+
+        response = self._post(self.body_file.name)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["file"], "My File.pdf")
+        self.session.refresh_from_db()
+        temp_file = self.session.get_file_by_name("My File.pdf")
+        self.addCleanup(temp_file.remove)
+        self.assertEqual(Path(temp_file.file_upload.path).stat().st_ino, inode)
+        self.assertFalse(self.body_file.exists())
+        self.assertEqual(temp_file.file_size, len(b"%PDF-1.4 file content"))
+
+    def test_rejected_file_is_not_moved(self) -> None:
+        """Test that a rejected file is left for NGINX to clean up."""
+        self.patch__accept_file.return_value = {"accepted": False, "error": "ISSUE"}
+
+        response = self._post(self.body_file.name)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"], "ISSUE")
+        self.assertEqual(self.session.tempuploadedfile_set.count(), 0)
+        self.assertTrue(self.body_file.exists())
+
+    def test_missing_body_file(self) -> None:
+        """Test that a 400 is returned if the request body file does not exist."""
+        for body_file in ["0000000002", "..", ""]:
+            with self.subTest(body_file=body_file):
+                response = self._post(body_file)
+
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()["error"], gettext("No file was uploaded"))
+
+    def test_invalid_session_token(self) -> None:
+        """Test that a file can't be added to another user's session."""
+        other_user = get_user_model().objects.create_user(username="other", password="password")
+        self.client.force_login(other_user)
+
+        response = self._post(self.body_file.name)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(self.body_file.exists())
+
+    def test_request_not_from_nginx(self) -> None:
+        """Test that a body file is not adopted from a request without the NGINX secret, e.g.,
+        one sent straight to the application server.
+        """
+        for secret in ["", "wrong-secret"]:
+            with self.subTest(secret=secret):
+                response = self._post(self.body_file.name, secret=secret)
+
+                self.assertEqual(response.status_code, 403)
+                self.assertEqual(self.session.tempuploadedfile_set.count(), 0)
+                self.assertTrue(self.body_file.exists())
+
+    @override_settings(UPLOAD_OFFLOAD_SECRET="")
+    def test_no_secret_configured(self) -> None:
+        """Test that no request is trusted if the secret is not set."""
+        response = self._post(self.body_file.name, secret="")
+
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(UPLOAD_OFFLOAD_ENABLED=False)
+    def test_disabled(self) -> None:
+        """Test that the endpoint does not exist when offloading is disabled."""
+        response = self._post(self.body_file.name)
+
+        self.assertEqual(response.status_code, 404)
+
+
+class FakeMultipartStorage(Storage):
+    """An in-memory storage that supports multipart uploads, like an object store."""
+
+    def __init__(self) -> None:
+        self.files = {}
+        self.uploads = {}
+
+    def _open(self, name: str, mode: str = "rb") -> ContentFile:
+        return ContentFile(self.files[name], name=name)
+
+    def _save(self, name: str, content: File) -> str:
+        self.files[name] = content.read()
+        return name
+
+    def exists(self, name: str) -> bool:
+        """Determine whether a file exists."""
+        return name in self.files
+
+    def delete(self, name: str) -> None:
+        """Delete a file."""
+        self.files.pop(name, None)
+
+    def size(self, name: str) -> int:
+        """Get the size of a file."""
+        return len(self.files[name])
+
+    def create_multipart_upload(self, name: str, content_type: str) -> tuple[str, str]:
+        """Start a multipart upload."""
+        name = self.get_available_name(name)
+        upload_id = f"upload-{len(self.uploads) + 1}"
+        self.uploads[upload_id] = {"name": name, "parts": {}}
+        return name, upload_id
+
+    def presign_upload_part(self, name: str, upload_id: str, part_number: int) -> str:
+        """Create a URL to upload a part to."""
+        return f"https://storage.example.com/{name}?uploadId={upload_id}&partNumber={part_number}"
+
+    def upload_part(self, upload_id: str, part_number: int, data: bytes) -> dict:
+        """Upload a part, like a client would with the presigned URL."""
+        self.uploads[upload_id]["parts"][part_number] = data
+        return {"PartNumber": part_number, "ETag": f'"etag-{part_number}"'}
+
+    def list_uploaded_parts(self, name: str, upload_id: str) -> list[dict]:
+        """List the uploaded parts."""
+        return [
+            {"PartNumber": number, "ETag": f'"etag-{number}"', "Size": len(data)}
+            for number, data in sorted(self.uploads[upload_id]["parts"].items())
+        ]
+
+    def complete_multipart_upload(self, name: str, upload_id: str, parts: list[dict]) -> None:
+        """Assemble the uploaded parts into a file."""
+        uploaded = self.uploads.pop(upload_id)["parts"]
+        self.files[name] = b"".join(uploaded[part["PartNumber"]] for part in parts)
+
+    def abort_multipart_upload(self, name: str, upload_id: str) -> None:
+        """Cancel an upload."""
+        self.uploads.pop(upload_id)
+
+    def read_head(self, name: str, length: int) -> bytes:
+        """Read the first bytes of a file."""
+        return self.files[name][:length]
+
+    def open_stream(self, name: str) -> io.BytesIO:
+        """Open a file to be read from start to end."""
+        return io.BytesIO(self.files[name])
+
+
+@override_settings(DIRECT_UPLOAD_ENABLED=True)
+class TestDirectUploadViews(TestCase):
+    """Tests for the views that let clients upload files directly to the temp storage."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        """Set up test data."""
+        cls.test_user_1 = get_user_model().objects.create_user(
+            username="testuser1", password="1X<ISRUkw+tuK"
+        )
+
+    def setUp(self) -> None:
+        """Set up test environment."""
+        self.client.force_login(self.test_user_1)
+        self.storage = FakeMultipartStorage()
+        patch("upload.direct.get_temp_file_storage", return_value=self.storage).start()
+        patch.object(
+            TempUploadedFile._meta.get_field("file_upload"), "storage", self.storage
+        ).start()
+        self.patch__accept_file = patch("upload.views.accept_file").start()
+        patch("upload.views.check_for_malware").start()
+        self.addCleanup(patch.stopall)
+        self.patch__accept_file.return_value = {"accepted": True}
+
+        self.session = UploadSession.new_session(user=self.test_user_1)
+        self.create_url = reverse("upload:create_direct_upload", args=[self.session.token])
+
+    def _create(self, name: str = "file.pdf", size: int = 21) -> HttpResponse:
+        return self.client.post(
+            self.create_url,
+            data={"name": name, "type": "application/pdf", "size": size},
+            content_type="application/json",
+        )
+
+    def _upload(self, content: bytes, name: str = "file.pdf") -> HttpResponse:
+        """Upload a file in two parts, and complete the upload."""
+        upload = self._create(name, len(content)).json()
+        upload_id, key = upload["uploadId"], upload["key"]
+
+        parts = []
+        for part_number, data in enumerate([content[:10], content[10:]], start=1):
+            response = self.client.get(
+                reverse(
+                    "upload:direct_upload_part",
+                    args=[self.session.token, upload_id, part_number],
+                ),
+                {"key": key},
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(f"partNumber={part_number}", response.json()["url"])
+            parts.append(self.storage.upload_part(upload_id, part_number, data))
+
+        return self.client.post(
+            reverse("upload:direct_upload", args=[self.session.token, upload_id]),
+            data={"key": key, "parts": parts},
+            content_type="application/json",
+        )
+
+    def test_file_is_added_to_session(self) -> None:
+        """Test that a completed upload is checked, and added to the session without a copy."""
+        response = self._upload(b"%PDF-1.4 file content")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["accepted"])
+        temp_file = self.session.tempuploadedfile_set.get()
+        self.assertEqual(temp_file.name, "file.pdf")
+        self.assertEqual(temp_file.file_upload.name, f"{self.session.token}/file.pdf")
+        self.assertEqual(temp_file.file_size, 21)
+        self.assertEqual(
+            self.storage.files, {temp_file.file_upload.name: b"%PDF-1.4 file content"}
+        )
+
+        checked_file = self.patch__accept_file.call_args.args[2]
+        self.assertEqual(checked_file.head, b"%PDF-1.4 file content")
+
+    def test_rejected_file_is_removed(self) -> None:
+        """Test that a completed upload that fails the checks is removed from the storage."""
+        self.patch__accept_file.return_value = {"accepted": False, "error": "ISSUE"}
+
+        response = self._upload(b"%PDF-1.4 file content")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"], "ISSUE")
+        self.assertEqual(self.session.tempuploadedfile_set.count(), 0)
+        self.assertEqual(self.storage.files, {})
+
+    def test_file_is_checked_before_upload(self) -> None:
+        """Test that no upload is started for a file that would be rejected."""
+        for name, size in [("file.exe", 21), ("file.pdf", 0)]:
+            with self.subTest(name=name, size=size):
+                response = self._create(name, size)
+
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.json()["accepted"])
+                self.assertEqual(self.storage.uploads, {})
+
+    def test_list_parts(self) -> None:
+        """Test that the uploaded parts are listed so an upload can be resumed."""
+        upload = self._create().json()
+        self.storage.upload_part(upload["uploadId"], 1, b"%PDF-1.4 f")
+
+        response = self.client.get(
+            reverse("upload:direct_upload", args=[self.session.token, upload["uploadId"]]),
+            {"key": upload["key"]},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["parts"], [{"PartNumber": 1, "ETag": '"etag-1"', "Size": 10}]
+        )
+
+    def test_abort(self) -> None:
+        """Test that an upload can be cancelled."""
+        upload = self._create().json()
+
+        response = self.client.delete(
+            reverse("upload:direct_upload", args=[self.session.token, upload["uploadId"]])
+            + f"?key={upload['key']}"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.storage.uploads, {})
+
+    def test_invalid_key(self) -> None:
+        """Test that an upload can't be used with a key for a different upload or session."""
+        upload = self._create().json()
+        other_session = UploadSession.new_session(user=self.test_user_1)
+        cases = [
+            (self.session, upload["uploadId"], upload["key"] + "x"),
+            (self.session, "upload-2", upload["key"]),
+            (other_session, upload["uploadId"], upload["key"]),
+        ]
+        for session, upload_id, key in cases:
+            with self.subTest(session=session.token, upload_id=upload_id):
+                response = self.client.get(
+                    reverse("upload:direct_upload_part", args=[session.token, upload_id, 1]),
+                    {"key": key},
+                )
+
+                self.assertEqual(response.status_code, 400)
+
+    def test_invalid_session_token(self) -> None:
+        """Test that an upload can't be started for another user's session."""
+        other_user = get_user_model().objects.create_user(username="other", password="password")
+        self.client.force_login(other_user)
+
+        response = self._create()
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.storage.uploads, {})
+
+    @override_settings(DIRECT_UPLOAD_ENABLED=False)
+    def test_disabled(self) -> None:
+        """Test that the endpoints do not exist when direct uploads are disabled."""
+        response = self._create()
+
+        self.assertEqual(response.status_code, 404)
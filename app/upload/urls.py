@@ -1,6 +1,6 @@
 from django.contrib.auth.decorators import login_required
 from django.urls import path
-from django.views.decorators.cache import never_cache
+from django.views.decorators.cache import cache_control, never_cache
 
 from . import views
 
@@ -8,12 +8,34 @@ app_name = "upload"
 urlpatterns = [
     path(
         "upload-session/<session_token>/files/",
-        never_cache(login_required(views.upload_or_list_files)),
+        # The list of files may be kept by the browser, but must be revalidated with its ETag
+        cache_control(private=True, no_cache=True)(login_required(views.upload_or_list_files)),
         name="upload_files",
     ),
+    path(
+        "upload-session/<session_token>/offloaded-files/",
+        never_cache(login_required(views.upload_offloaded_file)),
+        name="upload_offloaded_file",
+    ),
+    path(
+        "upload-session/<session_token>/direct-uploads/",
+        never_cache(login_required(views.create_direct_upload)),
+        name="create_direct_upload",
+    ),
+    path(
+        "upload-session/<session_token>/direct-uploads/<upload_id>/",
+        never_cache(login_required(views.direct_upload)),
+        name="direct_upload",
+    ),
+    path(
+        "upload-session/<session_token>/direct-uploads/<upload_id>/parts/<int:part_number>/",
+        never_cache(login_required(views.direct_upload_part)),
+        name="direct_upload_part",
+    ),
     path(
         "upload-session/<session_token>/files/<file_name>/",
-        never_cache(login_required(views.uploaded_file)),
+        # Files are served with an ETag, so the browser may keep them if it revalidates them
+        cache_control(private=True, no_cache=True)(login_required(views.uploaded_file)),
         name="uploaded_file",
     ),
 ]
@@ -1,20 +1,39 @@
+import hashlib
+import hmac
+import json
 import logging
+import time
 from typing import Optional, cast
+from urllib.parse import quote, unquote
 
 from django.conf import settings
-from django.core.exceptions import ValidationError
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import MemoryFileUploadHandler
 from django.http import (
     Http404,
     HttpRequest,
     HttpResponse,
     JsonResponse,
 )
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import RFC3986_SUBDELIMS, quote_etag
 from django.utils.translation import gettext
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from django.views.decorators.http import require_http_methods
 from nginx.serve import serve_media_file
+from utility.metrics import Histogram
 
-from .check import accept_file, accept_session
+from .check import accept_file, accept_file_info, accept_session
 from .clam import check_for_malware
+from .direct import (
+    DirectUploadedFile,
+    get_direct_upload_storage,
+    read_direct_upload_key,
+    start_direct_upload,
+)
+from .handlers import SessionFileUploadHandler, get_offloaded_file
 from .html import sanitize_html_file
 from .models import UploadSession
 
@@ -22,9 +41,19 @@ User = settings.AUTH_USER_MODEL
 
 LOGGER = logging.getLogger(__name__)
 
+# The characters reverse() leaves unquoted in a URL
+URL_SAFE_CHARACTERS = RFC3986_SUBDELIMS + "/~:@"
+
+UPLOAD_SECONDS = Histogram(
+    "upload_request_seconds",
+    "Time taken to receive, check, and store an uploaded file, by response status.",
+    ("status",),
+)
 
+
+@csrf_exempt
 @require_http_methods(["GET", "POST"])
-def upload_or_list_files(request: HttpRequest, session_token: str) -> JsonResponse:
+def upload_or_list_files(request: HttpRequest, session_token: str) -> HttpResponse:
     """Upload a single file to the server list the files uploaded in a given upload session. The
     file is added to the upload session using the session token passed as a parameter in the
     request. If a session token is invalid, an error message is returned.
@@ -39,8 +68,24 @@ def upload_or_list_files(request: HttpRequest, session_token: str) -> JsonRespon
     Returns:
         JsonResponse: If the list or upload operation was successful, the session token
         `uploadSessionToken` is included in the response. If not successful, the error description
-        `error` is included.
+        `error` is included. A GET is answered with a 304 if the list has not changed since the
+        ``ETag`` in the ``If-None-Match`` header.
     """
+    if request.method != "POST":
+        return _upload_or_list_files(request, session_token)
+
+    # The upload handlers can only be changed before the request body is read, which the CSRF
+    # middleware would do, so the CSRF token is checked by the inner view instead
+    handler = SessionFileUploadHandler(request)
+    request.upload_handlers = [MemoryFileUploadHandler(request), handler]
+    try:
+        return _upload_or_list_files(request, session_token)
+    finally:
+        handler.release_reservation()
+
+
+@csrf_protect
+def _upload_or_list_files(request: HttpRequest, session_token: str) -> HttpResponse:
     try:
         user: User = cast(User, request.user)
         session = UploadSession.objects.filter(token=session_token, user=user).first()
@@ -54,7 +99,7 @@ def upload_or_list_files(request: HttpRequest, session_token: str) -> JsonRespon
             )
 
         if request.method == "GET":
-            return _handle_list_files(session)
+            return _handle_list_files(request, session)
         else:
             return _handle_upload_file(request, session)
 
@@ -68,16 +113,59 @@ def upload_or_list_files(request: HttpRequest, session_token: str) -> JsonRespon
         )
 
 
-def _handle_list_files(session: UploadSession) -> JsonResponse:
-    file_metadata = [
-        {"name": f.name, "size": f.file_upload.size, "url": f.get_file_access_url()}
-        for f in session.get_uploads()
-    ]
-    return JsonResponse({"files": file_metadata}, status=200)
+def _handle_list_files(request: HttpRequest, session: UploadSession) -> HttpResponse:
+    """List the files in the session from the database alone.
+
+    The response has an ``ETag`` computed from the listed metadata, so that a client that already
+    has the current list is answered with a 304.
+    """
+    files = session.get_upload_metadata()
+    etag = quote_etag(
+        hashlib.sha256(json.dumps([session.token, files], default=str).encode()).hexdigest()
+    )
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        # The URL of each file is the URL of the list followed by the file name, so it is not
+        # reversed once for each file
+        files_url = reverse("upload:upload_files", kwargs={"session_token": session.token})
+        response = JsonResponse(
+            {
+                "files": [
+                    {
+                        "name": f["name"],
+                        "size": f["file_size"],
+                        "type": f["mime_type"],
+                        "url": f"{files_url}{quote(f['name'], safe=URL_SAFE_CHARACTERS)}/",
+                    }
+                    for f in files
+                ]
+            },
+            status=200,
+        )
+    response["ETag"] = etag
+    return response
 
 
 def _handle_upload_file(request: HttpRequest, session: UploadSession) -> JsonResponse:
+    start = time.perf_counter()
+    response = _receive_upload_file(request, session)
+    UPLOAD_SECONDS.observe(time.perf_counter() - start, status=str(response.status_code))
+    return response
+
+
+def _receive_upload_file(request: HttpRequest, session: UploadSession) -> JsonResponse:
     _file = request.FILES.get("file")
+    if not _file and getattr(request, "upload_storage_full", False):
+        return JsonResponse(
+            {
+                "uploadSessionToken": session.token,
+                "error": gettext(
+                    "There is not enough space on the server to upload this file. Please try "
+                    "again later."
+                ),
+            },
+            status=507,
+        )
     if not _file:
         return JsonResponse(
             {
@@ -87,6 +175,258 @@ def _handle_upload_file(request: HttpRequest, session: UploadSession) -> JsonRes
             status=400,
         )
 
+    return _add_file_to_session(_file, session)
+
+
+@require_http_methods(["POST"])
+def upload_offloaded_file(request: HttpRequest, session_token: str) -> JsonResponse:
+    """Add a file that NGINX has already written to the :ref:`UPLOAD_OFFLOAD_FOLDER` to an
+    upload session.
+
+    NGINX buffers the request body of the upload to a file, and only passes the name of that file
+    to the application in the ``X-Upload-File-Path`` header, along with the
+    :ref:`UPLOAD_OFFLOAD_SECRET` in the ``X-Upload-Offload-Secret`` header. Requests without the
+    secret are refused, since they did not come from NGINX. The name of the uploaded file is sent
+    by the client in the ``X-File-Name`` header. The file is checked the same way as a file
+    uploaded to ``upload_or_list_files``, and moved into the session if it is accepted.
+
+    Args:
+        request: The HTTP POST request
+        session_token: The upload session token from the URL
+
+    Returns:
+        JsonResponse: The same response as a POST to ``upload_or_list_files``
+    """
+    if not settings.UPLOAD_OFFLOAD_ENABLED:
+        raise Http404("Upload offloading is not enabled")
+    if not _is_from_nginx(request):
+        raise PermissionDenied("The request was not forwarded by NGINX")
+
+    try:
+        user: User = cast(User, request.user)
+        session = UploadSession.objects.filter(token=session_token, user=user).first()
+        if not session:
+            return JsonResponse(
+                {
+                    "uploadSessionToken": session_token,
+                    "error": gettext("Invalid upload session token"),
+                },
+                status=400,
+            )
+
+        _file = get_offloaded_file(
+            request.headers.get("X-Upload-File-Path", ""),
+            unquote(request.headers.get("X-File-Name", "")),
+            request.content_type or "",
+        )
+        if not _file:
+            return JsonResponse(
+                {
+                    "uploadSessionToken": session.token,
+                    "error": gettext("No file was uploaded"),
+                },
+                status=400,
+            )
+
+        with _file:
+            return _add_file_to_session(_file, session)
+
+    except Exception as exc:
+        LOGGER.error(
+            "Uncaught exception in upload_offloaded_file view: %s", str(exc), exc_info=exc
+        )
+        return JsonResponse(
+            {
+                "error": gettext("There was an internal server error. Please try again."),
+            },
+            status=500,
+        )
+
+
+def _is_from_nginx(request: HttpRequest) -> bool:
+    secret = settings.UPLOAD_OFFLOAD_SECRET
+    sent = request.headers.get("X-Upload-Offload-Secret", "")
+    return bool(secret) and hmac.compare_digest(sent.encode(), secret.encode())
+
+
+@require_http_methods(["POST"])
+def create_direct_upload(request: HttpRequest, session_token: str) -> JsonResponse:
+    """Start uploading a file directly to the temp storage, see :mod:`upload.direct`.
+
+    The JSON request body contains the ``name``, ``type``, and ``size`` of the file. The file name
+    and size are checked before the upload is started, so that clients don't upload files that
+    would be rejected.
+
+    Args:
+        request: The HTTP POST request
+        session_token: The upload session token from the URL
+
+    Returns:
+        JsonResponse: The ``uploadId`` and ``key`` of the upload if the file can be uploaded,
+        otherwise the same errors returned by ``upload_or_list_files``
+    """
+    storage = get_direct_upload_storage()
+    if not storage:
+        raise Http404("Direct uploads are not enabled")
+
+    try:
+        session = _get_user_session(request, session_token)
+        if not session:
+            return _invalid_session_response(session_token)
+
+        data = _get_json_body(request)
+        name = str(data.get("name", ""))
+        try:
+            size = int(data.get("size", -1))
+        except (TypeError, ValueError):
+            size = -1
+
+        for check in (accept_file_info(name, size), accept_session(name, size, session)):
+            if not check["accepted"]:
+                return JsonResponse(
+                    {"file": name, "uploadSessionToken": session.token, **check}, status=400
+                )
+
+        return JsonResponse(
+            start_direct_upload(storage, session, name, str(data.get("type", ""))), status=200
+        )
+
+    except Exception as exc:
+        LOGGER.error("Uncaught exception in create_direct_upload view: %s", str(exc), exc_info=exc)
+        return _internal_error_response()
+
+
+@require_http_methods(["GET", "POST", "DELETE"])
+def direct_upload(request: HttpRequest, session_token: str, upload_id: str) -> JsonResponse:
+    """List the uploaded parts of, complete, or cancel a direct upload to the temp storage.
+
+    The ``key`` returned by ``create_direct_upload`` must be sent in the query string, or in the
+    JSON request body when completing the upload. To complete an upload, the JSON request body
+    also contains the ``PartNumber`` and ``ETag`` of each uploaded part in ``parts``. The file is
+    then checked the same way as a file uploaded to ``upload_or_list_files``, and is removed from
+    the storage if it is not accepted.
+
+    Args:
+        request: The HTTP GET, POST, or DELETE request
+        session_token: The upload session token from the URL
+        upload_id: The ID of the multipart upload from the URL
+
+    Returns:
+        JsonResponse: The uploaded ``parts`` for a GET request, the same response as a POST to
+        ``upload_or_list_files`` for a POST request, or an empty response for a DELETE request
+    """
+    storage = get_direct_upload_storage()
+    if not storage:
+        raise Http404("Direct uploads are not enabled")
+
+    try:
+        session = _get_user_session(request, session_token)
+        if not session:
+            return _invalid_session_response(session_token)
+
+        data = _get_json_body(request) if request.method == "POST" else request.GET
+        upload = read_direct_upload_key(str(data.get("key", "")), session, upload_id)
+        if not upload:
+            return JsonResponse({"error": gettext("Invalid upload")}, status=400)
+
+        stored_name = upload["stored_name"]
+        if request.method == "GET":
+            return JsonResponse(
+                {"parts": storage.list_uploaded_parts(stored_name, upload_id)}, status=200
+            )
+        if request.method == "DELETE":
+            storage.abort_multipart_upload(stored_name, upload_id)
+            return JsonResponse({}, status=200)
+
+        storage.complete_multipart_upload(stored_name, upload_id, data.get("parts", []))
+        with DirectUploadedFile(
+            storage, stored_name, upload["name"], upload["content_type"]
+        ) as _file:
+            response = _add_file_to_session(_file, session)
+
+        # Only keep the uploaded file if it was added to the session as-is
+        if not session.tempuploadedfile_set.filter(file_upload=stored_name).exists():
+            storage.delete(stored_name)
+
+        return response
+
+    except Exception as exc:
+        LOGGER.error("Uncaught exception in direct_upload view: %s", str(exc), exc_info=exc)
+        return _internal_error_response()
+
+
+@require_http_methods(["GET"])
+def direct_upload_part(
+    request: HttpRequest, session_token: str, upload_id: str, part_number: int
+) -> JsonResponse:
+    """Get a presigned URL to upload one part of a direct upload to.
+
+    Args:
+        request: The HTTP GET request, with the ``key`` of the upload in the query string
+        session_token: The upload session token from the URL
+        upload_id: The ID of the multipart upload from the URL
+        part_number: The number of the part, from 1 to 10000
+
+    Returns:
+        JsonResponse: The ``url`` the part can be PUT to
+    """
+    storage = get_direct_upload_storage()
+    if not storage:
+        raise Http404("Direct uploads are not enabled")
+
+    try:
+        session = _get_user_session(request, session_token)
+        if not session:
+            return _invalid_session_response(session_token)
+
+        upload = read_direct_upload_key(request.GET.get("key", ""), session, upload_id)
+        if not upload or not 1 <= part_number <= 10000:
+            return JsonResponse({"error": gettext("Invalid upload")}, status=400)
+
+        return JsonResponse(
+            {"url": storage.presign_upload_part(upload["stored_name"], upload_id, part_number)},
+            status=200,
+        )
+
+    except Exception as exc:
+        LOGGER.error("Uncaught exception in direct_upload_part view: %s", str(exc), exc_info=exc)
+        return _internal_error_response()
+
+
+def _get_user_session(request: HttpRequest, session_token: str) -> Optional[UploadSession]:
+    user: User = cast(User, request.user)
+    return UploadSession.objects.filter(token=session_token, user=user).first()
+
+
+def _get_json_body(request: HttpRequest) -> dict:
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _invalid_session_response(session_token: str) -> JsonResponse:
+    return JsonResponse(
+        {
+            "uploadSessionToken": session_token,
+            "error": gettext("Invalid upload session token"),
+        },
+        status=400,
+    )
+
+
+def _internal_error_response() -> JsonResponse:
+    return JsonResponse(
+        {
+            "error": gettext("There was an internal server error. Please try again."),
+        },
+        status=500,
+    )
+
+
+def _add_file_to_session(_file: UploadedFile, session: UploadSession) -> JsonResponse:
+    """Check an uploaded file, and add it to the session if it is accepted."""
     file_check = accept_file(_file.name, _file.size, _file)
     if not file_check["accepted"]:
         return JsonResponse(
@@ -205,7 +545,7 @@ def readonly_uploaded_file(
     else:
         session = UploadSession.objects.filter(token=session_token, user=request.user).first()
 
-    return _handle_uploaded_file_get(session, file_name)
+    return _handle_uploaded_file_get(request, session, file_name)
 
 
 @require_http_methods(["DELETE", "GET"])
@@ -231,7 +571,7 @@ def uploaded_file(request: HttpRequest, session_token: str, file_name: str) -> H
     if request.method == "DELETE":
         return _handle_uploaded_file_delete(session, file_name)
     else:
-        return _handle_uploaded_file_get(session, file_name)
+        return _handle_uploaded_file_get(request, session, file_name)
 
 
 def _handle_uploaded_file_delete(session: Optional[UploadSession], file_name: str) -> HttpResponse:
@@ -256,7 +596,9 @@ def _handle_uploaded_file_delete(session: Optional[UploadSession], file_name: st
     return HttpResponse(status=204)
 
 
-def _handle_uploaded_file_get(session: Optional[UploadSession], file_name: str) -> HttpResponse:
+def _handle_uploaded_file_get(
+    request: HttpRequest, session: Optional[UploadSession], file_name: str
+) -> HttpResponse:
     if not session:
         raise Http404(gettext("The uploaded file could not be found"))
 
@@ -266,4 +608,10 @@ def _handle_uploaded_file_get(session: Optional[UploadSession], file_name: str)
         raise Http404("The uploaded file could not be found") from exc
 
     file_url = uploaded_file.get_file_media_url()
-    return serve_media_file(file_url)
+    return serve_media_file(
+        file_url,
+        uploaded_file.name,
+        request=request,
+        mime_type=uploaded_file.mime_type,
+        etag=uploaded_file.sha256,
+    )
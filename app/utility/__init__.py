@@ -3,8 +3,13 @@
 from .binary import bytes_to_mb, get_human_readable_size, mb_to_bytes
 from .client import get_client_ip_address
 from .deploy import is_deployed_environment
-from .files import count_file_types, get_human_readable_file_count, zip_directory
-from .i18n import get_js_translation_version
+from .files import (
+    count_file_types,
+    get_human_readable_file_count,
+    invert_file_groups,
+    zip_directory,
+)
+from .i18n import get_js_translation_version, get_translation_version
 from .strings import html_to_text
 
 __all__ = (
@@ -14,7 +19,9 @@ __all__ = (
     "get_human_readable_file_count",
     "get_human_readable_size",
     "get_js_translation_version",
+    "get_translation_version",
     "html_to_text",
+    "invert_file_groups",
     "is_deployed_environment",
     "mb_to_bytes",
     "zip_directory",
@@ -2,7 +2,7 @@
 
 import os
 from collections import defaultdict
-from typing import List
+from typing import List, Optional
 from zipfile import ZipFile
 
 from django.utils.translation import gettext_lazy as _
@@ -32,7 +32,11 @@ def zip_directory(directory: str, zipf: ZipFile) -> None:
                 zipf.write(filename, arcname)
 
 
-def get_human_readable_file_count(file_names: list, accepted_file_groups: dict) -> str:
+def get_human_readable_file_count(
+    file_names: list,
+    accepted_file_groups: Optional[dict] = None,
+    extension_groups: Optional[dict[str, str]] = None,
+) -> str:
     """Count the number of files falling into the accepted file groups, and report the number of
     files in each group.
 
@@ -40,11 +44,14 @@ def get_human_readable_file_count(file_names: list, accepted_file_groups: dict)
         file_names (list): A list of file paths or names with extension intact
         accepted_file_groups (dict): A dictionary of file group names mapping to a list of
             lowercase file extensions without periods.
+        extension_groups (dict): A dictionary mapping lowercase file extensions to file group
+            names, as returned by :func:`invert_file_groups`. Used instead of
+            accepted_file_groups if given.
 
     Returns:
         (str): A string reporting the number of files in each group.
     """
-    counted_types = count_file_types(file_names, accepted_file_groups)
+    counted_types = count_file_types(file_names, accepted_file_groups, extension_groups)
     if not counted_types:
         return _("No file types could be identified")
 
@@ -88,7 +95,29 @@ def get_human_readable_file_count(file_names: list, accepted_file_groups: dict)
     }
 
 
-def count_file_types(file_names: list, accepted_file_groups: dict[str, List[str]]) -> dict:
+def invert_file_groups(accepted_file_groups: dict[str, List[str]]) -> dict[str, str]:
+    """Invert the ACCEPTED_FILE_FORMATS dictionary so that it maps from lowercase extension to
+    group name instead of from group name to extensions.
+
+    Args:
+        accepted_file_groups (dict): A dictionary of file group names mapping to a list of file
+            extensions without periods.
+
+    Returns:
+        (dict): A dictionary mapping from lowercase extension to group name.
+    """
+    return {
+        extension.lower(): file_type_name
+        for file_type_name, file_extension_list in accepted_file_groups.items()
+        for extension in file_extension_list
+    }
+
+
+def count_file_types(
+    file_names: list,
+    accepted_file_groups: Optional[dict[str, List[str]]] = None,
+    extension_groups: Optional[dict[str, str]] = None,
+) -> dict:
     """Tabulate how many files fall into the file groups specified in the ACCEPTED_FILE_FORMATS
     dictionary.
 
@@ -99,31 +128,29 @@ def count_file_types(file_names: list, accepted_file_groups: dict[str, List[str]
         file_names (list): A list of file paths or names with extension intact
         accepted_file_groups (dict): A dictionary of file group names mapping to a list of
             lowercase file extensions without periods.
+        extension_groups (dict): A dictionary mapping lowercase file extensions to file group
+            names, as returned by :func:`invert_file_groups`. Used instead of
+            accepted_file_groups if given, so that it does not need to be inverted on each call.
 
     Returns:
         (dict): A dictionary mapping from group name to number of files in that group.
     """
-    # Invert dict so it maps from extension -> name instead of name -> extensions
-    names_for_extensions = {
-        extension: file_type_name
-        for file_type_name, file_extension_list in accepted_file_groups.items()
-        for extension in file_extension_list
-    }
+    if extension_groups is None:
+        extension_groups = invert_file_groups(accepted_file_groups or {})
 
     counts = defaultdict(int)
 
     for name in file_names:
-        parts = name.split(".")
+        _, dot, extension = name.rpartition(".")
 
-        if len(parts) < 2:
+        if not dot:
             continue
 
-        extension = parts[-1].lower()
+        group = extension_groups.get(extension.lower())
 
-        if extension not in names_for_extensions:
+        if group is None:
             continue
 
-        name = names_for_extensions[extension]
-        counts[name] += 1
+        counts[group] += 1
 
     return dict(counts)
@@ -5,18 +5,31 @@ from pathlib import Path
 from django.conf import settings
 
 
-def get_js_translation_version() -> str:
-    """Return the latest modification time of all djangojs.mo files in the locale directory.
+def get_translation_version(domain: str = "django") -> str:
+    """Return the latest modification time of all compiled translation files for a domain in the
+    locale directory.
 
-    This changes whenever compiled JS translations are updated.
+    This changes whenever compiled translations for the domain are updated.
+
+    Args:
+        domain: The gettext domain, e.g., "django" for templates and Python code, or "djangojs"
+            for JavaScript
     """
     return str(
         max(
             [
                 item.stat().st_mtime
                 for locale_dir in settings.LOCALE_PATHS
-                for item in Path(locale_dir).rglob("djangojs.mo")
+                for item in Path(locale_dir).rglob(f"{domain}.mo")
             ]
             or [0]
         )
     )
+
+
+def get_js_translation_version() -> str:
+    """Return the latest modification time of all djangojs.mo files in the locale directory.
+
+    This changes whenever compiled JS translations are updated.
+    """
+    return get_translation_version("djangojs")
@@ -0,0 +1,229 @@
+"""Counters and histograms shared by every process of the application.
+
+Observations are added up in Redis, so that the values recorded by each gunicorn worker and each
+RQ worker are combined, even when they run in different containers. The metrics are rendered in
+the Prometheus text format with :func:`render_metrics`. Nothing is recorded unless
+:ref:`METRICS_ENABLED` is True.
+
+Metrics are registered when they are created, so they should be created once, at the top of the
+module that records them.
+"""
+
+import json
+import logging
+import math
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Optional
+
+import django_rq
+from django.conf import settings
+from redis.exceptions import RedisError
+
+LOGGER = logging.getLogger(__name__)
+
+KEY_PREFIX = "metrics"
+
+# Upper bounds of the histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, math.inf)
+
+REGISTRY: dict[str, "Metric"] = {}
+
+
+class Metric:
+    """A metric with a name, a description, and the names of the labels it is recorded with."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        REGISTRY[name] = self
+
+    def key(self, suffix: str = "") -> str:
+        """Get the Redis key the values of the metric are kept in."""
+        return f"{KEY_PREFIX}:{self.name}{suffix}"
+
+    def render(self) -> list[str]:
+        """Render the metric in the Prometheus text format."""
+        return [
+            f"# HELP {self.name} {_escape_help(self.documentation)}",
+            f"# TYPE {self.name} {self.type_name}",
+            *self.render_samples(),
+        ]
+
+    def render_samples(self) -> list[str]:
+        """Render the samples of the metric, one per line."""
+        raise NotImplementedError
+
+    def _label_field(self, labels: dict) -> str:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Metric {self.name} has labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return json.dumps([str(labels[name]) for name in self.labelnames])
+
+    def _format_labels(self, values: list[str], **extra: str) -> str:
+        pairs = [*zip(self.labelnames, values, strict=True), *extra.items()]
+        if not pairs:
+            return ""
+        return "{%s}" % ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs)
+
+    def _record(self, commands: list[tuple]) -> None:
+        """Run Redis commands against the keys of the metric, in one round trip. Metrics are
+        never allowed to break the code they measure, so errors are only logged.
+        """
+        if not settings.METRICS_ENABLED:
+            return
+        try:
+            pipeline = django_rq.get_connection().pipeline(transaction=False)
+            for command, *args in commands:
+                getattr(pipeline, command)(*args)
+            pipeline.execute()
+        except (RedisError, OSError) as exc:
+            LOGGER.warning("Could not record metric %s: %s", self.name, exc)
+
+
+class Counter(Metric):
+    """A value that only goes up, e.g., the number of bytes uploaded."""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Add to the counter."""
+        self._record([("hincrbyfloat", self.key(), self._label_field(labels), amount)])
+
+    def render_samples(self) -> list[str]:
+        """Render the value of the counter for each set of labels."""
+        values = _hgetall(self.key())
+        return [
+            f"{self.name}{self._format_labels(json.loads(field))} {_format_value(value)}"
+            for field, value in sorted(values.items())
+        ]
+
+
+class Histogram(Metric):
+    """Counts observations, e.g., how long something took, in buckets by their size."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        if self.buckets[-1] != math.inf:
+            self.buckets = (*self.buckets, math.inf)
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Count an observation in the smallest bucket it fits in. The counts are made cumulative
+        when they are rendered.
+        """
+        field = self._label_field(labels)
+        bucket = next(bound for bound in self.buckets if value <= bound)
+        self._record(
+            [
+                ("hincrby", self.key(":bucket"), json.dumps([field, _format_value(bucket)]), 1),
+                ("hincrbyfloat", self.key(":sum"), field, value),
+                ("hincrby", self.key(":count"), field, 1),
+            ]
+        )
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe how many seconds the body of the ``with`` statement takes."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render_samples(self) -> list[str]:
+        """Render the cumulative buckets, sum, and count for each set of labels."""
+        buckets: dict[str, dict[str, float]] = {}
+        for field, count in _hgetall(self.key(":bucket")).items():
+            label_field, bound = json.loads(field)
+            buckets.setdefault(label_field, {})[bound] = float(count)
+        sums = _hgetall(self.key(":sum"))
+        counts = _hgetall(self.key(":count"))
+
+        lines = []
+        for field in sorted(counts):
+            values = json.loads(field)
+            total = 0.0
+            for bound in self.buckets:
+                le = _format_value(bound)
+                total += buckets.get(field, {}).get(le, 0)
+                labels = self._format_labels(values, le=le)
+                lines.append(f"{self.name}_bucket{labels} {_format_value(total)}")
+            labels = self._format_labels(values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(sums.get(field, 0))}")
+            lines.append(f"{self.name}_count{labels} {_format_value(counts[field])}")
+        return lines
+
+
+class CallbackGauge(Metric):
+    """A value that is looked up each time the metrics are rendered, e.g., the length of a
+    queue.
+    """
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        collect: Callable[[], dict[tuple[str, ...], float]],
+        labelnames: tuple[str, ...] = (),
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def render_samples(self) -> list[str]:
+        """Render the value collected for each set of labels."""
+        return [
+            f"{self.name}{self._format_labels(list(values))} {_format_value(value)}"
+            for values, value in sorted(self.collect().items())
+        ]
+
+
+def render_metrics(metrics: Optional[list[Metric]] = None) -> str:
+    """Render metrics in the Prometheus text format.
+
+    Args:
+        metrics: The metrics to render. Defaults to every registered metric
+    """
+    lines = []
+    for metric in REGISTRY.values() if metrics is None else metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def _hgetall(key: str) -> dict[str, str]:
+    values = django_rq.get_connection().hgetall(key)
+    return {_decode(field): _decode(value) for field, value in values.items()}
+
+
+def _decode(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _format_value(value: float | str) -> str:
+    value = float(value)
+    if value == math.inf:
+        return "+Inf"
+    return repr(value)
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(value: str) -> str:
+    return _escape_help(value).replace('"', '\\"')
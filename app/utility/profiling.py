@@ -0,0 +1,148 @@
+"""Count the database queries, database time, and cache lookups made while code runs.
+
+These are used by the :class:`~recordtransfer.middleware.RequestProfilerMiddleware` to profile
+each request in development, and by the ``query_budget`` pytest marker to keep the number of
+queries made by important views from growing.
+"""
+
+import time
+from collections.abc import Callable, Iterator
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from functools import partial
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.core.signals import request_finished, request_started
+from django.db import connections
+
+_MISSING = object()
+
+
+@dataclass
+class Profile:
+    """What was counted while profiling."""
+
+    queries: int = 0
+    db_seconds: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    seconds: float = 0.0
+
+    def server_timing(self) -> str:
+        """Format the profile as a ``Server-Timing`` header, which is shown by the network tab of
+        the browser's developer tools.
+        """
+        return ", ".join(
+            (
+                f'db;desc="{self.queries} queries";dur={self.db_seconds * 1000:.1f}',
+                f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+                f"total;dur={self.seconds * 1000:.1f}",
+            )
+        )
+
+
+@contextmanager
+def profile() -> Iterator[Profile]:
+    """Count the queries and cache lookups made in the body of the ``with`` statement.
+
+    Only the caches of the current thread are counted, so requests handled at the same time by
+    other threads are not included.
+    """
+    result = Profile()
+    start = time.perf_counter()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(partial(_count_query, result)))
+        for alias in settings.CACHES:
+            _count_cache_lookups(caches[alias], result, stack)
+        try:
+            yield result
+        finally:
+            result.seconds = time.perf_counter() - start
+
+
+@contextmanager
+def profile_requests() -> Iterator[list[tuple[str, Profile]]]:
+    """Profile each request handled in the body of the ``with`` statement, e.g., by the Django
+    test client. Yields a list of the path and profile of each request, in the order they were
+    handled.
+    """
+    profiles: list[tuple[str, Profile]] = []
+    with ExitStack() as stack:
+
+        def started(sender: Any, environ: dict, **kwargs) -> None:
+            path = f"{environ.get('REQUEST_METHOD', 'GET')} {environ.get('PATH_INFO', '')}"
+            profiles.append((path, stack.enter_context(profile())))
+
+        def finished(sender: Any, **kwargs) -> None:
+            stack.close()
+
+        request_started.connect(started, weak=False)
+        request_finished.connect(finished, weak=False)
+        try:
+            yield profiles
+        finally:
+            request_started.disconnect(started)
+            request_finished.disconnect(finished)
+
+
+def _count_query(
+    result: Profile,
+    execute: Callable,
+    sql: str,
+    params: Any,
+    many: bool,
+    context: dict,
+) -> Any:
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        result.queries += 1
+        result.db_seconds += time.perf_counter() - start
+
+
+def _count_cache_lookups(cache: BaseCache, result: Profile, stack: ExitStack) -> None:
+    """Wrap the lookup methods of one cache, and restore them when the stack is closed."""
+    get, get_many = cache.get, cache.get_many
+    previous = {
+        name: cache.__dict__[name] for name in ("get", "get_many") if name in cache.__dict__
+    }
+
+    # Some backends look up each of the keys given to get_many() with get(), which should not
+    # be counted twice
+    in_get_many = False
+
+    def counting_get(key: str, default: Any = None, version: Any = None) -> Any:
+        value = get(key, _MISSING, version=version)
+        if value is _MISSING:
+            result.cache_misses += not in_get_many
+            return default
+        result.cache_hits += not in_get_many
+        return value
+
+    def counting_get_many(keys: list, version: Any = None) -> dict:
+        nonlocal in_get_many
+        keys = list(keys)
+        in_get_many = True
+        try:
+            values = get_many(keys, version=version)
+        finally:
+            in_get_many = False
+        result.cache_hits += len(values)
+        result.cache_misses += len(keys) - len(values)
+        return values
+
+    def restore() -> None:
+        for name in ("get", "get_many"):
+            if name in previous:
+                setattr(cache, name, previous[name])
+            else:
+                delattr(cache, name)
+
+    cache.get = counting_get
+    cache.get_many = counting_get_many
+    stack.callback(restore)
@@ -0,0 +1,109 @@
+"""An in-memory stand-in for the Redis connection returned by ``django_rq.get_connection``."""
+
+from typing import Any, Callable
+
+
+class FakePipeline:
+    """A pipeline that runs its commands against a FakeRedis when executed."""
+
+    def __init__(self, redis: "FakeRedis") -> None:
+        self.redis = redis
+        self.commands: list = []
+
+    def __getattr__(self, name: str) -> Callable:
+        """Queue a command."""
+        if name.startswith("_") or not hasattr(self.redis, f"_{name}"):
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def execute(self) -> list:
+        """Run the queued commands in one round trip."""
+        self.redis.round_trips += 1
+        results = [self.redis.run(name, *args, **kwargs) for name, args, kwargs in self.commands]
+        self.commands = []
+        return results
+
+
+class FakeRedis:
+    """The Redis commands used by the application, kept in a dict.
+
+    Hash fields and values are kept as strings, and are returned as bytes like Redis does. Each
+    command counts as one round trip, unless it is run in a pipeline, in which case the whole
+    pipeline counts as one.
+
+    Attributes:
+        data (dict): The value of each key. The value of a hash is a dict of its fields
+        ttls (dict): The number of seconds each key was set to expire in
+        round_trips (int): The number of round trips made to the fake server
+        commands (list): The names of the commands that were run, in order
+    """
+
+    def __init__(self) -> None:
+        self.data: dict = {}
+        self.ttls: dict = {}
+        self.round_trips = 0
+        self.commands: list = []
+
+    def __getattr__(self, name: str) -> Callable:
+        """Run a command in its own round trip."""
+        if name.startswith("_") or not hasattr(type(self), f"_{name}"):
+            raise AttributeError(name)
+
+        def command(*args, **kwargs) -> Any:
+            self.round_trips += 1
+            return self.run(name, *args, **kwargs)
+
+        return command
+
+    def run(self, name: str, *args, **kwargs) -> Any:
+        """Run a command, without counting a round trip."""
+        self.commands.append(name)
+        return getattr(self, f"_{name}")(*args, **kwargs)
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        """Start a pipeline."""
+        return FakePipeline(self)
+
+    def _hash(self, name: str) -> dict:
+        return self.data.setdefault(name, {})
+
+    def _hgetall(self, name: str) -> dict:
+        return {key.encode(): value.encode() for key, value in self.data.get(name, {}).items()}
+
+    def _hset(
+        self,
+        name: str,
+        key: str | None = None,
+        value: Any = None,
+        mapping: dict | None = None,
+    ) -> None:
+        fields = self._hash(name)
+        if key is not None:
+            fields[key] = str(value)
+        for field, field_value in (mapping or {}).items():
+            fields[field] = str(field_value)
+
+    def _hdel(self, name: str, *keys: str | bytes) -> None:
+        for key in keys:
+            self.data.get(name, {}).pop(key.decode() if isinstance(key, bytes) else key, None)
+
+    def _hincrby(self, name: str, key: str, amount: int = 1) -> None:
+        fields = self._hash(name)
+        fields[key] = str(int(fields.get(key, 0)) + amount)
+
+    def _hincrbyfloat(self, name: str, key: str, amount: float = 1.0) -> None:
+        fields = self._hash(name)
+        fields[key] = str(float(fields.get(key, 0)) + amount)
+
+    def _exists(self, name: str) -> int:
+        return int(name in self.data)
+
+    def _set(self, name: str, value: Any) -> None:
+        self.data[name] = str(value)
+
+    def _expire(self, name: str, seconds: int) -> None:
+        self.ttls[name] = seconds
+
+    def _delete(self, name: str) -> None:
+        self.data.pop(name, None)
+        self.ttls.pop(name, None)
@@ -1,7 +1,7 @@
 from typing import ClassVar
 from unittest import TestCase
 
-from utility.files import count_file_types, get_human_readable_file_count
+from utility.files import count_file_types, get_human_readable_file_count, invert_file_groups
 
 
 class FileCountingUtilityTests(TestCase):
@@ -79,6 +79,15 @@ class FileCountingUtilityTests(TestCase):
         )
         self.assertEqual(counted_types, {"Microsoft Word Document": 1})
 
+    def test_inverted_groups_counted(self) -> None:
+        """Test counting with groups that were already inverted."""
+        extension_groups = invert_file_groups(self.accepted_formats)
+        self.assertEqual(extension_groups["xlsx"], "Microsoft Excel Spreadsheet")
+        counted_types = count_file_types(
+            ["file1.doc", "song1.mp3", "file3.pdf"], extension_groups=extension_groups
+        )
+        self.assertEqual(counted_types, {"Microsoft Word Document": 1, "Audio": 1})
+
 
 class HumanReadableCountTests(TestCase):
     """Test the get_human_readable_file_count function."""
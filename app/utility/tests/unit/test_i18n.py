@@ -1,7 +1,11 @@
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
 from unittest import TestCase
 
 from django.test import override_settings
-from utility.i18n import get_js_translation_version
+
+from utility.i18n import get_js_translation_version, get_translation_version
 
 
 class TestGetJsTranslationVersion(TestCase):
@@ -12,3 +16,19 @@ class TestGetJsTranslationVersion(TestCase):
         """Test that a default value of '0' is returned if there are no paths."""
         version = get_js_translation_version()
         self.assertEqual("0", version)
+
+
+class TestGetTranslationVersion(TestCase):
+    """Tests for get_translation_version."""
+
+    def test_domains_versioned_separately(self) -> None:
+        """Test that the version follows the compiled files of the domain."""
+        with TemporaryDirectory() as locale_dir:
+            mo_file = Path(locale_dir, "fr", "LC_MESSAGES", "django.mo")
+            mo_file.parent.mkdir(parents=True)
+            mo_file.touch()
+            os.utime(mo_file, (1000, 1000))
+
+            with override_settings(LOCALE_PATHS=[locale_dir]):
+                self.assertEqual("1000.0", get_translation_version())
+                self.assertEqual("0", get_translation_version("djangojs"))
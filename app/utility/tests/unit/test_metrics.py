@@ -0,0 +1,86 @@
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase, override_settings
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from utility.metrics import REGISTRY, CallbackGauge, Counter, Histogram, render_metrics
+from utility.tests.fake_redis import FakeRedis
+
+
+@override_settings(METRICS_ENABLED=True)
+class TestMetrics(SimpleTestCase):
+    """Tests for the metrics kept in Redis."""
+
+    def setUp(self) -> None:
+        """Use a fake Redis connection, and remove the metrics made by each test."""
+        self.redis = FakeRedis()
+        patcher = patch("utility.metrics.django_rq.get_connection", return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        registered = dict(REGISTRY)
+        self.addCleanup(lambda: (REGISTRY.clear(), REGISTRY.update(registered)))
+
+    def test_counter(self) -> None:
+        """Test that a counter adds up the amounts for each set of labels."""
+        counter = Counter("test_bytes_total", "Bytes received.", ("source",))
+        counter.inc(100, source="web")
+        counter.inc(50, source="web")
+        counter.inc(1, source='say "hi"')
+
+        self.assertEqual(
+            render_metrics([counter]),
+            "# HELP test_bytes_total Bytes received.\n"
+            "# TYPE test_bytes_total counter\n"
+            'test_bytes_total{source="say \\"hi\\""} 1.0\n'
+            'test_bytes_total{source="web"} 150.0\n',
+        )
+
+    def test_histogram(self) -> None:
+        """Test that a histogram renders cumulative buckets, the sum, and the count."""
+        histogram = Histogram("test_seconds", "Time taken.", buckets=(1, 5))
+        histogram.observe(0.5)
+        histogram.observe(3)
+        histogram.observe(10)
+
+        self.assertEqual(
+            render_metrics([histogram]).splitlines()[2:],
+            [
+                'test_seconds_bucket{le="1.0"} 1.0',
+                'test_seconds_bucket{le="5.0"} 2.0',
+                'test_seconds_bucket{le="+Inf"} 3.0',
+                "test_seconds_sum 13.5",
+                "test_seconds_count 3.0",
+            ],
+        )
+
+    def test_observation_one_round_trip(self) -> None:
+        """Test that an observation is recorded in one round trip to Redis."""
+        histogram = Histogram("test_seconds", "Time taken.", ("step",))
+        with histogram.time(step="scan"):
+            pass
+        self.assertEqual(self.redis.round_trips, 1)
+        self.assertIn('test_seconds_count{step="scan"} 1.0', render_metrics([histogram]))
+
+    def test_wrong_labels(self) -> None:
+        """Test that a metric must be recorded with the labels it was made with."""
+        counter = Counter("test_total", "Things.", ("kind",))
+        with self.assertRaises(ValueError):
+            counter.inc(other="value")
+
+    def test_callback_gauge(self) -> None:
+        """Test that a gauge is collected when it is rendered."""
+        gauge = CallbackGauge("test_length", "Length.", lambda: {("a",): 3}, ("queue",))
+        self.assertIn('test_length{queue="a"} 3.0', render_metrics([gauge]))
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled(self) -> None:
+        """Test that nothing is sent to Redis when metrics are disabled."""
+        Counter("test_total", "Things.").inc()
+        self.assertEqual(self.redis.round_trips, 0)
+
+    def test_redis_errors_ignored(self) -> None:
+        """Test that the code being measured is not broken when Redis is unavailable."""
+        broken = MagicMock()
+        broken.pipeline.return_value.execute.side_effect = RedisConnectionError("down")
+        with patch("utility.metrics.django_rq.get_connection", return_value=broken):
+            Counter("test_total", "Things.").inc()
@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from recordtransfer.models import User
+
+from utility.profiling import profile, profile_requests
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "test-profiling",
+        }
+    }
+)
+class TestProfile(TestCase):
+    """Tests for profiling queries and cache lookups."""
+
+    def setUp(self) -> None:
+        """Clear the cache after each test."""
+        self.addCleanup(cache.clear)
+
+    def test_queries_counted(self) -> None:
+        """Test that each query is counted."""
+        with profile() as result:
+            User.objects.count()
+            list(User.objects.all())
+        self.assertEqual(result.queries, 2)
+        self.assertGreater(result.seconds, 0)
+
+    def test_cache_lookups_counted(self) -> None:
+        """Test that cache hits and misses are counted, and the cache still works."""
+        cache.set("present", 0)
+        with profile() as result:
+            self.assertEqual(cache.get("present"), 0)
+            self.assertEqual(cache.get("missing", "default"), "default")
+            self.assertEqual(cache.get_many(["present", "missing"]), {"present": 0})
+            cache.get_or_set("computed", 1)
+        # get_or_set() looks the key up again after adding it
+        self.assertEqual(result.cache_hits, 3)
+        self.assertEqual(result.cache_misses, 3)
+
+    def test_cache_restored(self) -> None:
+        """Test that lookups are not counted after profiling, including by an outer profile."""
+        with profile() as outer:
+            with profile() as inner:
+                cache.get("key")
+            cache.get("key")
+        cache.get("key")
+        self.assertEqual(inner.cache_misses, 1)
+        self.assertEqual(outer.cache_misses, 2)
+        self.assertNotIn("get", cache.__dict__)
+
+    def test_profile_requests(self) -> None:
+        """Test that each request is profiled separately, without the queries made between."""
+        url = reverse("recordtransfer:index")
+        with profile_requests() as profiles:
+            self.client.get(url)
+            User.objects.count()
+            self.client.get(url)
+
+        self.assertEqual([path for path, _ in profiles], [f"GET {url}", f"GET {url}"])
+        self.assertEqual(profiles[0][1].queries, profiles[1][1].queries)
@@ -5,6 +5,7 @@ pytest during test collection and execution.
 import os
 import shutil
 import subprocess
+from collections.abc import Generator
 
 import pytest
 
@@ -37,3 +38,32 @@ def pytest_runtestloop(session: pytest.Session) -> None:
             pytest.exit(
                 f"pnpm command not found (got: {e}). pnpm must be installed to run e2e tests."
             )
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item: pytest.Item) -> Generator[None, object, object]:
+    """Fail tests marked with ``query_budget(max_queries)`` if any request they make with the
+    Django test client uses more than ``max_queries`` database queries. Queries made by the test
+    itself, e.g., to create its data, are not counted.
+    """
+    marker = item.get_closest_marker("query_budget")
+    if marker is None:
+        return (yield)
+
+    from utility.profiling import profile_requests
+
+    max_queries = marker.args[0]
+    with profile_requests() as profiles:
+        result = yield
+    if not profiles:
+        pytest.fail("The test has a query budget, but it made no requests")
+    over_budget = [
+        f"{path} made {profile.queries} queries"
+        for path, profile in profiles
+        if profile.queries > max_queries
+    ]
+    if over_budget:
+        pytest.fail(
+            f"Requests went over the budget of {max_queries} queries:\n" + "\n".join(over_budget)
+        )
+    return result
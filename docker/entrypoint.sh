@@ -26,6 +26,9 @@ if [ "$SERVICE_NAME" = 'rq' ]; then
 
   echo ">> Starting RQ worker(s)"
 
+elif [ "$SERVICE_NAME" = 'rq-email' ]; then
+  echo ">> Starting RQ email worker"
+
 elif [ "$SERVICE_NAME" = 'rq-scheduler' ]; then
   echo ">> Starting RQ scheduler"
 
@@ -38,6 +41,9 @@ elif [ "$SERVICE_NAME" = 'app' ]; then
 
     echo ">> Collecting static files."
     python manage.py collectstatic --no-input --clear
+
+    echo ">> Rendering JavaScript translation catalogs."
+    python manage.py render_javascript_catalogs
   fi
 
   echo ">> Starting app"
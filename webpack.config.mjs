@@ -25,6 +25,7 @@ export default {
     },
     entry: {
         main: "./app/frontend/main/index.ts",
+        submission_form: "./app/frontend/main/submission_form.ts",
         admin: "./app/frontend/admin/index.ts",
     },
     output: {
@@ -56,6 +57,7 @@ export default {
     plugins: [
         new MiniCssExtractPlugin({
             filename: "css/[name].[contenthash:8].css",
+            chunkFilename: "css/[name].[contenthash:8].chunk.css",
         }),
         new BundleTracker({
             path: path.resolve(__dirname, "dist"),
@@ -67,11 +69,16 @@ export default {
             "...", // This keeps the default JavaScript minifier
             new CssMinimizerPlugin(), // Add this line to minify CSS
         ],
+        // One runtime shared by the entry points loaded on the same page, so that they share
+        // modules and the chunks loaded with import()
+        runtimeChunk: "single",
         splitChunks: {
             cacheGroups: {
+                // Not given a single name, so that packages only used by chunks loaded with
+                // import() (e.g., Uppy) are not added to the vendor chunk every page loads
                 vendor: {
                     test: /[\\/]node_modules[\\/]/,
-                    name: "vendors",
+                    idHint: "vendors",
                     chunks: "all"
                 }
             }